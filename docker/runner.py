@@ -1,21 +1,19 @@
 import os
 import time
 import logging
-import requests
 import signal
+from dataclasses import asdict
 
+# Only what the runner needs before the health server is up; the trading stack
+# (pandas, the Alpaca SDK, strategies) is imported in main() after it starts
 from smartcfd.config import load_config_from_file
-from smartcfd.db import connect as db_connect, init_schema, record_run, record_heartbeat, record_order_event
+from smartcfd.db import connect as db_connect, init_schema, record_run, record_heartbeat, record_order_event, record_cycle_trace
 from smartcfd.alpaca_helpers import build_api_base, build_headers_from_env
 from smartcfd.health_server import start_health_server
-from smartcfd.logging_setup import setup_logging
-from smartcfd.regime_detector import RegimeDetector
-from smartcfd.strategy import get_strategy_by_name, InferenceStrategy
-from smartcfd.trader import Trader
-from smartcfd.alpaca_client import AlpacaBroker
-from smartcfd.risk import RiskManager
-from smartcfd.data_loader import DataLoader
-from smartcfd.portfolio import PortfolioManager
+from smartcfd.logging_setup import setup_logging, setup_logging_from_config, shutdown_logging
+from smartcfd.scheduler import FULL, build_scheduler, sleep_until
+from smartcfd.tracing import configure_tracing, tracer
+from smartcfd.metrics import CYCLE_SECONDS, CYCLES, ERRORS, LAST_CYCLE
 
 # Global connection and run_id to be accessible by the signal handler
 conn = None
@@ -40,8 +38,9 @@ def main():
     except (FileNotFoundError, ValueError) as e:
         log.critical(f"Failed to load configuration: {e}")
         return # Exit if config is missing or invalid
+    setup_logging_from_config(app_cfg)
 
-    api_base = f"https://paper-api.alpaca.markets" if app_cfg.alpaca_env == 'paper' else "https://api.alpaca.markets"
+    api_base = build_api_base(app_cfg.alpaca_env)
 
     if app_cfg.alpaca_env == "live":
         log.critical("="*80)
@@ -67,13 +66,38 @@ def main():
         signal.signal(signal.SIGBREAK, shutdown_handler)
 
     # Start /healthz server (optional)
+    recorder = None
+    trader = None
     try:
         # Start health server optionally
         if os.getenv("RUN_HEALTH_SERVER", "1") not in ("0", "false", "False", "FALSE"):
             start_health_server(app_cfg, alpaca_cfg)
 
+        from smartcfd import traffic
+        from smartcfd.alpaca_client import AlpacaBroker
+        from smartcfd.books import BookRunner
+        from smartcfd.data_loader import parse_interval, timeframe_to_timedelta
+        from smartcfd.portfolio import PortfolioManager
+        from smartcfd.profiles import load_profiles
+        from smartcfd.risk import RiskManager
+        from smartcfd.sharded_trader import ShardedTrader
+        from smartcfd.trader import Trader
+
+        # Record broker and market-data traffic for offline replay (scripts/replay.py)
+        if app_cfg.traffic_log_path:
+            os.makedirs(os.path.dirname(app_cfg.traffic_log_path) or ".", exist_ok=True)
+            recorder = traffic.TrafficRecorder(app_cfg.traffic_log_path, meta={
+                "app_config": {k: v for k, v in asdict(app_cfg).items() if k != "alpaca"},
+                "risk_config": asdict(risk_cfg),
+                "regime_config": asdict(regime_cfg),
+            })
+            traffic.install(recorder)
+            if app_cfg.trader_shards > 1:
+                log.warning("runner.traffic.shards_not_recorded", extra={"extra": {"trader_shards": app_cfg.trader_shards}})
+
         # Initialize Broker and DB connection
         broker = AlpacaBroker(key_id=alpaca_cfg.key_id, secret_key=alpaca_cfg.secret_key, paper=(app_cfg.alpaca_env == 'paper'))
+        broker.get_account_info()  # Fail fast on bad credentials or no connectivity
         conn = db_connect()
         init_schema(conn)
         run_id = record_run(conn, status="start", note="runner")
@@ -84,7 +108,7 @@ def main():
 
         # Initialize the Trader
         log.info("runner.init.trader.start")
-        trader = Trader(
+        trader_kwargs = dict(
             app_config=app_cfg,
             risk_config=risk_cfg,
             regime_config=regime_cfg,
@@ -93,38 +117,90 @@ def main():
             portfolio_manager=portfolio_manager,
             risk_manager=risk_manager
         )
+        trade_interval = app_cfg.trade_interval
+        if app_cfg.profiles:
+            profiles = load_profiles([p.strip() for p in app_cfg.profiles.split(",") if p.strip()], app_cfg, risk_cfg)
+            if app_cfg.trader_shards > 1:
+                log.warning("runner.books.shards_ignored", extra={"extra": {"trader_shards": app_cfg.trader_shards}})
+            trader = BookRunner(profiles, regime_cfg, broker, conn, portfolio_manager)
+            trade_interval = trader.trade_interval
+        elif app_cfg.trader_shards > 1:
+            trader = ShardedTrader(n_shards=app_cfg.trader_shards, **trader_kwargs)
+        else:
+            trader = Trader(**trader_kwargs)
         log.info("runner.init.trader.success")
 
-        log.info("runner.start")
+        scheduler = build_scheduler(
+            app_cfg.schedule_mode,
+            timeframe_to_timedelta(parse_interval(trade_interval)),
+            app_cfg.bar_settle_seconds,
+            app_cfg.run_interval_seconds,
+        )
+        log.info("runner.start", extra={"extra": {"schedule_mode": app_cfg.schedule_mode, "trade_interval": trade_interval}})
+
+        # Stage timings feed both the traces and the /metrics histograms
+        configure_tracing(app_cfg.tracing_enabled or app_cfg.metrics_enabled)
+        last_cycle_ms = None
 
         # Main loop
         while running:
-            try:
-                # Record a heartbeat to show the runner is alive
-                if conn:
-                    record_heartbeat(conn, ok=True, note="runner")
-
-                trader.run()
-
-            except Exception:
-                log.error("runner.loop.fail", exc_info=True)
-            
-            # Sleep in 1s intervals to allow signal handling
-            sleep_duration = app_cfg.run_interval_seconds
-            for _ in range(int(sleep_duration)):
-                if not running:
-                    break
-                time.sleep(1)
+            cycle = scheduler.next_cycle(time.time())
+            # Sleep in 1s steps to allow signal handling
+            if not sleep_until(cycle.at, lambda: running):
+                break
+
+            started = time.time()
+            with tracer.cycle(cycle.kind) as trace:
+                try:
+                    # Record a heartbeat to show the runner is alive (with the previous cycle's duration)
+                    if conn:
+                        record_heartbeat(conn, ok=True, latency_ms=last_cycle_ms, note="runner")
+
+                    if recorder:
+                        recorder.mark("cycle", kind=cycle.kind)
+                    if cycle.kind == FULL:
+                        trader.run()
+                    else:
+                        trader.reconcile()
+
+                except Exception:
+                    log.error("runner.loop.fail", exc_info=True)
+                    ERRORS.labels("runner").inc()
+            scheduler.complete(cycle)
+            last_cycle_ms = round(1000 * (time.time() - started), 3)
+            CYCLE_SECONDS.labels(cycle.kind).observe(last_cycle_ms / 1000)
+            CYCLES.labels(cycle.kind).inc()
+            LAST_CYCLE.set(time.time())
+            if recorder:
+                recorder.flush()
+            if trace is not None and app_cfg.tracing_enabled and conn:
+                try:
+                    record_cycle_trace(conn, trace.kind, last_cycle_ms, trace.stages())
+                except Exception:
+                    log.warning("runner.cycle_trace.fail", exc_info=True)
+            log.info("runner.cycle", extra={"extra": {"kind": cycle.kind, "lag_s": round(started - cycle.at, 3), "duration_s": round(last_cycle_ms / 1000, 3)}})
 
         # --- Shutdown sequence ---
         log.info("runner.shutdown.start")
         if conn and run_id:
             record_run(conn, status="end", note="shutdown signal received", run_id=run_id)
+    except Exception:
+        log.warning("runner.main.fail", exc_info=True)
+    finally:
+        # Also when the loop failed: stop the trader's workers and release the database
+        if hasattr(trader, "close"):
+            try:
+                trader.close()
+            except Exception:
+                log.warning("runner.shutdown.trader_close_fail", exc_info=True)
         if conn:
             conn.close()
         log.info("runner.shutdown.complete")
-    except Exception:
-        log.warning("runner.main.fail", exc_info=True)
+        if recorder:
+            # Also when the loop failed: unpatch the REST client and flush the (gzip) traffic log
+            traffic.uninstall()
+            recorder.close()
+        shutdown_logging()
 
 
 if __name__ == "__main__":
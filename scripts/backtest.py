@@ -13,40 +13,60 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 
 from smartcfd.data_loader import DataLoader
-from smartcfd.config import load_config, load_risk_config
+from smartcfd.config import AppConfig, RiskConfig, load_config_from_file
 from smartcfd.alpaca_helpers import build_api_base
 from smartcfd.strategy import InferenceStrategy
 from smartcfd.risk import RiskManager, BacktestRiskManager
 from smartcfd.backtest_broker import MockBroker
 from smartcfd.backtest_portfolio import BacktestPortfolio
+from smartcfd.multi_asset_backtest import align_bars, run_multi_asset_backtest
+from smartcfd.dataset_store import BarDatasetStore, load_bars
 
 def setup_logging(level="INFO"):
     """Sets up basic logging."""
     logging.basicConfig(level=level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-def run_backtest(symbol: str, start_date: str, end_date: str, initial_capital: float):
+def load_configs(offline: bool = False) -> tuple[AppConfig, RiskConfig]:
+    """
+    Loads app and risk settings from config.ini. Offline runs fall back to the
+    defaults when no config or credentials are available.
+    """
+    try:
+        app_cfg, _, risk_cfg, _ = load_config_from_file()
+        return app_cfg, risk_cfg
+    except (FileNotFoundError, ValueError) as e:
+        if not offline:
+            raise
+        logging.getLogger("backtester").warning(f"Using default configuration for offline backtest: {e}")
+        return AppConfig(), RiskConfig()
+
+def load_symbol_bars(symbol: str, start_date: str, end_date: str, interval: str, offline: bool = False) -> pd.DataFrame:
+    """
+    Reads bars from the local dataset archive. Missing months are downloaded once
+    (and kept) unless running offline, in which case only stored bars are used.
+    """
+    store = BarDatasetStore()
+    data_loader = None
+    if not offline and store.missing_months(symbol, interval, start_date, end_date):
+        app_cfg, alpaca_cfg, _, _ = load_config_from_file()
+        data_loader = DataLoader(
+            api_key=alpaca_cfg.key_id,
+            secret_key=alpaca_cfg.secret_key,
+            api_base=build_api_base(app_cfg.alpaca_env)
+        )
+    return load_bars(symbol, start_date, end_date, interval, store=store, data_loader=data_loader)
+
+def run_backtest(symbol: str, start_date: str, end_date: str, initial_capital: float, interval: str = "1Hour", offline: bool = False):
     """
     Main logic for running the backtest.
     """
     log = logging.getLogger("backtester")
     log.info(f"Starting backtest for {symbol} from {start_date} to {end_date} with ${initial_capital:,.2f}")
 
-    cfg = load_config()
-    api_base = build_api_base(cfg.alpaca_env)
-    data_loader = DataLoader(
-        api_key=cfg.alpaca_cfg.api_key,
-        secret_key=cfg.alpaca_cfg.secret_key,
-        api_base=api_base
-    )
-
     # 1. Load Data
     log.info("Loading historical data...")
-    # Note: The existing DataLoader is designed for fetching recent data for live trading.
-    # We may need to adapt it or use a different method for fetching long historical periods.
-    # For now, we'll assume it can be adapted.
     try:
-        # This is a conceptual placeholder. We'll need to implement fetching a date range.
-        data = data_loader.fetch_historical_range(symbol, start_date, end_date, "1Hour") # Assuming 1Hour for now
+        data = load_symbol_bars(symbol, start_date, end_date, interval, offline)
         if data.empty:
             log.error("No data loaded, cannot run backtest.")
             return
@@ -63,7 +83,7 @@ def run_backtest(symbol: str, start_date: str, end_date: str, initial_capital: f
 
     # 2. Initialize Components
     log.info("Initializing backtest components...")
-    risk_cfg = load_risk_config()
+    _, risk_cfg = load_configs(offline)
     broker = MockBroker(data)
     portfolio = BacktestPortfolio(initial_capital=initial_capital)
     risk_manager = BacktestRiskManager(risk_cfg)
@@ -144,6 +164,76 @@ def run_backtest(symbol: str, start_date: str, end_date: str, initial_capital: f
         log.info(f"Trade history saved to {trade_filename}")
 
 
+def run_portfolio_backtest(symbols: list[str], start_date: str, end_date: str, initial_capital: float, interval: str = "1Hour", offline: bool = False):
+    """
+    Backtests several symbols as one portfolio on an aligned timestamp index,
+    applying the live portfolio-level exposure caps.
+    """
+    import joblib
+
+    log = logging.getLogger("backtester")
+    log.info(f"Starting portfolio backtest for {symbols} from {start_date} to {end_date} with ${initial_capital:,.2f}")
+
+    app_cfg, risk_cfg = load_configs(offline)
+
+    data = {}
+    for symbol in symbols:
+        df = load_symbol_bars(symbol, start_date, end_date, interval, offline)
+        if df is None or df.empty:
+            log.warning(f"No data loaded for {symbol}; excluding it from the portfolio.")
+            continue
+        data[symbol] = df
+        log.info(f"Loaded {len(df)} data points for {symbol}.")
+    if not data:
+        log.error("No data loaded, cannot run backtest.")
+        return
+
+    model = joblib.load(os.getenv("MODEL_PATH", "models/model.joblib"))
+    feature_names = joblib.load(os.getenv("FEATURE_NAMES_PATH", "models/feature_names.joblib"))
+
+    aligned = align_bars(data, feature_names)
+    result = run_multi_asset_backtest(
+        aligned,
+        model,
+        risk_cfg,
+        initial_capital,
+        confidence_threshold=app_cfg.trade_confidence_threshold,
+    )
+
+    equity_series = result.equity_curve
+    returns = equity_series.pct_change().dropna()
+    sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252) if returns.std() > 0 else 0
+    max_drawdown = (equity_series / equity_series.cummax() - 1.0).min()
+    final_equity = equity_series.iloc[-1]
+
+    log.info("--- Portfolio Backtest Results ---")
+    log.info(f"Symbols:         {', '.join(aligned.symbols)}")
+    log.info(f"Initial Capital: ${initial_capital:,.2f}")
+    log.info(f"Final Equity:    ${final_equity:,.2f}")
+    log.info(f"Total Return:    {((final_equity - initial_capital) / initial_capital) * 100:.2f}%")
+    log.info(f"Sharpe Ratio:    {sharpe_ratio:.2f}")
+    log.info(f"Max Drawdown:    {max_drawdown:.2%}")
+    log.info(f"Total Trades:    {len(result.trades)}")
+    log.info("----------------------------------")
+
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    os.makedirs("reports", exist_ok=True)
+    plt.figure(figsize=(12, 6))
+    plt.plot(equity_series)
+    plt.title(f'Portfolio Equity Curve ({len(aligned.symbols)} symbols)')
+    plt.xlabel('Time')
+    plt.ylabel('Equity (USD)')
+    plot_filename = f"reports/backtest_portfolio_{stamp}.png"
+    plt.savefig(plot_filename)
+    plt.close()
+    log.info(f"Equity curve plot saved to {plot_filename}")
+
+    if not result.trades.empty:
+        trade_filename = f"reports/trade_history_portfolio_{stamp}.csv"
+        result.trades.to_csv(trade_filename, index=False)
+        log.info(f"Trade history saved to {trade_filename}")
+
+
 def main():
     """
     Main function to run the backtesting engine.
@@ -153,13 +243,21 @@ def main():
     log.info("Backtesting engine starting...")
 
     parser = argparse.ArgumentParser(description="SmartCFD Backtesting Engine")
-    parser.add_argument("--symbol", type=str, required=True, help="The symbol to backtest (e.g., 'BTC/USD')")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--symbol", type=str, help="The symbol to backtest (e.g., 'BTC/USD')")
+    target.add_argument("--symbols", type=str, help="Comma-separated symbols to backtest as one portfolio (e.g., 'BTC/USD,ETH/USD')")
     parser.add_argument("--start", type=str, required=True, help="Start date in YYYY-MM-DD format")
     parser.add_argument("--end", type=str, required=True, help="End date in YYYY-MM-DD format")
     parser.add_argument("--capital", type=float, default=10000.0, help="Initial capital for the backtest")
+    parser.add_argument("--interval", type=str, default="1Hour", help="Bar timeframe (e.g., '15m', '1Hour')")
+    parser.add_argument("--offline", action="store_true", help="Use only bars already in the local dataset archive")
     args = parser.parse_args()
 
-    run_backtest(args.symbol, args.start, args.end, args.capital)
+    if args.symbols:
+        symbols = [s.strip() for s in args.symbols.split(',') if s.strip()]
+        run_portfolio_backtest(symbols, args.start, args.end, args.capital, args.interval, args.offline)
+    else:
+        run_backtest(args.symbol, args.start, args.end, args.capital, args.interval, args.offline)
 
     log.info("Backtesting engine finished.")
 
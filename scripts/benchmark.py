@@ -0,0 +1,118 @@
+"""
+Benchmarks the trading hot paths on synthetic data and compares runs.
+
+Examples:
+  python scripts/benchmark.py run --preset quick
+  python scripts/benchmark.py run --cases "indicators.*" "features.*" --sizes 1000x1 100000x1 --output reports/benchmarks/features.json
+  python scripts/benchmark.py run --preset default --baseline reports/benchmarks/baseline.json
+  python scripts/benchmark.py compare reports/benchmarks/baseline.json reports/benchmarks/latest.json --threshold 0.05
+  python scripts/benchmark.py startup
+
+`compare` (and `run --baseline`) exits with status 1 when a case regressed, `startup`
+when an entry point's cold import exceeds its budget or loads a heavy dependency.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import logging
+from datetime import datetime, timezone
+
+from smartcfd.benchmarks import CASES, DEFAULT_THRESHOLD, MAX_ROWS, PRESETS, compare_results, format_comparison, run_benchmarks, select_cases
+from smartcfd.startup import check_startup, format_startup
+
+
+def _size(text: str):
+    """Parses BARSxSYMBOLS, e.g. 100000x20."""
+    try:
+        bars, symbols = text.lower().split("x")
+        return int(bars), int(symbols)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected BARSxSYMBOLS (e.g. 1000x20), got {text!r}")
+
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _report(rows, log) -> int:
+    print(format_comparison(rows))
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        log.error(f"{len(regressions)} benchmark(s) regressed: {', '.join(row['name'] for row in regressions)}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SmartCFD hot-path benchmarks")
+    parser.add_argument("--log-level", default="ERROR", help="Log level while benchmarking (INFO logs per prediction skew the timings)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run benchmarks and write the results to JSON")
+    run.add_argument("--preset", choices=sorted(PRESETS), default="default", help="Grid of (bars, symbols) sizes")
+    run.add_argument("--sizes", type=_size, nargs="+", default=None, help="Explicit sizes as BARSxSYMBOLS; overrides --preset")
+    run.add_argument("--cases", nargs="+", default=None, help="Glob patterns of the cases to run (default: all)")
+    run.add_argument("--list", action="store_true", help="List the cases and exit")
+    run.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data")
+    run.add_argument("--repeat", type=int, default=5, help="Timed repeats per case and size")
+    run.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per repeat (fast cases are looped)")
+    run.add_argument("--max-rows", type=int, default=MAX_ROWS, help="Skip sizes with more bars in total")
+    run.add_argument("--output", type=str, default=None, help="Results JSON (default: reports/benchmarks/benchmark_<utc time>.json)")
+    run.add_argument("--baseline", type=str, default=None, help="Results JSON to compare against after the run")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Relative slowdown counted as a regression")
+
+    compare = commands.add_parser("compare", help="Compare two results files")
+    compare.add_argument("baseline", type=str)
+    compare.add_argument("current", type=str)
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Relative slowdown counted as a regression")
+
+    startup = commands.add_parser("startup", help="Time the cold imports of the entry points against their budgets")
+    startup.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per entry point (median)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level="INFO", format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    log = logging.getLogger("benchmark")
+    logging.getLogger("smartcfd").setLevel(args.log_level)
+    logging.getLogger("risk").setLevel(args.log_level)
+
+    if args.command == "startup":
+        rows = check_startup(repeat=args.repeat)
+        print(format_startup(rows))
+        return 0 if all(row["status"] == "ok" for row in rows) else 1
+
+    if args.command == "compare":
+        return _report(compare_results(_load(args.baseline), _load(args.current), args.threshold), log)
+
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+    cases = select_cases(args.cases)
+    if not cases:
+        log.error(f"No benchmark matches {args.cases}. Available: {', '.join(CASES)}")
+        return 2
+    sizes = args.sizes or PRESETS[args.preset]
+    log.info(f"Running {len(cases)} case(s) at sizes {sizes}")
+    results = run_benchmarks(cases, sizes, seed=args.seed, repeat=args.repeat, min_time=args.min_time, max_rows=args.max_rows)
+
+    output = args.output or os.path.join("reports", "benchmarks", f"benchmark_{datetime.now(timezone.utc):%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    for row in results["results"]:
+        if "median_s" in row:
+            log.info(f"{row['name']:<40} {row['bars']:>9} x {row['symbols']:<4} median {1000 * row['median_s']:.3f}ms ({row['ns_per_bar']:.1f} ns/bar)")
+        else:
+            log.warning(f"{row['name']:<40} {row['bars']:>9} x {row['symbols']:<4} {row.get('skipped') or row.get('error')}")
+    log.info(f"Results written to {output}")
+
+    if args.baseline:
+        return _report(compare_results(_load(args.baseline), results, args.threshold), log)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
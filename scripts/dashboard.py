@@ -1,57 +1,59 @@
 """
 Simple Streamlit dashboard to visualize order lifecycle events.
 
+Reads the order_events table of the runner's database (DB_PATH) incrementally:
+each rerun only fetches the events written since the previous one (see
+smartcfd/event_feed.py), so it stays fast however many events accumulate.
+
 Run:
   streamlit run scripts/dashboard.py
 """
+import sys
 import os
-import time
-import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import streamlit as st
 
-EVENTS_CSV = os.getenv("ORDER_EVENTS_CSV", "logs/order_events.csv")
+from smartcfd.db import get_db_path
+from smartcfd.event_feed import OrderEventFeed, connect_readonly
+
+DB_PATH = get_db_path()
+RECENT_ROWS = 200
 
 st.set_page_config(page_title="SmartCFD Order Events", layout="wide")
 st.title("SmartCFD: Order Lifecycle Events")
 
-if not os.path.exists(EVENTS_CSV):
-    st.warning(f"No events file found at {EVENTS_CSV}. Start the bot to generate events.")
+if not os.path.exists(DB_PATH):
+    st.warning(f"No database found at {DB_PATH}. Start the bot to generate events.")
     st.stop()
 
-@st.cache_data(ttl=5.0)
-def load_events(path: str) -> pd.DataFrame:
-    try:
-        df = pd.read_csv(path)
-        if 'ts' in df.columns:
-            df['ts'] = pd.to_datetime(df['ts'])
-        return df
-    except Exception:
-        return pd.DataFrame()
-
-df = load_events(EVENTS_CSV)
-if df.empty:
+@st.cache_resource
+def get_feed(path: str) -> OrderEventFeed:
+    # One feed per database, shared by every session and rerun
+    return OrderEventFeed(connect_readonly(path))
+
+feed = get_feed(DB_PATH)
+feed.refresh()
+if not feed.total:
     st.info("No events yet.")
     st.stop()
 
 st.subheader("Summary")
 col1, col2, col3 = st.columns(3)
 with col1:
-    st.metric("Total Events", len(df))
+    st.metric("Total Events", feed.total)
 with col2:
-    st.metric("Trade Groups", df['group_gid'].nunique() if 'group_gid' in df.columns else 0)
+    st.metric("Trade Groups", feed.groups)
 with col3:
-    st.metric("Symbols", df['symbol'].nunique() if 'symbol' in df.columns else 0)
+    st.metric("Symbols", feed.symbols)
 
 st.subheader("Events by Type")
-evt_counts = df['event_type'].value_counts().reset_index()
-evt_counts.columns = ['event_type', 'count']
-st.dataframe(evt_counts, use_container_width=True)
+st.dataframe(feed.counts_by_type(), use_container_width=True)
 
 st.subheader("Recent Events")
-st.dataframe(df.sort_values('ts', ascending=False).head(200), use_container_width=True)
+st.dataframe(feed.recent(RECENT_ROWS), use_container_width=True)
 
 st.subheader("Filter")
 gid = st.text_input("Filter by group GID")
 if gid:
-    st.dataframe(df[df['group_gid'] == gid].sort_values('ts'), use_container_width=True)
-
+    st.dataframe(feed.group_events(gid), use_container_width=True)
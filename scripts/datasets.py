@@ -0,0 +1,71 @@
+"""
+Manages the local bar dataset archive used by backtests and model training.
+
+Examples:
+  python scripts/datasets.py download --symbols BTC/USD,ETH/USD --timeframe 15m --start 2022-01-01 --end 2024-01-01
+  python scripts/datasets.py list
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import logging
+
+from smartcfd.alpaca_helpers import build_api_base
+from smartcfd.config import load_config_from_file
+from smartcfd.data_loader import DataLoader
+from smartcfd.dataset_store import BarDatasetStore, DEFAULT_DATASET_ROOT
+
+
+def download(args) -> None:
+    log = logging.getLogger("datasets")
+    app_cfg, alpaca_cfg, _, _ = load_config_from_file()
+    data_loader = DataLoader(
+        api_key=alpaca_cfg.key_id,
+        secret_key=alpaca_cfg.secret_key,
+        api_base=build_api_base(app_cfg.alpaca_env)
+    )
+    store = BarDatasetStore(args.root)
+    symbols = [s.strip() for s in (args.symbols or app_cfg.watch_list).split(',') if s.strip()]
+    timeframe = args.timeframe or app_cfg.trade_interval
+
+    for symbol in symbols:
+        fetched = store.download(data_loader, symbol, timeframe, args.start, args.end, refresh=args.refresh)
+        log.info(f"{symbol} {timeframe}: fetched {len(fetched)} month(s) into {args.root}")
+
+
+def list_datasets(args) -> None:
+    summary = BarDatasetStore(args.root).summary()
+    if not summary:
+        print(f"No datasets stored under {args.root}.")
+        return
+    for symbol, timeframes in summary.items():
+        for timeframe, months in timeframes.items():
+            print(f"{symbol:12s} {timeframe:8s} {len(months):4d} month(s)  {months[0]} .. {months[-1]}")
+
+
+def main():
+    logging.basicConfig(level="INFO", format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="SmartCFD bar dataset manager")
+    parser.add_argument("--root", type=str, default=DEFAULT_DATASET_ROOT, help="Archive root directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    dl = subparsers.add_parser("download", help="Download missing months into the archive")
+    dl.add_argument("--symbols", type=str, default=None, help="Comma-separated symbols (defaults to watch_list)")
+    dl.add_argument("--timeframe", type=str, default=None, help="Bar timeframe (defaults to trade_interval)")
+    dl.add_argument("--start", type=str, required=True, help="Start date in YYYY-MM-DD format")
+    dl.add_argument("--end", type=str, required=True, help="End date in YYYY-MM-DD format (exclusive)")
+    dl.add_argument("--refresh", action="store_true", help="Re-download months that are already stored")
+    dl.set_defaults(func=download)
+
+    ls = subparsers.add_parser("list", help="Show stored symbols, timeframes and months")
+    ls.set_defaults(func=list_datasets)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
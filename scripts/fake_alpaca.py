@@ -0,0 +1,119 @@
+"""
+Serves a local fake Alpaca API, or load-tests N traders against one.
+
+Examples:
+  # Stand-alone server; point the bot at it with APCA_API_BASE_URL and APCA_API_DATA_URL
+  python scripts/fake_alpaca.py serve --port 8765 --latency-ms 40 --jitter-ms 20 --error-rate 0.01
+
+  # 8 traders x 20 symbols, 5 cycles each, against an in-process server
+  python scripts/fake_alpaca.py load --traders 8 --symbols 20 --cycles 5 --latency-ms 40 --output reports/load_8x20.json
+
+  # Find where the cycle stops scaling
+  for n in 1 2 4 8 16; do python scripts/fake_alpaca.py load --traders $n --symbols 20 --cycles 3; done
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import logging
+import time
+
+from smartcfd.benchmarks import synthetic_model, synthetic_symbols
+from smartcfd.fake_alpaca import FILL_MODES, FakeAlpacaConfig, FakeAlpacaServer
+from smartcfd.load_driver import LOAD_MODES, LoadSettings, run_load
+
+
+def _server_config(args) -> FakeAlpacaConfig:
+    return FakeAlpacaConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_codes=tuple(int(c) for c in args.error_codes.split(",")),
+        rate_limit=args.rate_limit,
+        fill_mode=args.fill_mode,
+        history_days=args.history_days,
+        seed=args.seed,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local fake Alpaca API and trader load driver")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Run the fake API until interrupted")
+    load = commands.add_parser("load", help="Run N traders against the fake API (or --url) and report cycle times")
+    for command in (serve, load):
+        command.add_argument("--latency-ms", type=float, default=0.0, help="Latency added to every response")
+        command.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform extra latency")
+        command.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failed with --error-codes")
+        command.add_argument("--error-codes", type=str, default="500,503", help="Comma-separated HTTP codes for injected errors")
+        command.add_argument("--rate-limit", type=int, default=200, help="Requests per API key per minute before 429s (0 = unlimited)")
+        command.add_argument("--fill-mode", choices=FILL_MODES, default="cross", help="cross: fill orders when the price allows; never: keep them open")
+        command.add_argument("--history-days", type=int, default=30, help="Days of synthetic price history before now")
+        command.add_argument("--seed", type=int, default=0, help="Seed of the price paths and injected errors")
+    serve.add_argument("--host", type=str, default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    load.add_argument("--url", type=str, default=None, help="Use a running server instead of starting one")
+    load.add_argument("--traders", type=int, default=4, help="Concurrent traders")
+    load.add_argument("--symbols", type=int, default=10, help="Watch-list size of each trader")
+    load.add_argument("--cycles", type=int, default=5, help="Cycles per trader")
+    load.add_argument("--pause", type=float, default=0.0, help="Seconds between one trader's cycles")
+    load.add_argument("--mode", choices=LOAD_MODES, default="process", help="One process per trader, or threads in this process")
+    load.add_argument("--cycle-mode", choices=("serial", "pipelined"), default="serial", help="Trader cycle_mode")
+    load.add_argument("--interval", type=str, default="15m", help="Trader trade_interval")
+    load.add_argument("--min-data-points", type=int, default=400, help="Bars per symbol per cycle")
+    load.add_argument("--retry-wait", type=int, default=1, help="SDK back-off in seconds after a 429 (APCA_RETRY_WAIT)")
+    load.add_argument("--output", type=str, default=None, help="Optional JSON file for the summary")
+    args = parser.parse_args()
+
+    logging.basicConfig(level="INFO", format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    log = logging.getLogger("fake_alpaca")
+
+    if args.command == "serve":
+        server = FakeAlpacaServer(_server_config(args), host=args.host, port=args.port).start()
+        log.info(f"Fake Alpaca API on {server.url}: export APCA_API_BASE_URL={server.url} APCA_API_DATA_URL={server.url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+        return 0
+
+    # Per-prediction INFO logs of N traders would dominate the timings
+    logging.getLogger("smartcfd").setLevel("WARNING")
+    logging.getLogger("risk").setLevel("WARNING")
+    server = None if args.url else FakeAlpacaServer(_server_config(args)).start()
+    url = args.url or server.url
+    try:
+        with synthetic_model(args.seed) as model_env:
+            settings = LoadSettings(
+                url=url,
+                symbols=synthetic_symbols(args.symbols),
+                cycles=args.cycles,
+                trade_interval=args.interval,
+                min_data_points=args.min_data_points,
+                cycle_mode=args.cycle_mode,
+                pause_seconds=args.pause,
+                model_env=model_env,
+                retry_wait_seconds=args.retry_wait,
+            )
+            log.info(f"Running {args.traders} trader(s) x {args.symbols} symbol(s) x {args.cycles} cycle(s) against {url} ({args.mode} mode)")
+            summary = run_load(settings, args.traders, args.mode)
+        if server is not None:
+            summary["server"] = dict(server.api.stats)
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+        log.info(f"Summary written to {args.output}")
+    return 1 if summary["failed_traders"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Manages the versioned model registry used by the trader.
+
+Examples:
+  python scripts/model_registry.py list
+  python scripts/model_registry.py publish models/model.joblib
+  python scripts/model_registry.py rollback
+  python scripts/model_registry.py activate 3f2a9c0d1e4b5a67 --name BTC_USD
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import logging
+
+from smartcfd.model_registry import ModelRegistry, DEFAULT_REGISTRY_DIR, DEFAULT_MODEL_NAME
+
+
+def list_versions(registry: ModelRegistry, args) -> None:
+    manifest = registry.manifest() or {}
+    versions = registry.versions()
+    if not versions:
+        print(f"No versions stored for {registry.name} under {args.root}.")
+        return
+    for version in versions:
+        marker = "*" if version == manifest.get("current") else ("-" if version == manifest.get("previous") else " ")
+        print(f"{marker} {version}")
+    print("(* current, - previous)")
+
+
+def publish(registry: ModelRegistry, args) -> None:
+    version = registry.publish(args.model_path, activate=not args.no_activate)
+    print(f"Published {version}" + ("" if args.no_activate else " and activated it"))
+
+
+def activate(registry: ModelRegistry, args) -> None:
+    registry.activate(args.version)
+    print(f"Activated {args.version}")
+
+
+def rollback(registry: ModelRegistry, args) -> None:
+    print(f"Rolled back to {registry.rollback()}")
+
+
+def prune(registry: ModelRegistry, args) -> None:
+    removed = registry.prune(keep=args.keep)
+    print(f"Removed {len(removed)} version(s)")
+
+
+def main():
+    logging.basicConfig(level="INFO", format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="SmartCFD model registry")
+    parser.add_argument("--root", type=str, default=DEFAULT_REGISTRY_DIR, help="Registry root directory")
+    parser.add_argument("--name", type=str, default=DEFAULT_MODEL_NAME, help="Model name ('default' or a symbol key such as BTC_USD)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="Show stored versions").set_defaults(func=list_versions)
+
+    pub = subparsers.add_parser("publish", help="Store a trained model as a new version")
+    pub.add_argument("model_path", type=str, help="Path to model.joblib (feature_names.joblib must be next to it)")
+    pub.add_argument("--no-activate", action="store_true", help="Store the version without making it current")
+    pub.set_defaults(func=publish)
+
+    act = subparsers.add_parser("activate", help="Make a stored version current")
+    act.add_argument("version", type=str)
+    act.set_defaults(func=activate)
+
+    subparsers.add_parser("rollback", help="Re-activate the previous version").set_defaults(func=rollback)
+
+    pr = subparsers.add_parser("prune", help="Delete old versions (never the current or previous one)")
+    pr.add_argument("--keep", type=int, default=5, help="Number of other versions to keep")
+    pr.set_defaults(func=prune)
+
+    args = parser.parse_args()
+    args.func(ModelRegistry(args.root, args.name), args)
+
+
+if __name__ == "__main__":
+    main()
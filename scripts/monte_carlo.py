@@ -0,0 +1,72 @@
+"""
+Runs a Monte Carlo robustness analysis over a backtest trade history.
+
+Example:
+  python scripts/monte_carlo.py --trades reports/trade_history_BTC_USD_20251007_210000.csv --paths 10000
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import logging
+import time
+import pandas as pd
+
+from smartcfd.monte_carlo import METHODS, equity_from_trade_history, returns_from_equity, run_monte_carlo
+
+
+def main():
+    logging.basicConfig(level="INFO", format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    log = logging.getLogger("monte_carlo")
+
+    parser = argparse.ArgumentParser(description="SmartCFD Monte Carlo robustness engine")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--trades", type=str, help="Trade history CSV written by scripts/backtest.py")
+    source.add_argument("--equity", type=str, help="CSV with an 'equity' column (one row per period)")
+    parser.add_argument("--capital", type=float, default=10000.0, help="Initial capital used to replay the trade history")
+    parser.add_argument("--paths", type=int, default=10000, help="Number of resampled paths")
+    parser.add_argument("--method", choices=METHODS, default="block", help="Resampling method")
+    parser.add_argument("--block-size", type=int, default=20, help="Block length for the block bootstrap")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Paths materialised per chunk")
+    parser.add_argument("--periods-per-year", type=float, default=252, help="Annualisation factor for the Sharpe ratio")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the intervals")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible results")
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON file for the summary")
+    args = parser.parse_args()
+
+    if args.trades:
+        equity = equity_from_trade_history(pd.read_csv(args.trades), args.capital)
+    else:
+        equity = pd.read_csv(args.equity)["equity"]
+    returns = returns_from_equity(equity)
+
+    started = time.perf_counter()
+    result = run_monte_carlo(
+        returns,
+        n_paths=args.paths,
+        method=args.method,
+        block_size=args.block_size,
+        chunk_size=args.chunk_size,
+        initial_equity=float(equity.iloc[0]),
+        periods_per_year=args.periods_per_year,
+        confidence=args.confidence,
+        seed=args.seed,
+    )
+    elapsed = time.perf_counter() - started
+
+    summary = result.summary()
+    log.info(f"--- Monte Carlo ({result.method}, {result.n_paths} paths x {result.n_periods} periods, {elapsed:.2f}s) ---")
+    for name, stats in summary.items():
+        log.info(f"{name:16s} median={stats['median']:.4f}  CI=[{stats['lower']:.4f}, {stats['upper']:.4f}]")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"method": result.method, "n_paths": result.n_paths, "n_periods": result.n_periods,
+                       "confidence": args.confidence, "statistics": summary}, f, indent=4)
+        log.info(f"Summary saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Inspects and replays broker/market-data traffic recorded by the runner (traffic_log_path).
+
+Examples:
+  python scripts/replay.py info logs/traffic.jsonl.gz
+
+  # Re-run the last recorded session offline with the model configured in this environment
+  python scripts/replay.py run logs/traffic.jsonl.gz --output reports/replay.json
+
+  # Profile it
+  python scripts/replay.py run logs/traffic.jsonl.gz --profile reports/replay.prof
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import cProfile
+import json
+import logging
+import pstats
+
+from smartcfd.traffic import TrafficReplay, describe, replay_session
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect and replay recorded Alpaca traffic")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="Summarise the sessions of a recording")
+    info.add_argument("path", type=str)
+    run = commands.add_parser("run", help="Replay one session through a trader built from its recorded configuration")
+    run.add_argument("path", type=str)
+    run.add_argument("--session", type=int, default=-1, help="Session index (default: the last one)")
+    run.add_argument("--cycles", type=int, default=None, help="Replay only the first N recorded cycles")
+    run.add_argument("--strict", action="store_true", help="Fail requests whose parameters were not recorded instead of substituting")
+    run.add_argument("--profile", type=str, default=None, help="Write cProfile stats of the replay to this file")
+    run.add_argument("--output", type=str, default=None, help="Optional JSON file for the summary")
+    args = parser.parse_args()
+
+    logging.basicConfig(level="INFO", format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    log = logging.getLogger("replay")
+
+    if args.command == "info":
+        print(json.dumps(describe(args.path), indent=2))
+        return 0
+
+    replay = TrafficReplay(args.path, session=args.session, strict=args.strict)
+    # Per-prediction INFO logs would dominate the timings
+    logging.getLogger("smartcfd").setLevel("WARNING")
+    logging.getLogger("risk").setLevel("WARNING")
+    if args.profile:
+        profiler = cProfile.Profile()
+        summary = profiler.runcall(replay_session, replay, args.cycles)
+        os.makedirs(os.path.dirname(args.profile) or ".", exist_ok=True)
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        log.info(f"Profile written to {args.profile}")
+    else:
+        summary = replay_session(replay, args.cycles)
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+        log.info(f"Summary written to {args.output}")
+    return 1 if replay.stats["exhausted"] or replay.stats["mismatched"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,24 +6,39 @@ up-to-date with the latest market data.
 
 The script performs the following steps:
 1.  Defines the paths for the current model and a backup location.
-2.  If an existing model is found, it is moved to the backup location.
-3.  It calculates a rolling date range for training (e.g., the last 2 years).
-4.  It calls the core `train_and_evaluate_model` function with the new date range.
+2.  In `auto` mode, if the model has training metadata and the last full
+    hyperparameter search is recent enough, the model is copied to the backup
+    location and updated incrementally on the bars added since its cutoff.
+3.  Otherwise (or if the incremental update degrades validation), the existing
+    model is moved to the backup location and a full retrain is run:
+    it calculates a rolling date range for training (e.g., the last 2 years)
+    and calls the core `train_and_evaluate_model` function with it.
+4.  The resulting model is published to the model registry (`models/registry`)
+    and activated; running traders pick it up at their next cycle, and
+    `scripts/model_registry.py rollback` switches back to the previous version.
 """
 import sys
 from pathlib import Path
 import os
 import shutil
+import argparse
 from datetime import datetime, timedelta
 
 # Add the project root to the Python path
 project_root = Path(__file__).resolve().parent.parent
 sys.path.append(str(project_root))
 
-from smartcfd.model_trainer import train_and_evaluate_model, DEFAULT_MODEL_PATH
+from smartcfd.model_trainer import train_and_evaluate_model, incremental_update_model, DEFAULT_MODEL_PATH
+from smartcfd.model_registry import ModelRegistry
+from smartcfd.incremental_training import (
+    full_search_due, load_training_metadata, training_metadata_path, STATUS_NO_NEW_DATA, STATUS_UPDATED,
+)
 
-def backup_model(model_path: str) -> None:
-    """Backs up the existing model file."""
+RETRAIN_MODES = ("auto", "incremental", "full")
+FULL_SEARCH_INTERVAL_DAYS = int(os.getenv("FULL_SEARCH_INTERVAL_DAYS", "28"))
+
+def backup_model(model_path: str, keep_original: bool = False) -> None:
+    """Backs up the existing model file (copying it instead of moving if `keep_original`)."""
     model_p = Path(model_path)
     if model_p.exists():
         backup_dir = model_p.parent / "backup"
@@ -33,20 +48,62 @@ def backup_model(model_path: str) -> None:
         backup_path = backup_dir / f"{model_p.stem}_{timestamp}{model_p.suffix}"
         
         print(f"Backing up existing model to {backup_path}...")
-        shutil.move(str(model_p), str(backup_path))
+        if keep_original:
+            shutil.copy2(str(model_p), str(backup_path))
+        else:
+            shutil.move(str(model_p), str(backup_path))
         print("Backup complete.")
 
-def main():
+def publish_model(model_path: str) -> None:
+    """Publishes and activates the model in the registry next to it, if training produced one."""
+    model_p = Path(model_path)
+    if not model_p.exists() or not model_p.with_name("feature_names.joblib").exists():
+        print("No trained model to publish.")
+        return
+    registry = ModelRegistry(os.getenv("MODEL_REGISTRY_DIR", str(model_p.with_name("registry"))))
+    version = registry.publish(str(model_p))
+    print(f"Published and activated model version {version}.")
+
+def try_incremental(mode: str, end_date_str: str) -> bool:
+    """
+    Runs a warm-start update when `mode` allows it. Returns True if the model is
+    up to date afterwards, False if a full retrain is needed.
+    """
+    metadata = load_training_metadata(training_metadata_path(DEFAULT_MODEL_PATH))
+    if metadata is None or not Path(DEFAULT_MODEL_PATH).exists():
+        print("No model with training metadata found; running a full retrain.")
+        return False
+    if mode == "auto" and full_search_due(metadata, FULL_SEARCH_INTERVAL_DAYS):
+        print(f"Last full search is older than {FULL_SEARCH_INTERVAL_DAYS} days; running a full retrain.")
+        return False
+
+    backup_model(DEFAULT_MODEL_PATH, keep_original=True)
+    status = incremental_update_model(end_date=end_date_str, model_output_path=DEFAULT_MODEL_PATH)
+    if status in (STATUS_UPDATED, STATUS_NO_NEW_DATA):
+        return True
+    print(f"Incremental update was not accepted ({status}); running a full retrain.")
+    return False
+
+def main(mode: str = None):
     """
     Main function to orchestrate the model retraining process.
+    `mode` is 'auto' (default, or RETRAIN_MODE), 'incremental' or 'full'.
     """
-    print("--- Automated Model Retraining ---")
-    
-    # 1. Backup the current model
-    backup_model(DEFAULT_MODEL_PATH)
+    mode = mode or os.getenv("RETRAIN_MODE", "auto")
+    if mode not in RETRAIN_MODES:
+        raise ValueError(f"Unknown retrain mode: {mode}")
+    print(f"--- Automated Model Retraining ({mode}) ---")
 
-    # 2. Define the new training period (e.g., last 2 years)
     end_date = datetime.now()
+    if mode != "full" and try_incremental(mode, end_date.strftime("%Y-%m-%d")):
+        publish_model(DEFAULT_MODEL_PATH)
+        print("--- Automated Retraining Finished ---")
+        return
+
+    # 1. Backup the current model (copied, so a trader starting meanwhile still finds it)
+    backup_model(DEFAULT_MODEL_PATH, keep_original=True)
+
+    # 2. Define the new training period (e.g., last 2 years)
     start_date = end_date - timedelta(days=365 * 2)
     
     start_date_str = start_date.strftime("%Y-%m-%d")
@@ -59,8 +116,14 @@ def main():
         start_date=start_date_str,
         end_date=end_date_str
     )
+
+    # 4. Make it the active version
+    publish_model(DEFAULT_MODEL_PATH)
     
     print("--- Automated Retraining Finished ---")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Retrain the trading model.")
+    parser.add_argument("--mode", choices=RETRAIN_MODES, default=None,
+                        help="auto: incremental unless a full search is due or validation degrades (default)")
+    main(parser.parse_args().mode)
@@ -9,22 +9,70 @@ Running this script directly is useful for:
 -   On-demand model retraining.
 -   Testing changes to the feature engineering or model tuning process.
 -   Generating an initial model if one does not exist.
+
+With `--symbols` (or `--all-symbols` for the whole watch list) one model per symbol
+is trained in parallel under `models/<SYMBOL>/`, each job limited to its share of
+the CPU budget.
+
+Every trained model is published to the model registry and activated: the trader
+loads the registry's current version rather than the plain model file.
 """
 import sys
+import argparse
+import logging
 from pathlib import Path
 
 # Add the project root to the Python path to allow importing from smartcfd
 project_root = Path(__file__).resolve().parent.parent
 sys.path.append(str(project_root))
 
-from smartcfd.model_trainer import train_and_evaluate_model
+from smartcfd.config import load_config_from_file
+from smartcfd.model_registry import ModelRegistry, DEFAULT_REGISTRY_DIR
+from smartcfd.model_trainer import train_and_evaluate_model, DEFAULT_START_DATE, DEFAULT_END_DATE
+from smartcfd.training_orchestrator import train_symbols, DEFAULT_MODELS_DIR
 
 def main():
     """
     Main function to trigger the model training and evaluation process.
     """
+    logging.basicConfig(level="INFO", format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Train the trading model(s).")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--symbols", type=str, default=None, help="Comma-separated symbols to train one model each for")
+    target.add_argument("--all-symbols", action="store_true", help="Train one model per symbol in the watch list")
+    parser.add_argument("--start", type=str, default=DEFAULT_START_DATE, help="Start date in YYYY-MM-DD format")
+    parser.add_argument("--end", type=str, default=DEFAULT_END_DATE, help="End date in YYYY-MM-DD format")
+    parser.add_argument("--timeframe", type=str, default=None, help="Bar timeframe (default: trade_interval of config.ini)")
+    parser.add_argument("--models-dir", type=str, default=DEFAULT_MODELS_DIR, help="Root directory for per-symbol models")
+    parser.add_argument("--cpu-budget", type=int, default=None, help="Total cores shared by all jobs (default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="Maximum number of parallel training jobs")
+    parser.add_argument("--offline", action="store_true", help="Train only on data already in the local archive")
+    args = parser.parse_args()
+
     print("--- Manual Model Training Trigger ---")
-    train_and_evaluate_model()
+    app_cfg, _, _, _ = load_config_from_file()
+    args.timeframe = args.timeframe or app_cfg.trade_interval
+    symbols = app_cfg.watch_list if args.all_symbols else args.symbols
+    if symbols:
+        results = train_symbols(
+            [s.strip() for s in symbols.split(',') if s.strip()],
+            start_date=args.start,
+            end_date=args.end,
+            timeframe_str=args.timeframe,
+            models_dir=args.models_dir,
+            cpu_budget=args.cpu_budget,
+            max_workers=args.workers,
+            offline=args.offline,
+        )
+        for result in results:
+            status = result.model_path if result.ok else f"FAILED ({result.error or 'no model produced'})"
+            print(f"{result.symbol:12s} {result.seconds:8.1f}s  {status}")
+    else:
+        model_path = train_and_evaluate_model(start_date=args.start, end_date=args.end, timeframe_str=args.timeframe, offline=args.offline)
+        if model_path:
+            version = ModelRegistry(DEFAULT_REGISTRY_DIR).publish(model_path)
+            print(f"Published and activated model version {version}.")
     print("--- Manual Training Finished ---")
 
 if __name__ == "__main__":
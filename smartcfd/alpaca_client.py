@@ -1,9 +1,12 @@
 import logging
-from typing import Any, List
+from typing import Any, List, Optional
 import alpaca_trade_api as tradeapi
 from alpaca_trade_api.rest import APIError
+from .alpaca_helpers import build_api_base
 from .broker import Broker
 from .types import OrderRequest
+from .tracing import traced
+from .metrics import ORDERS, instrument_session
 
 log = logging.getLogger(__name__)
 
@@ -11,12 +14,13 @@ class AlpacaBroker(Broker):
     """
     A concrete implementation of the Broker interface for Alpaca.
     This class uses the official alpaca-trade-api-python SDK.
+    Construction makes no requests; call `get_account_info` to verify the connection.
     """
-    def __init__(self, key_id: str, secret_key: str, paper: bool = True):
+    def __init__(self, key_id: str, secret_key: str, paper: bool = True, base_url: Optional[str] = None):
         self.api_key = key_id
         self.secret_key = secret_key
         self.paper = paper
-        self.base_url = "https://paper-api.alpaca.markets" if paper else "https://api.alpaca.markets"
+        self.base_url = base_url or build_api_base("paper" if paper else "live")
         
         if not self.api_key or not self.secret_key:
             log.error("Alpaca API key and secret key must be provided.")
@@ -26,13 +30,13 @@ class AlpacaBroker(Broker):
             self.api = tradeapi.REST(
                 self.api_key, self.secret_key, base_url=self.base_url, api_version='v2'
             )
-            # Verify connection by fetching account info
-            self.get_account_info()
-            log.info("Alpaca TradingClient initialized and connection verified.")
+            instrument_session(getattr(self.api, "_session", None))
+            log.info("Alpaca TradingClient initialized.")
         except Exception as e:
             log.error(f"Failed to initialize Alpaca TradingClient: {e}", exc_info=True)
             raise
 
+    @traced("broker.get_account_info")
     def get_account_info(self) -> Any:
         """Retrieves account information from the broker."""
         try:
@@ -43,6 +47,7 @@ class AlpacaBroker(Broker):
             log.error(f"Failed to fetch Alpaca account info: {e}", exc_info=True)
             raise
 
+    @traced("broker.list_positions")
     def list_positions(self) -> List[Any]:
         """Retrieves a list of current positions from the broker."""
         try:
@@ -53,6 +58,7 @@ class AlpacaBroker(Broker):
             log.error(f"Failed to fetch Alpaca positions: {e}", exc_info=True)
             raise
 
+    @traced("broker.get_orders")
     def get_orders(self, status: str = 'open') -> List[Any]:
         """Retrieves a list of orders from the broker."""
         try:
@@ -63,6 +69,7 @@ class AlpacaBroker(Broker):
             log.error(f"Failed to fetch Alpaca orders: {e}", exc_info=True)
             raise
 
+    @traced("broker.submit_order")
     def submit_order(self, order_request: OrderRequest) -> Any:
         """Submits a simple market order."""
         try:
@@ -78,11 +85,13 @@ class AlpacaBroker(Broker):
             }
             submitted_order = self.api.submit_order(**order_data)
             log.info("alpaca.submit_order.success", extra={"extra": {"order_id": submitted_order.id}})
+            ORDERS.labels("submitted").inc()
             return submitted_order
         except APIError as e:
             log.error("alpaca.submit_order.fail", exc_info=True)
             raise
 
+    @traced("broker.submit_take_profit_order")
     def submit_take_profit_order(self, symbol: str, qty: str, side: str, price: str, client_order_id: str) -> Any:
         """Submits a take-profit (limit) order."""
         try:
@@ -97,11 +106,13 @@ class AlpacaBroker(Broker):
             }
             submitted_order = self.api.submit_order(**order_data)
             log.info("alpaca.submit_take_profit.success", extra={"extra": {"order_id": submitted_order.id}})
+            ORDERS.labels("submitted").inc()
             return submitted_order
         except APIError as e:
             log.error("alpaca.submit_take_profit.fail", exc_info=True)
             raise
 
+    @traced("broker.submit_stop_loss_order")
     def submit_stop_loss_order(self, symbol: str, qty: str, side: str, price: str, client_order_id: str) -> Any:
         """Submits a stop-loss (stop) order."""
         try:
@@ -116,11 +127,13 @@ class AlpacaBroker(Broker):
             }
             submitted_order = self.api.submit_order(**order_data)
             log.info("alpaca.submit_stop_loss.success", extra={"extra": {"order_id": submitted_order.id}})
+            ORDERS.labels("submitted").inc()
             return submitted_order
         except APIError as e:
             log.error("alpaca.submit_stop_loss.fail", exc_info=True)
             raise
 
+    @traced("broker.get_order_by_client_id")
     def get_order_by_client_id(self, client_order_id: str) -> Any:
         """Retrieves a single order by its client_order_id."""
         try:
@@ -128,21 +141,25 @@ class AlpacaBroker(Broker):
             log.info("alpaca.get_order_by_client_id.success", extra={"extra": {"client_order_id": client_order_id}})
             return order
         except APIError as e:
-            if e.code == 404:
+            # Alpaca answers with code 40410000; status_code carries the HTTP 404
+            if e.code == 404 or e.status_code == 404:
                 log.warning("alpaca.get_order_by_client_id.not_found", extra={"extra": {"client_order_id": client_order_id}})
                 return None
             log.error("alpaca.get_order_by_client_id.fail", exc_info=True)
             raise
 
+    @traced("broker.cancel_order")
     def cancel_order(self, order_id: str) -> Any:
         """Cancels an open order."""
         try:
             self.api.cancel_order(order_id)
             log.info("alpaca.cancel_order.success", extra={"extra": {"order_id": order_id}})
+            ORDERS.labels("cancelled").inc()
         except APIError as e:
             log.error("alpaca.cancel_order.fail", exc_info=True)
             raise
 
+    @traced("broker.replace_order")
     def replace_order(self, order_id: str, qty: str | None = None, limit_price: str | None = None, stop_price: str | None = None) -> Any:
         """Replaces an existing order to adjust quantities or prices."""
         try:
@@ -160,6 +177,7 @@ class AlpacaBroker(Broker):
             log.error("alpaca.replace_order.fail", exc_info=True)
             raise
 
+    @traced("broker.close_position")
     def close_position(self, symbol: str) -> Any:
         """Closes an open position for a given symbol."""
         try:
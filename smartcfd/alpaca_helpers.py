@@ -1,6 +1,10 @@
 import os
 
 def build_api_base(env: str) -> str:
+    # APCA_API_BASE_URL (the SDK's own override) points the bot at another endpoint, e.g. smartcfd.fake_alpaca
+    override = os.getenv("APCA_API_BASE_URL")
+    if override:
+        return override.rstrip("/")
     return "https://paper-api.alpaca.markets" if env.lower() == "paper" else "https://api.alpaca.markets"
 
 def build_headers_from_env() -> dict:
@@ -74,3 +74,18 @@ class BacktestPortfolio:
             return self.initial_capital
             
         return self.equity_history[-1]
+
+    def get_exposure_for_symbol(self, symbol: str, current_prices: dict) -> float:
+        """
+        Returns the absolute notional value held in a symbol at current prices.
+        """
+        qty = self.positions.get(symbol, 0)
+        if not qty or symbol not in current_prices:
+            return 0.0
+        return abs(qty * current_prices[symbol])
+
+    def get_total_exposure(self, current_prices: dict) -> float:
+        """
+        Returns the absolute notional value of all positions at current prices.
+        """
+        return sum(self.get_exposure_for_symbol(symbol, current_prices) for symbol in self.positions)
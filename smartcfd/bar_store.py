@@ -0,0 +1,166 @@
+"""
+One-minute bar store with higher timeframes derived from it.
+
+`BarStore` keeps each symbol's bars at the base resolution (one minute) and
+derives minute and hour timeframes from them with `resample_bars`, a vectorised
+OHLCV aggregation over buckets aligned to the epoch, as Alpaca's bars are: first
+open, highest high, lowest low, last close, summed volume and trade count and a
+volume-weighted vwap.
+
+Derived bars are cached per (symbol, timeframe). When new base bars arrive, each
+cached timeframe is re-aggregated only from the bucket of the first changed base
+bar, which is usually just its latest bar. One fetch of the latest minutes thus
+keeps every timeframe current, and all timeframes are built from the same minutes.
+"""
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .bars import BAR_COLUMNS, Bars
+
+MINUTE = 60 * 10**9  # Base resolution in epoch nanoseconds
+
+_OPEN, _HIGH, _LOW, _CLOSE, _VOLUME, _TRADE_COUNT, _VWAP = (
+    BAR_COLUMNS.index(name) for name in ("open", "high", "low", "close", "volume", "trade_count", "vwap")
+)
+
+
+def _bars(timestamps: np.ndarray, values: np.ndarray) -> Bars:
+    return Bars(pd.DatetimeIndex(timestamps.view("M8[ns]"), tz="UTC"), values)
+
+
+def _concat(first: Bars, second: Bars) -> Bars:
+    if not len(first):
+        return second.compact()
+    if not len(second):
+        return first.compact()
+    return _bars(np.concatenate((first.timestamps, second.timestamps)), np.concatenate((first.values, second.values)))
+
+
+def _sum(column: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Per-bucket sums of the non-NaN values; NaN for buckets without any."""
+    present = ~np.isnan(column)
+    total = np.add.reduceat(np.where(present, column, 0.0), starts)
+    return np.where(np.logical_or.reduceat(present, starts), total, np.nan)
+
+
+def resample_bars(bars: Bars, step: int, start: Optional[int] = None) -> Bars:
+    """
+    Aggregates ascending `bars` into buckets of `step` nanoseconds aligned to the
+    epoch, indexed by bucket start. Buckets without bars are left out, as are
+    buckets starting before `start` (e.g. the first of a fetch, which may be partial).
+    """
+    timestamps, values = bars.timestamps, bars.values
+    if start is not None:
+        rows = int(np.searchsorted(timestamps, -(-start // step) * step))
+        timestamps, values = timestamps[rows:], values[rows:]
+    if not len(timestamps):
+        return _bars(np.empty(0, dtype=np.int64), np.empty((0, len(BAR_COLUMNS)), dtype=values.dtype))
+
+    buckets = timestamps - timestamps % step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+    out = np.empty((len(starts), len(BAR_COLUMNS)), dtype=values.dtype)
+    out[:, _OPEN] = values[starts, _OPEN]
+    out[:, _HIGH] = np.fmax.reduceat(values[:, _HIGH], starts)
+    out[:, _LOW] = np.fmin.reduceat(values[:, _LOW], starts)
+    out[:, _CLOSE] = values[ends, _CLOSE]
+    out[:, _VOLUME] = _sum(values[:, _VOLUME], starts)
+    out[:, _TRADE_COUNT] = _sum(values[:, _TRADE_COUNT], starts)
+    # Weighted by the volume of the bars that have a vwap (a snapshot bar doesn't)
+    vwap, volume = values[:, _VWAP], values[:, _VOLUME]
+    weight = np.where(np.isnan(vwap), np.nan, volume)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[:, _VWAP] = _sum(vwap * weight, starts) / _sum(weight, starts)
+    return _bars(buckets[starts], out)
+
+
+class BarStore:
+    """
+    Base-resolution bars per symbol and the higher timeframes derived from them;
+    see the module docstring. Safe to share between threads.
+    """
+
+    def __init__(self, retain: int = 0):
+        self.retain = retain  # Nanoseconds of base bars kept before each symbol's latest one; 0 keeps all
+        self._base: Dict[str, Bars] = {}
+        self._complete_from: Dict[str, int] = {}  # Base bars are known to be complete from this timestamp on
+        self._derived: Dict[str, Dict[int, Bars]] = {}  # symbol -> step -> bars
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def last_timestamp(self, symbol: str) -> Optional[int]:
+        bars = self._base.get(symbol)
+        return int(bars.timestamps[-1]) if bars is not None and len(bars) else None
+
+    def complete_from(self, symbol: str) -> Optional[int]:
+        return self._complete_from.get(symbol)
+
+    def update(self, symbol: str, bars: Bars, complete_from: Optional[int] = None) -> None:
+        """
+        Merges ascending base `bars` of `symbol`, which replace the stored bars from
+        their first timestamp on. With `complete_from` (the start of a full fetch)
+        they replace all stored bars; without it they must cover everything since
+        the stored latest bar, as a fetch starting at `last_timestamp` does.
+        """
+        with self._lock:
+            stored = self._base.get(symbol)
+            if complete_from is not None or stored is None:
+                base, changed = bars, None
+                complete_from = complete_from if complete_from is not None else (int(bars.timestamps[0]) if len(bars) else 0)
+            elif len(bars):
+                changed = int(bars.timestamps[0])
+                base = _concat(stored[:int(np.searchsorted(stored.timestamps, changed))], bars)
+                complete_from = self._complete_from[symbol]
+            else:
+                return
+            if self.retain and len(base):
+                cutoff = int(base.timestamps[-1]) - self.retain
+                if cutoff > complete_from:
+                    base = base[int(np.searchsorted(base.timestamps, cutoff)):]
+                    complete_from = cutoff
+            base = base.compact()
+            self._base[symbol] = base
+            self._complete_from[symbol] = complete_from
+
+            derived = self._derived.setdefault(symbol, {})
+            for step, cached in derived.items():
+                if changed is None:
+                    derived[step] = resample_bars(base, step, complete_from)
+                    continue
+                # Only the buckets from the one holding the first changed bar are aggregated again
+                bucket = max(changed - changed % step, complete_from)
+                kept = cached[int(np.searchsorted(cached.timestamps, complete_from)):int(np.searchsorted(cached.timestamps, bucket))]
+                derived[step] = _concat(kept, resample_bars(base, step, bucket))
+
+    def get(self, symbol: str, step: int) -> Optional[Bars]:
+        """Bars of `symbol` over `step` nanoseconds (a multiple of a minute), or None if it has none."""
+        with self._lock:
+            base = self._base.get(symbol)
+            if base is None:
+                return None
+            if step == MINUTE:
+                return base
+            derived = self._derived.setdefault(symbol, {})
+            bars = derived.get(step)
+            if bars is None:
+                self.misses += 1
+                bars = derived[step] = resample_bars(base, step, self._complete_from[symbol])
+            else:
+                self.hits += 1
+            return bars
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "symbols": len(self._base),
+                "base_bars": sum(len(bars) for bars in self._base.values()),
+                "derived_bars": sum(len(bars) for derived in self._derived.values() for bars in derived.values()),
+                "nbytes": sum(bars.nbytes for bars in self._base.values())
+                + sum(bars.nbytes for derived in self._derived.values() for bars in derived.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
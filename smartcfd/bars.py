@@ -0,0 +1,128 @@
+"""
+Compact, read-only OHLCV bars of one symbol.
+
+`Bars` keeps a symbol's bars as one UTC `DatetimeIndex` (int64 epoch nanoseconds,
+exposed as `timestamps`) and one C-contiguous rows x `BAR_COLUMNS` value block,
+float64 or float32. The block is built once per fetch and marked read-only; row
+slices (`tail`, `bars[a:b]`) and `frame()` are views of it, so features, regime
+detection, risk and the trader all read the same memory without copying. Code
+that needs extra columns works on `frame().copy(deep=False)` or a new frame.
+"""
+from typing import Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ("open", "high", "low", "close", "volume", "trade_count", "vwap")
+BAR_DTYPES = ("float64", "float32")
+
+
+def _check_dtype(dtype: str) -> np.dtype:
+    if str(dtype) not in BAR_DTYPES:
+        raise ValueError(f"Unknown bar dtype: {dtype}. Expected one of {BAR_DTYPES}.")
+    return np.dtype(dtype)
+
+
+class Bars:
+    """Bars of one symbol over a read-only value block; see the module docstring."""
+
+    __slots__ = ("index", "values", "_frame")
+
+    def __init__(self, index: pd.DatetimeIndex, values: np.ndarray):
+        if values.ndim != 2 or values.shape != (len(index), len(BAR_COLUMNS)):
+            raise ValueError(f"Expected a ({len(index)}, {len(BAR_COLUMNS)}) value block, got {values.shape}")
+        if values.flags.writeable:
+            values.flags.writeable = False
+        self.index = index
+        self.values = values
+        self._frame: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_arrays(
+        cls,
+        timestamps: np.ndarray,
+        columns: Mapping[str, np.ndarray],
+        dtype: str = "float64",
+        last: Optional[Tuple[int, Mapping[str, float]]] = None,
+    ) -> "Bars":
+        """
+        Copies ascending epoch-nanosecond `timestamps` and their `columns` (any of
+        `BAR_COLUMNS`; missing ones are NaN) into a new block. `last` is a forming bar
+        (timestamp, values): it replaces the final bar when their timestamps match,
+        is appended when newer and is ignored when older.
+        """
+        n = len(timestamps)
+        append = replace = False
+        if last is not None:
+            append = n == 0 or last[0] > timestamps[-1]
+            replace = n > 0 and last[0] == timestamps[-1]
+        rows = n + append
+        values = np.empty((rows, len(BAR_COLUMNS)), dtype=_check_dtype(dtype))
+        for j, name in enumerate(BAR_COLUMNS):
+            source = columns.get(name)
+            values[:n, j] = np.nan if source is None else source
+        if append:
+            values[n] = np.nan
+        if last is not None and (append or replace):
+            for j, name in enumerate(BAR_COLUMNS):
+                if name in last[1]:
+                    values[rows - 1, j] = last[1][name]
+        stamps = np.empty(rows, dtype=np.int64)
+        stamps[:n] = timestamps
+        if last is not None and append:
+            stamps[n] = last[0]
+        return cls(pd.DatetimeIndex(stamps.view("M8[ns]"), tz="UTC"), values)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dtype: str = "float64") -> "Bars":
+        """Copies a bars frame with a DatetimeIndex (naive is taken as UTC) and any-case column names."""
+        index = df.index
+        if index.tz is not None:
+            index = index.tz_convert("UTC")
+        timestamps = index.as_unit("ns").asi8
+        columns = {str(col).lower(): df[col].to_numpy() for col in df.columns if str(col).lower() in BAR_COLUMNS}
+        return cls.from_arrays(timestamps, columns, dtype)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Epoch nanoseconds (UTC) of the bars; a view of the index."""
+        return self.index.asi8
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.values.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.timestamps.nbytes
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, rows: slice) -> "Bars":
+        if not isinstance(rows, slice):
+            raise TypeError("Bars only support slicing by row ranges")
+        return Bars(self.index[rows], self.values[rows])
+
+    def tail(self, n: int) -> "Bars":
+        return self[max(len(self) - n, 0):] if n > 0 else self[:0]
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of one column."""
+        return self.values[:, BAR_COLUMNS.index(name)]
+
+    def owns_block(self) -> bool:
+        """Whether these bars span their whole value block (rather than being a slice of a larger one)."""
+        return self.values.base is None or self.values.base.shape[0] == len(self)
+
+    def compact(self) -> "Bars":
+        """These bars if they span their block, otherwise a copy, so a short view doesn't keep a long block alive."""
+        if self.owns_block():
+            return self
+        return Bars(self.index.copy(), self.values.copy())
+
+    def frame(self) -> pd.DataFrame:
+        """A DataFrame over the block and index, without copying (cached)."""
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.values, index=self.index, columns=list(BAR_COLUMNS), copy=False)
+        return self._frame
@@ -0,0 +1,455 @@
+"""
+Micro- and cycle-level benchmarks for the trading hot paths.
+
+    results = run_benchmarks(cases=["features.*"], sizes=PRESETS["quick"], seed=7)
+    rows = compare_results(baseline, results, threshold=0.10)
+
+Every case runs on synthetic OHLCV bars (`synthetic_ohlcv`, seeded, so two runs
+time identical inputs) at each (bars, symbols) size: `bars` rows per symbol and
+`symbols` frames. Cycle-level cases (`data.get_market_data`, `trader.run`) use an
+in-process fake of the market data API and of the broker, so they measure our
+code and not the network. Results are plain dicts written to JSON by
+`scripts/benchmark.py`; `compare_results` flags cases whose median time grew by
+more than the threshold.
+"""
+import fnmatch
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import timeit
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple, cast
+
+import numpy as np
+import pandas as pd
+
+from . import indicators
+from .broker import Broker
+from .data_loader import DataLoader, has_data_gaps, parse_interval, validate_bars
+from .features import create_features
+
+if TYPE_CHECKING:
+    from .alpaca_client import AlpacaBroker
+
+log = logging.getLogger(__name__)
+
+# (bars per symbol, symbols) grids; sizes above MAX_ROWS bars in total are skipped
+PRESETS: Dict[str, List[Tuple[int, int]]] = {
+    "quick": [(1_000, 1), (1_000, 20)],
+    "default": [(1_000, 1), (100_000, 1), (1_000, 20), (1_000, 200)],
+    "full": [(1_000, 1), (100_000, 1), (1_000_000, 1), (1_000, 20), (100_000, 20), (1_000, 200), (100_000, 200)],
+}
+MAX_ROWS = 20_000_000
+DEFAULT_THRESHOLD = 0.10
+BAR_FREQ = "15min"
+_ORIGIN = pd.Timestamp("2020-01-01", tz="UTC")
+
+
+def synthetic_ohlcv(n_bars: int, seed: int = 0, freq: str = BAR_FREQ, end: Optional[pd.Timestamp] = None, price: float = 100.0) -> pd.DataFrame:
+    """
+    Gapless OHLCV bars shaped like Alpaca's (plus trade_count and vwap), following a
+    geometric random walk. The same (n_bars, seed) always yields the same values;
+    `end` only moves the timestamps.
+    """
+    rng = np.random.default_rng(seed)
+    step = pd.Timedelta(freq)
+    if end is None:
+        index = pd.date_range(_ORIGIN, periods=n_bars, freq=step)
+    else:
+        index = pd.date_range(end=pd.Timestamp(end).floor(step), periods=n_bars, freq=step)
+    close = price * np.exp(np.cumsum(rng.normal(0.0, 0.004, n_bars)))
+    open_ = np.empty(n_bars)
+    open_[0] = price
+    open_[1:] = close[:-1]
+    wick = np.abs(rng.normal(0.0, 0.001, (2, n_bars)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(3.0, 1.0, n_bars)
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+            "trade_count": rng.integers(1, 500, n_bars).astype(float),
+            "vwap": (high + low + close) / 3,
+        },
+        index=pd.DatetimeIndex(index, name="timestamp"),
+    )
+
+
+def synthetic_symbols(n_symbols: int) -> List[str]:
+    return [f"SYM{i:03d}/USD" for i in range(n_symbols)]
+
+
+def synthetic_universe(n_bars: int, n_symbols: int, seed: int = 0, end: Optional[pd.Timestamp] = None) -> Dict[str, pd.DataFrame]:
+    """One synthetic frame per symbol, each with its own seed derived from `seed`."""
+    return {symbol: synthetic_ohlcv(n_bars, seed + i, end=end) for i, symbol in enumerate(synthetic_symbols(n_symbols))}
+
+
+class FakeMarketDataAPI:
+    """
+    Stands in for `alpaca_trade_api.REST` in `DataLoader`: serves the given frames as
+    a (symbol, timestamp) bars frame and the bar after the last one as the snapshot.
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        self.frames = frames
+        self._bars = pd.concat(frames, names=["symbol", "timestamp"])
+
+    def get_crypto_bars(self, symbols: Any, timeframe: Any, start: Any = None, end: Any = None) -> SimpleNamespace:
+        symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+        if len(symbols) == 1:
+            return SimpleNamespace(df=self._bars.loc[[symbols[0]]])
+        return SimpleNamespace(df=self._bars.loc[self._bars.index.get_level_values("symbol").isin(symbols)])
+
+    def get_crypto_snapshots(self, symbols: Sequence[str]) -> Dict[str, SimpleNamespace]:
+        snapshots = {}
+        for symbol in symbols:
+            frame = self.frames[symbol]
+            last = frame.iloc[-1]
+            bar = SimpleNamespace(
+                open=last["close"], high=last["close"], low=last["close"], close=last["close"], volume=1.0,
+                timestamp=frame.index[-1] + (frame.index[-1] - frame.index[-2]),
+            )
+            snapshots[symbol] = SimpleNamespace(minute_bar=bar, daily_bar=None)
+        return snapshots
+
+
+class FakeBroker(Broker):
+    """In-memory broker for `trader.run`: a flat account whose orders are accepted and never fill."""
+
+    api_key = "benchmark"
+    secret_key = "benchmark"
+    base_url = "https://paper-api.alpaca.markets"
+
+    def __init__(self, equity: float = 100_000.0):
+        self.account = {"id": "benchmark", "equity": equity, "last_equity": equity, "buying_power": equity, "cash": equity, "status": "ACTIVE"}
+        self.orders: Dict[str, SimpleNamespace] = {}
+
+    def get_account_info(self) -> Dict[str, Any]:
+        return dict(self.account)
+
+    def list_positions(self) -> List[Any]:
+        return []
+
+    def get_orders(self, status: str = "open") -> List[Any]:
+        return []
+
+    def _accept(self, symbol: str, qty: Any, side: str, client_order_id: Optional[str]) -> SimpleNamespace:
+        order = SimpleNamespace(id=f"order-{len(self.orders) + 1}", client_order_id=client_order_id, symbol=symbol, qty=qty, side=side, status="new")
+        self.orders[client_order_id or order.id] = order
+        return order
+
+    def submit_order(self, order_request: Any) -> SimpleNamespace:
+        return self._accept(order_request.symbol, order_request.qty, order_request.side, order_request.client_order_id)
+
+    def submit_take_profit_order(self, symbol: str, qty: str, side: str, price: str, client_order_id: str) -> SimpleNamespace:
+        return self._accept(symbol, qty, side, client_order_id)
+
+    def submit_stop_loss_order(self, symbol: str, qty: str, side: str, price: str, client_order_id: str) -> SimpleNamespace:
+        return self._accept(symbol, qty, side, client_order_id)
+
+    def get_order_by_client_id(self, client_order_id: str) -> Optional[SimpleNamespace]:
+        return self.orders.get(client_order_id)
+
+    def cancel_order(self, order_id: str) -> None:
+        return None
+
+    def replace_order(self, order_id: str, qty: Optional[str] = None, limit_price: Optional[str] = None, stop_price: Optional[str] = None) -> None:
+        return None
+
+    def close_position(self, symbol: str) -> None:
+        return None
+
+
+@contextmanager
+def _environ(**values: str) -> Iterator[None]:
+    saved = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+@contextmanager
+def synthetic_model(seed: int = 0, n_bars: int = 5_000) -> Iterator[Dict[str, str]]:
+    """
+    Trains a small XGBoost classifier on synthetic bars, labelled like the real
+    training data (`training_data.create_target`), and yields the MODEL_*
+    environment pointing an InferenceStrategy at it.
+    """
+    import joblib
+    from xgboost import XGBClassifier
+
+    from .training_data import create_target, numeric_feature_columns
+
+    bars = synthetic_ohlcv(n_bars, seed)
+    features = create_features(bars)
+    feature_names = numeric_feature_columns(features)
+    data = features[feature_names].assign(label=create_target(bars)).dropna()
+    model = XGBClassifier(n_estimators=50, max_depth=4, random_state=seed, n_jobs=1)
+    model.fit(data[feature_names], data["label"])
+
+    with tempfile.TemporaryDirectory(prefix="smartcfd-bench-") as workdir:
+        joblib.dump(model, os.path.join(workdir, "model.joblib"))
+        joblib.dump(feature_names, os.path.join(workdir, "feature_names.joblib"))
+        yield {
+            "MODEL_PATH": os.path.join(workdir, "model.joblib"),
+            "FEATURE_NAMES_PATH": os.path.join(workdir, "feature_names.joblib"),
+            "MODELS_DIR": os.path.join(workdir, "symbols"),
+            "MODEL_REGISTRY_DIR": os.path.join(workdir, "registry"),
+        }
+
+
+# --- Cases ---
+# A case is a context manager factory (bars, symbols, seed) -> zero-argument callable to time;
+# it is registered as the generator function that `contextmanager` wraps.
+
+CaseFactory = Callable[[int, int, int], Iterator[Callable[[], Any]]]
+Case = Callable[..., ContextManager[Callable[[], Any]]]
+CASES: Dict[str, Case] = {}
+
+
+def benchmark(name: str) -> Callable[[CaseFactory], Case]:
+    def register(factory: CaseFactory) -> Case:
+        CASES[name] = contextmanager(factory)
+        return CASES[name]
+    return register
+
+
+def _per_frame(func: Callable[[pd.DataFrame], Any]) -> CaseFactory:
+    def factory(bars: int, symbols: int, seed: int) -> Iterator[Callable[[], Any]]:
+        frames = list(synthetic_universe(bars, symbols, seed).values())
+        yield lambda: [func(frame) for frame in frames]
+    return factory
+
+
+_INDICATORS: Dict[str, Callable[[pd.DataFrame], Any]] = {
+    "atr": lambda df: indicators.atr(df["high"], df["low"], df["close"]),
+    "ema": lambda df: indicators.ema(df["close"]),
+    "rsi": lambda df: indicators.rsi(df["close"]),
+    "macd": lambda df: indicators.macd(df["close"]),
+    "bollinger_bands": lambda df: indicators.bollinger_bands(df["close"]),
+    "adx": lambda df: indicators.adx(df["high"], df["low"], df["close"]),
+    "stochastic_oscillator": lambda df: indicators.stochastic_oscillator(df["high"], df["low"], df["close"]),
+    "volume_profile": lambda df: indicators.volume_profile(df["close"], df["volume"]),
+    "price_rate_of_change": lambda df: indicators.price_rate_of_change(df["close"]),
+}
+for _name, _func in _INDICATORS.items():
+    benchmark(f"indicators.{_name}")(_per_frame(_func))
+
+benchmark("features.create_features")(_per_frame(create_features))
+
+_TIMEFRAME = parse_interval("15m")
+benchmark("data.has_data_gaps")(_per_frame(lambda df: has_data_gaps(df, _TIMEFRAME)))
+
+
+@benchmark("data.validate_bars_incremental")
+def _validate_bars_incremental(bars: int, symbols: int, seed: int) -> Iterator[Callable[[], Any]]:
+    # The next cycle's window: one bar dropped at the start, one closed at the end
+    frames = list(synthetic_universe(bars + 1, symbols, seed).values())
+    previous = [validate_bars(frame.iloc[:-1], _TIMEFRAME) for frame in frames]
+    windows = [frame.iloc[1:] for frame in frames]
+    yield lambda: [validate_bars(window, _TIMEFRAME, previous=p) for window, p in zip(windows, previous)]
+
+
+@benchmark("data.get_market_data")
+def _get_market_data(bars: int, symbols: int, seed: int) -> Iterator[Callable[[], Any]]:
+    frames = synthetic_universe(bars, symbols, seed, end=pd.Timestamp.now(tz="UTC"))
+    loader = DataLoader("benchmark", "benchmark", FakeBroker.base_url)
+    loader.api = FakeMarketDataAPI(frames)
+    names = list(frames)
+    yield lambda: loader.get_market_data(names, "15m", bars)
+
+
+def _inference(policy: str) -> CaseFactory:
+    def factory(bars: int, symbols: int, seed: int) -> Iterator[Callable[[], Any]]:
+        from .config import AppConfig
+        from .strategy import InferenceStrategy
+
+        frames = synthetic_universe(bars, symbols, seed)
+        config = AppConfig(watch_list=",".join(frames), min_data_points=min(bars, 100), intrabar_policy=policy, trade_interval="15m")
+        with synthetic_model(seed) as env, _environ(**env):
+            strategy = InferenceStrategy(config, FakeBroker())
+        # With the 'closed' policy every call after the warm-up is a cache hit
+        yield lambda: [strategy.evaluate(symbol, "trending_up", frame) for symbol, frame in frames.items()]
+    return factory
+
+
+benchmark("inference.evaluate")(_inference("always"))
+benchmark("inference.evaluate_cached")(_inference("closed"))
+
+
+@benchmark("trader.run")
+def _trader_run(bars: int, symbols: int, seed: int) -> Iterator[Callable[[], Any]]:
+    from .config import AppConfig, RegimeConfig, RiskConfig
+    from .db import connect, init_schema
+    from .portfolio import PortfolioManager
+    from .risk import RiskManager
+    from .trader import Trader
+
+    frames = synthetic_universe(bars, symbols, seed, end=pd.Timestamp.now(tz="UTC"))
+    # Act on every buy/sell prediction so the cycle also exercises sizing and order submission
+    config = AppConfig(watch_list=",".join(frames), min_data_points=bars, trade_interval="15m", intrabar_policy="always", trade_confidence_threshold=0.0)
+    risk_config = RiskConfig()
+    broker = FakeBroker()
+    conn = connect(":memory:")
+    init_schema(conn)
+    portfolio_manager = PortfolioManager(broker)
+    risk_manager = RiskManager(portfolio_manager, risk_config, broker)
+    with synthetic_model(seed) as env, _environ(**env):
+        # Trader is annotated with the Alpaca broker, which FakeBroker stands in for
+        trader = Trader(config, risk_config, RegimeConfig(), cast("AlpacaBroker", broker), conn, portfolio_manager, risk_manager)
+    trader.strategy.data_loader.api = FakeMarketDataAPI(frames)
+    try:
+        yield trader.run
+    finally:
+        conn.close()
+
+
+# --- Running and comparing ---
+
+@dataclass
+class Timing:
+    number: int  # calls per repeat
+    seconds: List[float]  # per call, one entry per repeat
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "number": self.number,
+            "repeat": len(self.seconds),
+            "min_s": min(self.seconds),
+            "median_s": statistics.median(self.seconds),
+            "mean_s": statistics.fmean(self.seconds),
+            "stdev_s": statistics.stdev(self.seconds) if len(self.seconds) > 1 else 0.0,
+        }
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, min_time: float = 0.2) -> Timing:
+    """
+    Times `func` like timeit: one warm-up call, then enough calls per repeat to last
+    `min_time` seconds (at least one), `repeat` times.
+    """
+    func()
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    seconds = [elapsed / number] + [timer.timeit(number) / number for _ in range(max(1, repeat) - 1)]
+    return Timing(number, seconds)
+
+
+def select_cases(patterns: Optional[Sequence[str]] = None) -> List[str]:
+    """Case names matching any of the glob `patterns` (all cases when empty)."""
+    if not patterns:
+        return list(CASES)
+    return [name for name in CASES if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)]
+
+
+def environment() -> Dict[str, Any]:
+    env = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+    try:
+        env["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        env["commit"] = None
+    return env
+
+
+def run_benchmarks(
+    cases: Optional[Sequence[str]] = None,
+    sizes: Sequence[Tuple[int, int]] = PRESETS["default"],
+    seed: int = 0,
+    repeat: int = 5,
+    min_time: float = 0.2,
+    max_rows: int = MAX_ROWS,
+) -> Dict[str, Any]:
+    """Runs the selected cases at every size and returns the JSON-serialisable results."""
+    results = []
+    for name in select_cases(cases):
+        for bars, symbols in sizes:
+            row: Dict[str, Any] = {"name": name, "bars": bars, "symbols": symbols}
+            if bars * symbols > max_rows:
+                row["skipped"] = f"{bars * symbols} rows > max_rows {max_rows}"
+                results.append(row)
+                continue
+            try:
+                with ExitStack() as stack:
+                    func = stack.enter_context(CASES[name](bars, symbols, seed))
+                    row.update(measure(func, repeat, min_time).summary())
+                row["ns_per_bar"] = round(1e9 * row["median_s"] / (bars * symbols), 3)
+            except Exception as e:
+                log.error("benchmarks.case_fail", exc_info=True, extra={"extra": {"name": name, "bars": bars, "symbols": symbols}})
+                row["error"] = repr(e)
+            log.info("benchmarks.case", extra={"extra": row})
+            results.append(row)
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "seed": seed,
+        "repeat": repeat,
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Matches cases by (name, bars, symbols) and compares median times. A case is a
+    `regression` when it got slower by more than `threshold` (0.10 = 10%), an
+    `improvement` when it got faster by as much, and `ok` otherwise; cases timed in
+    only one run are `new` or `missing`.
+    """
+    def timed(run: Dict[str, Any]) -> Dict[Tuple[str, int, int], Dict[str, Any]]:
+        return {(r["name"], r["bars"], r["symbols"]): r for r in run.get("results", []) if "median_s" in r}
+
+    before, after = timed(baseline), timed(current)
+    rows = []
+    for key in list(before) + [k for k in after if k not in before]:
+        name, bars, symbols = key
+        row: Dict[str, Any] = {"name": name, "bars": bars, "symbols": symbols}
+        if key not in after:
+            row.update(status="missing", baseline_s=before[key]["median_s"])
+        elif key not in before:
+            row.update(status="new", current_s=after[key]["median_s"])
+        else:
+            old, new = before[key]["median_s"], after[key]["median_s"]
+            ratio = new / old if old > 0 else float("inf")
+            status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 / (1 + threshold) else "ok"
+            row.update(status=status, baseline_s=old, current_s=new, ratio=round(ratio, 4))
+        rows.append(row)
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'case':<40} {'bars':>9} {'syms':>5} {'baseline':>12} {'current':>12} {'ratio':>7}  status"]
+    for row in rows:
+        baseline = f"{1000 * row['baseline_s']:.3f}ms" if "baseline_s" in row else "-"
+        current = f"{1000 * row['current_s']:.3f}ms" if "current_s" in row else "-"
+        ratio = f"{row['ratio']:.2f}x" if "ratio" in row else "-"
+        lines.append(f"{row['name']:<40} {row['bars']:>9} {row['symbols']:>5} {baseline:>12} {current:>12} {ratio:>7}  {row['status']}")
+    return "\n".join(lines)
@@ -0,0 +1,267 @@
+"""
+Runs several trading books (profiles, see `smartcfd.profiles`) in one process.
+
+Every book trades the same account with its own watch list, interval, confidence
+threshold, risk settings and limits, and its own trade groups (tagged with the
+book in the trade-group store). Per full cycle, `BookRunner`:
+
+  1. refreshes the models and reconciles the account, once;
+     cycles run on the shortest interval, and books on longer intervals are only
+     evaluated once per bar of their own (and reconciled in between);
+  2. per interval, fetches the bars of every symbol a book on that interval
+     watches, once, over the longest window those books need, through one shared
+     data loader (and bar store, with `resample_bars`);
+  3. per interval, detects the regime of each symbol and scores it once, with one
+     strategy (models, features, prediction cache) shared by the books on it and
+     gated at their lowest confidence threshold;
+  4. hands each book the data and signals of its symbols. The book keeps the
+     signals above its own threshold and within its limits, arms and manages its
+     exits, checks its halt conditions and places its orders.
+
+A book whose symbols another book already watches thus only adds its own risk
+and execution work. Books execute one after another, so the exposure checks of
+each book see the orders placed by the books before it.
+
+The account nets the books' trades on a symbol into one position, so a book
+sizes its exits from its own trade groups' orders, never from the position: a
+partial exit of one book leaves the other books' groups on the symbol as they
+are. The data loader serves crypto bars only; the books' other symbols (e.g.
+SPY) are left out of the fetch, and logged once, rather than requested from the
+crypto endpoints.
+"""
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .bar_store import BarStore
+from .data_loader import DataLoader, parse_interval, timeframe_to_timedelta
+from .metrics import ERRORS
+from .profiles import Profile, asset_class
+from .regime_detector import RegimeDetector
+from .risk import RiskManager
+from .strategy import Strategy, get_strategy_by_name
+from .trade_group_manager import TradeGroupManager
+from .trader import Trader, evaluate_symbols
+from .tracing import span
+
+log = logging.getLogger(__name__)
+
+# Trade groups that count against a book's limits
+OPEN_STATUSES = ("ENTRY_ORDER_PLACED", "ACTIVE", "PARTIAL_EXIT")
+
+
+class BookRiskManager(RiskManager):
+    """A book's risk manager, whose risk per trade can be set per asset class."""
+
+    def __init__(self, portfolio_manager: Any, risk_config: Any, broker: Any = None, class_risk_percent: Optional[Dict[str, float]] = None):
+        super().__init__(portfolio_manager, risk_config, broker)
+        self.class_risk_percent = dict(class_risk_percent or {})
+
+    def risk_per_trade_percent(self, symbol: str) -> float:
+        return self.class_risk_percent.get(asset_class(symbol), self.config.risk_per_trade_percent)
+
+
+class BookTrader(Trader):
+    """
+    The Trader of one book. Its strategy is shared with the other books on its
+    interval, it only sees its own trade groups, and its data and signals come
+    from the `BookRunner`.
+    """
+
+    def __init__(self, profile: Profile, regime_config: Any, broker: Any, db_conn: Any, portfolio_manager: Any, strategy: Strategy):
+        self.profile = profile
+        self._shared_strategy = strategy
+        risk_manager = BookRiskManager(portfolio_manager, profile.risk_config, broker, profile.limits.class_risk_percent)
+        super().__init__(profile.app_config, profile.risk_config, regime_config, broker, db_conn, portfolio_manager, risk_manager)
+        self.trade_group_manager = TradeGroupManager(db_conn, book=profile.name)
+
+    @property
+    def name(self) -> str:
+        return self.profile.name
+
+    def _initialize_strategy(self, app_config: Any) -> Strategy:
+        return self._shared_strategy
+
+    def remaining_exit_qty(self, group: Any, partial_order: Any) -> float:
+        """What the partially filled exit of `group` has left to fill, whatever other books hold in the symbol."""
+        return float(getattr(partial_order, 'qty', 0) or 0) - float(getattr(partial_order, 'filled_qty', 0) or 0)
+
+    def select_actions(self, actions: List[Dict[str, Any]], historical_data: Dict[str, pd.DataFrame]) -> List[Dict[str, Any]]:
+        """
+        The shared actions this book takes, in watch-list order: trades above its
+        confidence threshold, on enough bars and within its limits.
+        """
+        limits = self.profile.limits
+        groups = self.trade_group_manager.get_all_trade_groups()
+        open_groups = [g for g in groups if g.status in OPEN_STATUSES]
+        open_trades = len(open_groups)
+        open_by_class = Counter(asset_class(g.symbol) for g in open_groups)
+        last_entry: Dict[str, datetime] = {}
+        for group in groups:
+            created = datetime.fromisoformat(group.created_at)
+            last_entry[group.symbol] = max(created, last_entry.get(group.symbol, created))
+        now = datetime.now(timezone.utc)
+
+        order = {symbol: i for i, symbol in enumerate(self.profile.symbols)}
+        selected = []
+        for action in sorted(actions, key=lambda a: order.get(a.get("symbol"), len(order))):
+            symbol = action.get("symbol")
+            if action.get("action") != "trade":
+                selected.append(dict(action))
+                continue
+            cls = asset_class(symbol)
+            reason = None
+            if float(action.get("confidence", 1.0)) < self.app_config.trade_confidence_threshold:
+                reason = "confidence"
+            elif len(historical_data.get(symbol, ())) < self.app_config.min_data_points:
+                reason = "data_points"
+            elif limits.max_trades and open_trades >= limits.max_trades:
+                reason = "max_trades"
+            elif cls in limits.class_caps and open_by_class[cls] >= limits.class_caps[cls]:
+                reason = "class_cap"
+            elif limits.cooldown_minutes and symbol in last_entry and now - last_entry[symbol] < timedelta(minutes=limits.cooldown_minutes):
+                reason = "cooldown"
+            if reason:
+                log.info("books.action_skipped", extra={"extra": {"book": self.name, "symbol": symbol, "reason": reason}})
+                continue
+            open_trades += 1
+            open_by_class[cls] += 1
+            selected.append(dict(action))
+        return selected
+
+    def evaluate_book(self, historical_data: Dict[str, pd.DataFrame], actions: List[Dict[str, Any]]) -> None:
+        """`Trader.evaluate_new_trades` on the data and actions the runner computed for the book's interval."""
+        historical_data = {s: historical_data[s] for s in self.profile.symbols if s in historical_data}
+        self._last_historical_data = historical_data
+
+        with span("trader.reconcile_trade_groups"):
+            self.reconcile_trade_groups(historical_data)
+
+        if not historical_data or all(df.empty for df in historical_data.values()):
+            log.warning("trader.run.no_valid_data_from_strategy", extra={"extra": {"book": self.name}})
+            return
+
+        with span("trader.check_for_halt"):
+            halted = self.risk_manager.check_for_halt(historical_data, self.app_config.trade_interval)
+        if halted:
+            log.critical("trader.run.halted", extra={"extra": {"book": self.name, "reason": self.risk_manager.halt_reason}})
+            return
+
+        selected = self.select_actions([a for a in actions if a.get("symbol") in historical_data], historical_data)
+        with span("trader.execute_actions"):
+            self.execute_actions(selected, historical_data)
+
+
+@dataclass
+class _Desk:
+    """What the books on one interval share."""
+    interval: str
+    symbols: List[str]  # Union of the books' watch lists
+    limit: int  # Bars fetched: the most any of the books needs
+    strategy: Strategy
+    regime_detector: RegimeDetector
+    books: List[BookTrader] = field(default_factory=list)
+    last_bar: Optional[int] = None  # Epoch-aligned bar the books were last evaluated in
+
+
+class BookRunner:
+    """
+    Runs the books of `profiles` against one account; see the module docstring.
+    Used by the runner in place of a Trader (`run`, `reconcile`, `close`).
+    """
+
+    def __init__(self, profiles: List[Profile], regime_config: Any, broker: Any, db_conn: Any, portfolio_manager: Any):
+        if not profiles:
+            raise ValueError("No profiles to run.")
+        self.portfolio_manager = portfolio_manager
+        base = profiles[0].app_config
+        self.data_loader = DataLoader(
+            broker.api_key, broker.secret_key, broker.base_url,
+            bar_dtype=base.bar_dtype,
+            bar_store=BarStore() if base.resample_bars else None,
+        )
+
+        by_interval: Dict[str, List[Profile]] = {}
+        for profile in profiles:
+            by_interval.setdefault(profile.app_config.trade_interval, []).append(profile)
+        self.desks: Dict[str, _Desk] = {}
+        for interval, group in by_interval.items():
+            watched = list(dict.fromkeys(s for p in group for s in p.symbols))
+            symbols = [s for s in watched if asset_class(s) == "crypto"]
+            if len(symbols) < len(watched):
+                log.warning("books.symbols_without_data", extra={"extra": {
+                    "interval": interval, "symbols": [s for s in watched if s not in symbols],
+                }})
+            desk_config = replace(
+                group[0].app_config,
+                watch_list=",".join(symbols),
+                min_data_points=min(p.app_config.min_data_points for p in group),
+                trade_confidence_threshold=min(p.app_config.trade_confidence_threshold for p in group),
+            )
+            strategy = get_strategy_by_name(desk_config.strategy, desk_config, broker)
+            strategy.data_loader = self.data_loader
+            desk = _Desk(interval, symbols, max(p.app_config.min_data_points for p in group), strategy, RegimeDetector(desk_config, regime_config))
+            desk.books = [BookTrader(p, regime_config, broker, db_conn, portfolio_manager, strategy) for p in group]
+            self.desks[interval] = desk
+        self.books = [book for desk in self.desks.values() for book in desk.books]
+        log.info("books.init", extra={"extra": {
+            "books": {book.name: book.app_config.trade_interval for book in self.books},
+            "symbols": {desk.interval: len(desk.symbols) for desk in self.desks.values()},
+        }})
+
+    @property
+    def trade_interval(self) -> str:
+        """The shortest interval of the books, on whose bar closes cycles are scheduled."""
+        return min(self.desks, key=lambda interval: timeframe_to_timedelta(parse_interval(interval)))
+
+    def run(self) -> None:
+        """One full cycle of every book."""
+        try:
+            with span("trader.refresh_models"):
+                for desk in self.desks.values():
+                    refresh_models = getattr(desk.strategy, "refresh_models", None)
+                    if refresh_models is not None:
+                        refresh_models()
+
+            with span("trader.reconcile_portfolio"):
+                self.portfolio_manager.reconcile()
+
+            now, shortest = time.time(), self.trade_interval
+            for desk in self.desks.values():
+                bar = int(now // timeframe_to_timedelta(parse_interval(desk.interval)).total_seconds())
+                if desk.interval != shortest and bar == desk.last_bar:
+                    with span("trader.reconcile_trade_groups"):
+                        for book in desk.books:
+                            book.reconcile_trade_groups(book._last_historical_data)
+                    continue
+                desk.last_bar = bar
+                with span("trader.get_market_data"):
+                    historical_data = self.data_loader.get_market_data(desk.symbols, desk.interval, desk.limit) or {}
+                with span("trader.evaluate_symbols"):
+                    _, actions = evaluate_symbols(desk.strategy, desk.regime_detector, desk.symbols, historical_data)
+                for book in desk.books:
+                    try:
+                        book.evaluate_book(historical_data, actions)
+                    except Exception:
+                        log.error("books.run.book_fail", exc_info=True, extra={"extra": {"book": book.name}})
+                        ERRORS.labels("trader").inc()
+        except Exception:
+            log.error("trader.run.fail", exc_info=True)
+            ERRORS.labels("trader").inc()
+
+    def reconcile(self) -> None:
+        """Light cycle: reconciles the account once and every book's trade groups on its last data."""
+        try:
+            with span("trader.reconcile_portfolio"):
+                self.portfolio_manager.reconcile()
+            with span("trader.reconcile_trade_groups"):
+                for book in self.books:
+                    book.reconcile_trade_groups(book._last_historical_data)
+        except Exception:
+            log.error("trader.reconcile.fail", exc_info=True)
+            ERRORS.labels("trader").inc()
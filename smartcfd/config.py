@@ -1,6 +1,7 @@
 from dataclasses import dataclass, asdict
 import os
 import configparser
+from .alpaca_helpers import build_api_base
 
 def _as_bool(value: str) -> bool:
     return str(value).strip().lower() in ("1", "true", "yes", "on")
@@ -32,6 +33,26 @@ class AppConfig:
     db_path: str = "logs/trades.db" # Path to the SQLite database
     heartbeat_max_age_seconds: int = 120 # Max age for health check
     startup_grace_period: int = 60 # Grace period for health checks on startup
+    intrabar_policy: str = "closed" # When to re-score within a bar: closed, interval or always
+    intrabar_refresh_seconds: int = 300 # Re-score interval within a bar for the 'interval' policy
+    prediction_cache_size: int = 256 # Max cached predictions (LRU)
+    schedule_mode: str = "bar_close" # bar_close: evaluate on trade_interval closes; fixed: every run_interval_seconds
+    bar_settle_seconds: int = 5 # Delay after a bar closes before evaluating it
+    trader_shards: int = 1 # Worker processes for per-symbol data, features and inference (1 = in-process)
+    cycle_mode: str = "serial" # serial: stage by stage for all symbols; pipelined: symbols flow through bounded queues
+    pipeline_fetch_workers: int = 4 # Concurrent bar downloads in the pipelined cycle
+    pipeline_evaluate_workers: int = 1 # Concurrent feature/inference workers in the pipelined cycle
+    pipeline_queue_size: int = 8 # Capacity of each queue between pipeline stages
+    tracing_enabled: bool = False # Time each cycle stage, broker call and DB write
+    metrics_enabled: bool = True # Serve /metrics (also times stages, broker calls and DB writes)
+    traffic_log_path: str = "" # Record broker and market-data traffic to this file (.gz compresses); empty disables
+    bar_dtype: str = "float64" # Storage of fetched bars: float64, or float32 to halve their memory
+    resample_bars: bool = False # Derive minute/hour bars from one cached store of 1-minute bars instead of fetching each interval
+    profiles: str = "" # Comma-separated profile files (configs/*.yml) run as separate books; empty runs watch_list alone
+    log_level: str = "INFO" # Root log level; DEBUG adds feature vectors and sizing details
+    log_queue_size: int = 10000 # Records waiting for the log writer thread before new ones are dropped
+    log_rate_limit_per_second: float = 50.0 # Max records per second of one event below WARNING (0 = no limit)
+    log_sample_rates: str = "" # event=fraction pairs, comma-separated, keeping that fraction of an event's records
     
     # Nested Alpaca config for clarity
     alpaca: AlpacaConfig = None
@@ -53,16 +74,9 @@ class RegimeConfig:
     short_window: int = 50
     long_window: int = 200
 
-def load_config_from_file(path: str = 'config.ini') -> tuple[AppConfig, AlpacaConfig, RiskConfig, RegimeConfig]:
-    """Loads configuration from a .ini file."""
-    parser = configparser.ConfigParser()
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Configuration file not found at {path}. Please create it from config.ini.example.")
-    
-    parser.read(path)
-
-    # --- Load AppConfig ---
-    app_cfg = AppConfig(
+def _app_config(parser: configparser.ConfigParser) -> AppConfig:
+    """The [settings] section of `parser`, with environment variables and defaults for missing keys."""
+    return AppConfig(
         timezone=parser.get('settings', 'timezone', fallback=os.getenv("TIMEZONE", "Europe/Dublin")),
         alpaca_env=parser.get('settings', 'alpaca_env', fallback=os.getenv("ALPACA_ENV", "paper")),
         api_timeout_seconds=parser.getfloat('settings', 'api_timeout_seconds', fallback=float(os.getenv("API_TIMEOUT_SECONDS", "10"))),
@@ -82,8 +96,41 @@ def load_config_from_file(path: str = 'config.ini') -> tuple[AppConfig, AlpacaCo
         db_path=parser.get('settings', 'db_path', fallback=os.getenv("DB_PATH", "logs/trades.db")),
         heartbeat_max_age_seconds=parser.getint('settings', 'heartbeat_max_age_seconds', fallback=int(os.getenv("HEALTH_MAX_AGE_SECONDS", "120"))),
         startup_grace_period=parser.getint('settings', 'startup_grace_period', fallback=int(os.getenv("STARTUP_GRACE_PERIOD", "60"))),
+        intrabar_policy=parser.get('settings', 'intrabar_policy', fallback=os.getenv("INTRABAR_POLICY", "closed")),
+        intrabar_refresh_seconds=parser.getint('settings', 'intrabar_refresh_seconds', fallback=int(os.getenv("INTRABAR_REFRESH_SECONDS", "300"))),
+        prediction_cache_size=parser.getint('settings', 'prediction_cache_size', fallback=int(os.getenv("PREDICTION_CACHE_SIZE", "256"))),
+        schedule_mode=parser.get('settings', 'schedule_mode', fallback=os.getenv("SCHEDULE_MODE", "bar_close")),
+        bar_settle_seconds=parser.getint('settings', 'bar_settle_seconds', fallback=int(os.getenv("BAR_SETTLE_SECONDS", "5"))),
+        trader_shards=parser.getint('settings', 'trader_shards', fallback=int(os.getenv("TRADER_SHARDS", "1"))),
+        cycle_mode=parser.get('settings', 'cycle_mode', fallback=os.getenv("CYCLE_MODE", "serial")),
+        pipeline_fetch_workers=parser.getint('settings', 'pipeline_fetch_workers', fallback=int(os.getenv("PIPELINE_FETCH_WORKERS", "4"))),
+        pipeline_evaluate_workers=parser.getint('settings', 'pipeline_evaluate_workers', fallback=int(os.getenv("PIPELINE_EVALUATE_WORKERS", "1"))),
+        pipeline_queue_size=parser.getint('settings', 'pipeline_queue_size', fallback=int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))),
+        tracing_enabled=parser.getboolean('settings', 'tracing_enabled', fallback=_as_bool(os.getenv("TRACING_ENABLED", "0"))),
+        metrics_enabled=parser.getboolean('settings', 'metrics_enabled', fallback=_as_bool(os.getenv("METRICS_ENABLED", "1"))),
+        traffic_log_path=parser.get('settings', 'traffic_log_path', fallback=os.getenv("TRAFFIC_LOG_PATH", "")),
+        bar_dtype=parser.get('settings', 'bar_dtype', fallback=os.getenv("BAR_DTYPE", "float64")),
+        resample_bars=parser.getboolean('settings', 'resample_bars', fallback=_as_bool(os.getenv("RESAMPLE_BARS", "0"))),
+        profiles=parser.get('settings', 'profiles', fallback=os.getenv("PROFILES", "")),
+        log_level=parser.get('settings', 'log_level', fallback=os.getenv("LOG_LEVEL", "INFO")),
+        log_queue_size=parser.getint('settings', 'log_queue_size', fallback=int(os.getenv("LOG_QUEUE_SIZE", "10000"))),
+        log_rate_limit_per_second=parser.getfloat('settings', 'log_rate_limit_per_second', fallback=float(os.getenv("LOG_RATE_LIMIT_PER_SECOND", "50"))),
+        log_sample_rates=parser.get('settings', 'log_sample_rates', fallback=os.getenv("LOG_SAMPLE_RATES", "")),
     )
 
+def load_config() -> AppConfig:
+    """The AppConfig from environment variables and defaults alone, without a config.ini."""
+    return _app_config(configparser.ConfigParser())
+
+def load_config_from_file(path: str = 'config.ini') -> tuple[AppConfig, AlpacaConfig, RiskConfig, RegimeConfig]:
+    """Loads configuration from a .ini file."""
+    parser = configparser.ConfigParser()
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Configuration file not found at {path}. Please create it from config.ini.example.")
+    
+    parser.read(path)
+    app_cfg = _app_config(parser)
+
     # --- Load RiskConfig ---
     risk_cfg = RiskConfig(
         max_daily_drawdown_percent=parser.getfloat('risk', 'max_daily_drawdown_percent', fallback=float(os.getenv("MAX_DAILY_DRAWDOWN_PERCENT", "-5.0"))),
@@ -109,8 +156,7 @@ def load_config_from_file(path: str = 'config.ini') -> tuple[AppConfig, AlpacaCo
     alpaca_secret_key = os.getenv('APCA_API_SECRET_KEY') or parser.get('alpaca', 'secret_key', fallback=None)
     
     # Determine API base URL
-    is_paper = app_cfg.alpaca_env.lower() == 'paper'
-    api_base = "https://paper-api.alpaca.markets" if is_paper else "https://api.alpaca.markets"
+    api_base = build_api_base(app_cfg.alpaca_env)
 
     if not alpaca_api_key or 'YOUR' in str(alpaca_api_key):
         raise ValueError("Alpaca API key is not configured via environment variables or config.ini.")
@@ -1,18 +1,27 @@
+from __future__ import annotations
+
 import os
+import numpy as np
 import pandas as pd
 import requests
-import alpaca_trade_api as tradeapi
-from alpaca_trade_api.rest import TimeFrame, TimeFrameUnit
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Dict
-from typing import Dict
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from .bar_store import BarStore
+from .bars import BAR_COLUMNS, Bars
+from .metrics import instrument_session
+
+# The Alpaca SDK (and aiohttp with it) is imported on first use, not when this module is
+if TYPE_CHECKING:
+    from alpaca_trade_api.rest import TimeFrame
 
 log = logging.getLogger(__name__)
 
 def parse_interval(interval_str: str) -> TimeFrame:
     """Parses a string like '15m', '1h', '1d', '1Hour', '1Day' into an Alpaca TimeFrame."""
+    from alpaca_trade_api.rest import TimeFrame, TimeFrameUnit
     try:
         # More robust parsing
         import re
@@ -44,12 +53,29 @@ def parse_interval(interval_str: str) -> TimeFrame:
         # Default to a sensible value if parsing fails, to avoid crashing.
         return TimeFrame.Minute
 
+def timeframe_to_timedelta(timeframe: TimeFrame) -> timedelta:
+    """Duration of one bar of `timeframe` (a day for units without a fixed length)."""
+    from alpaca_trade_api.rest import TimeFrameUnit
+    if timeframe.unit == TimeFrameUnit.Minute:
+        return timedelta(minutes=timeframe.amount)
+    if timeframe.unit == TimeFrameUnit.Hour:
+        return timedelta(hours=timeframe.amount)
+    if timeframe.unit == TimeFrameUnit.Day:
+        return timedelta(days=timeframe.amount)
+    return timedelta(days=1)
+
 class DataLoader:
     """
     Handles fetching historical market data from Alpaca.
     """
-    def __init__(self, api_key: str, secret_key: str, api_base: str):
+    def __init__(self, api_key: str, secret_key: str, api_base: str, bar_dtype: str = "float64", bar_store: Optional[BarStore] = None):
+        import alpaca_trade_api as tradeapi
         self.api = tradeapi.REST(api_key, secret_key, base_url=api_base, api_version='v2')
+        self.bar_dtype = bar_dtype # Storage of the bars returned by get_market_data: float64 or float32
+        self.bar_store = bar_store # Source of minute and hour bars when set; see get_multi_timeframe_data
+        instrument_session(getattr(self.api, "_session", None))
+        # Last validation of each (symbol, interval)'s bars; the next cycle only checks bars it hasn't seen
+        self._validations: Dict[Tuple[str, str], BarValidation] = {}
 
     def fetch_historical_range(self, symbol: str, start_date: str, end_date: str, interval: str) -> pd.DataFrame | None:
         """
@@ -82,9 +108,12 @@ class DataLoader:
         Fetches and validates historical crypto data for a list of symbols.
         This method combines historical bars with the latest snapshot to ensure data is fresh
         and complete, avoiding partial bars for the current interval.
+        With a bar store, minute and hour bars are derived from its 1-minute bars instead.
         """
         if not symbols:
             return {}
+        if self.bar_store is not None and _resampled(interval):
+            return self.get_multi_timeframe_data(symbols, [interval], limit)[interval]
 
         try:
             timeframe = parse_interval(interval)
@@ -92,95 +121,29 @@ class DataLoader:
             # --- Calculate start_date instead of relying on 'limit' ---
             required_bars = limit + 50 
             
-            if timeframe.unit == TimeFrameUnit.Minute:
-                delta = timedelta(minutes=timeframe.amount * required_bars)
-            elif timeframe.unit == TimeFrameUnit.Hour:
-                delta = timedelta(hours=timeframe.amount * required_bars)
-            elif timeframe.unit == TimeFrameUnit.Day:
-                delta = timedelta(days=timeframe.amount * required_bars)
-            else:
-                delta = timedelta(days=required_bars) 
+            delta = timeframe_to_timedelta(timeframe) * required_bars
 
             start_date = datetime.now(timezone.utc) - delta - timedelta(days=1)
 
             # 1. Fetch historical bars using get_crypto_bars
-            raw_bars_df = self.api.get_crypto_bars(
-                symbols,
-                timeframe,
-                start=start_date.isoformat()
-            ).df
+            raw_bars = self._fetch_bars(symbols, timeframe, start_date)
 
             # 2. Fetch latest snapshot data
             snapshots = self.api.get_crypto_snapshots(symbols)
 
             # --- Data Combination and Validation ---
+            # Each symbol's bars are copied once, snapshot included, into a read-only block; the
+            # frame handed out is a view of its last `limit` rows
             validated_data = {}
             for symbol in symbols:
-                if isinstance(raw_bars_df.index, pd.MultiIndex) and symbol in raw_bars_df.index.get_level_values('symbol'):
-                    bars_df = raw_bars_df.loc[symbol].copy()
-                elif not isinstance(raw_bars_df.index, pd.MultiIndex) and len(symbols) == 1:
-                    bars_df = raw_bars_df.copy()
-                else:
-                    log.warning(f"data_loader.get_market_data.no_hist_data", extra={"extra": {"symbol": symbol}})
-                    bars_df = pd.DataFrame()
-
-                snapshot = snapshots.get(symbol)
-
-                current_bar = None
-                if hasattr(snapshot, 'minute_bar') and snapshot.minute_bar:
-                    current_bar = snapshot.minute_bar
-                elif hasattr(snapshot, 'daily_bar') and snapshot.daily_bar:
-                    current_bar = snapshot.daily_bar
-
-                if not snapshot or not current_bar:
+                last = _snapshot_bar(snapshots.get(symbol))
+                if last is None:
                     log.warning(f"data_loader.get_market_data.no_snapshot_bar", extra={"extra": {"symbol": symbol}})
                     validated_data[symbol] = pd.DataFrame()
                     continue
-
-                snapshot_bar_dict = {
-                    "open": current_bar.open,
-                    "high": current_bar.high,
-                    "low": current_bar.low,
-                    "close": current_bar.close,
-                    "volume": current_bar.volume,
-                    "timestamp": current_bar.timestamp,
-                }
-                snapshot_df = pd.DataFrame([snapshot_bar_dict])
-                snapshot_df['timestamp'] = pd.to_datetime(snapshot_df['timestamp'])
-                snapshot_df = snapshot_df.set_index('timestamp')
-
-                # --- Column Alignment ---
-                # Ensure snapshot_df has the same columns in the same order as bars_df
-                if not bars_df.empty:
-                    snapshot_columns = [col for col in bars_df.columns if col in snapshot_df.columns]
-                    snapshot_df = snapshot_df[snapshot_columns]
-                    if set(bars_df.columns) == set(snapshot_df.columns):
-                         snapshot_df = snapshot_df[bars_df.columns]
-
-                # Combine historical and snapshot data
-                if not bars_df.empty and not snapshot_df.empty:
-                    if snapshot_df.index[0] == bars_df.index[-1]:
-                        # Update only the columns present in the snapshot
-                        common_cols = [col for col in snapshot_df.columns if col in bars_df.columns]
-                        bars_df.loc[bars_df.index[-1], common_cols] = snapshot_df.iloc[0][common_cols]
-                    else:
-                        # The snapshot is a new bar, append it
-                        bars_df = pd.concat([bars_df, snapshot_df])
-                elif not snapshot_df.empty:
-                    # No historical data, just use the snapshot
-                    bars_df = snapshot_df
-
-                # --- Data Cleaning ---
-                if isinstance(bars_df.index, pd.DatetimeIndex):
-                    bars_df.index = bars_df.index.tz_convert('UTC')
-                symbol_df = remove_zero_volume_anomalies(bars_df)
-
-                # --- Final Validation ---
-                if has_data_gaps(symbol_df, timeframe):
-                    log.warning(f"data_loader.get_market_data.validation_fail", extra={"extra": {"symbol": symbol}})
-                    validated_data[symbol] = pd.DataFrame() # Invalidate on validation failure
-                else:
-                    validated_data[symbol] = symbol_df.tail(limit) # Return the requested number of bars
+                timestamps, columns = raw_bars[symbol]
+                bars = Bars.from_arrays(timestamps, columns, dtype=self.bar_dtype, last=last)
+                validated_data[symbol] = self._validated(symbol, interval, timeframe, bars, limit)
 
             return validated_data
 
@@ -188,6 +151,146 @@ class DataLoader:
             log.error("data_loader.get_market_data.fail", exc_info=True)
             return {s: pd.DataFrame() for s in symbols}
 
+    def get_multi_timeframe_data(self, symbols: list[str], intervals: list[str], limit: int) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """
+        `get_market_data` for several intervals: {interval: {symbol: bars}}. With a bar
+        store, the minute and hour intervals share one fetch of 1-minute bars (after the
+        first call, only of the minutes since the latest stored one) and are aggregated
+        from the same minutes; other intervals are fetched on their own.
+        """
+        if not symbols:
+            return {interval: {} for interval in intervals}
+        store = self.bar_store
+        resampled = [interval for interval in intervals if store is not None and _resampled(interval)]
+        data = {interval: self.get_market_data(symbols, interval, limit) for interval in intervals if interval not in resampled}
+        if store is None or not resampled:
+            return data
+
+        try:
+            timeframes = {interval: parse_interval(interval) for interval in resampled}
+            span = max(timeframe_to_timedelta(timeframe) for timeframe in timeframes.values()) * (limit + 50)
+            store.retain = max(store.retain, _nanoseconds(span))
+            window_start = pd.Timestamp.now(tz="UTC").value - _nanoseconds(span)
+
+            # Symbols stored over the whole window only need the minutes since their latest bar (which may have been forming)
+            stored_until: Dict[str, int] = {}
+            for symbol in symbols:
+                complete_from, latest = store.complete_from(symbol), store.last_timestamp(symbol)
+                if complete_from is not None and latest is not None and complete_from <= window_start <= latest:
+                    stored_until[symbol] = latest
+            recent = list(stored_until)
+            stale = [s for s in symbols if s not in stored_until]
+            fetches = []
+            if stale:
+                fetches.append((stale, window_start, True))
+            if recent:
+                fetches.append((recent, min(stored_until.values()), False))
+            fetched = [(group, start, full, self._fetch_bars(group, parse_interval("1m"), pd.Timestamp(start, tz="UTC"))) for group, start, full in fetches]
+            snapshots = self.api.get_crypto_snapshots(symbols)
+
+            missing = set()
+            for group, start, full, raw_bars in fetched:
+                for symbol in group:
+                    last = _snapshot_bar(snapshots.get(symbol))
+                    if last is None:
+                        log.warning("data_loader.get_market_data.no_snapshot_bar", extra={"extra": {"symbol": symbol}})
+                        missing.add(symbol)
+                    timestamps, columns = raw_bars[symbol]
+                    bars = Bars.from_arrays(timestamps, columns, dtype=self.bar_dtype, last=last)
+                    store.update(symbol, bars, complete_from=start if full else None)
+
+            for interval, timeframe in timeframes.items():
+                step = _nanoseconds(timeframe_to_timedelta(timeframe))
+                data[interval] = {
+                    symbol: pd.DataFrame() if symbol in missing else self._validated(symbol, interval, timeframe, store.get(symbol, step), limit)
+                    for symbol in symbols
+                }
+        except Exception:
+            log.error("data_loader.get_market_data.fail", exc_info=True)
+            data.update({interval: {s: pd.DataFrame() for s in symbols} for interval in resampled})
+        return data
+
+    def _fetch_bars(self, symbols: list[str], timeframe: TimeFrame, start: datetime) -> Dict[str, tuple]:
+        """Bars of `symbols` since `start` as {symbol: (epoch-nanosecond timestamps, {column: values})}."""
+        raw_bars_df = self.api.get_crypto_bars(
+            symbols,
+            timeframe,
+            start=start.isoformat()
+        ).df
+        if not isinstance(raw_bars_df.index, pd.MultiIndex) and 'symbol' in raw_bars_df.columns:
+            # alpaca_trade_api 3.x returns the bars of all symbols in one frame with a 'symbol' column
+            raw_bars_df = raw_bars_df.set_index('symbol', append=True).swaplevel(0, 1)
+
+        if isinstance(raw_bars_df.index, pd.MultiIndex):
+            raw_timestamps = raw_bars_df.index.get_level_values(1).as_unit('ns').asi8
+        elif isinstance(raw_bars_df.index, pd.DatetimeIndex):
+            raw_timestamps = raw_bars_df.index.as_unit('ns').asi8
+        else:
+            raw_timestamps = np.empty(0, dtype=np.int64)
+        raw_columns = {col: raw_bars_df[col].to_numpy() for col in BAR_COLUMNS if col in raw_bars_df.columns}
+
+        raw_bars = {}
+        for symbol in symbols:
+            if isinstance(raw_bars_df.index, pd.MultiIndex) and symbol in raw_bars_df.index.get_level_values('symbol'):
+                rows = raw_bars_df.index.get_loc(symbol)
+            elif not isinstance(raw_bars_df.index, pd.MultiIndex) and len(symbols) == 1:
+                rows = slice(None)
+            else:
+                log.warning("data_loader.get_market_data.no_hist_data", extra={"extra": {"symbol": symbol}})
+                rows = slice(0, 0)
+            raw_bars[symbol] = (raw_timestamps[rows], {col: values[rows] for col, values in raw_columns.items()})
+        return raw_bars
+
+    def _validated(self, symbol: str, interval: str, timeframe: TimeFrame, bars: Optional[Bars], limit: int) -> pd.DataFrame:
+        """
+        A view of the last `limit` of `bars` (whose block was built once, by the fetch or the
+        bar store), or an empty frame if they have too many gaps.
+        """
+        if bars is None:
+            return pd.DataFrame()
+        gaps = False
+        if len(bars) >= 2:
+            validation = validate_bars(bars.frame(), timeframe, previous=self._validations.get((symbol, interval)))
+            self._validations[(symbol, interval)] = validation
+            _log_zero_volume_moves(validation)
+            gaps = _log_gaps(validation)
+        if gaps:
+            log.warning("data_loader.get_market_data.validation_fail", extra={"extra": {"symbol": symbol}})
+            return pd.DataFrame() # Invalidate on validation failure
+        return bars.tail(limit).frame()
+
+
+def _resampled(interval: str) -> bool:
+    """Whether bars of `interval` can be aggregated from 1-minute bars (day bars are fetched as they are)."""
+    from alpaca_trade_api.rest import TimeFrameUnit
+    return parse_interval(interval).unit in (TimeFrameUnit.Minute, TimeFrameUnit.Hour)
+
+
+def _nanoseconds(delta: timedelta) -> int:
+    return delta // timedelta(microseconds=1) * 1000
+
+
+def _snapshot_bar(snapshot) -> Optional[tuple]:
+    """
+    The latest bar of a snapshot as (epoch nanoseconds, OHLCV), or None. The SDK
+    returns snapshot timestamps in New York time; bars are UTC. A snapshot of the
+    last bar updates it, a newer one is appended as the forming bar.
+    """
+    current_bar = None
+    if hasattr(snapshot, 'minute_bar') and snapshot.minute_bar:
+        current_bar = snapshot.minute_bar
+    elif hasattr(snapshot, 'daily_bar') and snapshot.daily_bar:
+        current_bar = snapshot.daily_bar
+    if not snapshot or not current_bar:
+        return None
+    return pd.to_datetime(current_bar.timestamp, utc=True).as_unit('ns').value, {
+        "open": current_bar.open,
+        "high": current_bar.high,
+        "low": current_bar.low,
+        "close": current_bar.close,
+        "volume": current_bar.volume,
+    }
+
 
 def fetch_data(symbol: str, timeframe: TimeFrame, start_date: str, end_date: str) -> pd.DataFrame:
     """
@@ -224,48 +327,191 @@ def is_data_stale(df: pd.DataFrame, max_staleness_minutes: int) -> bool:
     
     return is_stale
 
+@dataclass
+class BarValidation:
+    """
+    Result of `validate_bars`: per-bar checks of one frame, aligned with its rows.
+    Kept between cycles so that validating an overlapping window only checks new bars.
+    """
+    timestamps: np.ndarray  # int64 epoch values in `unit`, ascending
+    unit: str  # Resolution of `timestamps` (pandas datetime unit)
+    step: Optional[int]  # Expected bar spacing in `unit`; None when gaps aren't checked
+    missing_before: np.ndarray  # Expected bars missing between each bar and the previous one
+    bad_price: np.ndarray  # Zero or negative open/high/low/close
+    inverted: np.ndarray  # high < low
+    zero_volume_move: np.ndarray  # high != low on zero volume
+    bar_range: np.ndarray  # high - low
+    checked_rows: int  # Bars checked by this call; the others were carried over from the previous one
+
+    @property
+    def rows(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def missing(self) -> int:
+        return int(self.missing_before.sum())
+
+    @property
+    def expected(self) -> int:
+        return self.rows + self.missing
+
+    @property
+    def missing_ratio(self) -> float:
+        return self.missing / self.expected if self.expected else 0.0
+
+    @property
+    def first_missing(self) -> Optional[pd.Timestamp]:
+        gaps = np.flatnonzero(self.missing_before)
+        if not len(gaps):
+            return None
+        return pd.Timestamp(int(self.timestamps[gaps[0] - 1] + self.step), unit=self.unit, tz="UTC")
+
+    @property
+    def spike_ratio(self) -> float:
+        """Range of the latest bar over the mean range of the bars before it (0 when undefined)."""
+        if self.rows < 2:
+            return 0.0
+        earlier = self.bar_range[:-1]
+        valid = np.count_nonzero(~np.isnan(earlier))
+        average = np.nansum(earlier) / valid if valid else 0.0
+        latest = self.bar_range[-1]
+        return float(latest / average) if average > 1e-9 and not np.isnan(latest) else 0.0
+
+
+_NANOSECONDS = {"s": 10**9, "ms": 10**6, "us": 10**3, "ns": 1}
+
+
+def _bar_step(expected_interval: TimeFrame) -> Optional[timedelta]:
+    from alpaca_trade_api.rest import TimeFrameUnit
+    if expected_interval.unit in (TimeFrameUnit.Minute, TimeFrameUnit.Hour, TimeFrameUnit.Day):
+        return timeframe_to_timedelta(expected_interval)
+    return None
+
+
+def _column(df: pd.DataFrame, name: str, columns: Dict[str, str], rows: slice) -> Optional[np.ndarray]:
+    column = columns.get(name)
+    if column is None:
+        return None
+    return df[column].to_numpy(dtype=np.float64, copy=False)[rows]
+
+
+def validate_bars(df: pd.DataFrame, expected_interval: Optional[TimeFrame], previous: Optional[BarValidation] = None) -> BarValidation:
+    """
+    Checks the bars of `df` in one vectorised pass over its int64 timestamps and
+    OHLCV columns: gaps against the expected bar spacing, price sanity and bar
+    ranges (for spike detection). `df` is not modified and column names are matched
+    case-insensitively.
+
+    With the `previous` validation of the same symbol, bars already checked there
+    (matched by timestamp, as when a window slides forward) are carried over and only
+    newer bars are checked. The last previously checked bar is checked again, since
+    it may have been the still-forming snapshot bar.
+    """
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        unit = getattr(index, "unit", "ns")
+        timestamps = index.asi8  # UTC epoch values; a naive index is taken as UTC
+    else:
+        unit, timestamps, expected_interval = "ns", np.arange(len(df), dtype=np.int64), None
+    step_td = _bar_step(expected_interval) if expected_interval is not None else None
+    step = (step_td // timedelta(microseconds=1)) * 1000 // _NANOSECONDS[unit] if step_td is not None else None
+    n = len(timestamps)
+
+    reuse = 0
+    if previous is not None and n and previous.rows and previous.step == step and previous.unit == unit:
+        start = int(np.searchsorted(previous.timestamps, timestamps[0]))
+        # The previous last bar is left out of the match: live it is the forming snapshot bar,
+        # off the grid and replaced by the completed bar, and it is checked again either way
+        overlap = min(previous.rows - 1 - start, n - 1)
+        if overlap > 0 and np.array_equal(previous.timestamps[start:start + overlap], timestamps[:overlap]):
+            reuse = overlap
+
+    # Spacing of the bars to check (and the one before them); the carried-over ones are known to be ascending
+    spacing = np.diff(timestamps[max(reuse - 1, 0):])
+    order = None
+    if (spacing < 0).any():
+        reuse = 0
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        spacing = np.diff(timestamps)
+
+    # --- New bars: one fused pass ---
+    rows = slice(reuse, None) if order is None else order
+    columns = {str(col).lower(): col for col in df.columns}
+    open_, high, low, close, volume = (_column(df, name, columns, rows) for name in ("open", "high", "low", "close", "volume"))
+    new = n - reuse if order is None else n
+    bad_price = np.zeros(new, dtype=bool)
+    for prices in (open_, high, low, close):
+        if prices is not None:
+            bad_price |= prices <= 0
+    if high is not None and low is not None:
+        bar_range = high - low
+        inverted = bar_range < 0
+        zero_volume_move = (bar_range != 0) & (volume == 0) if volume is not None else np.zeros(new, dtype=bool)
+    else:
+        bar_range = np.full(new, np.nan)
+        inverted = zero_volume_move = np.zeros(new, dtype=bool)
+    if step:
+        # Bars missing between neighbours: ceil(spacing / step) - 1; off-grid bars (a forming snapshot bar) count none
+        gaps = (spacing - 1) // step
+        np.maximum(gaps, 0, out=gaps)
+        missing_before = gaps if reuse else np.concatenate((np.zeros(min(n, 1), dtype=np.int64), gaps))
+    else:
+        missing_before = np.zeros(new, dtype=np.int64)
+
+    if reuse:
+        carried = slice(start, start + reuse)
+        missing_before = np.concatenate((previous.missing_before[carried], missing_before))
+        missing_before[0] = 0  # Nothing is missing before the first bar of the window
+        bad_price = np.concatenate((previous.bad_price[carried], bad_price))
+        inverted = np.concatenate((previous.inverted[carried], inverted))
+        zero_volume_move = np.concatenate((previous.zero_volume_move[carried], zero_volume_move))
+        bar_range = np.concatenate((previous.bar_range[carried], bar_range))
+
+    return BarValidation(
+        timestamps=timestamps,
+        unit=unit,
+        step=step,
+        missing_before=missing_before,
+        bad_price=bad_price,
+        inverted=inverted,
+        zero_volume_move=zero_volume_move,
+        bar_range=bar_range,
+        checked_rows=new,
+    )
+
+
+def _log_gaps(validation: BarValidation, tolerance: float = 0.10) -> bool:
+    """Logs the gaps of a validation; True when the share of missing bars exceeds `tolerance`."""
+    if not validation.missing:
+        return False
+    if validation.missing_ratio > tolerance:
+        log.warning(f"Data gap detected. Missing {validation.missing} timestamps ({validation.missing_ratio:.2%}), which is above the {tolerance:.2%} tolerance. First missing: {validation.first_missing}")
+        return True
+    log.info(f"Data gap detected, but within tolerance. Missing {validation.missing} timestamps ({validation.missing_ratio:.2%}).")
+    return False
+
+
+def _log_zero_volume_moves(validation: BarValidation) -> None:
+    count = int(validation.zero_volume_move.sum())
+    if count:
+        log.warning(f"Anomaly detected: {count} bars with zero volume on price movement. Data not removed.")
+
+
 def has_data_gaps(df: pd.DataFrame, expected_interval: TimeFrame, tolerance: float = 0.10) -> bool:
     """
     Checks for missing timestamps in the data, indicating gaps.
     Allows for a certain tolerance (e.g., 10%) of missing data before failing.
+    The frame is not modified; see `validate_bars`.
     """
     if not isinstance(df.index, pd.DatetimeIndex) or len(df) < 2:
         return False  # Not a DatetimeIndex or not enough data to detect a gap.
 
-    # Convert Alpaca TimeFrame to pandas frequency string
-    if expected_interval.unit == TimeFrameUnit.Minute:
-        freq_str = f"{expected_interval.amount}min"
-    elif expected_interval.unit == TimeFrameUnit.Hour:
-        freq_str = f"{expected_interval.amount}h"
-    elif expected_interval.unit == TimeFrameUnit.Day:
-        freq_str = f"{expected_interval.amount}D"
-    else:
+    if _bar_step(expected_interval) is None:
         log.warning(f"Unsupported timeframe unit for gap detection: {expected_interval.unit}")
         return False
 
-    # Ensure index is timezone-aware (UTC) and sorted
-    if isinstance(df.index, pd.DatetimeIndex):
-        if df.index.tz is None:
-            df.index = df.index.tz_localize('UTC')
-        else:
-            df.index = df.index.tz_convert('UTC')
-    df = df.sort_index()
-    
-    # Use the generated frequency string
-    expected_timestamps = pd.date_range(start=df.index.min(), end=df.index.max(), freq=freq_str)
-    missing_timestamps = expected_timestamps.difference(df.index)
-    
-    if not missing_timestamps.empty:
-        # Calculate the percentage of missing data
-        missing_percentage = len(missing_timestamps) / len(expected_timestamps)
-        
-        if missing_percentage > tolerance:
-            log.warning(f"Data gap detected. Missing {len(missing_timestamps)} timestamps ({missing_percentage:.2%}), which is above the {tolerance:.2%} tolerance. First missing: {missing_timestamps[0]}")
-            return True
-        else:
-            log.info(f"Data gap detected, but within tolerance. Missing {len(missing_timestamps)} timestamps ({missing_percentage:.2%}).")
-        
-    return False
+    return _log_gaps(validate_bars(df, expected_interval), tolerance)
 
 def has_anomalous_data(df: pd.DataFrame, anomaly_threshold: float = 5.0) -> bool:
     """
@@ -279,31 +525,21 @@ def has_anomalous_data(df: pd.DataFrame, anomaly_threshold: float = 5.0) -> bool
         log.warning("Anomaly detected: DataFrame is empty.")
         return True
 
-    # Standardize column names to lowercase for robustness
-    df = df.copy()
-    df.columns = [col.lower() for col in df.columns]
+    validation = validate_bars(df, None)
 
     # Check for zero prices in key columns
-    if (df[['open', 'high', 'low', 'close']] <= 0).any().any():
+    if validation.bad_price.any():
         log.warning("Anomaly detected: Zero or negative price found in OHLC data.")
         return True
 
     # This check is relaxed to only log, not fail the health check.
     # Anomalies are now removed in the get_market_data pipeline.
 
-    # Check for sudden price spikes
-    if 'high' in df.columns and 'low' in df.columns:
-        df['range'] = df['high'] - df['low']
-        
-        # Avoid the most recent bar in the average calculation to detect its anomaly
-        if len(df) > 1:
-            average_range = df['range'].iloc[:-1].mean()
-            latest_range = df['range'].iloc[-1]
-
-            # Check for division by zero or near-zero
-            if average_range > 1e-9 and (latest_range / average_range) > anomaly_threshold:
-                log.warning(f"Anomaly detected: Sudden price spike. Latest range ({latest_range:.2f}) is more than {anomaly_threshold}x the average range ({average_range:.2f}).")
-    
+    # Check for sudden price spikes; the most recent bar is left out of the average to detect its anomaly
+    if validation.spike_ratio > anomaly_threshold:
+        latest_range = validation.bar_range[-1]
+        log.warning(f"Anomaly detected: Sudden price spike. Latest range ({latest_range:.2f}) is more than {anomaly_threshold}x the average range ({latest_range / validation.spike_ratio:.2f}).")
+
     return False # Relaxed check - don't invalidate data for this
 
 def remove_zero_volume_anomalies(df: pd.DataFrame) -> pd.DataFrame:
@@ -315,12 +551,5 @@ def remove_zero_volume_anomalies(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty or 'high' not in df.columns or 'low' not in df.columns or 'volume' not in df.columns:
         return df
 
-    # Find bars with price movement but no volume
-    anomalies = df[(df['high'] != df['low']) & (df['volume'] == 0)]
-
-    if not anomalies.empty:
-        log.warning(f"Anomaly detected: {len(anomalies)} bars with zero volume on price movement. Data not removed.")
-        # Return the original DataFrame
-        # return df.drop(anomalies.index)
-
+    _log_zero_volume_moves(validate_bars(df, None))
     return df
@@ -0,0 +1,192 @@
+"""
+Local columnar archive of historical bars for offline backtests and training.
+
+Bars are downloaded once through DataLoader.fetch_historical_range and stored as
+Parquet files partitioned by symbol, timeframe and calendar month:
+
+    <root>/<SYMBOL>/<timeframe>/<YYYY-MM>.parquet      e.g. data/bars/BTC_USD/15m/2024-01.parquet
+
+Reads only open the partitions overlapping the requested date range, memory-map
+them, and trim the boundary months, so repeated runs are reproducible and need
+neither network access nor API credentials.
+"""
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+log = logging.getLogger(__name__)
+
+DEFAULT_DATASET_ROOT = os.getenv("DATASET_ROOT", "data/bars")
+
+
+def _to_utc(value: Any) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def symbol_key(symbol: str) -> str:
+    """"BTC/USD" -> "BTC_USD": the directory name of a symbol, here and under models/."""
+    return symbol.replace("/", "_").replace("-", "_").upper()
+
+
+def months_in_range(start: Any, end: Any) -> List[pd.Period]:
+    """Calendar months overlapping the half-open interval [start, end)."""
+    start_ts, end_ts = _to_utc(start), _to_utc(end)
+    if end_ts <= start_ts:
+        return []
+    last = (end_ts - pd.Timedelta(1, "ns")).tz_localize(None).to_period("M")
+    return list(pd.period_range(start_ts.tz_localize(None).to_period("M"), last, freq="M"))
+
+
+class BarDatasetStore:
+    """
+    Month-partitioned Parquet store for OHLCV bars.
+    """
+    def __init__(self, root: str = DEFAULT_DATASET_ROOT):
+        self.root = Path(root)
+
+    def partition_path(self, symbol: str, timeframe: str, month: pd.Period) -> Path:
+        return self.root / symbol_key(symbol) / timeframe / f"{month.strftime('%Y-%m')}.parquet"
+
+    def available_months(self, symbol: str, timeframe: str) -> List[pd.Period]:
+        """Months already stored for a symbol/timeframe, in ascending order."""
+        directory = self.root / symbol_key(symbol) / timeframe
+        if not directory.exists():
+            return []
+        return sorted(pd.Period(p.stem, freq="M") for p in directory.glob("*.parquet"))
+
+    def is_complete(self, symbol: str, timeframe: str, month: pd.Period) -> bool:
+        """
+        A partition is complete if it was written after its month ended.
+        Partitions written mid-month are re-fetched by `download`.
+        """
+        path = self.partition_path(symbol, timeframe, month)
+        if not path.exists():
+            return False
+        month_end = (month + 1).start_time.tz_localize("UTC")
+        return pd.Timestamp(path.stat().st_mtime, unit="s", tz="UTC") >= month_end
+
+    def missing_months(self, symbol: str, timeframe: str, start: Any, end: Any) -> List[pd.Period]:
+        """Months in [start, end) that are absent or were stored before the month ended."""
+        return [m for m in months_in_range(start, end) if not self.is_complete(symbol, timeframe, m)]
+
+    def write(self, symbol: str, timeframe: str, bars: pd.DataFrame) -> int:
+        """
+        Writes bars into their month partitions, merging with rows already stored.
+        Returns the number of partitions written.
+        """
+        if bars is None or bars.empty:
+            return 0
+        df = bars.copy()
+        if isinstance(df.index, pd.MultiIndex):
+            df.index = df.index.get_level_values("timestamp")
+        df.index = pd.to_datetime(df.index, utc=True)
+        df.index.name = "timestamp"
+        df.columns = [str(c).lower() for c in df.columns]
+
+        written = 0
+        months = df.index.tz_localize(None).to_period("M")
+        for month, month_df in df.groupby(months):
+            path = self.partition_path(symbol, timeframe, month)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists():
+                existing = pq.read_table(path).to_pandas().set_index("timestamp")
+                month_df = pd.concat([existing, month_df])
+            month_df = month_df[~month_df.index.duplicated(keep="last")].sort_index()
+
+            table = pa.Table.from_pandas(month_df.reset_index(), preserve_index=False)
+            tmp_path = path.with_suffix(".parquet.tmp")
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+            written += 1
+        log.info("dataset_store.write", extra={"extra": {"symbol": symbol, "timeframe": timeframe, "partitions": written, "rows": len(df)}})
+        return written
+
+    def read(self, symbol: str, timeframe: str, start: Any, end: Any) -> pd.DataFrame:
+        """
+        Reads bars in [start, end) from the partitions overlapping that range.
+        Returns an empty DataFrame if nothing is stored.
+        """
+        start_ts, end_ts = _to_utc(start), _to_utc(end)
+        tables = []
+        for month in months_in_range(start_ts, end_ts):
+            path = self.partition_path(symbol, timeframe, month)
+            if not path.exists():
+                continue
+            table = pq.read_table(path, memory_map=True)
+            month_start = month.start_time.tz_localize("UTC")
+            month_end = (month + 1).start_time.tz_localize("UTC")
+            # Only the first and last month can extend past the requested range
+            if month_start < start_ts or month_end > end_ts:
+                ts = table.column("timestamp")
+                mask = pc.and_(
+                    pc.greater_equal(ts, pa.scalar(start_ts, type=ts.type)),
+                    pc.less(ts, pa.scalar(end_ts, type=ts.type)),
+                )
+                table = table.filter(mask)
+            tables.append(table)
+
+        if not tables:
+            return pd.DataFrame()
+        df = pa.concat_tables(tables, promote_options="default").to_pandas().set_index("timestamp")
+        df.index = pd.to_datetime(df.index, utc=True)
+        return df.sort_index()
+
+    def download(self, data_loader: Any, symbol: str, timeframe: str, start: Any, end: Any, refresh: bool = False) -> List[pd.Period]:
+        """
+        Fetches the months in [start, end) that are not yet stored (or all of them if `refresh`)
+        and writes them to the archive. Returns the months fetched.
+        """
+        months = months_in_range(start, end) if refresh else self.missing_months(symbol, timeframe, start, end)
+        fetched = []
+        for month in months:
+            month_start = month.start_time
+            month_end = (month + 1).start_time
+            bars = data_loader.fetch_historical_range(symbol, month_start.strftime("%Y-%m-%d"), month_end.strftime("%Y-%m-%d"), timeframe)
+            if bars is None or bars.empty:
+                log.warning("dataset_store.download.no_data", extra={"extra": {"symbol": symbol, "timeframe": timeframe, "month": str(month)}})
+                continue
+            if isinstance(bars.index, pd.MultiIndex):
+                bars.index = bars.index.get_level_values("timestamp")
+            idx = pd.to_datetime(bars.index, utc=True)
+            bars = bars[(idx >= month_start.tz_localize("UTC")) & (idx < month_end.tz_localize("UTC"))]
+            self.write(symbol, timeframe, bars)
+            fetched.append(month)
+        return fetched
+
+    def summary(self) -> Dict[str, Dict[str, List[str]]]:
+        """Stored months per symbol and timeframe."""
+        out: Dict[str, Dict[str, List[str]]] = {}
+        if not self.root.exists():
+            return out
+        for symbol_dir in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            for tf_dir in sorted(p for p in symbol_dir.iterdir() if p.is_dir()):
+                out.setdefault(symbol_dir.name, {})[tf_dir.name] = sorted(p.stem for p in tf_dir.glob("*.parquet"))
+        return out
+
+
+def load_bars(
+    symbol: str,
+    start: Any,
+    end: Any,
+    timeframe: str,
+    store: Optional[BarDatasetStore] = None,
+    data_loader: Optional[Any] = None,
+) -> pd.DataFrame:
+    """
+    Returns bars for [start, end) from the local archive. Missing months are downloaded
+    first when a `data_loader` is given; otherwise whatever is stored is returned.
+    """
+    store = store or BarDatasetStore()
+    missing = store.missing_months(symbol, timeframe, start, end)
+    if missing and data_loader is not None:
+        store.download(data_loader, symbol, timeframe, start, end)
+    elif missing:
+        log.warning("dataset_store.load_bars.incomplete", extra={"extra": {"symbol": symbol, "timeframe": timeframe, "missing_months": [str(m) for m in missing]}})
+    return store.read(symbol, timeframe, start, end)
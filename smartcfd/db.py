@@ -1,9 +1,30 @@
+import json
 import os
 import sqlite3
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Optional
 
+import functools
+
+from .metrics import DB_WRITE_QUEUE
+from .tracing import traced
+
+def db_write(operation: str):
+    """Times a database write as span `db.<operation>` and counts it in the write queue gauge while it runs."""
+    def decorator(func):
+        timed = traced(f"db.{operation}")(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            DB_WRITE_QUEUE.inc()
+            try:
+                return timed(*args, **kwargs)
+            finally:
+                DB_WRITE_QUEUE.dec()
+        return wrapper
+    return decorator
+
 def get_db_path(default: str = "app.db") -> str:
     return os.getenv("DB_PATH", default)
 
@@ -17,6 +38,11 @@ def connect(db_path: Optional[str] = None) -> sqlite3.Connection:
     conn.row_factory = sqlite3.Row
     return conn
 
+def _add_column(conn: sqlite3.Connection, table: str, column: str, declaration: str) -> None:
+    """Adds `column` to a table created before it existed."""
+    if column not in [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
 def init_schema(conn: sqlite3.Connection) -> None:
     # Runs table
     conn.execute(
@@ -59,10 +85,12 @@ def init_schema(conn: sqlite3.Connection) -> None:
             open_qty REAL,
             created_at TEXT NOT NULL,
             updated_at TEXT NOT NULL,
-            note TEXT
+            note TEXT,
+            book TEXT
         )
         """
     )
+    _add_column(conn, "trade_groups", "book", "TEXT")  # Trading book of the group (multi-book runner); NULL otherwise
     # Order events table for telemetry
     conn.execute(
         """
@@ -83,8 +111,25 @@ def init_schema(conn: sqlite3.Connection) -> None:
         )
         """
     )
+    # The dashboard tails events by id (the primary key) and counts them per type, group and symbol
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_order_events_event_type ON order_events (event_type)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_order_events_group_gid ON order_events (group_gid)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_order_events_symbol ON order_events (symbol)")
+    # Per-cycle stage timings (written when tracing is enabled)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cycle_traces (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            duration_ms REAL NOT NULL,
+            stages TEXT NOT NULL
+        )
+        """
+    )
     conn.commit()
 
+@db_write("record_run")
 def record_run(
     conn: sqlite3.Connection,
     status: str,
@@ -119,6 +164,7 @@ def get_latest_runs(conn: sqlite3.Connection, limit: int = 5) -> List[Dict]:
     rows = cur.fetchall()
     return [dict(r) for r in rows]
 
+@db_write("record_heartbeat")
 def record_heartbeat(
     conn: sqlite3.Connection,
     ok: bool,
@@ -154,6 +200,7 @@ def get_daily_pnl(conn: Optional[sqlite3.Connection] = None) -> float:
     """
     return 0.0
 
+@db_write("record_order_event")
 def record_order_event(
     conn: sqlite3.Connection,
     event_type: str,
@@ -196,6 +243,75 @@ def record_order_event(
         pass
     return int(cur.lastrowid)
 
+def get_last_order_event_id(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT MAX(id) FROM order_events").fetchone()
+    return int(row[0] or 0)
+
+def get_order_events_between(conn: sqlite3.Connection, after_id: int, up_to_id: int, limit: int = 1000) -> List[Dict]:
+    """The last `limit` order events with after_id < id <= up_to_id, oldest first."""
+    cur = conn.execute(
+        "SELECT * FROM order_events WHERE id > ? AND id <= ? ORDER BY id DESC LIMIT ?",
+        (int(after_id), int(up_to_id), int(limit)),
+    )
+    return [dict(r) for r in reversed(cur.fetchall())]
+
+def get_order_events_for_group(conn: sqlite3.Connection, group_gid: str) -> List[Dict]:
+    cur = conn.execute("SELECT * FROM order_events WHERE group_gid = ? ORDER BY id", (group_gid,))
+    return [dict(r) for r in cur.fetchall()]
+
+def get_order_event_stats(conn: sqlite3.Connection, after_id: int, up_to_id: int) -> Dict:
+    """
+    Counts of the order events with after_id < id <= up_to_id: in total, per event type,
+    and the groups and symbols that have no event up to after_id (so running totals
+    can be kept by adding the stats of each new range of ids).
+    """
+    bounds = (int(after_id), int(up_to_id))
+    # A new range is found through the primary key; the whole table is aggregated from
+    # the covering column index when it exists (databases created before it had none)
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'order_events'")}
+
+    def source(column: str) -> str:
+        index = f"idx_order_events_{column}"
+        return f"order_events INDEXED BY {index}" if bounds[0] <= 0 and index in indexes else "order_events"
+
+    by_type = {
+        r["event_type"]: r["n"]
+        for r in conn.execute(
+            f"SELECT event_type, COUNT(*) AS n FROM {source('event_type')} WHERE id > ? AND id <= ? GROUP BY event_type", bounds
+        )
+    }
+    new = {}
+    for column in ("group_gid", "symbol"):
+        if bounds[0] <= 0:
+            sql, params = f"SELECT COUNT(DISTINCT {column}) FROM {source(column)} WHERE id <= ?", bounds[1:]
+        else:
+            sql = f"""
+                SELECT COUNT(DISTINCT e.{column}) FROM order_events e
+                WHERE e.id > ? AND e.id <= ? AND e.{column} IS NOT NULL
+                  AND NOT EXISTS (SELECT 1 FROM order_events p WHERE p.{column} = e.{column} AND p.id <= ?)
+            """
+            params = bounds + (bounds[0],)
+        new[column] = conn.execute(sql, params).fetchone()[0]
+    return {"events": sum(by_type.values()), "by_type": by_type, "new_groups": new["group_gid"], "new_symbols": new["symbol"]}
+
+@db_write("record_cycle_trace")
+def record_cycle_trace(conn: sqlite3.Connection, kind: str, duration_ms: float, stages: Dict, ts: Optional[str] = None) -> int:
+    """Stores the stage timings of one runner cycle (see smartcfd.tracing.CycleTrace.summary)."""
+    tstamp = ts or datetime.now(timezone.utc).isoformat()
+    cur = conn.execute(
+        "INSERT INTO cycle_traces (ts, kind, duration_ms, stages) VALUES (?, ?, ?, ?)",
+        (tstamp, kind, duration_ms, json.dumps(stages)),
+    )
+    conn.commit()
+    return int(cur.lastrowid)
+
+def get_recent_cycle_traces(conn: sqlite3.Connection, limit: int = 10) -> List[Dict]:
+    cur = conn.execute(
+        "SELECT id, ts, kind, duration_ms, stages FROM cycle_traces ORDER BY id DESC LIMIT ?",
+        (int(limit),),
+    )
+    return [dict(r, stages=json.loads(r["stages"])) for r in cur.fetchall()]
+
 def get_heartbeat_stats(conn: sqlite3.Connection, hours: int = 24) -> Dict:
     """
     Calculates heartbeat statistics over a given period.
@@ -0,0 +1,79 @@
+"""
+Order events for the dashboard, read incrementally from the `order_events` table.
+
+`OrderEventFeed` remembers the last event id it has seen. Each `refresh` reads
+only the events written since (a range of the primary key), adds their counts
+(aggregated by SQLite) to running totals and appends the newest of them to an
+in-memory frame of the latest `window` events:
+
+    feed = OrderEventFeed(connect_readonly("logs/trades.db"))
+    feed.refresh()
+    feed.total, feed.by_type, feed.recent(200)
+
+A refresh thus costs the same whether the table holds a thousand events or
+millions; only the first one aggregates the whole table, using its indexes.
+"""
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, List
+
+import pandas as pd
+
+from .db import get_last_order_event_id, get_order_event_stats, get_order_events_between, get_order_events_for_group
+
+
+def connect_readonly(db_path: str) -> sqlite3.Connection:
+    """A read-only connection usable from any thread (Streamlit runs each session in its own)."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _frame(rows: List[Dict]) -> pd.DataFrame:
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df["ts"] = pd.to_datetime(df["ts"], utc=True, format="ISO8601")
+    return df
+
+
+class OrderEventFeed:
+    def __init__(self, conn: sqlite3.Connection, window: int = 5000):
+        self.conn = conn
+        self.window = window
+        self.last_id = 0
+        self.total = 0
+        self.groups = 0
+        self.symbols = 0
+        self.by_type: Counter = Counter()
+        self.frame = pd.DataFrame()  # The latest `window` events, oldest first
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """Reads the events written since the last refresh; returns how many there were."""
+        with self._lock:
+            last_id = get_last_order_event_id(self.conn)
+            if last_id <= self.last_id:
+                return 0
+            stats = get_order_event_stats(self.conn, self.last_id, last_id)
+            new = _frame(get_order_events_between(self.conn, self.last_id, last_id, limit=self.window))
+            frame = pd.concat([self.frame, new], ignore_index=True) if not self.frame.empty else new
+            self.frame = frame.iloc[-self.window:].reset_index(drop=True)
+            self.by_type.update(stats["by_type"])
+            self.total += stats["events"]
+            self.groups += stats["new_groups"]
+            self.symbols += stats["new_symbols"]
+            self.last_id = last_id
+            return stats["events"]
+
+    def counts_by_type(self) -> pd.DataFrame:
+        return pd.DataFrame(self.by_type.most_common(), columns=["event_type", "count"])
+
+    def recent(self, n: int = 200) -> pd.DataFrame:
+        """The latest `n` events, newest first."""
+        return self.frame.iloc[::-1].head(n)
+
+    def group_events(self, group_gid: str) -> pd.DataFrame:
+        """Every event of one trade group, oldest first (by the group_gid index, not from the frame)."""
+        with self._lock:
+            return _frame(get_order_events_for_group(self.conn, group_gid))
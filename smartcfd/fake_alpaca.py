@@ -0,0 +1,554 @@
+"""
+A local stand-in for the Alpaca trading and crypto market-data APIs.
+
+    server = FakeAlpacaServer(FakeAlpacaConfig(latency_ms=40, error_rate=0.01)).start()
+    broker = AlpacaBroker("key", "secret", base_url=server.url)   # with APCA_API_DATA_URL=server.url
+    ...
+    server.stop()
+
+It serves the endpoints the bot uses, in the shapes the alpaca_trade_api SDK
+expects, so `AlpacaBroker`, `DataLoader` and the `Trader` run unmodified:
+
+    GET    /v2/account, /v2/positions, /v2/orders, /v2/orders:by_client_order_id, /v2/clock
+    POST   /v2/orders
+    PATCH  /v2/orders/<id>
+    DELETE /v2/orders/<id>, /v2/positions/<symbol>
+    GET    /v1beta3/crypto/us/bars, /v1beta3/crypto/us/snapshots
+    GET    /fake/stats   (request counts; not part of the Alpaca API)
+
+Every API key gets its own account. Prices follow a seeded random walk per
+symbol on a one-minute grid that advances with the wall clock; bars of any
+minute, hour or day timeframe are aggregated from it. Market orders fill at the
+current price, and limit and stop orders fill once the price crosses them (or
+never, with `fill_mode="never"`). Latency, error injection and the per-key rate
+limit (with Alpaca's X-RateLimit-* headers and 429 responses) are set by
+`FakeAlpacaConfig`.
+"""
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+FILL_MODES = ("cross", "never")
+_TIMEFRAME_UNITS = {"min": 1, "t": 1, "hour": 60, "h": 60, "day": 1440, "d": 1440}
+_PAGE_SIZE = 1000
+_MAX_PAGE_SIZE = 10000
+
+
+@dataclass
+class FakeAlpacaConfig:
+    latency_ms: float = 0.0  # Added to every response
+    jitter_ms: float = 0.0  # Uniform extra latency in [0, jitter_ms]
+    error_rate: float = 0.0  # Share of requests answered with a random code from error_codes
+    error_codes: Tuple[int, ...] = (500, 503)
+    rate_limit: int = 200  # Requests per key per minute before 429s; 0 disables the limit
+    fill_mode: str = "cross"  # cross: fill when the price crosses the order; never: leave every order open
+    starting_cash: float = 100_000.0
+    history_days: int = 30  # Price history available before the server started
+    volatility: float = 0.001  # Per-minute log-return standard deviation
+    seed: int = 0
+
+
+class APIFailure(Exception):
+    """An error answered in Alpaca's {"code", "message"} format."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = status * 100000 + 10000
+
+
+def _iso(epoch_seconds: float) -> str:
+    return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_time(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def parse_timeframe(value: str) -> int:
+    """Timeframe in minutes from the SDK's format, e.g. '15Min', '1Hour', '1Day'."""
+    match = re.fullmatch(r"(\d+)([A-Za-z]+)", value or "")
+    unit = match and _TIMEFRAME_UNITS.get(match.group(2).lower())
+    if not unit:
+        raise APIFailure(422, f"invalid timeframe: {value}")
+    return int(match.group(1)) * unit
+
+
+class PricePath:
+    """
+    One-minute OHLCV bars of a seeded random walk, from `origin` (epoch minute)
+    onwards, extended as the clock advances.
+    """
+
+    def __init__(self, symbol: str, origin: int, seed: int, volatility: float, price: float = 100.0):
+        self.origin = origin
+        self.volatility = volatility
+        self._rng = np.random.default_rng([seed, zlib.crc32(symbol.encode())])
+        self._last = price
+        self.open = np.empty(0)
+        self.high = np.empty(0)
+        self.low = np.empty(0)
+        self.close = np.empty(0)
+        self.volume = np.empty(0)
+        self._lock = threading.Lock()
+
+    def extend_to(self, minute: int) -> None:
+        """Makes the bar opening at `minute` available."""
+        with self._lock:
+            n = minute - self.origin + 1 - len(self.close)
+            if n <= 0:
+                return
+            close = self._last * np.exp(np.cumsum(self._rng.normal(0.0, self.volatility, n)))
+            open_ = np.concatenate(([self._last], close[:-1]))
+            wick = np.abs(self._rng.normal(0.0, self.volatility / 2, (2, n)))
+            self.open = np.concatenate((self.open, open_))
+            self.high = np.concatenate((self.high, np.maximum(open_, close) * (1 + wick[0])))
+            self.low = np.concatenate((self.low, np.minimum(open_, close) * (1 - wick[1])))
+            self.close = np.concatenate((self.close, close))
+            self.volume = np.concatenate((self.volume, self._rng.lognormal(1.0, 1.0, n)))
+            self._last = float(close[-1])
+
+    def price(self, minute: int) -> float:
+        self.extend_to(minute)
+        return float(self.close[minute - self.origin])
+
+    def bars(self, start: int, end: int, step: int) -> List[Dict[str, Any]]:
+        """Bars of `step` minutes (aligned to the epoch) opening in [start, end]; the last may be in progress."""
+        self.extend_to(end)
+        first = max(start, self.origin)
+        first += (-first) % step  # first aligned bucket
+        bars = []
+        for bucket in range(first, end + 1, step):
+            lo, hi = bucket - self.origin, min(bucket + step, end + 1) - self.origin
+            volume = float(self.volume[lo:hi].sum())
+            bars.append({
+                "t": _iso(bucket * 60),
+                "o": float(self.open[lo]),
+                "h": float(self.high[lo:hi].max()),
+                "l": float(self.low[lo:hi].min()),
+                "c": float(self.close[hi - 1]),
+                "v": volume,
+                "n": int(hi - lo),
+                "vw": float((self.close[lo:hi] * self.volume[lo:hi]).sum() / volume) if volume else float(self.close[hi - 1]),
+            })
+        return bars
+
+
+class FakeAlpaca:
+    """The state and request handling of the fake API, independent of HTTP."""
+
+    def __init__(self, config: Optional[FakeAlpacaConfig] = None, clock=time.time):
+        self.config = config or FakeAlpacaConfig()
+        if self.config.fill_mode not in FILL_MODES:
+            raise ValueError(f"Unknown fill mode: {self.config.fill_mode}. Expected one of {FILL_MODES}.")
+        self.clock = clock
+        self.origin = int(clock() // 60) - self.config.history_days * 1440
+        self._paths: Dict[str, PricePath] = {}
+        self._accounts: Dict[str, Dict[str, Any]] = {}
+        self._windows: Dict[str, List[float]] = {}  # key -> [window start, requests in window]
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.RLock()
+        self.stats: Dict[str, int] = {}
+
+    # --- Plumbing ---
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    def rate_limit(self, key: str) -> Tuple[bool, Dict[str, str]]:
+        """Counts a request against `key`'s window. Returns (allowed, X-RateLimit-* headers)."""
+        limit = self.config.rate_limit
+        if limit <= 0:
+            return True, {}
+        now = self.clock()
+        with self._lock:
+            window = self._windows.setdefault(key, [now, 0])
+            if now - window[0] >= 60:
+                window[0], window[1] = now, 0
+            window[1] += 1
+            used, reset = window[1], window[0] + 60
+        headers = {"X-RateLimit-Limit": str(limit), "X-RateLimit-Remaining": str(max(0, limit - used)), "X-RateLimit-Reset": str(int(reset))}
+        return used <= limit, headers
+
+    def injected_error(self) -> Optional[int]:
+        with self._lock:
+            if self.config.error_rate > 0 and self._random.random() < self.config.error_rate:
+                return self._random.choice(self.config.error_codes)
+        return None
+
+    def latency(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(0, self.config.jitter_ms) if self.config.jitter_ms else 0.0
+        return (self.config.latency_ms + jitter) / 1000
+
+    def path(self, symbol: str) -> PricePath:
+        with self._lock:
+            path = self._paths.get(symbol)
+            if path is None:
+                price = 100.0 * (1 + zlib.crc32(symbol.encode()) % 1000)
+                path = self._paths[symbol] = PricePath(symbol, self.origin, self.config.seed, self.config.volatility, price)
+        return path
+
+    def minute(self) -> int:
+        return int(self.clock() // 60)
+
+    def account(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            account = self._accounts.get(key)
+            if account is None:
+                account = self._accounts[key] = {
+                    "id": str(uuid.uuid5(uuid.NAMESPACE_OID, key)),
+                    "cash": self.config.starting_cash,
+                    "last_equity": self.config.starting_cash,
+                    "positions": {},  # symbol -> [qty, cost basis]
+                    "orders": {},  # id -> order
+                    "by_client_id": {},
+                }
+        return account
+
+    # --- Orders and positions ---
+
+    def _fill(self, account: Dict[str, Any], order: Dict[str, Any], price: float) -> None:
+        qty = float(order["qty"])
+        signed = qty if order["side"] == "buy" else -qty
+        position = account["positions"].setdefault(order["symbol"], [0.0, 0.0])
+        if position[0] == 0 or (position[0] > 0) == (signed > 0):
+            position[1] += signed * price
+        else:
+            # Reducing (or flipping) a position releases cost basis at the average price
+            closed = min(abs(signed), abs(position[0]))
+            average = position[1] / position[0]
+            position[1] -= average * closed * (1 if position[0] > 0 else -1)
+            if abs(signed) > closed:
+                position[1] = (signed + position[0]) * price
+        position[0] += signed
+        if abs(position[0]) < 1e-12:
+            del account["positions"][order["symbol"]]
+        account["cash"] -= signed * price
+        now = _iso(self.clock())
+        order.update(status="filled", filled_qty=str(qty), filled_avg_price=str(price), filled_at=now, updated_at=now)
+
+    def _sweep(self, account: Dict[str, Any]) -> None:
+        """Fills the open orders whose condition the current price meets."""
+        if self.config.fill_mode == "never":
+            return
+        minute = self.minute()
+        for order in account["orders"].values():
+            if order["status"] not in ("new", "accepted", "partially_filled"):
+                continue
+            price = self.path(order["symbol"]).price(minute)
+            kind, buy = order["type"], order["side"] == "buy"
+            limit = float(order["limit_price"]) if order.get("limit_price") else None
+            stop = float(order["stop_price"]) if order.get("stop_price") else None
+            if kind == "market":
+                self._fill(account, order, price)
+            elif kind == "limit" and limit is not None and (price <= limit if buy else price >= limit):
+                self._fill(account, order, limit)
+            elif kind in ("stop", "stop_limit") and stop is not None and (price >= stop if buy else price <= stop):
+                self._fill(account, order, price)
+
+    def _order(self, account: Dict[str, Any], order_id: str) -> Dict[str, Any]:
+        order = account["orders"].get(order_id)
+        if order is None:
+            raise APIFailure(404, "order not found")
+        return order
+
+    def submit_order(self, key: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        for field in ("symbol", "side", "type", "time_in_force"):
+            if not body.get(field):
+                raise APIFailure(422, f"{field} is required")
+        if body.get("qty") is None or float(body["qty"]) <= 0:
+            raise APIFailure(422, "qty must be > 0")
+        with self._lock:
+            account = self.account(key)
+            client_order_id = body.get("client_order_id") or str(uuid.uuid4())
+            if client_order_id in account["by_client_id"]:
+                raise APIFailure(422, "client_order_id must be unique")
+            now = _iso(self.clock())
+            order = {
+                "id": str(uuid.uuid4()), "client_order_id": client_order_id, "created_at": now, "updated_at": now,
+                "submitted_at": now, "filled_at": None, "expired_at": None, "canceled_at": None, "failed_at": None,
+                "replaced_at": None, "replaced_by": None, "replaces": None, "asset_id": str(uuid.uuid5(uuid.NAMESPACE_OID, body["symbol"])),
+                "symbol": body["symbol"], "asset_class": "crypto", "notional": None, "qty": str(body["qty"]), "filled_qty": "0",
+                "filled_avg_price": None, "order_class": body.get("order_class") or "simple", "order_type": body["type"],
+                "type": body["type"], "side": body["side"], "time_in_force": body["time_in_force"],
+                "limit_price": str(body["limit_price"]) if body.get("limit_price") is not None else None,
+                "stop_price": str(body["stop_price"]) if body.get("stop_price") is not None else None,
+                "status": "new", "extended_hours": False, "legs": None, "trail_price": None, "trail_percent": None, "hwm": None,
+            }
+            account["orders"][order["id"]] = order
+            account["by_client_id"][client_order_id] = order
+            self._sweep(account)
+            return dict(order)
+
+    def get_order_by_client_id(self, key: str, client_order_id: str) -> Dict[str, Any]:
+        with self._lock:
+            account = self.account(key)
+            self._sweep(account)
+            order = account["by_client_id"].get(client_order_id)
+            if order is None:
+                raise APIFailure(404, "order not found")
+            return dict(order)
+
+    def list_orders(self, key: str, status: str = "open") -> List[Dict[str, Any]]:
+        with self._lock:
+            account = self.account(key)
+            self._sweep(account)
+            open_statuses = ("new", "accepted", "partially_filled")
+            orders = [o for o in account["orders"].values() if status == "all" or (o["status"] in open_statuses) == (status == "open")]
+            return [dict(o) for o in orders]
+
+    def cancel_order(self, key: str, order_id: str) -> None:
+        with self._lock:
+            order = self._order(self.account(key), order_id)
+            if order["status"] in ("filled", "canceled"):
+                raise APIFailure(422, f"order is already {order['status']}")
+            now = _iso(self.clock())
+            order.update(status="canceled", canceled_at=now, updated_at=now)
+
+    def replace_order(self, key: str, order_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            account = self.account(key)
+            old = self._order(account, order_id)
+            if old["status"] not in ("new", "accepted", "partially_filled"):
+                raise APIFailure(422, f"order is {old['status']}")
+            now = _iso(self.clock())
+            new = dict(old, id=str(uuid.uuid4()), client_order_id=body.get("client_order_id") or str(uuid.uuid4()),
+                       replaces=old["id"], created_at=now, updated_at=now, submitted_at=now)
+            for field in ("qty", "limit_price", "stop_price", "time_in_force"):
+                if body.get(field) is not None:
+                    new[field] = str(body[field])
+            old.update(status="replaced", replaced_by=new["id"], replaced_at=now, updated_at=now)
+            account["orders"][new["id"]] = new
+            account["by_client_id"][new["client_order_id"]] = new
+            self._sweep(account)
+            return dict(new)
+
+    def positions(self, key: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            account = self.account(key)
+            self._sweep(account)
+            minute = self.minute()
+            result = []
+            for symbol, (qty, cost) in account["positions"].items():
+                price = self.path(symbol).price(minute)
+                market_value = qty * price
+                result.append({
+                    "asset_id": str(uuid.uuid5(uuid.NAMESPACE_OID, symbol)), "symbol": symbol, "exchange": "CRYPTO",
+                    "asset_class": "crypto", "qty": str(abs(qty)), "side": "long" if qty > 0 else "short",
+                    "avg_entry_price": str(cost / qty), "market_value": str(market_value), "cost_basis": str(cost),
+                    "unrealized_pl": str(market_value - cost), "unrealized_plpc": str((market_value - cost) / abs(cost)) if cost else "0",
+                    "current_price": str(price), "lastday_price": str(price), "change_today": "0",
+                })
+            return result
+
+    def close_position(self, key: str, symbol: str) -> Dict[str, Any]:
+        with self._lock:
+            position = self.account(key)["positions"].get(symbol)
+            if not position:
+                raise APIFailure(404, "position does not exist")
+            side = "sell" if position[0] > 0 else "buy"
+            return self.submit_order(key, {"symbol": symbol, "qty": abs(position[0]), "side": side, "type": "market", "time_in_force": "gtc"})
+
+    def get_account(self, key: str) -> Dict[str, Any]:
+        positions = self.positions(key)
+        with self._lock:
+            account = self.account(key)
+            long_value = sum(float(p["market_value"]) for p in positions if p["side"] == "long")
+            short_value = sum(float(p["market_value"]) for p in positions if p["side"] == "short")
+            equity = account["cash"] + long_value + short_value
+            return {
+                "id": account["id"], "account_number": f"FAKE{account['id'][:8].upper()}", "status": "ACTIVE",
+                "crypto_status": "ACTIVE", "currency": "USD", "cash": str(account["cash"]), "equity": str(equity),
+                "last_equity": str(account["last_equity"]), "portfolio_value": str(equity),
+                "buying_power": str(max(0.0, account["cash"])), "regt_buying_power": str(max(0.0, account["cash"])),
+                "daytrading_buying_power": "0", "non_marginable_buying_power": str(max(0.0, account["cash"])),
+                "long_market_value": str(long_value), "short_market_value": str(short_value), "multiplier": "1",
+                "initial_margin": "0", "maintenance_margin": "0", "last_maintenance_margin": "0", "sma": "0",
+                "daytrade_count": 0, "pattern_day_trader": False, "trading_blocked": False, "transfers_blocked": False,
+                "account_blocked": False, "shorting_enabled": False, "created_at": _iso(self.origin * 60),
+            }
+
+    def clock_status(self) -> Dict[str, Any]:
+        now = self.clock()
+        return {"timestamp": _iso(now), "is_open": True, "next_open": _iso(now), "next_close": _iso(now + 86400)}
+
+    # --- Market data ---
+
+    def bars(self, params: Dict[str, str]) -> Dict[str, Any]:
+        symbols = [s for s in params.get("symbols", "").split(",") if s]
+        if not symbols:
+            raise APIFailure(422, "symbols is required")
+        step = parse_timeframe(params.get("timeframe", ""))
+        now = self.minute()
+        start = int(_parse_time(params["start"]) // 60) if params.get("start") else now - 1000 * step
+        end = min(now, int(_parse_time(params["end"]) // 60)) if params.get("end") else now
+        page_size = min(int(params.get("limit") or _PAGE_SIZE), _MAX_PAGE_SIZE)
+        offset = int(params.get("page_token") or 0)
+
+        # Pages run over the bars of all symbols in symbol order, as Alpaca's do
+        items = [(symbol, bar) for symbol in sorted(symbols) for bar in self.path(symbol).bars(start, end, step)]
+        page = items[offset:offset + page_size]
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for symbol, bar in page:
+            grouped.setdefault(symbol, []).append(bar)
+        more = offset + page_size < len(items)
+        return {"bars": grouped, "next_page_token": str(offset + page_size) if more else None}
+
+    def snapshots(self, params: Dict[str, str]) -> Dict[str, Any]:
+        symbols = [s for s in params.get("symbols", "").split(",") if s]
+        now = self.minute()
+        snapshots = {}
+        for symbol in symbols:
+            path = self.path(symbol)
+            minute_bar = path.bars(now, now, 1)[-1]
+            daily = path.bars(now - now % 1440, now, 1440)[-1]
+            price = minute_bar["c"]
+            snapshots[symbol] = {
+                "latestTrade": {"t": minute_bar["t"], "p": price, "s": 0.01, "tks": "B", "i": 0},
+                "latestQuote": {"t": minute_bar["t"], "bp": price * 0.9999, "bs": 1.0, "ap": price * 1.0001, "as": 1.0},
+                "minuteBar": minute_bar,
+                "dailyBar": daily,
+                "prevDailyBar": path.bars(now - now % 1440 - 1440, now - now % 1440 - 1, 1440)[-1] if now - self.origin > 1440 else daily,
+            }
+        return {"snapshots": snapshots}
+
+    # --- Routing ---
+
+    def handle(self, method: str, path: str, params: Dict[str, str], body: Optional[Dict[str, Any]], key: str) -> Any:
+        """Dispatches one API call. Returns the JSON body; raises APIFailure for error responses."""
+        if method == "GET" and path == "/fake/stats":
+            with self._lock:
+                return dict(self.stats)
+        routes = [
+            ("GET", r"/v2/account", lambda: self.get_account(key)),
+            ("GET", r"/v2/positions", lambda: self.positions(key)),
+            ("GET", r"/v2/orders", lambda: self.list_orders(key, params.get("status", "open"))),
+            ("GET", r"/v2/orders:by_client_order_id", lambda: self.get_order_by_client_id(key, params.get("client_order_id", ""))),
+            ("GET", r"/v2/clock", self.clock_status),
+            ("POST", r"/v2/orders", lambda: self.submit_order(key, body or {})),
+            ("PATCH", r"/v2/orders/(?P<id>[^/]+)", lambda id: self.replace_order(key, id, body or {})),
+            ("DELETE", r"/v2/orders/(?P<id>[^/]+)", lambda id: self.cancel_order(key, id)),
+            ("DELETE", r"/v2/positions/(?P<symbol>.+)", lambda symbol: self.close_position(key, symbol)),
+            ("GET", r"/v1beta3/crypto/us/bars", lambda: self.bars(params)),
+            ("GET", r"/v1beta3/crypto/us/snapshots", lambda: self.snapshots(params)),
+        ]
+        for route_method, pattern, func in routes:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                self.count(f"{method} {pattern}")
+                return func(**match.groupdict())
+        raise APIFailure(404, f"endpoint not found: {method} {path}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    api: FakeAlpaca  # set on the subclass built by FakeAlpacaServer
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY each keep-alive response stalls ~40ms
+    disable_nagle_algorithm = True
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        key = self.headers.get("APCA-API-KEY-ID")
+
+        time.sleep(self.api.latency())
+        headers: Dict[str, str] = {}
+        try:
+            if url.path.startswith("/fake/"):
+                status, payload = 200, self.api.handle(method, url.path, params, None, "")
+            elif not key or not self.headers.get("APCA-API-SECRET-KEY"):
+                raise APIFailure(401, "request is not authorized")
+            else:
+                allowed, headers = self.api.rate_limit(key)
+                if not allowed:
+                    self.api.count("rate_limited")
+                    raise APIFailure(429, "rate limit exceeded")
+                injected = self.api.injected_error()
+                if injected:
+                    self.api.count("injected_errors")
+                    raise APIFailure(injected, "injected error")
+                body = json.loads(raw) if raw else None
+                status, payload = 200, self.api.handle(method, url.path, params, body, key)
+                if payload is None:
+                    status = 204
+        except APIFailure as e:
+            status, payload = e.status, {"code": e.code, "message": str(e)}
+        except Exception as e:
+            log.error("fake_alpaca.handler_fail", exc_info=True)
+            status, payload = 500, {"code": 50010000, "message": repr(e)}
+
+        data = b"" if status == 204 else json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.debug("fake_alpaca.request " + format % args)
+
+
+class FakeAlpacaServer:
+    """Runs a FakeAlpaca behind a threaded HTTP server on localhost."""
+
+    def __init__(self, config: Optional[FakeAlpacaConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.api = FakeAlpaca(config)
+        handler = type("FakeAlpacaHandler", (_Handler,), {"api": self.api})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAlpacaServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-alpaca", daemon=True)
+        self._thread.start()
+        log.info("fake_alpaca.start", extra={"extra": {"url": self.url}})
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeAlpacaServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
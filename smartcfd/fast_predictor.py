@@ -0,0 +1,103 @@
+"""
+Low-latency scoring of a single feature row with a trained XGBClassifier.
+
+The sklearn wrapper builds a DMatrix, validates feature names and converts the
+DataFrame on every `predict`/`predict_proba` call. `FastPredictor` instead keeps a
+single-threaded copy of the booster and a preallocated C-contiguous float32 row,
+and scores it through `Booster.inplace_predict`. The DMatrix path also casts the
+features to float32, so the probabilities are identical to the reference path;
+this is checked on a probe batch when the predictor is built.
+"""
+import logging
+import threading
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+
+class FastPredictor:
+    """Scores one row at a time with the booster of an XGBClassifier."""
+
+    def __init__(self, model: Any, feature_names: Sequence[str]):
+        self.feature_names = list(feature_names)
+        self.classes = np.asarray(getattr(model, "classes_", np.arange(3)))
+        self.missing = model.get_params().get("missing", np.nan)
+        self.missing = np.nan if self.missing is None else self.missing
+        try:
+            # Same rule as the wrapper: stop at the best iteration when early stopping was used
+            self.iteration_range = (0, model.best_iteration + 1)
+        except AttributeError:
+            self.iteration_range = (0, 0)
+        # A private copy: a single row gains nothing from threads, and the shared model stays untouched
+        self.booster = model.get_booster().copy()
+        self.booster.set_param({"nthread": 1})
+        self._row = np.zeros((1, len(self.feature_names)), dtype=np.float32)
+        self._lock = threading.Lock()  # guards the shared row buffer
+        # (DataFrame columns, positions of feature_names in them) of the last frame seen
+        self._layout: Optional[Tuple[Tuple[str, ...], np.ndarray]] = None
+
+    @staticmethod
+    def supports(model: Any) -> bool:
+        try:
+            from xgboost import XGBClassifier
+        except ImportError:
+            return False
+        return isinstance(model, XGBClassifier)
+
+    def predict_proba_row(self, values: Sequence[float]) -> np.ndarray:
+        """Class probabilities for one row given in `feature_names` order."""
+        with self._lock:
+            self._row[0, :] = values
+            proba = self.booster.inplace_predict(
+                self._row,
+                iteration_range=self.iteration_range,
+                missing=self.missing,
+                validate_features=False,
+            )
+            return proba[0].copy()
+
+    def latest_values(self, features: pd.DataFrame) -> np.ndarray:
+        """The last row of `features`, reordered to `feature_names`. Raises KeyError if any are missing."""
+        columns = tuple(features.columns)
+        layout = self._layout
+        if layout is None or layout[0] != columns:
+            indexer = features.columns.get_indexer(self.feature_names)
+            if (indexer < 0).any():
+                missing = [n for n, i in zip(self.feature_names, indexer) if i < 0]
+                raise KeyError(f"Missing features required by model: {missing}")
+            layout = self._layout = (columns, indexer)
+        return features.iloc[-1].to_numpy()[layout[1]]
+
+    def predict_latest(self, features: pd.DataFrame) -> Tuple[Any, float, np.ndarray]:
+        """(label, confidence, feature values) for the last row of `features`."""
+        values = self.latest_values(features)
+        proba = self.predict_proba_row(values)
+        best = int(np.argmax(proba))
+        return self.classes[best], float(proba[best]), values
+
+    def matches_reference(self, model: Any, X: pd.DataFrame) -> bool:
+        """True if every row of `X` scores exactly as `model.predict_proba` does."""
+        expected = model.predict_proba(X[self.feature_names])
+        values = X[self.feature_names].to_numpy()
+        return all(np.array_equal(self.predict_proba_row(values[i]), expected[i]) for i in range(len(X)))
+
+
+def build_fast_predictor(model: Any, feature_names: List[str], n_probe: int = 8, seed: int = 0) -> Optional[FastPredictor]:
+    """
+    Returns a FastPredictor for `model`, or None if the model is not an XGBClassifier
+    or the fast path does not reproduce `predict_proba` on a random probe batch.
+    """
+    if not FastPredictor.supports(model):
+        return None
+    try:
+        predictor = FastPredictor(model, feature_names)
+        probe = pd.DataFrame(np.random.default_rng(seed).normal(size=(n_probe, len(feature_names))), columns=feature_names)
+        if predictor.matches_reference(model, probe):
+            return predictor
+        log.warning("fast_predictor.reference_mismatch", extra={"extra": {"features": len(feature_names)}})
+    except Exception as e:
+        log.warning("fast_predictor.build_fail", extra={"extra": {"error": repr(e)}})
+    return None
@@ -12,10 +12,10 @@ def create_features(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return pd.DataFrame()
 
+    # A shallow copy: the bars (possibly a read-only view) are neither copied nor modified
+    df = df.copy(deep=False)
     if not isinstance(df.index, pd.DatetimeIndex):
         df.index = pd.to_datetime(df.index, utc=True)
-
-    df = df.copy()
     df.columns = [x.lower() for x in df.columns]
     features = pd.DataFrame(index=df.index)
 
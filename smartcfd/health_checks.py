@@ -2,6 +2,7 @@ import logging
 import pandas as pd
 from smartcfd.data_loader import DataLoader, is_data_stale, has_data_gaps, parse_interval
 from smartcfd.config import AppConfig, AlpacaConfig
+from smartcfd.alpaca_helpers import build_api_base
 
 log = logging.getLogger(__name__)
 
@@ -15,7 +16,7 @@ def check_data_feed_health(app_config: AppConfig, alpaca_config: AlpacaConfig) -
     primary_symbol = app_config.watch_list.split(',')[0]
     interval = app_config.trade_interval
     
-    api_base = "https://paper-api.alpaca.markets" if app_config.alpaca_env == "paper" else "https://api.alpaca.markets"
+    api_base = build_api_base(app_config.alpaca_env)
     loader = DataLoader(
         api_key=alpaca_config.key_id,
         secret_key=alpaca_config.secret_key,
@@ -9,8 +9,9 @@ from datetime import datetime, timezone
 from functools import partial
 
 from smartcfd.db import connect, get_recent_heartbeats, get_heartbeat_stats
-from smartcfd.health_checks import check_data_feed_health
 from smartcfd.config import load_config_from_file
+from smartcfd.tracing import tracer
+from smartcfd.metrics import CONTENT_TYPE, REGISTRY
 
 log = logging.getLogger("health")
 
@@ -26,6 +27,12 @@ _health_status_cache = {
 _start_time = time.time()
 
 
+def _check_data_feed(app_cfg, alpaca_cfg) -> dict:
+    # Imported on first use: the data feed check needs pandas and the Alpaca SDK, the rest of the server doesn't
+    from smartcfd.health_checks import check_data_feed_health
+    return check_data_feed_health(app_cfg, alpaca_cfg)
+
+
 def compute_health(db_path: Optional[str] = None, max_age_seconds: int = 120, startup_grace_period: int = 60) -> Tuple[bool, str, Dict[str, Any]]:
     """
     Checks the latest heartbeat from the database and data feed health.
@@ -65,7 +72,7 @@ def compute_health(db_path: Optional[str] = None, max_age_seconds: int = 120, st
     # 2. Data Feed Health
     try:
         app_cfg, alpaca_cfg, _, _ = load_config_from_file() # Load config to get watchlist
-        data_feed_status = check_data_feed_health(app_cfg, alpaca_cfg)
+        data_feed_status = _check_data_feed(app_cfg, alpaca_cfg)
         component_statuses["data_feed"] = data_feed_status
     except Exception:
         log.error("health.compute.data_feed_fail", exc_info=True)
@@ -154,13 +161,32 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
             self.wfile.write(json.dumps(stats, indent=4).encode('utf-8'))
 
         elif self.path == '/health/data':
-            data_health = check_data_feed_health(self.app_config, self.alpaca_config)
+            data_health = _check_data_feed(self.app_config, self.alpaca_config)
             status_code = 200 if data_health.get("ok") else 503
             self.send_response(status_code)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
             self.wfile.write(json.dumps(data_health).encode('utf-8'))
 
+        elif self.path == '/metrics':
+            if not self.app_config.metrics_enabled:
+                self.send_response(404)
+                self.end_headers()
+                self.wfile.write(b'Not Found')
+                return
+            body = REGISTRY.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        elif self.path == '/health/traces':
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.end_headers()
+            self.wfile.write(json.dumps(tracer.snapshot()).encode('utf-8'))
+
         else:
             self.send_response(404)
             self.end_headers()
@@ -0,0 +1,161 @@
+"""
+Warm-start retraining of the XGBoost classifier.
+
+A full retrain re-runs the hyperparameter search over the whole rolling window.
+Between full searches the current booster is instead extended with a small number
+of extra trees fitted only on the bars added since the last training cutoff,
+reusing the best hyperparameters found by the last search. The metadata needed for
+that (cutoff, parameters, validation score, date of the last search) is stored as
+JSON next to the model file.
+"""
+import json
+import logging
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import numpy as np
+
+from smartcfd.hyperparameter_search import BASE_PARAMS
+
+# scikit-learn and XGBoost are imported where a model is scored or fitted, so the
+# metadata helpers stay cheap to import (e.g. for scripts/retrain_model.py)
+if TYPE_CHECKING:
+    from xgboost import XGBClassifier
+
+log = logging.getLogger(__name__)
+
+METADATA_FILENAME = "training_metadata.json"
+
+STATUS_UPDATED = "updated"
+STATUS_NO_NEW_DATA = "no_new_data"
+STATUS_DEGRADED = "degraded"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class IncrementalUpdateResult:
+    """
+    Outcome of a warm-start update. `model` is None unless the update was accepted;
+    `trained_through` is then the index of the last row it was fitted on.
+    """
+    status: str
+    model: Optional["XGBClassifier"] = None
+    trained_through: Any = None
+    n_rows: int = 0
+    new_trees: int = 0
+    validation_logloss: Optional[float] = None
+    previous_logloss: Optional[float] = None
+    error: Optional[str] = None
+
+
+def training_metadata_path(model_path: str) -> Path:
+    return Path(model_path).with_name(METADATA_FILENAME)
+
+
+def load_training_metadata(path: Path) -> Optional[Dict[str, Any]]:
+    """Returns the stored metadata, or None if the file is absent or unreadable."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning("incremental_training.metadata_unreadable", extra={"extra": {"path": str(path), "error": repr(e)}})
+        return None
+
+
+def save_training_metadata(path: Path, metadata: Dict[str, Any]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2, sort_keys=True, default=str)
+    os.replace(tmp_path, path)
+
+
+def full_search_due(metadata: Optional[Dict[str, Any]], interval_days: int, now: Optional[datetime] = None) -> bool:
+    """True if there is no record of a full search or the last one is older than `interval_days`."""
+    if not metadata or not metadata.get("last_full_search"):
+        return True
+    now = now or datetime.now(timezone.utc)
+    last = datetime.fromisoformat(metadata["last_full_search"])
+    if last.tzinfo is None:
+        last = last.replace(tzinfo=timezone.utc)
+    return (now - last).days >= interval_days
+
+
+def validation_logloss(model: "XGBClassifier", X, y) -> float:
+    from sklearn.metrics import log_loss
+    return float(log_loss(y, model.predict_proba(X), labels=[0, 1, 2]))
+
+
+def continue_training(
+    model: "XGBClassifier",
+    X,
+    y,
+    params: Dict[str, Any],
+    sample_weight: Optional[np.ndarray] = None,
+    baseline_logloss: Optional[float] = None,
+    max_new_trees: int = 200,
+    early_stopping_rounds: int = 20,
+    validation_fraction: float = 0.2,
+    degradation_tolerance: float = 0.1,
+    min_rows: int = 50,
+    n_jobs: int = -1,
+) -> IncrementalUpdateResult:
+    """
+    Continues boosting `model` on the new rows `X`/`y` (time-ordered, all after the
+    previous cutoff). The last `validation_fraction` of the rows is held out for early
+    stopping, so it is not fitted on (the next update picks it up); the update is rejected as degraded if its validation log loss exceeds
+    `baseline_logloss` by more than `degradation_tolerance` (relative).
+    """
+    n_rows = len(X)
+    if n_rows < min_rows:
+        return IncrementalUpdateResult(status=STATUS_NO_NEW_DATA, n_rows=n_rows)
+
+    n_val = max(1, int(n_rows * validation_fraction))
+    n_fit = n_rows - n_val
+    X_fit, y_fit = X.iloc[:n_fit], y.iloc[:n_fit]
+    X_val, y_val = X.iloc[n_fit:], y.iloc[n_fit:]
+    w_fit = sample_weight[:n_fit] if sample_weight is not None else None
+
+    from xgboost import XGBClassifier
+
+    previous = validation_logloss(model, X_val, y_val)
+    booster = model.get_booster()
+    trees_before = booster.num_boosted_rounds()
+
+    params = {k: v for k, v in params.items() if k != "n_estimators"}
+    try:
+        probe = XGBClassifier(**BASE_PARAMS, **params, n_estimators=max_new_trees, early_stopping_rounds=early_stopping_rounds, n_jobs=n_jobs)
+        probe.fit(X_fit, y_fit, sample_weight=w_fit, eval_set=[(X_val, y_val)], xgb_model=booster, verbose=False)
+        new_trees = max(1, int(probe.best_iteration) + 1 - trees_before)
+        # Refit without the trees grown past the early-stopping point so the next
+        # continuation starts from the best iteration
+        updated = XGBClassifier(**BASE_PARAMS, **params, n_estimators=new_trees, n_jobs=n_jobs)
+        updated.fit(X_fit, y_fit, sample_weight=w_fit, xgb_model=booster, verbose=False)
+    except Exception as e:
+        # e.g. a short window in which one of the classes never occurs
+        log.warning("incremental_training.fit_fail", extra={"extra": {"rows": n_rows, "error": repr(e)}})
+        return IncrementalUpdateResult(status=STATUS_FAILED, n_rows=n_rows, previous_logloss=previous, error=repr(e))
+
+    score = validation_logloss(updated, X_val, y_val)
+    log.info("incremental_training.fit", extra={"extra": {"rows": n_rows, "new_trees": new_trees, "validation_logloss": score, "previous_logloss": previous, "baseline_logloss": baseline_logloss}})
+
+    if baseline_logloss is not None and math.isfinite(baseline_logloss) and score > baseline_logloss * (1 + degradation_tolerance):
+        return IncrementalUpdateResult(status=STATUS_DEGRADED, n_rows=n_rows, new_trees=new_trees, validation_logloss=score, previous_logloss=previous)
+
+    return IncrementalUpdateResult(
+        status=STATUS_UPDATED,
+        model=updated,
+        trained_through=X_fit.index[-1],
+        n_rows=n_rows,
+        new_trees=new_trees,
+        validation_logloss=score,
+        previous_logloss=previous,
+    )
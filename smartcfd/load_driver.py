@@ -0,0 +1,149 @@
+"""
+Runs N complete traders against a fake (or any) Alpaca endpoint and measures their cycles.
+
+Each trader is the production stack: `AlpacaBroker` and `DataLoader` talking HTTP
+to the endpoint through the alpaca_trade_api SDK, `PortfolioManager`,
+`RiskManager`, an in-memory trades database and an `InferenceStrategy` with a
+small synthetic model. Traders use separate API keys, so on `smartcfd.fake_alpaca`
+each has its own account and rate-limit window. In `process` mode every trader
+runs in its own process, which is the realistic setting for CPU-bound cycles;
+`thread` mode puts them all in this process.
+"""
+import logging
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+LOAD_MODES = ("process", "thread")
+
+
+@dataclass
+class LoadSettings:
+    url: str  # Trading and market data base URL
+    symbols: List[str]
+    cycles: int = 5
+    trade_interval: str = "15m"
+    min_data_points: int = 400
+    intrabar_policy: str = "always"  # Score every cycle, as a bar close would
+    trade_confidence_threshold: float = 0.0  # Trade on every buy/sell prediction
+    cycle_mode: str = "serial"
+    pause_seconds: float = 0.0  # Between one trader's cycles
+    model_env: Dict[str, str] = field(default_factory=dict)  # MODEL_* variables of the model to load
+    retry_wait_seconds: int = 1  # SDK back-off after a 429/504 (APCA_RETRY_WAIT)
+
+
+@dataclass
+class TraderResult:
+    trader: int
+    cycle_seconds: List[float] = field(default_factory=list)
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)  # tracer histograms of the trader's process
+    entries: int = 0  # entry orders submitted
+    error: Optional[str] = None
+
+
+def run_trader(index: int, settings: LoadSettings) -> TraderResult:
+    """Builds trader number `index` against `settings.url` and runs its cycles."""
+    # The SDK reads these on every request; all traders of a run share them
+    os.environ.update(settings.model_env)
+    os.environ["APCA_API_DATA_URL"] = settings.url
+    os.environ["APCA_RETRY_WAIT"] = str(settings.retry_wait_seconds)
+
+    from .alpaca_client import AlpacaBroker
+    from .config import AppConfig, RegimeConfig, RiskConfig
+    from .db import connect, init_schema
+    from .portfolio import PortfolioManager
+    from .risk import RiskManager
+    from .tracing import configure_tracing, tracer
+    from .trader import Trader
+
+    result = TraderResult(index)
+    try:
+        configure_tracing(True)
+        app_config = AppConfig(
+            watch_list=",".join(settings.symbols),
+            trade_interval=settings.trade_interval,
+            min_data_points=settings.min_data_points,
+            intrabar_policy=settings.intrabar_policy,
+            trade_confidence_threshold=settings.trade_confidence_threshold,
+            cycle_mode=settings.cycle_mode,
+        )
+        risk_config = RiskConfig()
+        broker = AlpacaBroker(key_id=f"load-{index}", secret_key="load", base_url=settings.url)
+        conn = connect(":memory:")
+        init_schema(conn)
+        portfolio_manager = PortfolioManager(broker)
+        risk_manager = RiskManager(portfolio_manager, risk_config, broker)
+        trader = Trader(app_config, risk_config, RegimeConfig(), broker, conn, portfolio_manager, risk_manager)
+        for cycle in range(settings.cycles):
+            started = time.perf_counter()
+            trader.run()
+            result.cycle_seconds.append(time.perf_counter() - started)
+            if settings.pause_seconds and cycle + 1 < settings.cycles:
+                time.sleep(settings.pause_seconds)
+        result.entries = conn.execute("SELECT COUNT(*) FROM order_events WHERE event_type = 'entry_submitted'").fetchone()[0]
+        result.stages = tracer.snapshot()["stages"]
+    except Exception as e:
+        log.error("load_driver.trader_fail", exc_info=True, extra={"extra": {"trader": index}})
+        result.error = repr(e)
+    return result
+
+
+def run_load(settings: LoadSettings, n_traders: int, mode: str = "process") -> Dict[str, Any]:
+    """Runs `n_traders` traders concurrently and summarises their cycle times."""
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode: {mode}. Expected one of {LOAD_MODES}.")
+    started = time.perf_counter()
+    if mode == "process":
+        executor = ProcessPoolExecutor(max_workers=n_traders, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        from .tracing import tracer
+        tracer.reset()
+        executor = ThreadPoolExecutor(max_workers=n_traders)
+    with executor:
+        results = list(executor.map(run_trader, range(n_traders), [settings] * n_traders))
+    wall_seconds = time.perf_counter() - started
+    # Threads share one tracer, so its histograms already cover every trader
+    stages = [r.stages for r in results] if mode == "process" else [tracer.snapshot()["stages"]]
+    return summarize(results, stages, wall_seconds)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def summarize(results: List[TraderResult], stages: List[Dict[str, Dict[str, float]]], wall_seconds: float) -> Dict[str, Any]:
+    cycles = [s for r in results for s in r.cycle_seconds]
+    # Broker call latency as seen by the traders, merged over processes by call count
+    broker: Dict[str, Dict[str, float]] = {}
+    for histograms in stages:
+        for name, stage in histograms.items():
+            if name.startswith("broker.") and stage["count"]:
+                merged = broker.setdefault(name, {"count": 0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0})
+                total = merged["mean_ms"] * merged["count"] + stage["mean_ms"] * stage["count"]
+                merged["count"] += stage["count"]
+                merged["mean_ms"] = round(total / merged["count"], 3)
+                merged["p95_ms"] = max(merged["p95_ms"], stage["p95_ms"])
+                merged["max_ms"] = max(merged["max_ms"], stage["max_ms"])
+    return {
+        "traders": len(results),
+        "failed_traders": [r.trader for r in results if r.error],
+        "errors": {r.trader: r.error for r in results if r.error},
+        "cycles": len(cycles),
+        "wall_seconds": round(wall_seconds, 3),
+        "cycles_per_second": round(len(cycles) / wall_seconds, 3) if wall_seconds else 0.0,
+        "cycle_ms": {
+            "mean": round(1000 * statistics.fmean(cycles), 3) if cycles else 0.0,
+            "p50": round(1000 * _percentile(cycles, 0.50), 3),
+            "p95": round(1000 * _percentile(cycles, 0.95), 3),
+            "max": round(1000 * max(cycles), 3) if cycles else 0.0,
+        },
+        "entries_submitted": sum(r.entries for r in results),
+        "broker_calls": broker,
+    }
@@ -1,45 +1,229 @@
+"""
+JSON logging that never blocks the trading loop.
+
+Loggers hand their records to a `QueueHandler`; a `QueueListener` thread encodes
+them as one JSON object per line and writes them to stdout. A slow or stalled
+stdout thus only fills the (bounded) queue: once it is full, further records are
+dropped and counted instead of waiting for space.
+
+Before a record is queued, `EventSampler` applies per-event limits (the event is
+the record's message, e.g. "risk.calculate_order_qty.success"):
+
+  - at most `rate_limit_per_second` records of one event per second; the next
+    record let through reports how many were suppressed;
+  - `sample_rates` keeps a fraction of an event's records, e.g.
+    {"inference.generate_signal.hold": 0.1} keeps every tenth.
+
+Warnings and errors are never sampled or rate limited. Large payloads (feature
+vectors, sizing details) are logged at DEBUG behind `log.isEnabledFor`, so they
+cost nothing at the default level.
+"""
+import atexit
+import json
 import logging
-import logging.config
+import queue
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from .metrics import LOG_RECORDS_DROPPED
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[QueueHandler] = None
+
+
+def _default(value: Any) -> Any:
+    # numpy scalars (np.int64, np.bool_) and other non-JSON values
+    item = getattr(value, "item", None)
+    if item is not None and getattr(value, "shape", None) == ():
+        return item()
+    return str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record: ts, level, logger, msg, the fields passed in
+    `extra` (and in `extra={"extra": {...}}`, flattened), and exc_info.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        created = time.gmtime(record.created)
+        payload: Dict[str, Any] = {
+            "ts": "%s.%03dZ" % (time.strftime("%Y-%m-%dT%H:%M:%S", created), record.msecs),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key in _RECORD_ATTRS:
+                continue
+            if key == "extra" and isinstance(value, dict):
+                payload.update(value)
+            else:
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=_default, separators=(",", ":"))
+
+
+class EventSampler(logging.Filter):
+    """
+    Per-event rate limit and sampling of records below WARNING; see the module docstring.
+    The event is the message template, so records logged with %-style arguments share
+    one; messages built with f-strings are an event each, and the rate windows of
+    events not seen for a second are evicted once `max_events` are tracked.
+    """
+
+    max_events = 1024
+
+    def __init__(self, rate_limit_per_second: float = 0.0, sample_rates: Optional[Dict[str, float]] = None, clock=time.monotonic):
+        super().__init__()
+        self.rate_limit = rate_limit_per_second
+        self.sample_rates = dict(sample_rates or {})
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._windows: Dict[str, list] = {}  # event -> [window start, records in window, suppressed]
+        self._credit: Dict[str, float] = {}  # sampled event -> credit; a record is kept per whole credit
 
-def setup_logging(level: str = "INFO") -> None:
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        event = record.msg if isinstance(record.msg, str) else str(record.msg)
+        with self._lock:
+            rate = self.sample_rates.get(event)
+            if rate is not None:
+                credit = self._credit.get(event, 1.0)
+                keep = credit >= 1.0 - 1e-9
+                self._credit[event] = credit + rate - (1.0 if keep else 0.0)
+                if not keep:
+                    LOG_RECORDS_DROPPED.labels("sampled").inc()
+                    return False
+            if self.rate_limit > 0:
+                now = self._clock()
+                window = self._windows.get(event)
+                if window is None:
+                    if len(self._windows) >= self.max_events:
+                        self._evict(now)
+                    window = self._windows[event] = [now, 0, 0]
+                if now - window[0] >= 1.0:
+                    window[0], window[1] = now, 0
+                if window[1] >= self.rate_limit:
+                    window[2] += 1
+                    LOG_RECORDS_DROPPED.labels("rate_limit").inc()
+                    return False
+                window[1] += 1
+                if window[2]:
+                    record.suppressed = window[2]
+                    window[2] = 0
+        return True
+
+    def _evict(self, now: float) -> None:
+        # Windows older than a second only hold a suppressed count, which is already in the metric
+        self._windows = {event: w for event, w in self._windows.items() if now - w[0] < 1.0}
+        if len(self._windows) >= self.max_events:
+            self._windows.clear()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queues records without waiting: when the queue is full the record is dropped and counted."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Freeze the message and traceback now (the arguments may change before the listener
+        # runs); the JSON encoding itself happens on the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.dropped:
+            record.queue_dropped = self.dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.labels("queue_full").inc()
+        else:
+            self.dropped = 0
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full at shutdown: wait for the writer to make room
+        self.queue.put(self._sentinel)
+
+
+def parse_sample_rates(text: str) -> Dict[str, float]:
+    """"event=rate,event=rate" (as in config.ini) -> {event: rate}."""
+    rates = {}
+    for item in text.split(","):
+        if item.strip():
+            event, _, rate = item.partition("=")
+            rates[event.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+def setup_logging(
+    level: str = "INFO",
+    queue_size: int = 10000,
+    rate_limit_per_second: float = 0.0,
+    sample_rates: Optional[Dict[str, float]] = None,
+) -> None:
     """
-    Set up logging using a dictionary configuration for robustness.
-    This ensures our JSON formatter is used consistently.
+    Routes the root logger through a queue to a JSON stdout writer thread.
+    Calling it again (e.g. once the configuration is loaded) replaces the previous setup.
+    Unlike the dictConfig this used to be, other handlers already on the root logger are
+    kept (so records also reach them, without the queue); only our own handler is replaced.
     """
-    LOGGING_CONFIG = {
-        "version": 1,
-        "disable_existing_loggers": False,
-        "formatters": {
-            "json": {
-                "()": "pythonjsonlogger.jsonlogger.JsonFormatter",
-            },
-            "standard": {
-                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-            },
-        },
-        "handlers": {
-            "console": {
-                "class": "logging.StreamHandler",
-                "stream": sys.stdout,
-                "formatter": "json",
-            },
-        },
-        "root": {
-            "level": level.upper(),
-            "handlers": ["console"],
-        },
-        "loggers": {
-            "urllib3": {
-                "level": "WARNING",
-                "handlers": ["console"],
-                "propagate": False,
-            },
-            "requests": {
-                "level": "WARNING",
-                "handlers": ["console"],
-                "propagate": False,
-            },
-        },
-    }
-    logging.config.dictConfig(LOGGING_CONFIG)
+    global _listener, _handler
+    shutdown_logging()
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(JsonFormatter())
+    _handler = NonBlockingQueueHandler(queue.Queue(maxsize=max(0, queue_size)))
+    _handler.addFilter(EventSampler(rate_limit_per_second, sample_rates))
+    _listener = _Listener(_handler.queue, console, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(level.upper())
+    for name in ("urllib3", "requests"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def setup_logging_from_config(app_config: Any) -> None:
+    """`setup_logging` with the log_* settings of an AppConfig."""
+    setup_logging(
+        app_config.log_level,
+        queue_size=app_config.log_queue_size,
+        rate_limit_per_second=app_config.log_rate_limit_per_second,
+        sample_rates=parse_sample_rates(app_config.log_sample_rates),
+    )
+
+
+def shutdown_logging() -> None:
+    """Writes out the queued records and stops the writer thread."""
+    global _listener, _handler
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,205 @@
+"""
+Versioned store of trained models with an atomically switched "current" pointer.
+
+    <root>/<name>/versions/<version>/model.joblib, feature_names.joblib[, training_metadata.json]
+    <root>/<name>/manifest.json      {"current": ..., "previous": ..., "history": [...]}
+
+A version is the content hash of the model and its feature names, so publishing
+the same artifacts twice is a no-op and a version directory never changes once
+written. Activating a version (or rolling back to the previous one) only rewrites
+the manifest, via a temporary file and `os.replace`, so readers always see either
+the old or the new pointer. `name` is "default" for the shared model and the
+symbol key (e.g. "BTC_USD") for per-symbol models.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+
+log = logging.getLogger(__name__)
+
+DEFAULT_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "models/registry")
+DEFAULT_MODEL_NAME = "default"
+MODEL_FILENAME = "model.joblib"
+FEATURE_NAMES_FILENAME = "feature_names.joblib"
+METADATA_FILENAME = "training_metadata.json"
+HISTORY_LIMIT = 50
+
+
+@dataclass
+class LoadedModel:
+    """A model ready for inference, with the version it was loaded from."""
+    model: Any
+    feature_names: List[str]
+    version: str
+
+
+def _hash_files(paths: List[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    """
+    Content-addressed model versions for one model name plus its manifest pointer.
+    """
+    def __init__(self, root: str = DEFAULT_REGISTRY_DIR, name: str = DEFAULT_MODEL_NAME):
+        self.root = Path(root) / name
+        self.name = name
+        self.versions_dir = self.root / "versions"
+        self.manifest_path = self.root / "manifest.json"
+
+    def manifest(self) -> Optional[Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return None
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("model_registry.manifest_unreadable", extra={"extra": {"name": self.name, "error": repr(e)}})
+            return None
+
+    def current_version(self) -> Optional[str]:
+        manifest = self.manifest()
+        return manifest.get("current") if manifest else None
+
+    def version_dir(self, version: str) -> Path:
+        return self.versions_dir / version
+
+    def versions(self) -> List[str]:
+        """Stored versions, oldest first."""
+        if not self.versions_dir.exists():
+            return []
+        dirs = [p for p in self.versions_dir.iterdir() if p.is_dir() and not p.name.startswith(".")]
+        return [p.name for p in sorted(dirs, key=lambda p: p.stat().st_mtime)]
+
+    def publish(self, model_path: str, feature_names_path: Optional[str] = None, metadata_path: Optional[str] = None, activate: bool = True) -> str:
+        """
+        Copies a trained model (and the feature names and training metadata next to it,
+        unless given explicitly) into an immutable version directory and, if `activate`,
+        points the manifest at it. Returns the version.
+        """
+        model_file = Path(model_path)
+        names_file = Path(feature_names_path) if feature_names_path else model_file.with_name(FEATURE_NAMES_FILENAME)
+        metadata_file = Path(metadata_path) if metadata_path else model_file.with_name(METADATA_FILENAME)
+        if not model_file.exists() or not names_file.exists():
+            raise FileNotFoundError(f"Model or feature names file not found next to {model_file}.")
+
+        version = _hash_files([model_file, names_file])
+        target = self.version_dir(version)
+        if not target.exists():
+            self.versions_dir.mkdir(parents=True, exist_ok=True)
+            staging = self.versions_dir / f".staging-{uuid.uuid4().hex}"
+            staging.mkdir()
+            shutil.copy2(model_file, staging / MODEL_FILENAME)
+            shutil.copy2(names_file, staging / FEATURE_NAMES_FILENAME)
+            if metadata_file.exists():
+                shutil.copy2(metadata_file, staging / METADATA_FILENAME)
+            try:
+                os.rename(staging, target)
+            except OSError:
+                # Published concurrently with identical content
+                shutil.rmtree(staging, ignore_errors=True)
+        log.info("model_registry.publish", extra={"extra": {"name": self.name, "version": version}})
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str) -> None:
+        """Atomically points the manifest at `version`, remembering the current one as previous."""
+        if not (self.version_dir(version) / MODEL_FILENAME).exists():
+            raise ValueError(f"Unknown model version for {self.name}: {version}")
+        manifest = self.manifest() or {"history": []}
+        current = manifest.get("current")
+        if current == version:
+            return
+        history = (manifest.get("history") or []) + [{"version": version, "activated_at": datetime.now(timezone.utc).isoformat()}]
+        self.root.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(self.manifest_path, {
+            "name": self.name,
+            "current": version,
+            "previous": current,
+            "history": history[-HISTORY_LIMIT:],
+        })
+        log.info("model_registry.activate", extra={"extra": {"name": self.name, "version": version, "previous": current}})
+
+    def rollback(self) -> str:
+        """Re-activates the previous version. Returns the version now current."""
+        manifest = self.manifest()
+        previous = manifest.get("previous") if manifest else None
+        if not previous:
+            raise ValueError(f"No previous model version to roll back to for {self.name}.")
+        self.activate(previous)
+        return previous
+
+    def load(self, version: Optional[str] = None) -> LoadedModel:
+        version = version or self.current_version()
+        if not version:
+            raise FileNotFoundError(f"No active model version for {self.name}.")
+        directory = self.version_dir(version)
+        return LoadedModel(
+            model=joblib.load(directory / MODEL_FILENAME),
+            feature_names=joblib.load(directory / FEATURE_NAMES_FILENAME),
+            version=version,
+        )
+
+    def prune(self, keep: int = 5) -> List[str]:
+        """Deletes all but the newest `keep` versions, never the current or previous one."""
+        manifest = self.manifest() or {}
+        protected = {manifest.get("current"), manifest.get("previous")}
+        candidates = [v for v in self.versions() if v not in protected]
+        removed = candidates[:max(0, len(candidates) - keep)]
+        for version in removed:
+            shutil.rmtree(self.version_dir(version), ignore_errors=True)
+        return removed
+
+
+def file_version(model_path: Path) -> Optional[str]:
+    """Version token of an unregistered model file: changes whenever the file is replaced."""
+    try:
+        stat = Path(model_path).stat()
+    except OSError:
+        return None
+    return f"file-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def current_model_version(registry: ModelRegistry, fallback_model_path: Path) -> Optional[str]:
+    """The version that `load_current_model` would load, without loading it."""
+    return registry.current_version() or file_version(fallback_model_path)
+
+
+def load_current_model(registry: ModelRegistry, fallback_model_path: Path, fallback_feature_names_path: Optional[Path] = None) -> Optional[LoadedModel]:
+    """
+    Loads the registry's current version, or the plain model file at `fallback_model_path`
+    if nothing has been published under that name. Returns None if neither exists.
+    """
+    if registry.current_version():
+        return registry.load()
+    fallback_model_path = Path(fallback_model_path)
+    feature_names_path = Path(fallback_feature_names_path or fallback_model_path.with_name(FEATURE_NAMES_FILENAME))
+    version = file_version(fallback_model_path)
+    if version is None or not feature_names_path.exists():
+        return None
+    return LoadedModel(joblib.load(fallback_model_path), joblib.load(feature_names_path), version)
@@ -1,105 +1,117 @@
 """
 This module contains the core logic for training, evaluating, and saving the ML model.
 It is designed to be reusable by both manual training scripts and automated retraining workflows.
+
+Importing it reads no configuration and loads none of scikit-learn, XGBoost or
+matplotlib; they are imported by the functions that train, evaluate or plot.
 """
 import pandas as pd
-from sklearn.model_selection import train_test_split, RandomizedSearchCV, TimeSeriesSplit
-from xgboost import XGBClassifier
-from sklearn.metrics import classification_report
 import joblib
 from smartcfd.data_loader import DataLoader
-from smartcfd.features import create_features
+from smartcfd.dataset_store import BarDatasetStore, load_bars, DEFAULT_DATASET_ROOT
+from smartcfd.training_data import build_training_matrix
+from smartcfd.hyperparameter_search import successive_halving_search, BASE_PARAMS
+from smartcfd.incremental_training import (
+    continue_training, load_training_metadata, save_training_metadata, training_metadata_path, validation_logloss,
+    STATUS_NO_NEW_DATA, STATUS_UPDATED,
+)
 from smartcfd.config import load_config_from_file
 import numpy as np
 import os
+from datetime import datetime, timezone
 from pathlib import Path
-import matplotlib.pyplot as plt
-from sklearn.utils import class_weight
+from typing import Optional, Tuple
 
 # --- Default Configuration ---
-app_cfg, _, _, _ = load_config_from_file()
-DEFAULT_SYMBOL = app_cfg.watch_list.split(',')[0].strip()
 DEFAULT_START_DATE = "2022-01-01"
 DEFAULT_END_DATE = "2024-01-01"
-DEFAULT_TIMEFRAME = app_cfg.trade_interval
 DEFAULT_MODEL_PATH = "models/model.joblib"
+DEFAULT_SEARCH_MODE = os.getenv("SEARCH_MODE", "halving") # 'halving' or 'random'
 REPORTS_DIR = "reports"
 
-def create_target(df: pd.DataFrame, period: int = 5) -> pd.Series:
-    """
-    Creates the target variable for classification.
-    - 1: Buy (price is expected to increase significantly)
-    - 2: Sell (price is expected to decrease significantly)
-    - 0: Hold (price is not expected to move significantly)
-    """
-    future_returns = df['close'].pct_change(periods=period).shift(-period)
-    
-    # Define thresholds for buy/sell signals
-    # These should be tuned based on asset volatility and strategy goals
-    buy_threshold = 0.01  # e.g., 1% increase
-    sell_threshold = -0.01 # e.g., 1% decrease
-
-    conditions = [
-        future_returns > buy_threshold,
-        future_returns < sell_threshold
-    ]
-    choices = [1, 2] # 1 for Buy, 2 for Sell
-    
-    return np.select(conditions, choices, default=0) # 0 for Hold
+
+def configured_defaults() -> Tuple[str, str]:
+    """(symbol, timeframe) trained by default: the first watch-list symbol and the trade interval of config.ini."""
+    app_cfg, _, _, _ = load_config_from_file()
+    return app_cfg.watch_list.split(',')[0].strip(), app_cfg.trade_interval
+
+
+def _load_training_bars(symbol: str, start_date: str, end_date: str, timeframe_str: str, dataset_root: str, offline: bool) -> pd.DataFrame:
+    store = BarDatasetStore(dataset_root)
+    loader = None
+    if not offline and store.missing_months(symbol, timeframe_str, start_date, end_date):
+        app_cfg, alpaca_cfg, _, _ = load_config_from_file()
+        api_base = "https://paper-api.alpaca.markets" if app_cfg.alpaca_env == "paper" else "https://api.alpaca.markets"
+        loader = DataLoader(
+            api_key=alpaca_cfg.key_id,
+            secret_key=alpaca_cfg.secret_key,
+            api_base=api_base
+        )
+    df = load_bars(symbol, start_date, end_date, timeframe_str, store=store, data_loader=loader)
+    if isinstance(df.index, pd.MultiIndex):
+        df.index = df.index.get_level_values('timestamp')
+    return df
+
+
+def _dump_atomic(obj, path) -> None:
+    """Written next to the target and renamed, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
 
 
-    # feature engineering now imported from smartcfd.features
+def _balanced_sample_weights(y) -> np.ndarray:
+    from sklearn.utils import class_weight
+
+    y = np.asarray(y)
+    classes = np.unique(y)
+    weights = class_weight.compute_class_weight(class_weight='balanced', classes=classes, y=y)
+    lookup = np.zeros(int(classes.max()) + 1, dtype=np.float32)
+    lookup[classes] = weights
+    return lookup[y]
 
 
 def train_and_evaluate_model(
-    symbol: str = DEFAULT_SYMBOL,
+    symbol: Optional[str] = None,
     start_date: str = DEFAULT_START_DATE,
     end_date: str = DEFAULT_END_DATE,
-    timeframe_str: str = DEFAULT_TIMEFRAME,
-    model_output_path: str = DEFAULT_MODEL_PATH
+    timeframe_str: Optional[str] = None,
+    model_output_path: str = DEFAULT_MODEL_PATH,
+    dataset_root: str = DEFAULT_DATASET_ROOT,
+    offline: bool = False,
+    search_mode: str = DEFAULT_SEARCH_MODE,
+    reports_dir: str = REPORTS_DIR,
+    n_jobs: int = -1
 ):
     """
-    Fetches data, creates features, trains an XGBoost model with hyperparameter tuning,
-    evaluates it, and saves it to disk.
+    Loads data from the local bar archive (downloading missing months unless `offline`),
+    creates features, trains an XGBoost model with hyperparameter tuning,
+    evaluates it, and saves it to disk together with its feature names and the
+    training metadata used by `incremental_update_model`. `n_jobs` caps the threads
+    used by XGBoost and the search. `symbol` and `timeframe_str` default to
+    `configured_defaults()`. Returns the model path, or None if nothing was trained.
     """
-    print(f"Fetching data for {symbol} from {start_date} to {end_date}...")
-    app_cfg, _, alpaca_cfg = load_config_from_file()
-    api_base = "https://paper-api.alpaca.markets" if app_cfg.alpaca_env == "paper" else "https://api.alpaca.markets"
-    loader = DataLoader(
-        api_key=alpaca_cfg.api_key,
-        secret_key=alpaca_cfg.secret_key,
-        api_base=api_base
-    )
-    df = loader.fetch_historical_range(symbol, start_date, end_date, timeframe_str)
+    from sklearn.metrics import classification_report
+    from sklearn.model_selection import RandomizedSearchCV, TimeSeriesSplit
+    from xgboost import XGBClassifier
+
+    if symbol is None or timeframe_str is None:
+        default_symbol, default_timeframe = configured_defaults()
+        symbol = symbol or default_symbol
+        timeframe_str = timeframe_str or default_timeframe
+    print(f"Loading data for {symbol} from {start_date} to {end_date}...")
+    df = _load_training_bars(symbol, start_date, end_date, timeframe_str, dataset_root, offline)
     
     if df.empty:
         print("No data fetched. Exiting.")
         return
 
-    if isinstance(df.index, pd.MultiIndex):
-        df.index = df.index.get_level_values('timestamp')
-
-    print("Creating features...")
-    df_features = create_features(df)
-
-    print("Creating target variable...")
-    target = create_target(df)
-    target = pd.Series(target, index=df.index) # Ensure target is a Series with the correct index
-
-    # Align features and target by index
-    aligned_index = df_features.index.intersection(target.index)
-    df_features = df_features.loc[aligned_index]
-    df_features['target'] = target.loc[aligned_index]
-
-    df_features.dropna(inplace=True)
-
-    # Align dataframes by index
-    df = df.loc[df_features.index]
-    
-    # Ensure all feature columns are included
-    features = [col for col in df_features.columns if col.startswith('feature_')]
-    X = df_features[features]
-    y = df_features['target']
+    print("Creating features and target variable...")
+    data = build_training_matrix(df)
+    del df
+    print(f"Training matrix: {len(data)} rows x {len(data.feature_names)} features (float32, {data.nbytes / 2**20:.1f} MB)")
+    # Zero-copy views of the float32 matrix; XGBoost's hist method quantises them directly
+    X, y = data.frame(), data.labels()
 
     print("--- Target Variable Distribution ---")
     print(y.value_counts(normalize=True))
@@ -109,22 +121,17 @@ def train_and_evaluate_model(
         print("Not enough data to train after processing. Exiting.")
         return
 
-    # Save feature names
+    output_dir = Path(model_output_path).parent
+    os.makedirs(output_dir, exist_ok=True)
     feature_names = X.columns.tolist()
-    joblib.dump(feature_names, 'models/feature_names.joblib')
-    print(f"Saved {len(feature_names)} feature names to models/feature_names.joblib")
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, shuffle=False)
+    # Chronological split by position so both sides stay views of the matrix
+    n_train = len(X) - int(np.ceil(len(X) * 0.2))
+    X_train, X_test = X.iloc[:n_train], X.iloc[n_train:]
+    y_train, y_test = y.iloc[:n_train], y.iloc[n_train:]
 
     print("Calculating class weights to handle imbalance...")
-    # Calculate class weights
-    classes = np.unique(y_train)
-    weights = class_weight.compute_class_weight(class_weight='balanced', classes=classes, y=y_train)
-    class_weights = dict(zip(classes, weights))
-    print(f"Computed class weights: {class_weights}")
-
-    # Create sample weights for the training data
-    sample_weights = np.array([class_weights[i] for i in y_train])
+    sample_weights = _balanced_sample_weights(y_train)
 
     print(f"Training model on {len(X_train)} samples...")
     
@@ -138,26 +145,51 @@ def train_and_evaluate_model(
         'gamma': [0, 0.1, 0.2, 0.3]
     }
 
-    xgb = XGBClassifier(random_state=42, use_label_encoder=False, eval_metric='mlogloss', objective='multi:softprob', num_class=3)
+    if search_mode == "halving":
+        # Successive halving with early stopping on the most recent part of the training period
+        search = successive_halving_search(
+            X_train, y_train,
+            sample_weight=sample_weights,
+            param_distributions=param_dist,
+            n_candidates=27,
+            eta=3,
+            n_jobs=n_jobs,
+        )
+        print("Best parameters found: ", search.best_params, f"(n_estimators={search.best_n_estimators})")
 
-    # Use TimeSeriesSplit for cross-validation
-    tscv = TimeSeriesSplit(n_splits=3)
+        os.makedirs(reports_dir, exist_ok=True)
+        trace_path = Path(reports_dir) / "hyperparameter_search_trace.csv"
+        search.trace_frame().to_csv(trace_path, index=False)
+        print(f"Search trace saved to {trace_path}")
 
-    random_search = RandomizedSearchCV(
-        estimator=xgb,
-        param_distributions=param_dist,
-        n_iter=30,
-        cv=tscv,
-        verbose=2,
-        random_state=42,
-        n_jobs=-1
-    )
+        best_params = dict(search.best_params)
+        model = XGBClassifier(**BASE_PARAMS, **best_params, n_estimators=search.best_n_estimators, n_jobs=n_jobs)
+        model.fit(X_train, y_train, sample_weight=sample_weights)
+    elif search_mode == "random":
+        # Parallelism comes from the CV jobs; each candidate fit is single-threaded
+        xgb = XGBClassifier(random_state=42, use_label_encoder=False, eval_metric='mlogloss', objective='multi:softprob', num_class=3, n_jobs=1)
 
-    random_search.fit(X_train, y_train, sample_weight=sample_weights)
+        # Use TimeSeriesSplit for cross-validation
+        tscv = TimeSeriesSplit(n_splits=3)
 
-    print("Best parameters found: ", random_search.best_params_)
-    
-    model = random_search.best_estimator_
+        random_search = RandomizedSearchCV(
+            estimator=xgb,
+            param_distributions=param_dist,
+            n_iter=30,
+            cv=tscv,
+            verbose=2,
+            random_state=42,
+            n_jobs=n_jobs
+        )
+
+        random_search.fit(X_train, y_train, sample_weight=sample_weights)
+
+        print("Best parameters found: ", random_search.best_params_)
+        
+        model = random_search.best_estimator_
+        best_params = {k: v for k, v in random_search.best_params_.items() if k != 'n_estimators'}
+    else:
+        raise ValueError(f"Unknown search mode: {search_mode}")
 
     print("Evaluating best XGBoost model found...")
     y_pred = model.predict(X_test)
@@ -171,14 +203,16 @@ def train_and_evaluate_model(
     }).sort_values('importance', ascending=False)
 
     # Ensure reports directory exists
-    os.makedirs(REPORTS_DIR, exist_ok=True)
+    os.makedirs(reports_dir, exist_ok=True)
     
     # Save feature importances to CSV
-    importance_csv_path = Path(REPORTS_DIR) / "feature_importances.csv"
+    importance_csv_path = Path(reports_dir) / "feature_importances.csv"
     feature_importances.to_csv(importance_csv_path, index=False)
     print(f"Feature importances saved to {importance_csv_path}")
 
     # Plot and save feature importances
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 8))
     plt.title('Feature Importances')
     plt.barh(feature_importances['feature'], feature_importances['importance'])
@@ -186,15 +220,93 @@ def train_and_evaluate_model(
     plt.gca().invert_yaxis()
     plt.tight_layout()
     
-    importance_plot_path = Path(REPORTS_DIR) / "feature_importances.png"
+    importance_plot_path = Path(reports_dir) / "feature_importances.png"
     plt.savefig(importance_plot_path)
     print(f"Feature importance plot saved to {importance_plot_path}")
     plt.close()
 
-    # Ensure the directory exists
-    output_dir = Path(model_output_path).parent
-    os.makedirs(output_dir, exist_ok=True)
-
+    # The feature names go first: the strategy reloads both files when the model file changes
+    feature_names_path = output_dir / "feature_names.joblib"
+    _dump_atomic(feature_names, feature_names_path)
+    print(f"Saved {len(feature_names)} feature names to {feature_names_path}")
     print(f"Saving model to {model_output_path}...")
-    joblib.dump(model, model_output_path)
+    _dump_atomic(model, model_output_path)
     print("Model saved successfully.")
+
+    now = datetime.now(timezone.utc).isoformat()
+    save_training_metadata(training_metadata_path(model_output_path), {
+        "symbol": symbol,
+        "timeframe": timeframe_str,
+        "feature_names": feature_names,
+        "best_params": best_params,
+        "n_estimators": int(model.get_booster().num_boosted_rounds()),
+        # The test period is not fitted on; incremental updates pick it up
+        "trained_through": X_train.index[-1].isoformat(),
+        "validation_logloss": validation_logloss(model, X_test, y_test),
+        "last_full_search": now,
+        "updated_at": now,
+        "incremental_updates": 0,
+    })
+    return model_output_path
+
+
+def incremental_update_model(
+    end_date: str,
+    model_output_path: str = DEFAULT_MODEL_PATH,
+    dataset_root: str = DEFAULT_DATASET_ROOT,
+    offline: bool = False,
+    warmup_days: int = 90,
+    max_new_trees: int = 200,
+    degradation_tolerance: float = 0.1,
+    n_jobs: int = -1,
+) -> str:
+    """
+    Continues boosting the saved model on the bars added since its training cutoff,
+    reusing the hyperparameters of the last full search. `warmup_days` of older bars are
+    loaded so the rolling features of the first new bar are fully formed.
+
+    Returns one of the `incremental_training.STATUS_*` values; the model and metadata
+    are only rewritten when the update is accepted.
+    """
+    metadata = load_training_metadata(training_metadata_path(model_output_path))
+    if metadata is None or not Path(model_output_path).exists():
+        raise FileNotFoundError(f"No model with training metadata at {model_output_path}; run a full retrain first.")
+
+    cutoff = pd.Timestamp(metadata["trained_through"])
+    symbol, timeframe_str = metadata["symbol"], metadata["timeframe"]
+    start_date = (cutoff - pd.Timedelta(days=warmup_days)).strftime("%Y-%m-%d")
+    print(f"Loading data for {symbol} from {start_date} to {end_date} (cutoff {cutoff})...")
+    df = _load_training_bars(symbol, start_date, end_date, timeframe_str, dataset_root, offline)
+    if df.empty:
+        print("No data fetched. Model left unchanged.")
+        return STATUS_NO_NEW_DATA
+
+    data = build_training_matrix(df, feature_names=metadata["feature_names"]).after(cutoff)
+    X, y = data.frame(), data.labels()
+    print(f"Continuing training on {len(X)} new samples...")
+
+    model = joblib.load(model_output_path)
+    result = continue_training(
+        model, X, y,
+        params=metadata["best_params"],
+        sample_weight=_balanced_sample_weights(y) if len(y) else None,
+        baseline_logloss=metadata.get("validation_logloss"),
+        max_new_trees=max_new_trees,
+        degradation_tolerance=degradation_tolerance,
+        n_jobs=n_jobs,
+    )
+    print(f"Incremental update {result.status}: {result.n_rows} rows, {result.new_trees} new trees, "
+          f"validation logloss {result.validation_logloss} (before: {result.previous_logloss})")
+    if result.status != STATUS_UPDATED:
+        return result.status
+
+    _dump_atomic(result.model, model_output_path)
+    metadata.update({
+        "n_estimators": int(result.model.get_booster().num_boosted_rounds()),
+        "trained_through": result.trained_through.isoformat(),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "incremental_updates": int(metadata.get("incremental_updates", 0)) + 1,
+    })
+    save_training_metadata(training_metadata_path(model_output_path), metadata)
+    print("Model updated successfully.")
+    return result.status
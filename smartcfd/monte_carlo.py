@@ -0,0 +1,178 @@
+"""
+Monte Carlo robustness analysis for backtest return series.
+
+A single backtest gives one equity path and one Sharpe ratio. This module
+resamples the per-period returns of that path thousands of times, either with a
+circular block bootstrap (keeps short-range autocorrelation) or by shuffling the
+order of returns, and reports confidence intervals for Sharpe ratio, maximum
+drawdown and terminal equity.
+
+Resamples are generated as a 2-D (paths x periods) NumPy matrix, one chunk of
+paths at a time, and only three summary numbers per path are kept, so memory
+is bounded by `chunk_size * len(returns)` regardless of `n_paths`.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+METHODS = ("block", "shuffle")
+
+
+@dataclass
+class MonteCarloResult:
+    """Per-path statistics and their confidence intervals."""
+    method: str
+    n_paths: int
+    n_periods: int
+    sharpe: np.ndarray
+    max_drawdown: np.ndarray
+    terminal_equity: np.ndarray
+    confidence_intervals: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Returns the confidence intervals plus the median of each statistic."""
+        out = {}
+        for name in ("sharpe", "max_drawdown", "terminal_equity"):
+            values = getattr(self, name)
+            out[name] = {"median": float(np.median(values)), **self.confidence_intervals.get(name, {})}
+        return out
+
+
+def equity_from_trade_history(trades: pd.DataFrame, initial_capital: float) -> pd.Series:
+    """
+    Replays a trade history CSV (as written by scripts/backtest.py) into an equity series.
+    Positions are marked at the last traded price of each symbol. Both column layouts
+    are accepted: `side`/`qty` and `action`/`quantity`.
+    """
+    if trades.empty:
+        return pd.Series([initial_capital], dtype=float)
+
+    side_col = "side" if "side" in trades.columns else "action"
+    qty_col = "qty" if "qty" in trades.columns else "quantity"
+    symbols = trades["symbol"] if "symbol" in trades.columns else pd.Series("_", index=trades.index)
+
+    cash = float(initial_capital)
+    positions: Dict[str, float] = {}
+    last_price: Dict[str, float] = {}
+    equity = np.empty(len(trades) + 1, dtype=np.float64)
+    equity[0] = cash
+
+    for i, (symbol, side, qty, price) in enumerate(zip(symbols, trades[side_col], trades[qty_col].astype(float), trades["price"].astype(float))):
+        signed_qty = qty if str(side).lower() == "buy" else -qty
+        cash -= signed_qty * price
+        positions[symbol] = positions.get(symbol, 0.0) + signed_qty
+        last_price[symbol] = price
+        equity[i + 1] = cash + sum(q * last_price[s] for s, q in positions.items())
+
+    index = None
+    if "timestamp" in trades.columns:
+        ts = pd.to_datetime(trades["timestamp"], utc=True)
+        index = pd.DatetimeIndex([ts.iloc[0]]).append(pd.DatetimeIndex(ts))
+    return pd.Series(equity, index=index, name="equity")
+
+
+def returns_from_equity(equity: pd.Series | np.ndarray) -> np.ndarray:
+    """Simple per-period returns of an equity curve, dropping non-finite values."""
+    values = np.asarray(equity, dtype=np.float64)
+    if values.size < 2:
+        return np.empty(0, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = values[1:] / values[:-1] - 1.0
+    return returns[np.isfinite(returns)]
+
+
+def _block_bootstrap_indices(rng: np.random.Generator, n_paths: int, n_periods: int, block_size: int) -> np.ndarray:
+    """Circular block bootstrap: each path is a concatenation of random contiguous blocks."""
+    n_blocks = -(-n_periods // block_size)
+    starts = rng.integers(0, n_periods, size=(n_paths, n_blocks, 1))
+    offsets = np.arange(block_size).reshape(1, 1, block_size)
+    return ((starts + offsets) % n_periods).reshape(n_paths, n_blocks * block_size)[:, :n_periods]
+
+
+def _shuffle_indices(rng: np.random.Generator, n_paths: int, n_periods: int) -> np.ndarray:
+    """Independent permutation of the period order for every path."""
+    return rng.random((n_paths, n_periods)).argsort(axis=1)
+
+
+def _path_statistics(paths: np.ndarray, initial_equity: float, periods_per_year: float):
+    """Sharpe, max drawdown and terminal equity for each row of a (paths x periods) return matrix."""
+    mean = paths.mean(axis=1)
+    std = paths.std(axis=1, ddof=1) if paths.shape[1] > 1 else np.zeros(paths.shape[0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+
+    equity = np.cumprod(1.0 + paths, axis=1)
+    equity *= initial_equity
+    running_max = np.maximum.accumulate(np.maximum(equity, initial_equity), axis=1)
+    max_drawdown = (equity / running_max - 1.0).min(axis=1)
+    return sharpe, np.minimum(max_drawdown, 0.0), equity[:, -1]
+
+
+def run_monte_carlo(
+    returns: Sequence[float] | np.ndarray,
+    n_paths: int = 10000,
+    method: str = "block",
+    block_size: int = 20,
+    chunk_size: int = 1000,
+    initial_equity: float = 1.0,
+    periods_per_year: float = 252,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+) -> MonteCarloResult:
+    """
+    Resamples a return series `n_paths` times and computes per-path statistics.
+
+    :param method: 'block' for a circular block bootstrap, 'shuffle' to permute the returns.
+    :param chunk_size: Number of paths materialised at once; bounds peak memory.
+    :param confidence: Two-sided confidence level of the reported intervals.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown resampling method: {method}. Expected one of {METHODS}.")
+    returns = np.asarray(returns, dtype=np.float64)
+    returns = returns[np.isfinite(returns)]
+    n_periods = returns.size
+    if n_periods < 2:
+        raise ValueError("At least two returns are required for resampling.")
+    if n_paths <= 0 or chunk_size <= 0:
+        raise ValueError("n_paths and chunk_size must be positive.")
+
+    block_size = max(1, min(int(block_size), n_periods))
+    rng = np.random.default_rng(seed)
+
+    sharpe = np.empty(n_paths, dtype=np.float64)
+    max_drawdown = np.empty(n_paths, dtype=np.float64)
+    terminal_equity = np.empty(n_paths, dtype=np.float64)
+
+    for start in range(0, n_paths, chunk_size):
+        stop = min(start + chunk_size, n_paths)
+        if method == "block":
+            idx = _block_bootstrap_indices(rng, stop - start, n_periods, block_size)
+        else:
+            idx = _shuffle_indices(rng, stop - start, n_periods)
+        s, dd, te = _path_statistics(returns[idx], initial_equity, periods_per_year)
+        sharpe[start:stop] = s
+        max_drawdown[start:stop] = dd
+        terminal_equity[start:stop] = te
+
+    alpha = (1.0 - confidence) / 2.0
+    quantiles = (alpha, 1.0 - alpha)
+    intervals = {}
+    for name, values in (("sharpe", sharpe), ("max_drawdown", max_drawdown), ("terminal_equity", terminal_equity)):
+        lo, hi = np.quantile(values, quantiles)
+        intervals[name] = {"lower": float(lo), "upper": float(hi)}
+
+    log.info("monte_carlo.run.complete", extra={"extra": {"method": method, "n_paths": n_paths, "n_periods": n_periods}})
+    return MonteCarloResult(
+        method=method,
+        n_paths=n_paths,
+        n_periods=n_periods,
+        sharpe=sharpe,
+        max_drawdown=max_drawdown,
+        terminal_equity=terminal_equity,
+        confidence_intervals=intervals,
+    )
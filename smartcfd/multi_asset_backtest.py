@@ -0,0 +1,140 @@
+"""
+Multi-asset portfolio backtesting on a single aligned timestamp index.
+
+All symbols are loaded onto the union of their bar timestamps and held as
+dense NumPy arrays (symbols x bars, plus one feature axis), so memory scales
+linearly with symbols x bars. At every timestamp the model scores all symbols
+with bars in one batch, and orders are sized by BacktestRiskManager so the
+shared exposure caps of the live system apply across the whole watch list.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from smartcfd.backtest_portfolio import BacktestPortfolio
+from smartcfd.config import RiskConfig
+from smartcfd.features import create_features
+from smartcfd.risk import BacktestRiskManager
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class AlignedBars:
+    """
+    Bars and features for several symbols on one shared timestamp index.
+    Row `i` of every array belongs to `symbols[i]`; column `t` to `index[t]`.
+    """
+    index: pd.DatetimeIndex
+    symbols: List[str]
+    close: np.ndarray      # (n_symbols, n_bars) float64, forward-filled for valuation
+    has_bar: np.ndarray    # (n_symbols, n_bars) bool, True where the symbol printed a bar
+    features: np.ndarray   # (n_symbols, n_bars, n_features) float32
+    feature_names: List[str]
+
+
+@dataclass
+class MultiAssetBacktestResult:
+    """Output of a multi-asset backtest run."""
+    equity_curve: pd.Series
+    trades: pd.DataFrame
+    final_positions: Dict[str, float] = field(default_factory=dict)
+
+
+def align_bars(data: Dict[str, pd.DataFrame], feature_names: List[str]) -> AlignedBars:
+    """
+    Computes features per symbol and places every symbol on the union of all bar timestamps.
+    Symbols without data are dropped.
+    """
+    frames = {s: df for s, df in data.items() if df is not None and not df.empty}
+    if not frames:
+        raise ValueError("No data provided for any symbol.")
+
+    symbols = list(frames.keys())
+    index = frames[symbols[0]].index
+    for symbol in symbols[1:]:
+        index = index.union(frames[symbol].index)
+    index = index.sort_values()
+
+    n_symbols, n_bars, n_features = len(symbols), len(index), len(feature_names)
+    close = np.full((n_symbols, n_bars), np.nan, dtype=np.float64)
+    has_bar = np.zeros((n_symbols, n_bars), dtype=bool)
+    features = np.full((n_symbols, n_bars, n_features), np.nan, dtype=np.float32)
+
+    for i, symbol in enumerate(symbols):
+        df = frames[symbol]
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        positions = index.get_indexer(df.index)
+        closes = df["close"] if "close" in df.columns else df["Close"]
+        close[i, positions] = closes.to_numpy(dtype=np.float64)
+        has_bar[i, positions] = True
+
+        symbol_features = create_features(df)
+        missing = set(feature_names) - set(symbol_features.columns)
+        if missing:
+            raise ValueError(f"Missing features for {symbol}: {sorted(missing)}")
+        features[i, positions, :] = symbol_features[feature_names].to_numpy(dtype=np.float32)
+
+    # Forward-fill closes so positions keep a valuation on bars a symbol did not print
+    close = pd.DataFrame(close.T).ffill().to_numpy().T
+
+    log.info("backtest.multi.aligned", extra={"extra": {"symbols": n_symbols, "bars": n_bars, "features": n_features}})
+    return AlignedBars(index=index, symbols=symbols, close=close, has_bar=has_bar, features=features, feature_names=list(feature_names))
+
+
+def run_multi_asset_backtest(
+    aligned: AlignedBars,
+    model: Any,
+    risk_config: RiskConfig,
+    initial_capital: float,
+    confidence_threshold: float = 0.75,
+) -> MultiAssetBacktestResult:
+    """
+    Walks the aligned index, scoring all symbols with a bar at each timestamp in one
+    `predict_proba` call. Labels follow the trainer: 0=Hold, 1=Buy, 2=Sell.
+    Buys are sized by BacktestRiskManager against the shared portfolio; sells close the long.
+    """
+    portfolio = BacktestPortfolio(initial_capital=initial_capital)
+    risk_manager = BacktestRiskManager(risk_config)
+    symbols = aligned.symbols
+    equity_curve = np.empty(len(aligned.index), dtype=np.float64)
+    trades = []
+
+    for t, timestamp in enumerate(aligned.index):
+        prices_t = aligned.close[:, t]
+        current_prices = {symbols[i]: float(prices_t[i]) for i in range(len(symbols)) if not np.isnan(prices_t[i])}
+
+        X_t = aligned.features[:, t, :]
+        scorable = aligned.has_bar[:, t] & ~np.isnan(X_t).any(axis=1)
+        rows = np.flatnonzero(scorable)
+
+        if rows.size:
+            proba = np.asarray(model.predict_proba(X_t[rows]))
+            labels = proba.argmax(axis=1)
+            confidences = proba.max(axis=1)
+
+            for row, label, confidence in zip(rows, labels, confidences):
+                if confidence < confidence_threshold:
+                    continue
+                symbol = symbols[row]
+                price = current_prices[symbol]
+
+                if label == 1:
+                    qty = risk_manager.calculate_order_qty(symbol, price, portfolio, current_prices)
+                    if qty > 0 and portfolio.execute_order(symbol, qty, "buy", price):
+                        trades.append({"timestamp": timestamp, "symbol": symbol, "action": "buy", "quantity": qty, "price": price})
+                elif label == 2:
+                    qty = portfolio.positions.get(symbol, 0)
+                    if qty > 0 and portfolio.execute_order(symbol, qty, "sell", price):
+                        trades.append({"timestamp": timestamp, "symbol": symbol, "action": "sell", "quantity": qty, "price": price})
+
+        equity_curve[t] = portfolio.update_equity(current_prices)
+
+    return MultiAssetBacktestResult(
+        equity_curve=pd.Series(equity_curve, index=aligned.index, name="equity"),
+        trades=pd.DataFrame(trades, columns=["timestamp", "symbol", "action", "quantity", "price"]),
+        final_positions=dict(portfolio.positions),
+    )
@@ -0,0 +1,109 @@
+"""
+A small staged pipeline on threads with bounded queues.
+
+Items flow through a chain of stages, each served by its own number of worker
+threads, and the results are handed to a consumer running in the calling thread.
+Every hand-over goes through a bounded queue, so a fast stage blocks instead of
+running ahead of a slow one. The trader uses it to overlap the bar downloads of
+some symbols with the feature computation and inference of others, and to submit
+orders as soon as each symbol has been evaluated (see `Trader.evaluate_new_trades`).
+"""
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List
+
+log = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+
+
+class StagedPipeline:
+    """
+    Runs items through `stages` in order. An item whose stage function raises is
+    logged and dropped; the other items carry on.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 8):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage.")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+
+    def run(self, items: Iterable[Any], consume: Callable[[Any], None]) -> Dict[str, Any]:
+        """
+        Feeds `items` through the stages and calls `consume` on every result, in
+        completion order, from the calling thread. Returns per-stage item counts and
+        the total duration.
+        """
+        started = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        counts = {stage.name: 0 for stage in self.stages}
+        lock = threading.Lock()
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0], self.stages[0].workers), daemon=True)]
+
+        for i, stage in enumerate(self.stages):
+            # Workers still running in this stage; the last one to finish closes the next queue
+            remaining = [max(1, stage.workers)]
+            downstream = self.stages[i + 1].workers if i + 1 < len(self.stages) else 1
+            for _ in range(max(1, stage.workers)):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[i], queues[i + 1], remaining, downstream, counts, lock),
+                    daemon=True,
+                ))
+        for thread in threads:
+            thread.start()
+
+        consumed = 0
+        while True:
+            result = queues[-1].get()
+            if result is _DONE:
+                break
+            consumed += 1
+            try:
+                consume(result)
+            except Exception:
+                # Keep draining, or the upstream workers would block on a full queue
+                log.error("pipeline.consume_fail", exc_info=True)
+
+        for thread in threads:
+            thread.join()
+        return {"counts": counts, "consumed": consumed, "seconds": time.perf_counter() - started}
+
+    @staticmethod
+    def _feed(items: Iterable[Any], out: queue.Queue, n_workers: int) -> None:
+        for item in items:
+            out.put(item)
+        for _ in range(max(1, n_workers)):
+            out.put(_DONE)
+
+    @staticmethod
+    def _work(stage: Stage, inbox: queue.Queue, out: queue.Queue, remaining: List[int], downstream: int, counts: Dict[str, int], lock: threading.Lock) -> None:
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            try:
+                result = stage.func(item)
+            except Exception:
+                log.error("pipeline.stage_fail", exc_info=True, extra={"extra": {"stage": stage.name}})
+                continue
+            out.put(result)
+            with lock:
+                counts[stage.name] += 1
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(max(1, downstream)):
+                out.put(_DONE)
@@ -0,0 +1,104 @@
+"""
+Memoizes inference results between bar closes.
+
+The runner usually loops much faster than the trading interval (e.g. every 60s on
+15m bars), so most cycles see the same closed bars plus an updated in-progress
+snapshot bar. A prediction is cached under
+
+    (symbol, model version, timestamp of the last closed bar, hash of the closed bars)
+
+and reused until one of them changes. What happens inside a bar is set by the
+intrabar policy:
+
+    closed    score only closed bars, once per bar (default)
+    interval  score the live data, including the in-progress bar, at most once every
+              `intrabar_refresh_seconds` within a bar
+    always    no caching: score the live data on every call
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+INTRABAR_POLICIES = ("closed", "interval", "always")
+DEFAULT_MAX_ENTRIES = 256
+
+_HASHED_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass
+class CachedPrediction:
+    """A cached signal (None for hold) and when it was computed."""
+    signal: Optional[Dict[str, Any]]
+    computed_at: pd.Timestamp
+
+
+class PredictionCache:
+    """Bounded LRU map from prediction keys to CachedPrediction entries."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[Hashable, CachedPrediction]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[CachedPrediction]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, signal: Optional[Dict[str, Any]], computed_at: pd.Timestamp) -> None:
+        with self._lock:
+            self._entries[key] = CachedPrediction(dict(signal) if signal else None, computed_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def closed_bar_count(index: pd.DatetimeIndex, bar: timedelta, now: pd.Timestamp) -> int:
+    """
+    Number of leading rows of `index` (bar open times, sorted) whose bar has closed
+    at `now`. The snapshot bar merged by `DataLoader.get_market_data` is still open.
+    Naive timestamps are taken to be UTC.
+    """
+    cutoff = pd.Timestamp(now).tz_convert("UTC") - pd.Timedelta(bar)
+    if index.tz is None:
+        cutoff = cutoff.tz_localize(None)
+    return int(index.searchsorted(cutoff, side="right"))
+
+
+def bars_hash(bars: pd.DataFrame) -> str:
+    """Hash of the bar timestamps and OHLCV values, i.e. of everything the features are computed from."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(bars.index.asi8).tobytes())
+    columns = [c for c in bars.columns if str(c).lower() in _HASHED_COLUMNS]
+    digest.update(np.ascontiguousarray(bars[columns].to_numpy(dtype=np.float64, na_value=np.nan)).tobytes())
+    return digest.hexdigest()
+
+
+def prediction_key(symbol: str, model_version: str, closed_bars: pd.DataFrame) -> Tuple[str, str, pd.Timestamp, str]:
+    return (symbol, model_version, closed_bars.index[-1], bars_hash(closed_bars))
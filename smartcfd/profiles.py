@@ -0,0 +1,167 @@
+"""
+Trading profiles (`configs/*.yml`) as trading books.
+
+A profile file maps profile names to settings:
+
+    profiles:
+      crypto_1h:
+        watch: [BTC-USD, ETH-USD]
+        interval: "1h"
+        risk: 0.02
+        max_trades: 10
+        cooldown_min: 30
+        class_caps: {crypto: 2}
+
+Each profile becomes a `Profile`: the runner's `AppConfig` and `RiskConfig` with the
+profile's overrides, plus the book-level `BookLimits`. Recognised keys:
+
+    watch, interval, ml_threshold   watch_list, trade_interval, trade_confidence_threshold
+    risk                            risk_per_trade_percent, as a fraction of equity
+    any AppConfig/RiskConfig field  that field (e.g. min_data_points, max_total_exposure_percent)
+    max_trades                      open trade groups in the book
+    cooldown_min                    minutes between entries of the book in one symbol
+    class_caps                      open trade groups in the book per asset class
+    class_risk_budget               risk per trade per asset class, as a fraction of equity
+
+Other keys are ignored (and logged). Symbols are written as in the profiles
+(`BTC-USD`) or as Alpaca's (`BTC/USD`); Yahoo-style forex and futures symbols
+(`EURUSD=X`, `CL=F`) are not tradable through Alpaca and are dropped.
+"""
+import logging
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Dict, Iterable, List, Optional
+
+from .config import AppConfig, RiskConfig
+
+log = logging.getLogger(__name__)
+
+ASSET_CLASSES = ("crypto", "equity", "forex", "commodity")
+
+_ALIASES = {"watch": "watch_list", "interval": "trade_interval", "ml_threshold": "trade_confidence_threshold"}
+_LIMIT_KEYS = ("max_trades", "cooldown_min", "class_caps", "class_risk_budget")
+_APP_FIELDS = {f.name for f in fields(AppConfig)} - {"alpaca"}
+_RISK_FIELDS = {f.name for f in fields(RiskConfig)}
+_CRYPTO_QUOTES = ("USD", "USDT", "USDC", "BTC")
+_METALS = ("XAU", "XAG", "XPT", "XPD")
+
+
+@dataclass
+class BookLimits:
+    """Limits a book applies to its own entries, on top of the risk manager's."""
+    max_trades: int = 0  # Open trade groups; 0 = no limit
+    cooldown_minutes: float = 0.0  # Minimum time between entries in one symbol
+    class_caps: Dict[str, int] = field(default_factory=dict)  # Open trade groups per asset class
+    class_risk_percent: Dict[str, float] = field(default_factory=dict)  # Risk per trade per asset class, in percent of equity
+
+
+@dataclass
+class Profile:
+    name: str
+    source: str  # File the profile was read from
+    app_config: AppConfig
+    risk_config: RiskConfig
+    limits: BookLimits
+    ignored: List[str] = field(default_factory=list)  # Keys with no meaning for this runtime
+
+    @property
+    def symbols(self) -> List[str]:
+        return [s.strip() for s in self.app_config.watch_list.split(",") if s.strip()]
+
+
+def asset_class(symbol: str) -> str:
+    """crypto, equity, forex or commodity, from the symbol's format."""
+    if "/" in symbol:
+        return "crypto"
+    if symbol.endswith("=F") or (symbol.endswith("=X") and symbol[:3] in _METALS):
+        return "commodity"
+    if symbol.endswith("=X"):
+        return "forex"
+    return "equity"
+
+
+def normalize_symbol(symbol: str) -> Optional[str]:
+    """Alpaca's form of a profile symbol (BTC-USD -> BTC/USD), or None if Alpaca can't trade it."""
+    symbol = str(symbol).strip().upper()
+    base, _, quote = symbol.rpartition("-")
+    if base and quote in _CRYPTO_QUOTES:
+        symbol = f"{base}/{quote}"
+    if asset_class(symbol) in ("forex", "commodity"):
+        return None
+    return symbol
+
+
+def _coerce(value: Any, default: Any) -> Any:
+    if isinstance(default, bool):
+        return value if isinstance(value, bool) else str(value).strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, (int, float, str)):
+        return type(default)(value)
+    return value
+
+
+def _classes(values: Optional[Dict[str, Any]], name: str, key: str) -> Dict[str, Any]:
+    values = dict(values or {})
+    unknown = set(values) - set(ASSET_CLASSES)
+    if unknown:
+        raise ValueError(f"Profile {name}: unknown asset classes in {key}: {sorted(unknown)}. Expected some of {ASSET_CLASSES}.")
+    return values
+
+
+def build_profile(name: str, settings: Dict[str, Any], app_config: AppConfig, risk_config: RiskConfig, source: str = "") -> Profile:
+    """Applies one profile's settings to copies of the runner's configuration."""
+    settings = dict(settings)
+    for alias, key in _ALIASES.items():
+        if alias in settings:
+            settings.setdefault(key, settings.pop(alias))  # Explicit field names win over their aliases
+
+    app_updates: Dict[str, Any] = {}
+    risk_updates: Dict[str, Any] = {}
+    ignored = []
+    for key, value in settings.items():
+        if key == "watch_list":
+            symbols = value.split(",") if isinstance(value, str) else list(value)
+            normalized = [normalize_symbol(s) for s in symbols]
+            dropped = [s for s, n in zip(symbols, normalized) if n is None]
+            if dropped:
+                log.warning("profiles.symbols_not_tradable", extra={"extra": {"profile": name, "symbols": dropped}})
+            app_updates[key] = ",".join(dict.fromkeys(n for n in normalized if n))
+        elif key == "risk":
+            risk_updates["risk_per_trade_percent"] = float(value) * 100.0
+        elif key in _APP_FIELDS:
+            app_updates[key] = _coerce(value, getattr(app_config, key))
+        elif key in _RISK_FIELDS:
+            risk_updates[key] = _coerce(value, getattr(risk_config, key))
+        elif key not in _LIMIT_KEYS:
+            ignored.append(key)
+
+    limits = BookLimits(
+        max_trades=int(settings.get("max_trades") or 0),
+        cooldown_minutes=float(settings.get("cooldown_min") or 0),
+        class_caps={k: int(v) for k, v in _classes(settings.get("class_caps"), name, "class_caps").items()},
+        class_risk_percent={k: float(v) * 100.0 for k, v in _classes(settings.get("class_risk_budget"), name, "class_risk_budget").items()},
+    )
+    profile = Profile(name, source, replace(app_config, **app_updates), replace(risk_config, **risk_updates), limits, ignored)
+    if not profile.symbols:
+        raise ValueError(f"Profile {name} has no tradable symbols.")
+    if ignored:
+        log.info("profiles.ignored_keys", extra={"extra": {"profile": name, "keys": ignored}})
+    return profile
+
+
+def load_profiles(paths: Iterable[str], app_config: AppConfig, risk_config: RiskConfig) -> List[Profile]:
+    """Every profile of the given YAML files, in file order. Profile names must be unique."""
+    import yaml
+
+    profiles: List[Profile] = []
+    for path in paths:
+        # utf-8-sig: some of the profile files start with a byte-order mark
+        with open(path, encoding="utf-8-sig") as f:
+            document = yaml.safe_load(f) or {}
+        entries = document.get("profiles")
+        if not isinstance(entries, dict) or not entries:
+            raise ValueError(f"No profiles found in {path}.")
+        for name, settings in entries.items():
+            if any(p.name == name for p in profiles):
+                raise ValueError(f"Duplicate profile name {name} in {path}.")
+            profiles.append(build_profile(name, settings or {}, app_config, risk_config, source=path))
+    log.info("profiles.loaded", extra={"extra": {"profiles": [p.name for p in profiles]}})
+    return profiles
@@ -1,18 +1,18 @@
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 import pandas as pd
-from pydantic import BaseModel
 import ta
 
 from smartcfd.types import OrderRequest, StopLossRequest, TakeProfitRequest
 from smartcfd.config import RiskConfig
-from smartcfd.data_loader import DataLoader
 from smartcfd.db import get_daily_pnl
 from smartcfd.indicators import atr
-from smartcfd.strategy import Strategy
 from smartcfd.portfolio import Account, Position, PortfolioManager
 from smartcfd.backtest_portfolio import BacktestPortfolio
 
+if TYPE_CHECKING:
+    from smartcfd.strategy import Strategy
+
 log = logging.getLogger("risk")
 
 class RiskManager:
@@ -26,6 +26,9 @@ class RiskManager:
         self.halt_reason = ""
         self.broker = broker
 
+    def risk_per_trade_percent(self, symbol: str) -> float:
+        """Share of equity risked on a new trade in `symbol`, in percent."""
+        return self.config.risk_per_trade_percent
 
     def generate_bracket_order(self, symbol: str, side: str, qty: float, current_price: float, historical_data: pd.DataFrame) -> Optional[OrderRequest]:
         """
@@ -114,7 +117,7 @@ class RiskManager:
         Calculates the quantity for an order based on risk rules and returns
         the quantity and the current price.
         """
-        log.info(
+        log.debug(
             "risk.calculate_order_qty.start",
             extra={"extra": {"symbol": symbol, "side": side}},
         )
@@ -157,7 +160,10 @@ class RiskManager:
             # Use absolute value for exposure calculation
             total_exposure = float(self.portfolio_manager.get_total_exposure())
 
-            log.info(f"EQUITY: {equity}, TOTAL_EXPOSURE: {total_exposure}, MAX_EXPOSURE: {max_total_exposure_value}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("risk.calculate_order_qty.exposure", extra={"extra": {
+                    "symbol": symbol, "equity": equity, "total_exposure": total_exposure, "max_total_notional": max_total_exposure_value,
+                }})
             
             available_capital_total = max_total_exposure_value - total_exposure
             if available_capital_total <= 0:
@@ -178,7 +184,7 @@ class RiskManager:
                 return 0.0, current_price
 
             # Rule 3: Risk per trade
-            risk_per_trade_value = equity * (self.config.risk_per_trade_percent / 100.0)
+            risk_per_trade_value = equity * (self.risk_per_trade_percent(symbol) / 100.0)
 
             # Determine the final capital to allocate
             capital_to_allocate = min(
@@ -214,13 +220,13 @@ class RiskManager:
             return None
 
         try:
-            # Ensure 'atr' is calculated if not present
-            if 'atr' not in historical_data.columns:
+            # Use the 'atr' column if present, otherwise compute it (without adding it to the shared bars)
+            if 'atr' in historical_data.columns:
+                current_atr = historical_data['atr'].iloc[-1]
+            else:
                 # Assuming 'high', 'low', 'close' are present for ATR calculation
                 from smartcfd.indicators import atr
-                historical_data['atr'] = atr(historical_data['high'], historical_data['low'], historical_data['close'], length=14)
-
-            current_atr = historical_data['atr'].iloc[-1]
+                current_atr = atr(historical_data['high'], historical_data['low'], historical_data['close'], window=14).iloc[-1]
             
             if side == 'buy':
                 # For a buy order, TP is above entry, SL is below
@@ -323,7 +329,7 @@ class RiskManager:
 
         # Check if the current true range exceeds the historical average by the multiplier
         is_tripped = true_range > historical_atr * multiplier
-        log.info(
+        log.debug(
             "risk.volatility_check.evaluate",
             extra={
                 "extra": {
@@ -364,7 +370,7 @@ class RiskManager:
             # Check if the current true range exceeds the historical ATR by the multiplier
             is_tripped = true_range > (historical_atr * self.config.circuit_breaker_atr_multiplier)
             
-            log.info("risk.volatility_check.evaluate", extra={"extra": {
+            log.debug("risk.volatility_check.evaluate", extra={"extra": {
                 "symbol": symbol,
                 "is_tripped": str(is_tripped),
                 "true_range": true_range,
@@ -386,7 +392,7 @@ class RiskManager:
         Checks all halt conditions. If any are met, sets the halt flag and returns True.
         If no conditions are met, it ensures the halt is lifted and returns False.
         """
-        log.info("risk.check_for_halt.start")
+        log.debug("risk.check_for_halt.start")
         # --- Check for conditions that would CAUSE a halt ---
 
         # 1. Check for daily drawdown
@@ -398,7 +404,7 @@ class RiskManager:
                 drawdown = (equity / last_equity) - 1 if last_equity > 0 else 0
                 
                 is_exceeded = drawdown < self.config.max_daily_drawdown_percent
-                log.info(
+                log.debug(
                     "risk.check_for_halt.drawdown_check",
                     extra={
                         "extra": {
@@ -439,10 +445,10 @@ class RiskManager:
             self.is_halted = False
             self.halt_reason = ""
         
-        log.info("risk.check_for_halt.end", extra={"extra": {"is_halted": self.is_halted}})
+        log.debug("risk.check_for_halt.end", extra={"extra": {"is_halted": self.is_halted}})
         return self.is_halted
     
-    def manage_open_positions(self, strategy: Strategy):
+    def manage_open_positions(self, strategy: "Strategy"):
         """
         Manages open positions according to the defined strategy and risk rules.
         """
@@ -493,3 +499,49 @@ class RiskManager:
             return True
         
         return False
+
+
+class BacktestRiskManager:
+    """
+    Applies the live sizing rules (total exposure, per-asset exposure, risk per
+    trade and minimum notional) against a BacktestPortfolio, so a multi-asset
+    backtest is bound by the same portfolio-level caps as the running trader.
+    """
+    def __init__(self, risk_config: RiskConfig):
+        self.config = risk_config
+
+    def calculate_order_qty(self, symbol: str, current_price: float, portfolio: BacktestPortfolio, current_prices: Optional[Dict[str, float]] = None) -> float:
+        """
+        Returns the quantity to buy for a symbol, or 0.0 if a cap is already reached.
+        `current_prices` values every open position; it defaults to the symbol's price only.
+        """
+        if not current_price or current_price <= 0:
+            return 0.0
+
+        prices = current_prices if current_prices is not None else {symbol: current_price}
+        equity = portfolio.get_total_equity(prices)
+        if equity <= 0:
+            return 0.0
+
+        # Rule 1: Max total exposure
+        max_total_exposure_value = equity * (self.config.max_total_exposure_percent / 100.0)
+        available_capital_total = max_total_exposure_value - portfolio.get_total_exposure(prices)
+        if available_capital_total <= 0:
+            log.debug("risk.backtest.max_total_exposure_breached", extra={"extra": {"symbol": symbol}})
+            return 0.0
+
+        # Rule 2: Max exposure per asset
+        max_asset_exposure_value = equity * (self.config.max_exposure_per_asset_percent / 100.0)
+        available_capital_asset = max_asset_exposure_value - portfolio.get_exposure_for_symbol(symbol, prices)
+        if available_capital_asset <= 0:
+            log.debug("risk.backtest.max_asset_exposure_breached", extra={"extra": {"symbol": symbol}})
+            return 0.0
+
+        # Rule 3: Risk per trade, bounded by the cash actually available
+        risk_per_trade_value = equity * (self.config.risk_per_trade_percent / 100.0)
+        capital_to_allocate = min(available_capital_total, available_capital_asset, risk_per_trade_value, portfolio.cash)
+
+        if capital_to_allocate < self.config.min_order_notional:
+            return 0.0
+
+        return capital_to_allocate / current_price
@@ -0,0 +1,110 @@
+"""
+Schedules the runner's cycles on bar boundaries.
+
+A full cycle (data fetch, evaluation, order placement) runs once per bar,
+`settle_seconds` after the bar closes, so decisions are made on a just-closed bar
+rather than a half-formed one. Between bar closes, light cycles (portfolio and
+OCO exit reconciliation only) run every `light_interval_seconds`, on a grid
+anchored to the last bar close.
+
+Every cycle time is computed from the wall clock and the bar grid (bars are
+aligned to the Unix epoch, i.e. to UTC), never by adding sleeps, so cycles do not
+drift. A full cycle missed because an earlier cycle overran is run as soon as the
+scheduler is asked again.
+"""
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Optional
+
+log = logging.getLogger(__name__)
+
+FULL = "full"
+LIGHT = "light"
+SCHEDULE_MODES = ("bar_close", "fixed")
+
+
+@dataclass
+class ScheduledCycle:
+    """A cycle to run at `at` (Unix seconds)."""
+    at: float
+    kind: str
+
+
+class BarCloseScheduler:
+    """Full cycles on bar close plus `settle_seconds`, light cycles in between."""
+
+    def __init__(self, bar: timedelta, settle_seconds: float = 5.0, light_interval_seconds: float = 0.0):
+        self.bar_seconds = bar.total_seconds()
+        if self.bar_seconds <= 0:
+            raise ValueError(f"Bar duration must be positive, got {bar}.")
+        self.settle_seconds = float(settle_seconds) % self.bar_seconds
+        self.light_interval_seconds = max(0.0, float(light_interval_seconds))
+        self._last_full: Optional[float] = None
+
+    def last_close(self, now: float) -> float:
+        """The latest bar close (plus settle delay) at or before `now`."""
+        return math.floor((now - self.settle_seconds) / self.bar_seconds) * self.bar_seconds + self.settle_seconds
+
+    def next_cycle(self, now: float) -> ScheduledCycle:
+        latest = self.last_close(now)
+        if self._last_full is None:
+            # First cycle: evaluate straight away rather than wait for the next close
+            return ScheduledCycle(now, FULL)
+        if latest > self._last_full:
+            # The full cycle of the latest close has not run yet (an earlier cycle overran)
+            return ScheduledCycle(latest, FULL)
+
+        next_full = latest + self.bar_seconds
+        if self.light_interval_seconds:
+            light = latest + (math.floor((now - latest) / self.light_interval_seconds) + 1) * self.light_interval_seconds
+            if light < next_full:
+                return ScheduledCycle(light, LIGHT)
+        return ScheduledCycle(next_full, FULL)
+
+    def complete(self, cycle: ScheduledCycle) -> None:
+        if cycle.kind == FULL:
+            self._last_full = self.last_close(cycle.at)
+
+
+class FixedIntervalScheduler:
+    """The previous behaviour: a full cycle `interval_seconds` after the previous one ended."""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = float(interval_seconds)
+        self._last_end: Optional[float] = None
+
+    def next_cycle(self, now: float) -> ScheduledCycle:
+        if self._last_end is None:
+            return ScheduledCycle(now, FULL)
+        return ScheduledCycle(self._last_end + self.interval_seconds, FULL)
+
+    def complete(self, cycle: ScheduledCycle) -> None:
+        self._last_end = time.time()
+
+
+def build_scheduler(mode: str, bar: timedelta, settle_seconds: float, interval_seconds: float):
+    """
+    'bar_close': full cycles on bar close, light cycles every `interval_seconds`.
+    'fixed': a full cycle every `interval_seconds`.
+    """
+    if mode == "bar_close":
+        return BarCloseScheduler(bar, settle_seconds, interval_seconds)
+    if mode == "fixed":
+        return FixedIntervalScheduler(interval_seconds)
+    raise ValueError(f"Unknown schedule mode: {mode}. Expected one of {SCHEDULE_MODES}.")
+
+
+def sleep_until(at: float, should_continue: Callable[[], bool], step: float = 1.0, clock: Callable[[], float] = time.time) -> bool:
+    """
+    Sleeps until `at` in steps of at most `step` seconds, so a shutdown request is
+    seen promptly. Returns False if `should_continue` turned false while waiting.
+    """
+    while should_continue():
+        remaining = at - clock()
+        if remaining <= 0:
+            return True
+        time.sleep(min(step, remaining))
+    return False
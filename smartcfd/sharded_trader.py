@@ -0,0 +1,169 @@
+"""
+Runs the per-symbol part of a trading cycle in several processes.
+
+The watch list is split into `n_shards` groups. Each shard is a long-lived worker
+process with its own strategy (models, prediction cache) and data loader, and runs
+data fetch -> regime detection -> inference for its symbols. The coordinator (the
+runner's process) keeps everything portfolio-wide: the portfolio and risk state,
+the SQLite trade-group store, the halt checks and order submission. Shards only
+return data and proposed actions; actions are executed one at a time in watch-list
+order by the coordinator, so exposure caps see every order placed before them.
+"""
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .regime_detector import MarketRegime, RegimeDetector
+from .strategy import Strategy, get_strategy_by_name
+from .trader import Trader, evaluate_symbols
+from .tracing import span
+
+log = logging.getLogger(__name__)
+
+# State of the shard living in this worker process, set by _init_shard
+_shard: Optional[Dict[str, Any]] = None
+
+
+def partition_symbols(symbols: List[str], n_shards: int) -> List[List[str]]:
+    """Splits `symbols` round-robin into at most `n_shards` non-empty groups."""
+    n_shards = max(1, min(n_shards, len(symbols)))
+    return [symbols[i::n_shards] for i in range(n_shards)]
+
+
+@dataclass
+class ShardResult:
+    symbols: List[str]
+    historical_data: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    regimes: Dict[str, MarketRegime] = field(default_factory=dict)
+    actions: List[Dict[str, Any]] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def _init_shard(symbols: List[str], app_config: Any, regime_config: Any, credentials: Dict[str, str]) -> None:
+    """Worker initializer: builds the shard's strategy once, so models stay loaded across cycles."""
+    global _shard
+    from .logging_setup import setup_logging_from_config
+    setup_logging_from_config(app_config)
+    # The strategy only needs the broker's credentials to build its data loader
+    broker = SimpleNamespace(**credentials)
+    _shard = {
+        "symbols": symbols,
+        "strategy": get_strategy_by_name(app_config.strategy, app_config, broker),
+        "regime_detector": RegimeDetector(app_config, regime_config),
+    }
+
+
+def _run_shard_cycle() -> ShardResult:
+    """Worker entry point: fetches, classifies and evaluates the shard's symbols."""
+    started = time.perf_counter()
+    symbols: List[str] = _shard["symbols"]
+    strategy: Strategy = _shard["strategy"]
+    refresh_models = getattr(strategy, "refresh_models", None)
+    if refresh_models is not None:
+        refresh_models()
+    historical_data = strategy.get_historical_data(symbols) or {}
+    regimes, actions = evaluate_symbols(strategy, _shard["regime_detector"], symbols, historical_data)
+    return ShardResult(symbols, historical_data, regimes, actions, time.perf_counter() - started)
+
+
+class ShardedTrader(Trader):
+    """
+    A Trader whose data fetch and strategy evaluation run in `n_shards` worker
+    processes. Reconciliation, risk checks and order execution are unchanged and
+    stay in this process.
+    """
+
+    def __init__(self, *args: Any, n_shards: int = 2, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        symbols = [s.strip() for s in self.app_config.watch_list.split(',') if s.strip()]
+        self.shards = partition_symbols(symbols, n_shards)
+        self._executors: List[Optional[ProcessPoolExecutor]] = [None] * len(self.shards)
+        for i in range(len(self.shards)):
+            self._start_shard(i)
+        log.info("sharded_trader.init", extra={"extra": {"shards": self.shards}})
+
+    def _initialize_strategy(self, app_config: Any) -> Optional[Strategy]:
+        # Strategies (and their models) live in the shard processes
+        return None
+
+    def _start_shard(self, i: int) -> None:
+        credentials = {"api_key": self.broker.api_key, "secret_key": self.broker.secret_key, "base_url": self.broker.base_url}
+        # 'spawn' so workers do not inherit the coordinator's sockets and DB connection
+        self._executors[i] = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_shard,
+            initargs=(self.shards[i], self.app_config, self.regime_config, credentials),
+        )
+
+    def _collect(self) -> List[ShardResult]:
+        """Runs one cycle on every shard. A failed shard yields no data and is restarted."""
+        futures = [executor.submit(_run_shard_cycle) for executor in self._executors]
+        results = []
+        for i, future in enumerate(futures):
+            try:
+                result = future.result()
+                log.info("sharded_trader.shard_complete", extra={"extra": {"shard": i, "symbols": len(result.symbols), "actions": len(result.actions), "seconds": round(result.seconds, 3)}})
+                results.append(result)
+            except BrokenProcessPool:
+                log.error("sharded_trader.shard_crashed", extra={"extra": {"shard": i, "symbols": self.shards[i]}})
+                self._executors[i].shutdown(wait=False, cancel_futures=True)
+                self._start_shard(i)
+            except Exception as e:
+                log.error("sharded_trader.shard_fail", extra={"extra": {"shard": i, "symbols": self.shards[i], "error": repr(e)}})
+        return results
+
+    def evaluate_new_trades(self):
+        """
+        Same steps as `Trader.evaluate_new_trades`, with the per-symbol work done by the
+        shards. Actions are executed in watch-list order regardless of which shard
+        produced them.
+        """
+        watch_list = [s.strip() for s in self.app_config.watch_list.split(',') if s.strip()]
+        with span("trader.shards"):
+            results = self._collect()
+
+        historical_data: Dict[str, pd.DataFrame] = {}
+        market_regimes: Dict[str, MarketRegime] = {}
+        actions: List[Dict[str, Any]] = []
+        for result in results:
+            historical_data.update(result.historical_data)
+            market_regimes.update(result.regimes)
+            actions.extend(result.actions)
+        order = {symbol: i for i, symbol in enumerate(watch_list)}
+        actions.sort(key=lambda action: order.get(action.get("symbol"), len(order)))
+        self._last_historical_data = historical_data
+
+        # Now that we have data, we can reconcile trade groups, which may need to arm exits
+        with span("trader.reconcile_trade_groups"):
+            self.reconcile_trade_groups(historical_data)
+
+        if not historical_data or all(df.empty for df in historical_data.values()):
+            log.warning("trader.run.no_valid_data_from_strategy")
+            return
+
+        with span("trader.check_for_halt"):
+            halted = self.risk_manager.check_for_halt(historical_data, self.app_config.trade_interval)
+        if halted:
+            log.critical("trader.run.halted", extra={"extra": {"reason": self.risk_manager.halt_reason}})
+            return
+
+        if not market_regimes:
+            log.warning("trader.run.no_regimes_detected")
+            return
+
+        with span("trader.execute_actions"):
+            self.execute_actions(actions, historical_data)
+
+    def close(self) -> None:
+        """Stops the shard processes."""
+        for executor in self._executors:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,83 @@
+"""
+Cold-start budgets of the entry points.
+
+Each entry point is imported in a fresh interpreter with `python -X importtime`; its
+import time (the cumulative time of the module and its parent packages) is compared
+with its budget, and the heavy dependencies it must not load at import are checked:
+
+    rows = check_startup()  # one row per entry point; status ok, over_budget or heavy_import
+
+`scripts/benchmark.py startup` prints the rows and fails when a budget is exceeded.
+Import time is the part of a container restart or a health-check subprocess that we
+control; everything else (model loading, the first fetch) happens on first use.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAINING = ("sklearn", "xgboost", "matplotlib")
+DATA = ("pandas", "alpaca_trade_api", "aiohttp")
+
+
+@dataclass(frozen=True)
+class StartupBudget:
+    module: str
+    seconds: float  # Budget of the cold import
+    forbidden: Tuple[str, ...] = ()  # Top-level packages the import must not load
+
+
+BUDGETS: List[StartupBudget] = [
+    StartupBudget("smartcfd.config", 0.1, DATA + TRAINING),
+    StartupBudget("smartcfd.health_server", 0.3, DATA + TRAINING),
+    StartupBudget("smartcfd.trader", 1.5, ("alpaca_trade_api",) + TRAINING),
+    StartupBudget("smartcfd.model_trainer", 1.5, ("alpaca_trade_api",) + TRAINING),
+    StartupBudget("docker.runner", 0.3, DATA + TRAINING),
+]
+
+
+def measure_import(module: str) -> Tuple[float, List[str]]:
+    """Seconds to import `module` in a fresh interpreter, and the top-level packages it loaded."""
+    code = f"import sys, json; import {module}; print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=REPO_ROOT, timeout=120,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed: {proc.stderr.strip().splitlines()[-1:]}")
+    parts = module.split(".")
+    names = {".".join(parts[:i + 1]) for i in range(len(parts))}
+    micros = 0
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | name", nested imports indented under their importer
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].startswith(" ") and not fields[2].startswith("  ") and fields[2].strip() in names:
+            micros += int(fields[1])
+    return micros / 1e6, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def check_startup(budgets: Optional[Sequence[StartupBudget]] = None, repeat: int = 3) -> List[Dict[str, Any]]:
+    """Measures every budgeted import `repeat` times (median) and checks it against its budget."""
+    rows = []
+    for budget in budgets or BUDGETS:
+        timings, loaded = [], []
+        for _ in range(max(1, repeat)):
+            seconds, loaded = measure_import(budget.module)
+            timings.append(seconds)
+        seconds = statistics.median(timings)
+        heavy = sorted(set(budget.forbidden) & set(loaded))
+        status = "heavy_import" if heavy else "over_budget" if seconds > budget.seconds else "ok"
+        rows.append({"module": budget.module, "seconds": round(seconds, 4), "budget_s": budget.seconds, "heavy": heavy, "status": status})
+    return rows
+
+
+def format_startup(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'module':<28} {'import':>9} {'budget':>9}  status"]
+    for row in rows:
+        heavy = f" ({', '.join(row['heavy'])})" if row["heavy"] else ""
+        lines.append(f"{row['module']:<28} {1000 * row['seconds']:>7.0f}ms {1000 * row['budget_s']:>7.0f}ms  {row['status']}{heavy}")
+    return "\n".join(lines)
@@ -1,18 +1,25 @@
 import logging
+import threading
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import pandas as pd
-import joblib
 import os
 
 from .portfolio import PortfolioManager
-from .data_loader import DataLoader, has_data_gaps
+from .bar_store import BarStore
+from .data_loader import DataLoader, has_data_gaps, parse_interval, timeframe_to_timedelta
 from .features import create_features
 from .regime_detector import MarketRegime
 from .config import AppConfig
 from .broker import Broker
-from alpaca_trade_api.rest import TimeFrame, TimeFrameUnit
+from .training_orchestrator import DEFAULT_MODELS_DIR, symbol_key, symbol_model_path
+from .fast_predictor import FastPredictor, build_fast_predictor
+from .tracing import span
+from .prediction_cache import INTRABAR_POLICIES, PredictionCache, closed_bar_count, prediction_key
+from .model_registry import (
+    DEFAULT_MODEL_NAME, DEFAULT_REGISTRY_DIR, LoadedModel, ModelRegistry, current_model_version, load_current_model,
+)
 
 log = logging.getLogger(__name__)
 
@@ -28,7 +35,11 @@ class Strategy(ABC):
     def __init__(self, app_config: AppConfig, broker: Broker):
         self.app_config = app_config
         self.broker = broker
-        self.data_loader = DataLoader(broker.api_key, broker.secret_key, broker.base_url)
+        self.data_loader = DataLoader(
+            broker.api_key, broker.secret_key, broker.base_url,
+            bar_dtype=app_config.bar_dtype,
+            bar_store=BarStore() if app_config.resample_bars else None,
+        )
 
     def get_historical_data(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
         """Fetches historical data for the given symbols."""
@@ -51,53 +62,183 @@ class Strategy(ABC):
 class InferenceStrategy(Strategy):
     """
     A strategy that uses a pre-trained machine learning model to make trading decisions.
+    Symbols with their own model (see `training_orchestrator.train_symbols`) use it;
+    all others use the shared model. Models are read from the model registry when a
+    version has been published there, and from the plain model files otherwise;
+    `refresh_models` hot-swaps them when the registry pointer or the file changes.
+    Predictions are cached per closed bar according to `app_config.intrabar_policy`
+    (see `smartcfd.prediction_cache`).
     """
     def __init__(self, app_config: AppConfig, broker: Broker):
         super().__init__(app_config, broker)
         self.model_path = Path(os.getenv("MODEL_PATH", "models/model.joblib"))
         self.feature_names_path = Path(os.getenv("FEATURE_NAMES_PATH", "models/feature_names.joblib"))
-        
-        if not self.model_path.exists() or not self.feature_names_path.exists():
+        self.models_dir = Path(os.getenv("MODELS_DIR", DEFAULT_MODELS_DIR))
+        self.registry_dir = os.getenv("MODEL_REGISTRY_DIR", DEFAULT_REGISTRY_DIR)
+        # Keyed by registry name: DEFAULT_MODEL_NAME for the shared model, the symbol key otherwise
+        self._models: Dict[str, Optional[LoadedModel]] = {}
+        self.fast_inference = os.getenv("FAST_INFERENCE", "1").strip().lower() in ("1", "true", "yes", "on")
+        self._predictors: Dict[str, Optional[FastPredictor]] = {}  # keyed by model version
+        self._predictors_lock = threading.Lock()  # Pipelined cycles score symbols on several threads
+        if app_config.intrabar_policy not in INTRABAR_POLICIES:
+            raise ValueError(f"Unknown intrabar policy: {app_config.intrabar_policy}. Expected one of {INTRABAR_POLICIES}.")
+        self.intrabar_policy = app_config.intrabar_policy
+        self.intrabar_refresh = pd.Timedelta(seconds=app_config.intrabar_refresh_seconds)
+        self.bar_duration = timeframe_to_timedelta(parse_interval(app_config.trade_interval))
+        self.prediction_cache = PredictionCache(app_config.prediction_cache_size)
+
+        self._load(DEFAULT_MODEL_NAME)
+        symbols = [s.strip() for s in app_config.watch_list.split(',') if s.strip()]
+        for symbol in symbols:
+            self._load(symbol_key(symbol))
+
+        if self._models[DEFAULT_MODEL_NAME] is None and not all(self._models.get(symbol_key(s)) for s in symbols):
             log.error("inference.strategy.init.fail", extra={"extra": {"reason": "Model or feature names file not found."}})
             raise FileNotFoundError("Model or feature names file not found.")
-            
-        self.model = joblib.load(self.model_path)
-        self.feature_names = joblib.load(self.feature_names_path)
-        log.info("inference.strategy.init.success")
+        log.info("inference.strategy.init.success", extra={"extra": {"models": self.model_versions()}})
+
+    @property
+    def model(self) -> Any:
+        default = self._models.get(DEFAULT_MODEL_NAME)
+        return default.model if default else None
+
+    @property
+    def feature_names(self) -> Optional[List[str]]:
+        default = self._models.get(DEFAULT_MODEL_NAME)
+        return default.feature_names if default else None
+
+    def model_versions(self) -> Dict[str, str]:
+        return {name: loaded.version for name, loaded in self._models.items() if loaded}
+
+    def _sources(self, name: str) -> Tuple[ModelRegistry, Path, Path]:
+        registry = ModelRegistry(self.registry_dir, name)
+        if name == DEFAULT_MODEL_NAME:
+            return registry, self.model_path, self.feature_names_path
+        model_path = symbol_model_path(name, str(self.models_dir))
+        return registry, model_path, model_path.with_name("feature_names.joblib")
+
+    def _load(self, name: str) -> Optional[LoadedModel]:
+        registry, model_path, feature_names_path = self._sources(name)
+        loaded = load_current_model(registry, model_path, feature_names_path)
+        self._models[name] = loaded
+        return loaded
+
+    def refresh_models(self) -> List[str]:
+        """
+        Reloads every model whose active version changed since it was loaded and swaps
+        it in. A model that fails to load, or whose source disappeared, is kept as it
+        is. Returns the names of the models swapped.
+        """
+        swapped = []
+        for name, loaded in list(self._models.items()):
+            registry, model_path, feature_names_path = self._sources(name)
+            version = current_model_version(registry, model_path)
+            if version is None or (loaded is not None and loaded.version == version):
+                continue
+            try:
+                new = load_current_model(registry, model_path, feature_names_path)
+            except Exception as e:
+                log.error("inference.strategy.model_swap_fail", extra={"extra": {"name": name, "version": version, "error": repr(e)}})
+                continue
+            if new is None:
+                continue
+            self._models[name] = new
+            swapped.append(name)
+            log.info("inference.strategy.model_swapped", extra={"extra": {"name": name, "from": loaded.version if loaded else None, "to": new.version}})
+        return swapped
+
+    def _predictor_for(self, loaded: LoadedModel) -> Optional[FastPredictor]:
+        """The fast single-row predictor of a loaded model, built once per version."""
+        if not self.fast_inference:
+            return None
+        with self._predictors_lock:
+            if loaded.version not in self._predictors:
+                live = {m.version for m in list(self._models.values()) if m}
+                for version in [v for v in self._predictors if v not in live]:
+                    del self._predictors[version]
+                self._predictors[loaded.version] = build_fast_predictor(loaded.model, loaded.feature_names)
+            return self._predictors[loaded.version]
+
+    def _model_for(self, symbol: str) -> Optional[LoadedModel]:
+        """The model used for `symbol`: its own if present, else the shared one."""
+        name = symbol_key(symbol)
+        if name not in self._models:
+            self._load(name)
+        return self._models[name] or self._models.get(DEFAULT_MODEL_NAME)
 
     def evaluate(self, symbol: str, regime: str, historical_data: pd.DataFrame) -> Optional[Dict[str, Any]]:
         """
-        Generates a trading signal using the loaded ML model.
+        Generates a trading signal using the loaded ML model. The signal is reused
+        until a new bar closes, the closed bars change or the model is swapped, unless
+        the intrabar policy asks for a re-score.
         """
         if historical_data.empty or len(historical_data) < self.app_config.min_data_points:
             log.warning("inference.generate_signal.no_data", extra={"extra": {"symbol": symbol, "data_points": len(historical_data)}})
             return None
 
+        loaded = self._model_for(symbol)
+        if loaded is None:
+            log.warning("inference.generate_signal.no_model", extra={"extra": {"symbol": symbol}})
+            return None
+
+        index = historical_data.index
+        if self.intrabar_policy == "always" or not isinstance(index, pd.DatetimeIndex):
+            return self._score(symbol, regime, historical_data, loaded)[0]
+
+        now = pd.Timestamp.now(tz="UTC")
+        n_closed = closed_bar_count(index, self.bar_duration, now)
+        if n_closed == 0:
+            return self._score(symbol, regime, historical_data, loaded)[0]
+        closed = historical_data.iloc[:n_closed]
+
+        key = prediction_key(symbol, loaded.version, closed)
+        cached = self.prediction_cache.get(key)
+        if cached is not None and (self.intrabar_policy == "closed" or now - cached.computed_at < self.intrabar_refresh):
+            log.debug("inference.prediction_cache.hit", extra={"extra": {"symbol": symbol, "bar": str(key[2]), "version": loaded.version}})
+            return dict(cached.signal) if cached.signal else None
+
+        signal, scored = self._score(symbol, regime, closed if self.intrabar_policy == "closed" else historical_data, loaded)
+        if scored:
+            self.prediction_cache.put(key, signal, now)
+        return signal
+
+    def _score(self, symbol: str, regime: str, historical_data: pd.DataFrame, loaded: LoadedModel) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Computes the features of `historical_data` and scores its last row.
+        Returns (signal or None for hold, whether the model produced a prediction).
+        """
         # 1. Feature Engineering
-        features = create_features(historical_data)
+        with span("strategy.create_features"):
+            features = create_features(historical_data)
         if features.empty:
             log.warning("inference.generate_signal.no_features", extra={"extra": {"symbol": symbol}})
-            return None
+            return None, False
+        model, feature_names = loaded.model, loaded.feature_names
 
-        # Align features with the model's expected input
-        latest_features = features.iloc[-1:]
-        
         # Ensure all required feature names are present
-        missing_features = set(self.feature_names) - set(latest_features.columns)
+        missing_features = set(feature_names) - set(features.columns)
         if missing_features:
             log.error(f"Missing features required by model: {missing_features}")
-            return None
-            
-        latest_features = latest_features[self.feature_names]
+            return None, False
 
         # 2. Prediction
         try:
-            prediction = self.model.predict(latest_features)[0]
-            confidence = self.model.predict_proba(latest_features)[0].max()
-            log.info("inference.predict.details", extra={"symbol": symbol, "prediction": prediction, "confidence": confidence, "features": latest_features.to_dict('records')[0]})
+            predictor = self._predictor_for(loaded)
+            with span("strategy.predict"):
+                if predictor is not None:
+                    prediction, confidence, values = predictor.predict_latest(features)
+                else:
+                    # Align features with the model's expected input
+                    latest_features = features.iloc[-1:][feature_names]
+                    prediction = model.predict(latest_features)[0]
+                    confidence = model.predict_proba(latest_features)[0].max()
+            # The feature vector is only built for DEBUG: it is the largest record of a cycle
+            if log.isEnabledFor(logging.DEBUG):
+                row = values.tolist() if predictor is not None else latest_features.iloc[0].tolist()
+                log.debug("inference.predict.details", extra={"symbol": symbol, "prediction": prediction, "confidence": confidence, "features": dict(zip(feature_names, row))})
         except Exception as e:
             log.error("inference.predict.fail", extra={"symbol": symbol, "error": str(e)})
-            return None
+            return None, False
 
         # 3. Signal Generation
         action = None
@@ -123,7 +264,7 @@ class InferenceStrategy(Strategy):
                     "regime": regime,
                 }
             )
-            return action
+            return action, True
 
         log.info(
             "inference.generate_signal.hold",
@@ -134,7 +275,7 @@ class InferenceStrategy(Strategy):
                 "regime": regime,
             }
         )
-        return None
+        return None, True
 
 
 def get_strategy_by_name(strategy_name: str, app_config: AppConfig, broker: Broker) -> "Strategy":
@@ -0,0 +1,184 @@
+"""
+Lightweight timing spans for the trading loop.
+
+    with span("trader.get_market_data"):
+        ...
+
+    @traced("broker.submit_order")
+    def submit_order(...): ...
+
+Each finished span is added to a per-name latency histogram of the metrics
+registry (`smartcfd.metrics.span_metrics`, also exported at `/metrics`) and, while a
+cycle is open (`tracer.cycle(...)`), to that cycle's trace, which the runner
+persists to the `cycle_traces` table. The histograms and the last cycle are served
+by the health server at `/health/traces`.
+
+Tracing is off unless enabled (`tracing_enabled` or `metrics_enabled` in config.ini,
+or TRACING_ENABLED). When off, `span` returns a shared no-op context manager and `traced` functions
+cost one attribute check per call.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .metrics import Histogram, span_metrics
+
+log = logging.getLogger(__name__)
+
+
+class CycleTrace:
+    """The spans finished during one runner cycle."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.spans: List[Tuple[str, float, float]] = []  # (name, offset s, duration s)
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, duration: float) -> None:
+        with self._lock:
+            self.spans.append((name, start - self.start, duration))
+
+    def stages(self) -> Dict[str, Dict[str, float]]:
+        """Per-span-name totals: count, total_ms, max_ms."""
+        stages: Dict[str, Dict[str, float]] = {}
+        for name, _, duration in self.spans:
+            stage = stages.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stage["count"] += 1
+            stage["total_ms"] = round(stage["total_ms"] + 1000 * duration, 3)
+            stage["max_ms"] = max(stage["max_ms"], round(1000 * duration, 3))
+        return stages
+
+    def summary(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "started_at": self.started_at, "duration_ms": round(1000 * self.duration, 3), "stages": self.stages()}
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer: "Tracer", name: str):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> bool:
+        self.tracer.record(self.name, self.start, time.perf_counter() - self.start, error=exc_type is not None)
+        return False
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.histograms: Dict[str, Histogram] = {}
+        self._metrics: Dict[str, Tuple[Any, Any]] = {}
+        self.last_cycle: Optional[Dict[str, Any]] = None
+        self._cycle: Optional[CycleTrace] = None
+        self._lock = threading.Lock()
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, start: float, duration: float, error: bool = False) -> None:
+        metrics = self._metrics.get(name)
+        if metrics is None:
+            with self._lock:
+                metrics = self._metrics[name] = span_metrics(name)
+                self.histograms[name] = metrics[0]
+        metrics[0].observe(duration)
+        if error:
+            metrics[1].inc()
+        cycle = self._cycle
+        if cycle is not None:
+            cycle.add(name, start, duration)
+
+    @contextmanager
+    def cycle(self, kind: str) -> Iterator[Optional[CycleTrace]]:
+        """
+        Collects the spans of one runner cycle. Yields the CycleTrace (None when
+        tracing is off); its `duration` is set on exit.
+        """
+        if not self.enabled:
+            yield None
+            return
+        trace = CycleTrace(kind)
+        self._cycle = trace
+        try:
+            yield trace
+        finally:
+            self._cycle = None
+            trace.duration = time.perf_counter() - trace.start
+            self.record(f"cycle.{kind}", trace.start, trace.duration)
+            self.last_cycle = trace.summary()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            histograms = dict(self.histograms)
+        return {
+            "enabled": self.enabled,
+            "stages": {name: h.snapshot() for name, h in sorted(histograms.items())},
+            "last_cycle": self.last_cycle,
+        }
+
+    def reset(self) -> None:
+        """Forgets the spans seen so far (the metrics registry keeps its totals)."""
+        with self._lock:
+            self.histograms = {}
+            self._metrics = {}
+            self.last_cycle = None
+
+
+tracer = Tracer(enabled=os.getenv("TRACING_ENABLED", "0").strip().lower() in ("1", "true", "yes", "on"))
+
+
+def configure_tracing(enabled: bool) -> Tracer:
+    tracer.enabled = bool(enabled)
+    log.info("tracing.configured", extra={"extra": {"enabled": tracer.enabled}})
+    return tracer
+
+
+def span(name: str):
+    """Times the enclosed block as `name` (a no-op when tracing is off)."""
+    return tracer.span(name)
+
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of `span`."""
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                tracer.record(name, start, time.perf_counter() - start, error=True)
+                raise
+            tracer.record(name, start, time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
@@ -9,11 +9,15 @@ from .types import TradeGroup
 class TradeGroupManager:
     """
     Manages the state of trade groups in the database for client-side OCO logic.
+    With a `book`, groups are created in that trading book and only its groups are
+    listed; without one, every group is.
     """
 
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(self, conn: sqlite3.Connection, book: Optional[str] = None):
         self.conn = conn
+        self.book = book
 
+    @db.db_write("trade_groups.create_group")
     def create_group(self, symbol: str, side: str) -> TradeGroup:
         """
         Creates a new trade group record in the database.
@@ -28,18 +32,20 @@ class TradeGroupManager:
             status="new",
             created_at=now,
             updated_at=now,
+            book=self.book,
         )
         
         self.conn.execute(
             """
-            INSERT INTO trade_groups (gid, symbol, side, status, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO trade_groups (gid, symbol, side, status, created_at, updated_at, book)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
             """,
-            (group.gid, group.symbol, group.side, group.status, group.created_at, group.updated_at)
+            (group.gid, group.symbol, group.side, group.status, group.created_at, group.updated_at, group.book)
         )
         self.conn.commit()
         return group
 
+    @db.db_write("trade_groups.update_group")
     def update_group(self, gid: str, updates: Dict[str, Any]) -> Optional[TradeGroup]:
         """
         Updates an existing trade group.
@@ -68,14 +74,8 @@ class TradeGroupManager:
             updates["note"] = note
         self.update_group(gid, updates)
 
-    def get_group_by_gid(self, gid: str) -> Optional[TradeGroup]:
-        """
-        Retrieves a single trade group by its GID.
-        """
-        cur = self.conn.execute("SELECT * FROM trade_groups WHERE gid = ?", (gid,))
-        row = cur.fetchone()
-        if not row:
-            return None
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> TradeGroup:
         keys = row.keys()
         return TradeGroup(
             gid=row['gid'],
@@ -90,54 +90,36 @@ class TradeGroupManager:
             created_at=row['created_at'],
             updated_at=row['updated_at'],
             note=row['note'] if 'note' in keys else None,
+            book=row['book'] if 'book' in keys else None,
         )
 
+    def _select(self, where: str = "", params: tuple = ()) -> List[TradeGroup]:
+        """Groups matching `where` (SQL conditions), restricted to the book if there is one."""
+        conditions = [where] if where else []
+        if self.book is not None:
+            conditions.append("book = ?")
+            params = params + (self.book,)
+        sql = "SELECT * FROM trade_groups" + (" WHERE " + " AND ".join(conditions) if conditions else "")
+        return [self._from_row(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def get_group_by_gid(self, gid: str) -> Optional[TradeGroup]:
+        """
+        Retrieves a single trade group by its GID.
+        """
+        cur = self.conn.execute("SELECT * FROM trade_groups WHERE gid = ?", (gid,))
+        row = cur.fetchone()
+        if not row:
+            return None
+        return self._from_row(row)
+
     def get_groups_by_status(self, status: str) -> List[TradeGroup]:
         """
         Retrieves all trade groups with a given status.
         """
-        cur = self.conn.execute("SELECT * FROM trade_groups WHERE status = ?", (status,))
-        rows = cur.fetchall()
-        groups = []
-        for row in rows:
-            keys = row.keys()
-            groups.append(TradeGroup(
-                gid=row['gid'],
-                symbol=row['symbol'],
-                side=row['side'],
-                status=row['status'],
-                entry_order_id=row['entry_order_id'] if 'entry_order_id' in keys else None,
-                entry_filled_qty=row['entry_filled_qty'] if 'entry_filled_qty' in keys else None,
-                tp_order_id=row['tp_order_id'] if 'tp_order_id' in keys else None,
-                sl_order_id=row['sl_order_id'] if 'sl_order_id' in keys else None,
-                open_qty=row['open_qty'] if 'open_qty' in keys else None,
-                created_at=row['created_at'],
-                updated_at=row['updated_at'],
-                note=row['note'] if 'note' in keys else None,
-            ))
-        return groups
+        return self._select("status = ?", (status,))
 
     def get_all_trade_groups(self) -> List[TradeGroup]:
         """
         Retrieves all trade groups from the database.
         """
-        cur = self.conn.execute("SELECT * FROM trade_groups")
-        rows = cur.fetchall()
-        groups = []
-        for row in rows:
-            keys = row.keys()
-            groups.append(TradeGroup(
-                gid=row['gid'],
-                symbol=row['symbol'],
-                side=row['side'],
-                status=row['status'],
-                entry_order_id=row['entry_order_id'] if 'entry_order_id' in keys else None,
-                entry_filled_qty=row['entry_filled_qty'] if 'entry_filled_qty' in keys else None,
-                tp_order_id=row['tp_order_id'] if 'tp_order_id' in keys else None,
-                sl_order_id=row['sl_order_id'] if 'sl_order_id' in keys else None,
-                open_qty=row['open_qty'] if 'open_qty' in keys else None,
-                created_at=row['created_at'],
-                updated_at=row['updated_at'],
-                note=row['note'] if 'note' in keys else None,
-            ))
-        return groups
+        return self._select()
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Set, Tuple
 import pandas as pd
 import time
 
@@ -10,15 +10,52 @@ from .portfolio import PortfolioManager
 from .regime_detector import RegimeDetector, MarketRegime
 from .data_loader import DataLoader
 from .trade_group_manager import TradeGroupManager
-from smartcfd.alpaca_client import AlpacaBroker
+from .pipeline import Stage, StagedPipeline
+from .tracing import span
+from .metrics import ERRORS, ORDERS
 from .types import TradeGroup
-from alpaca_trade_api.entity import Order
 from time import sleep
 from smartcfd.db import record_order_event
 from smartcfd.indicators import atr
 
+if TYPE_CHECKING:
+    from alpaca_trade_api.entity import Order
+    from smartcfd.alpaca_client import AlpacaBroker
+
 log = logging.getLogger(__name__)
 
+def evaluate_symbols(
+    strategy: Strategy,
+    regime_detector: RegimeDetector,
+    symbols: List[str],
+    historical_data: Dict[str, pd.DataFrame],
+) -> Tuple[Dict[str, MarketRegime], List[Dict[str, Any]]]:
+    """
+    Detects the market regime of every symbol with data and collects the strategy's
+    actions for them. Returns (regimes by symbol, actions in `symbols` order).
+    """
+    market_regimes = {}
+    for symbol, data in historical_data.items():
+        if not data.empty:
+            regime = regime_detector.detect(data)
+            market_regimes[symbol] = regime
+        else:
+            log.warning("trader.run.no_data_for_regime_detection", extra={"extra": {"symbol": symbol}})
+
+    actions = []
+    for symbol in symbols:
+        if symbol in historical_data and symbol in market_regimes:
+            action = strategy.evaluate(
+                symbol=symbol,
+                regime=market_regimes[symbol],
+                historical_data=historical_data[symbol]
+            )
+            if action:
+                action['symbol'] = symbol # Add symbol to action dict
+                actions.append(action)
+    return market_regimes, actions
+
+
 class Trader:
     """
     The Trader class orchestrates the trading process.
@@ -26,7 +63,7 @@ class Trader:
     A RiskManager is used to size the orders.
     """
 
-    def __init__(self, app_config: Any, risk_config: Any, regime_config: Any, broker: AlpacaBroker, db_conn: Any, portfolio_manager: PortfolioManager, risk_manager: RiskManager):
+    def __init__(self, app_config: Any, risk_config: Any, regime_config: Any, broker: "AlpacaBroker", db_conn: Any, portfolio_manager: PortfolioManager, risk_manager: RiskManager):
         self.app_config = app_config
         self.risk_config = risk_config
         self.regime_config = regime_config
@@ -37,6 +74,8 @@ class Trader:
         self.regime_detector = RegimeDetector(app_config, regime_config)
         self.strategy = self._initialize_strategy(app_config)
         self.trade_group_manager = TradeGroupManager(db_conn)
+        # Market data of the last full cycle, reused by light reconciliation cycles
+        self._last_historical_data: Dict[str, pd.DataFrame] = {}
 
         self.reconcile_on_start = self.app_config.on_reconnect_reconcile
 
@@ -55,30 +94,57 @@ class Trader:
         Runs the trading loop, which is now a stateful reconciliation loop.
         """
         try:
+            # 0. Pick up a newly activated (or rolled back) model between cycles
+            refresh_models = getattr(self.strategy, "refresh_models", None)
+            if refresh_models is not None:
+                with span("trader.refresh_models"):
+                    refresh_models()
+
             # 1. Reconcile our internal state with the broker
             # self.reconcile_trade_groups()
 
             # 2. Reconcile portfolio state with the broker
-            self.portfolio_manager.reconcile()
+            with span("trader.reconcile_portfolio"):
+                self.portfolio_manager.reconcile()
 
             # 3. Look for new trading opportunities
-            self.evaluate_new_trades()
+            with span("trader.evaluate_new_trades"):
+                self.evaluate_new_trades()
 
         except Exception:
             log.error("trader.run.fail", exc_info=True)
+            ERRORS.labels("trader").inc()
 
-    def reconcile_trade_groups(self, historical_data: Dict[str, pd.DataFrame]):
+    def reconcile(self):
         """
-        Reconciles the state of all trade groups, including arming exits for filled entries.
+        Light cycle between bar closes: reconciles the portfolio and manages OCO exits
+        using the market data of the last full cycle. Fetches no bars and evaluates
+        no new trades.
+        """
+        try:
+            with span("trader.reconcile_portfolio"):
+                self.portfolio_manager.reconcile()
+            with span("trader.reconcile_trade_groups"):
+                self.reconcile_trade_groups(self._last_historical_data)
+        except Exception:
+            log.error("trader.reconcile.fail", exc_info=True)
+            ERRORS.labels("trader").inc()
+
+    def reconcile_trade_groups(self, historical_data: Dict[str, pd.DataFrame], symbols: Optional[Set[str]] = None):
+        """
+        Reconciles the state of all trade groups (or those of `symbols`), including arming exits for filled entries.
         """
         log.info("trader.reconcile_trade_groups.start")
         trade_groups = self.trade_group_manager.get_all_trade_groups()
+        if symbols is not None:
+            trade_groups = [g for g in trade_groups if g.symbol in symbols]
         for group in trade_groups:
             if group.status == "ENTRY_ORDER_PLACED":
                 # Check if the entry order has been filled
                 entry_order = self.broker.get_order_by_client_id(group.entry_order_id)
                 if entry_order and entry_order.status == 'filled':
                     log.info("trader.arm_exits.entry_filled", extra={"extra": {"group_id": group.gid, "symbol": group.symbol}})
+                    ORDERS.labels("filled").inc()
                     try:
                         record_order_event(
                             self.db_conn,
@@ -128,6 +194,7 @@ class Trader:
                         return False
 
                     if tp_filled:
+                        ORDERS.labels("filled").inc()
                         if _is_open(sl_order):
                             _cancel_with_backoff(sl_order.id)
                             try:
@@ -141,6 +208,7 @@ class Trader:
                             pass
                         log.info("trader.reconcile_trade_groups.closed_tp", extra={"extra": {"group_id": group.gid}})
                     elif sl_filled:
+                        ORDERS.labels("filled").inc()
                         if _is_open(tp_order):
                             _cancel_with_backoff(tp_order.id)
                             try:
@@ -155,8 +223,7 @@ class Trader:
                         log.info("trader.reconcile_trade_groups.closed_sl", extra={"extra": {"group_id": group.gid}})
                     elif tp_partial or sl_partial:
                         # Partial exit: adjust the peer order qty and refresh price using ATR if possible
-                        pos = self.portfolio_manager.get_position(group.symbol)
-                        rem_qty = float(getattr(pos, 'qty', 0.0) or 0.0)
+                        rem_qty = self.remaining_exit_qty(group, tp_order if tp_partial else sl_order)
                         peer = sl_order if tp_partial else tp_order
                         if rem_qty > 0 and peer is not None and _is_open(peer):
                             # Compute ATR-based refreshed price from provided historical data
@@ -219,7 +286,12 @@ class Trader:
                 except Exception:
                     log.error("trader.reconcile_trade_groups.manage_oco_fail", exc_info=True, extra={"extra": {"group_id": group.gid}})
     
-    def arm_exits(self, group: TradeGroup, entry_order: Order, historical_data: Dict[str, pd.DataFrame]):
+    def remaining_exit_qty(self, group: TradeGroup, partial_order: Any) -> float:
+        """Quantity still to exit after `partial_order` (the partially filled exit) of `group`: the open position."""
+        pos = self.portfolio_manager.get_position(group.symbol)
+        return float(getattr(pos, 'qty', 0.0) or 0.0)
+
+    def arm_exits(self, group: TradeGroup, entry_order: "Order", historical_data: Dict[str, pd.DataFrame]):
         """
         Arms the take-profit and stop-loss orders for a filled entry order.
         """
@@ -293,13 +365,18 @@ class Trader:
         """
         Evaluates the strategy for new trading opportunities and executes them.
         """
+        if self.app_config.cycle_mode == "pipelined":
+            return self.evaluate_new_trades_pipelined()
         watch_list = self.app_config.watch_list.split(',')
         
         # First, get historical data. The strategy's evaluate method is now responsible for this.
-        historical_data = self.strategy.get_historical_data(watch_list)
+        with span("trader.get_market_data"):
+            historical_data = self.strategy.get_historical_data(watch_list)
+        self._last_historical_data = historical_data or {}
 
         # Now that we have data, we can reconcile trade groups, which may need to arm exits
-        self.reconcile_trade_groups(historical_data)
+        with span("trader.reconcile_trade_groups"):
+            self.reconcile_trade_groups(historical_data)
 
         # If the initial data load failed or returned no valid data, we should not proceed.
         if not historical_data or all(df.empty for df in historical_data.values()):
@@ -307,40 +384,105 @@ class Trader:
             return
 
         # Check for global halt conditions (e.g., max drawdown, high volatility)
-        halted = self.risk_manager.check_for_halt(historical_data, self.app_config.trade_interval)
+        with span("trader.check_for_halt"):
+            halted = self.risk_manager.check_for_halt(historical_data, self.app_config.trade_interval)
         if halted:
             log.critical("trader.run.halted", extra={"extra": {"reason": self.risk_manager.halt_reason}})
             return
 
-        # Detect market regime for each symbol
-        market_regimes = {}
-        for symbol, data in historical_data.items():
-            if not data.empty:
-                regime = self.regime_detector.detect(data)
-                market_regimes[symbol] = regime
-            else:
-                log.warning("trader.run.no_data_for_regime_detection", extra={"extra": {"symbol": symbol}})
+        # Detect market regimes and get trading signals from the strategy
+        with span("trader.evaluate_symbols"):
+            market_regimes, actions = evaluate_symbols(self.strategy, self.regime_detector, watch_list, historical_data)
 
         # If no regimes were detected, we cannot proceed with the strategy.
         if not market_regimes:
             log.warning("trader.run.no_regimes_detected")
             return
 
-        # Now, get trading signals from the strategy using the data and regimes
-        actions = []
-        for symbol in watch_list:
-            if symbol in historical_data and symbol in market_regimes:
-                action = self.strategy.evaluate(
-                    symbol=symbol,
-                    regime=market_regimes[symbol],
-                    historical_data=historical_data[symbol]
-                )
-                if action:
-                    action['symbol'] = symbol # Add symbol to action dict
-                    actions.append(action)
-
         # Execute actions
-        self.execute_actions(actions, historical_data)
+        with span("trader.execute_actions"):
+            self.execute_actions(actions, historical_data)
+
+    def evaluate_new_trades_pipelined(self):
+        """
+        Pipelined variant of `evaluate_new_trades`: symbols flow one by one through
+        fetch -> regime detection and inference -> execution, connected by bounded
+        queues, so the bars of one symbol download while another is scored, and each
+        symbol's orders go out as soon as it has been evaluated. As in the serial cycle,
+        the trade groups of a symbol are reconciled (exits armed and managed) before its
+        orders, on the execution thread as its data arrives.
+
+        Account-level halt conditions are checked before the first fetch. The
+        volatility circuit breaker is checked per symbol as its data arrives; once it
+        trips, no further orders are placed in this cycle (orders already placed for
+        earlier symbols stand). Execution always runs on a single thread, so the risk
+        checks of each order see every order placed before it.
+        """
+        watch_list = self.app_config.watch_list.split(',')
+        if self.risk_manager.check_for_halt({}, self.app_config.trade_interval):
+            log.critical("trader.run.halted", extra={"extra": {"reason": self.risk_manager.halt_reason}})
+            historical_data = self.strategy.get_historical_data(watch_list)
+            self._last_historical_data = historical_data or {}
+            self.reconcile_trade_groups(historical_data or {})
+            return
+
+        started = time.perf_counter()
+        historical_data: Dict[str, pd.DataFrame] = {}
+        state = {"halted": False, "first_order_s": None, "orders": 0}
+
+        def fetch(symbol: str):
+            with span("trader.get_market_data"):
+                data = (self.strategy.get_historical_data([symbol]) or {}).get(symbol)
+            return symbol, data if data is not None else pd.DataFrame()
+
+        def evaluate(item):
+            symbol, data = item
+            with span("trader.evaluate_symbols"):
+                _, actions = evaluate_symbols(self.strategy, self.regime_detector, [symbol], {symbol: data})
+            return symbol, data, actions
+
+        def execute(item):
+            symbol, data, actions = item
+            historical_data[symbol] = data
+            with span("trader.reconcile_trade_groups"):
+                self.reconcile_trade_groups({symbol: data}, symbols={symbol})
+            if state["halted"] or data.empty:
+                return
+            if self.risk_manager.volatility_check(data, symbol):
+                state["halted"] = True
+                self.risk_manager.is_halted = True
+                self.risk_manager.halt_reason = f"Volatility circuit breaker tripped for {symbol}."
+                log.critical("trader.run.halted", extra={"extra": {"reason": self.risk_manager.halt_reason}})
+                return
+            if actions:
+                with span("trader.execute_actions"):
+                    self.execute_actions(actions, {symbol: data})
+                state["orders"] += len(actions)
+                if state["first_order_s"] is None:
+                    state["first_order_s"] = round(time.perf_counter() - started, 3)
+
+        pipeline = StagedPipeline([
+            Stage("fetch", fetch, self.app_config.pipeline_fetch_workers),
+            Stage("evaluate", evaluate, self.app_config.pipeline_evaluate_workers),
+        ], queue_size=self.app_config.pipeline_queue_size)
+        stats = pipeline.run(watch_list, execute)
+
+        # Ordered by the watch list, as in the serial cycle
+        self._last_historical_data = {s: historical_data[s] for s in watch_list if s in historical_data}
+        # Groups of symbols that never reached execution (a failed stage, or no longer watched)
+        leftover = {g.symbol for g in self.trade_group_manager.get_all_trade_groups()} - set(historical_data)
+        if leftover:
+            with span("trader.reconcile_trade_groups"):
+                self.reconcile_trade_groups(self._last_historical_data, symbols=leftover)
+        if not historical_data or all(df.empty for df in historical_data.values()):
+            log.warning("trader.run.no_valid_data_from_strategy")
+        log.info("trader.pipeline.complete", extra={"extra": {
+            "symbols": len(watch_list),
+            "evaluated": stats["consumed"],
+            "actions": state["orders"],
+            "first_action_s": state["first_order_s"],
+            "seconds": round(stats["seconds"], 3),
+        }})
 
     def execute_actions(self, actions: List[Dict[str, Any]], historical_data: Dict[str, pd.DataFrame]):
         """
@@ -0,0 +1,308 @@
+"""
+Records broker and market-data traffic, and replays it.
+
+Every Alpaca call made by `AlpacaBroker` and `DataLoader` goes through
+`alpaca_trade_api.REST._request`, which returns the decoded JSON of the response.
+`install(tap)` routes that method through a tap for the whole process:
+
+- `TrafficRecorder` performs the request and appends it, with its response or
+  error, to a JSON-lines log (gzip-compressed when the path ends in `.gz`). The
+  log is append-only: each runner start adds a session header and each cycle a
+  mark, so one file can hold many sessions.
+- `TrafficReplay` serves a recorded session without touching the network, as fast
+  as the trader asks for it. Responses are served per endpoint in recorded order,
+  preferring the entry whose parameters match the request, so the same recording
+  always replays the same way.
+
+API keys travel in headers and are never written; responses (account numbers,
+balances, orders) are stored verbatim.
+"""
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from alpaca_trade_api.rest import REST, APIError
+
+log = logging.getLogger(__name__)
+
+FORMAT = "smartcfd-traffic"
+VERSION = 1
+# Request parameters derived from the wall clock; ignored when matching a replayed request
+VOLATILE_PARAMS = ("start", "end")
+
+
+class ReplayExhausted(LookupError):
+    """Raised when the trader makes a request the recording holds no (more) responses for."""
+
+
+class ReplayMismatch(LookupError):
+    """Raised by a strict replay when no recorded request has the same parameters."""
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _dumps(entry: Dict[str, Any]) -> str:
+    return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+def _match_key(params: Any) -> str:
+    if isinstance(params, dict):
+        params = {k: v for k, v in params.items() if k not in VOLATILE_PARAMS}
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class TrafficRecorder:
+    """Performs requests and appends them to `path`, with optional session metadata."""
+
+    def __init__(self, path: str, meta: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._file = _open(path, "a")
+        self._write({"session": {"format": FORMAT, "version": VERSION, "started": time.time(), **(meta or {})}})
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(_dumps(entry) + "\n")
+
+    def request(self, meta: Dict[str, Any], call: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        entry = dict(meta, ts=round(time.time(), 3))
+        try:
+            response = call()
+        except APIError as e:
+            entry["error"] = {"status": e.status_code, "body": getattr(e, "_error", None) or str(e)}
+            raise
+        except Exception as e:
+            entry["error"] = {"status": None, "body": repr(e)}
+            raise
+        else:
+            entry["response"] = response
+            return response
+        finally:
+            entry["ms"] = round(1000 * (time.perf_counter() - started), 3)
+            with self._lock:
+                entry["seq"] = self._seq
+                self._seq += 1
+                self._file.write(_dumps(entry) + "\n")
+
+    def mark(self, name: str, **fields: Any) -> None:
+        """Records a cycle boundary (or any other named point) between requests."""
+        self._write({"mark": name, "ts": round(time.time(), 3), **fields})
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def read_sessions(path: str) -> List[Dict[str, Any]]:
+    """Splits a traffic log into sessions: {"meta": header, "entries": requests and marks}."""
+    sessions: List[Dict[str, Any]] = []
+    with _open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "session" in entry:
+                sessions.append({"meta": entry["session"], "entries": []})
+            elif sessions:
+                sessions[-1]["entries"].append(entry)
+    return sessions
+
+
+class TrafficReplay:
+    """
+    Serves the responses of one recorded session. With `strict=False` a request
+    whose parameters match no recorded one (e.g. client order ids built from new
+    group ids) gets the next recorded response of the same endpoint.
+    """
+
+    def __init__(self, path: str, session: int = -1, strict: bool = False):
+        sessions = read_sessions(path)
+        if not sessions:
+            raise ValueError(f"No recorded sessions in {path}")
+        chosen = sessions[session]
+        self.path = path
+        self.meta: Dict[str, Any] = chosen["meta"]
+        self.strict = strict
+        self.cycles: List[str] = [e.get("kind", "full") for e in chosen["entries"] if e.get("mark") == "cycle"]
+        self._pending: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        for entry in chosen["entries"]:
+            if "mark" not in entry:
+                self._pending.setdefault((entry["api"], entry["method"], entry["path"]), []).append(entry)
+        self._lock = threading.Lock()
+        self.stats: Counter = Counter()
+
+    @property
+    def remaining(self) -> int:
+        return sum(len(q) for q in self._pending.values())
+
+    def _take(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        endpoint = (meta["api"], meta["method"], meta["path"])
+        with self._lock:
+            queue = self._pending.get(endpoint)
+            if not queue:
+                self.stats["exhausted"] += 1
+                raise ReplayExhausted(f"No recorded response left for {meta['method']} {meta['path']}")
+            key = _match_key(meta["params"])
+            for i, entry in enumerate(queue):
+                if _match_key(entry["params"]) == key:
+                    self.stats["matched"] += 1
+                    return queue.pop(i)
+            if self.strict:
+                self.stats["mismatched"] += 1
+                raise ReplayMismatch(f"No recorded {meta['method']} {meta['path']} with params {key}")
+            self.stats["substituted"] += 1
+            return queue.pop(0)
+
+    def request(self, meta: Dict[str, Any], call: Callable[[], Any]) -> Any:
+        entry = self._take(meta)
+        error = entry.get("error")
+        if error is None:
+            return entry.get("response")
+        if error["status"] is None:
+            raise requests.ConnectionError(error["body"])
+        response = requests.Response()
+        response.status_code = error["status"]
+        body = error["body"] if isinstance(error["body"], dict) else {"message": error["body"]}
+        raise APIError(body, requests.HTTPError(response=response))
+
+
+_ORIGINAL_REQUEST = REST._request
+_active: Any = None
+
+
+def _tapped_request(self, method, path, data=None, base_url=None, api_version=None):
+    tap = _active
+    if tap is None:
+        return _ORIGINAL_REQUEST(self, method, path, data, base_url, api_version)
+    meta = {
+        # DataLoader's calls go to the data URL; everything else is the trading API
+        "api": "data" if base_url else "trading",
+        "method": method,
+        "path": f"/{api_version or self._api_version}{path}",
+        "params": data,
+    }
+    return tap.request(meta, lambda: _ORIGINAL_REQUEST(self, method, path, data, base_url, api_version))
+
+
+def install(tap: Any) -> None:
+    """Routes every alpaca REST request of this process through `tap`."""
+    global _active
+    _active = tap
+    REST._request = _tapped_request
+    log.info("traffic.install", extra={"extra": {"tap": type(tap).__name__, "path": getattr(tap, "path", None)}})
+
+
+def uninstall() -> None:
+    global _active
+    _active = None
+    REST._request = _ORIGINAL_REQUEST
+
+
+@contextmanager
+def installed(tap: Any) -> Iterator[Any]:
+    install(tap)
+    try:
+        yield tap
+    finally:
+        uninstall()
+
+
+def _from_meta(cls: Any, values: Optional[Dict[str, Any]]) -> Any:
+    import dataclasses
+    names = {f.name for f in dataclasses.fields(cls)}
+    return cls(**{k: v for k, v in (values or {}).items() if k in names})
+
+
+def replay_session(replay: TrafficReplay, cycles: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Rebuilds the recorded trader from the session's configuration (with the model
+    configured in this environment, an in-memory trades database and no shards) and
+    runs the recorded cycles against `replay`. Stops early when the recording runs
+    out of responses. Returns cycle timings, stage histograms and replay counters.
+    """
+    import statistics
+    from .alpaca_client import AlpacaBroker
+    from .config import AppConfig, RegimeConfig, RiskConfig
+    from .db import connect, init_schema
+    from .portfolio import PortfolioManager
+    from .risk import RiskManager
+    from .scheduler import FULL
+    from .tracing import configure_tracing, tracer
+    from .trader import Trader
+
+    app_config = _from_meta(AppConfig, replay.meta.get("app_config"))
+    risk_config = _from_meta(RiskConfig, replay.meta.get("risk_config"))
+    regime_config = _from_meta(RegimeConfig, replay.meta.get("regime_config"))
+    kinds = replay.cycles or [FULL] * (cycles or 1)
+    if cycles is not None:
+        kinds = kinds[:cycles]
+
+    configure_tracing(True)
+    tracer.reset()
+    durations: List[float] = []
+    with installed(replay):
+        broker = AlpacaBroker(key_id="replay", secret_key="replay", paper=(app_config.alpaca_env == "paper"))
+        broker.get_account_info()  # As the runner does at startup
+        conn = connect(":memory:")
+        init_schema(conn)
+        portfolio_manager = PortfolioManager(broker)
+        risk_manager = RiskManager(portfolio_manager, risk_config, broker)
+        trader = Trader(app_config, risk_config, regime_config, broker, conn, portfolio_manager, risk_manager)
+        for kind in kinds:
+            exhausted = replay.stats["exhausted"]
+            started = time.perf_counter()
+            with tracer.cycle(kind):
+                trader.run() if kind == FULL else trader.reconcile()
+            durations.append(time.perf_counter() - started)
+            if replay.stats["exhausted"] > exhausted:
+                log.warning("traffic.replay.exhausted", extra={"extra": {"cycle": len(durations), "recorded_cycles": len(kinds)}})
+                break
+    entries = conn.execute("SELECT COUNT(*) FROM order_events WHERE event_type = 'entry_submitted'").fetchone()[0]
+    ordered = sorted(durations)
+    return {
+        "session_started": replay.meta.get("started"),
+        "cycles": len(durations),
+        "recorded_cycles": len(replay.cycles),
+        "cycle_ms": {
+            "mean": round(1000 * statistics.fmean(durations), 3) if durations else 0.0,
+            "p50": round(1000 * ordered[len(ordered) // 2], 3) if ordered else 0.0,
+            "max": round(1000 * ordered[-1], 3) if ordered else 0.0,
+        },
+        "entries_submitted": entries,
+        "replay": dict(replay.stats),
+        "unserved_responses": replay.remaining,
+        "stages": tracer.snapshot()["stages"],
+    }
+
+
+def describe(path: str) -> List[Dict[str, Any]]:
+    """Per-session summary of a traffic log: cycles, requests by endpoint, errors and time spent waiting."""
+    summaries = []
+    for session in read_sessions(path):
+        requests_ = [e for e in session["entries"] if "mark" not in e]
+        summaries.append({
+            "started": session["meta"].get("started"),
+            "watch_list": (session["meta"].get("app_config") or {}).get("watch_list"),
+            "cycles": sum(1 for e in session["entries"] if e.get("mark") == "cycle"),
+            "requests": len(requests_),
+            "errors": sum(1 for e in requests_ if "error" in e),
+            "network_ms": round(sum(e.get("ms", 0.0) for e in requests_), 3),
+            "endpoints": dict(Counter(f"{e['method']} {e['path']}" for e in requests_).most_common()),
+        })
+    return summaries
@@ -0,0 +1,134 @@
+"""
+Builds the model's training matrix with bounded memory.
+
+Features are computed over fixed-size chunks of bars (each preceded by enough
+warm-up bars for the rolling and exponential indicators to converge) and written
+straight into one preallocated, C-contiguous float32 matrix. Only the rows that are
+fully defined and can be labelled are kept. The matrix is handed to XGBoost as a
+zero-copy DataFrame view, which the `hist` tree method quantises into a
+QuantileDMatrix without materialising another float copy.
+"""
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from smartcfd.features import create_features
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 200_000
+DEFAULT_WARMUP_ROWS = 500
+
+
+def create_target(df: pd.DataFrame, period: int = 5) -> pd.Series:
+    """
+    Creates the target variable for classification.
+    - 1: Buy (price is expected to increase significantly)
+    - 2: Sell (price is expected to decrease significantly)
+    - 0: Hold (price is not expected to move significantly)
+    """
+    future_returns = df['close'].pct_change(periods=period).shift(-period)
+
+    # Define thresholds for buy/sell signals
+    # These should be tuned based on asset volatility and strategy goals
+    buy_threshold = 0.01  # e.g., 1% increase
+    sell_threshold = -0.01 # e.g., 1% decrease
+
+    conditions = [
+        future_returns > buy_threshold,
+        future_returns < sell_threshold
+    ]
+    choices = [1, 2] # 1 for Buy, 2 for Sell
+
+    return np.select(conditions, choices, default=0) # 0 for Hold
+
+
+def numeric_feature_columns(features: pd.DataFrame) -> List[str]:
+    """`feature_*` columns with a numeric dtype (placeholder columns holding pd.NA are skipped)."""
+    return [c for c in features.columns if c.startswith('feature_') and pd.api.types.is_numeric_dtype(features[c])]
+
+
+@dataclass
+class TrainingMatrix:
+    """Float32 feature matrix (rows x features, C-contiguous) with its labels and bar timestamps."""
+    X: np.ndarray
+    y: np.ndarray
+    index: pd.DatetimeIndex
+    feature_names: List[str]
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    @property
+    def nbytes(self) -> int:
+        return self.X.nbytes + self.y.nbytes
+
+    def frame(self) -> pd.DataFrame:
+        """The features as a DataFrame sharing memory with `X`."""
+        return pd.DataFrame(self.X, index=self.index, columns=self.feature_names, copy=False)
+
+    def labels(self) -> pd.Series:
+        return pd.Series(self.y, index=self.index, name='target', copy=False)
+
+    def after(self, cutoff: pd.Timestamp) -> "TrainingMatrix":
+        """Rows strictly after `cutoff`, as views of this matrix."""
+        start = int(self.index.searchsorted(cutoff, side='right'))
+        return TrainingMatrix(self.X[start:], self.y[start:], self.index[start:], self.feature_names)
+
+
+def build_training_matrix(
+    df: pd.DataFrame,
+    feature_names: Optional[Sequence[str]] = None,
+    period: int = 5,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    warmup_rows: int = DEFAULT_WARMUP_ROWS,
+) -> TrainingMatrix:
+    """
+    Builds the training matrix for the bars in `df` (sorted by time).
+
+    `feature_names` fixes the columns and their order (e.g. those of a model being
+    updated); by default all numeric feature columns are used. The last `period` bars,
+    whose future return is not known yet, are left out. Peak memory is the output
+    matrix plus the float64 features of one chunk.
+    """
+    if isinstance(df.index, pd.MultiIndex):
+        df = df.set_axis(df.index.get_level_values('timestamp'))
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df = df.set_axis(pd.to_datetime(df.index, utc=True))
+    if 'close' not in df.columns:
+        df = df.rename(columns=str.lower)
+
+    n_rows = len(df)
+    target = create_target(df, period=period).astype(np.int32)
+    labelled = np.arange(n_rows) < max(n_rows - period, 0)
+
+    X: Optional[np.ndarray] = None
+    y = np.empty(n_rows, dtype=np.int32)
+    keep = np.zeros(n_rows, dtype=bool)
+    n_kept = 0
+    for start in range(0, n_rows, chunk_rows):
+        stop = min(start + chunk_rows, n_rows)
+        lo = max(0, start - warmup_rows)
+        features = create_features(df.iloc[lo:stop]).iloc[start - lo:]
+        if feature_names is None:
+            feature_names = numeric_feature_columns(features)
+        if X is None:
+            X = np.empty((n_rows, len(feature_names)), dtype=np.float32)
+
+        values = features[list(feature_names)].to_numpy(dtype=np.float32, na_value=np.nan)
+        valid = labelled[start:stop] & ~np.isnan(values).any(axis=1)
+        n_valid = int(valid.sum())
+        X[n_kept:n_kept + n_valid] = values[valid]
+        y[n_kept:n_kept + n_valid] = target[start:stop][valid]
+        keep[start:stop] = valid
+        n_kept += n_valid
+        del features, values
+
+    if X is None:
+        X = np.empty((0, len(feature_names or [])), dtype=np.float32)
+    matrix = TrainingMatrix(X=X[:n_kept], y=y[:n_kept], index=df.index[keep], feature_names=list(feature_names or []))
+    log.info("training_data.matrix", extra={"extra": {"bars": n_rows, "rows": n_kept, "features": len(matrix.feature_names), "mbytes": round(matrix.nbytes / 2**20, 1)}})
+    return matrix
@@ -0,0 +1,130 @@
+"""
+Trains one model per symbol in parallel.
+
+Each symbol is trained in its own process with a fixed thread budget, so the
+XGBoost/OpenMP threads of all jobs together never exceed the CPU budget. Artifacts
+are written per symbol:
+
+    <models_dir>/<SYMBOL>/model.joblib, feature_names.joblib, training_metadata.json
+    <reports_dir>/<SYMBOL>/...
+
+`InferenceStrategy` routes each symbol to its own model when one exists and falls
+back to the shared `models/model.joblib` otherwise.
+"""
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .dataset_store import symbol_key
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MODELS_DIR = os.getenv("MODELS_DIR", "models")
+
+# Thread-pool variables read by OpenMP/BLAS when a worker process starts
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def symbol_model_path(symbol: str, models_dir: str = DEFAULT_MODELS_DIR) -> Path:
+    return Path(models_dir) / symbol_key(symbol) / "model.joblib"
+
+
+def plan_cpu_budget(n_jobs: int, cpu_budget: Optional[int] = None, max_workers: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Splits `cpu_budget` cores (default: all) over `n_jobs` training jobs.
+    Returns (worker processes, threads per worker) with workers * threads <= cpu_budget.
+    """
+    cpu_budget = max(1, cpu_budget or os.cpu_count() or 1)
+    workers = max(1, min(n_jobs, max_workers or cpu_budget, cpu_budget))
+    return workers, max(1, cpu_budget // workers)
+
+
+@dataclass
+class TrainingJobResult:
+    symbol: str
+    model_path: Optional[str]
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.model_path is not None
+
+
+def _limit_threads(n_threads: int) -> None:
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+
+
+def _train_symbol(job: Dict[str, Any], registry_dir: Optional[str] = None) -> TrainingJobResult:
+    """Worker entry point: trains and saves the model of one symbol, then publishes it."""
+    _limit_threads(job["n_jobs"])
+    # Imported in the worker, after the thread limits are set
+    from smartcfd.model_trainer import train_and_evaluate_model
+    from smartcfd.model_registry import ModelRegistry
+
+    started = time.perf_counter()
+    try:
+        model_path = train_and_evaluate_model(**job)
+        if model_path and registry_dir:
+            ModelRegistry(registry_dir, symbol_key(job["symbol"])).publish(model_path)
+        return TrainingJobResult(job["symbol"], model_path, time.perf_counter() - started)
+    except Exception as e:
+        return TrainingJobResult(job["symbol"], None, time.perf_counter() - started, error=repr(e))
+
+
+def train_symbols(
+    symbols: List[str],
+    start_date: str,
+    end_date: str,
+    timeframe_str: str,
+    models_dir: str = DEFAULT_MODELS_DIR,
+    reports_dir: str = "reports",
+    cpu_budget: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    publish: bool = True,
+    **train_kwargs: Any,
+) -> List[TrainingJobResult]:
+    """
+    Trains a model for every symbol, `plan_cpu_budget` jobs at a time. Extra keyword
+    arguments (e.g. `dataset_root`, `offline`, `search_mode`) are passed to
+    `train_and_evaluate_model`. If `publish`, each model is published and activated in
+    the model registry under `<models_dir>/registry`. Returns one result per symbol,
+    in input order.
+    """
+    registry_dir = str(Path(models_dir) / "registry") if publish else None
+    workers, threads = plan_cpu_budget(len(symbols), cpu_budget, max_workers)
+    log.info("training_orchestrator.start", extra={"extra": {"symbols": symbols, "workers": workers, "threads_per_job": threads}})
+
+    jobs = [
+        dict(
+            train_kwargs,
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            timeframe_str=timeframe_str,
+            model_output_path=str(symbol_model_path(symbol, models_dir)),
+            reports_dir=str(Path(reports_dir) / symbol_key(symbol)),
+            n_jobs=threads,
+        )
+        for symbol in symbols
+    ]
+
+    results: Dict[str, TrainingJobResult] = {}
+    # 'spawn' so workers do not inherit an already initialised OpenMP runtime
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {executor.submit(_train_symbol, job, registry_dir): job["symbol"] for job in jobs}
+        for future in as_completed(futures):
+            result = future.result()
+            results[result.symbol] = result
+            if result.ok:
+                log.info("training_orchestrator.job_complete", extra={"extra": {"symbol": result.symbol, "model_path": result.model_path, "seconds": round(result.seconds, 1)}})
+            else:
+                log.error("training_orchestrator.job_fail", extra={"extra": {"symbol": result.symbol, "error": result.error or "no model produced"}})
+
+    return [results[symbol] for symbol in symbols]
@@ -99,3 +99,4 @@ class TradeGroup(BaseModel):
     created_at: str
     updated_at: str
     note: Optional[str] = None
+    book: Optional[str] = None
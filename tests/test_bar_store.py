@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from smartcfd.bar_store import MINUTE, BarStore, resample_bars
+from smartcfd.bars import Bars
+from smartcfd.data_loader import DataLoader
+from smartcfd.fake_alpaca import FakeAlpacaConfig, FakeAlpacaServer
+
+
+def _minutes(n, seed=0, start=1_700_000_000 * 10**9 // MINUTE * MINUTE):
+    """Minute bars with about a fifth of the minutes missing (no trades)."""
+    rng = np.random.default_rng(seed)
+    timestamps = start + np.flatnonzero(rng.random(n) > 0.2) * MINUTE
+    close = 100 + np.cumsum(rng.normal(0, 0.1, len(timestamps)))
+    open_ = close + rng.normal(0, 0.05, len(timestamps))
+    columns = {
+        "open": open_, "high": np.maximum(open_, close) + 0.1, "low": np.minimum(open_, close) - 0.1, "close": close,
+        "volume": rng.random(len(timestamps)) * 10, "trade_count": np.ones(len(timestamps)), "vwap": (open_ + close) / 2,
+    }
+    return Bars.from_arrays(timestamps, columns)
+
+
+def test_resampling_matches_pandas_ohlcv_aggregation():
+    bars = _minutes(2000)
+    df = bars.frame().assign(pv=lambda f: f["vwap"] * f["volume"])
+
+    expected = df.resample("15min").agg({
+        "open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum", "trade_count": "sum", "pv": "sum",
+    }).dropna(subset=["open"])
+    expected["vwap"] = expected.pop("pv") / expected["volume"]
+    resampled = resample_bars(bars, 15 * MINUTE).frame()
+
+    assert resampled.index.equals(expected.index)
+    assert np.allclose(resampled.to_numpy(), expected[resampled.columns].to_numpy())
+    # Buckets starting before `start` are left out
+    start = resampled.index[0].value + MINUTE
+    assert resample_bars(bars, 15 * MINUTE, start).frame().equals(resampled.iloc[1:])
+
+
+def test_store_updates_only_the_latest_buckets_and_matches_a_full_aggregation():
+    bars = _minutes(3000, seed=1)
+    store = BarStore(retain=1000 * MINUTE)
+    store.update("BTC/USD", bars[:1000], complete_from=int(bars.timestamps[0]))
+    hourly = store.get("BTC/USD", 60 * MINUTE)
+    assert store.get("BTC/USD", MINUTE) is not None and store.get("BTC/USD", 15 * MINUTE) is not None
+
+    # Each update re-sends the latest stored minute, as a fetch from `last_timestamp` does
+    rows, rng = 1000, np.random.default_rng(0)
+    while rows < len(bars):
+        end = min(len(bars), rows + int(rng.integers(1, 30)))
+        store.update("BTC/USD", bars[rows - 1:end])
+        rows = end
+        complete_from = store.complete_from("BTC/USD")
+        for step in (15 * MINUTE, 60 * MINUTE):
+            assert store.get("BTC/USD", step).frame().equals(resample_bars(store.get("BTC/USD", MINUTE), step, complete_from).frame())
+
+    # Old minutes are dropped past `retain`, and the hourly bars with them
+    base = store.get("BTC/USD", MINUTE)
+    assert base.timestamps[-1] - base.timestamps[0] <= 1000 * MINUTE
+    assert store.get("BTC/USD", 60 * MINUTE).timestamps[0] >= store.complete_from("BTC/USD") > hourly.timestamps[0]
+    assert store.stats()["misses"] == 2
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv("APCA_RETRY_MAX", "0")
+    with FakeAlpacaServer(FakeAlpacaConfig(rate_limit=0)) as server:
+        monkeypatch.setenv("APCA_API_DATA_URL", server.url)
+        yield server
+
+
+def test_data_loader_derives_timeframes_from_one_minute_fetch(server):
+    symbols = ["BTC/USD", "ETH/USD"]
+    loader = DataLoader("key-1", "secret", server.url, bar_store=BarStore())
+
+    data = loader.get_multi_timeframe_data(symbols, ["15m", "1h", "1d"], 50)
+
+    direct = DataLoader("key-1", "secret", server.url)
+    for interval in ("15m", "1h"):
+        fetched = direct.get_market_data(symbols, interval, 50)
+        for symbol in symbols:
+            derived = data[interval][symbol]
+            assert len(derived) == 50 and str(derived.index.tz) == "UTC"
+            # The closed bars agree with the server's own; the last is the bar in progress
+            closed = derived.index[:-1].intersection(fetched[symbol].index)
+            assert len(closed) >= 47  # The direct fetch ends with the bar in progress and the snapshot
+            assert np.allclose(derived.loc[closed].to_numpy(), fetched[symbol].loc[closed].to_numpy())
+    assert not data["1d"]["BTC/USD"].empty  # Day bars are fetched as they are
+
+    # Later calls only fetch the minutes since the latest stored one
+    server.api.stats.clear()
+    again = loader.get_market_data(symbols, "1h", 50)
+    assert server.api.stats == {"GET /v1beta3/crypto/us/bars": 1, "GET /v1beta3/crypto/us/snapshots": 1}
+    assert len(again["BTC/USD"]) == 50 and again["BTC/USD"].index.is_monotonic_increasing
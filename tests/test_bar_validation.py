@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from smartcfd.data_loader import has_anomalous_data, has_data_gaps, parse_interval, validate_bars
+
+FIFTEEN_MINUTES = parse_interval("15m")
+
+
+def _bars(index, **overrides):
+    n = len(index)
+    columns = {"open": np.full(n, 100.0), "high": np.full(n, 101.0), "low": np.full(n, 99.0), "close": np.full(n, 100.5), "volume": np.full(n, 10.0)}
+    columns.update(overrides)
+    return pd.DataFrame(columns, index=index)
+
+
+def test_gaps_are_counted_without_touching_the_frame():
+    grid = pd.date_range("2024-01-01", periods=40, freq="15min")  # naive, taken as UTC
+    df = _bars(grid.delete([5, 6, 20]))
+
+    validation = validate_bars(df, FIFTEEN_MINUTES)
+
+    assert (validation.rows, validation.missing, validation.expected) == (37, 3, 40)
+    assert validation.first_missing == pd.Timestamp("2024-01-01 01:15", tz="UTC")
+    assert not has_data_gaps(df, FIFTEEN_MINUTES)  # 7.5% missing, within the 10% tolerance
+    assert has_data_gaps(df, FIFTEEN_MINUTES, tolerance=0.05)
+    assert df.index.tz is None
+
+    # Order doesn't matter; an off-grid forming bar after the last close isn't a gap
+    shuffled = df.iloc[np.random.default_rng(0).permutation(len(df))]
+    assert validate_bars(shuffled, FIFTEEN_MINUTES).missing == 3
+    forming = _bars(grid.append(pd.DatetimeIndex([grid[-1] + pd.Timedelta("4min")])))
+    assert validate_bars(forming, FIFTEEN_MINUTES).missing == 0
+
+
+def test_incremental_validation_matches_a_full_pass():
+    grid = pd.date_range("2024-01-01", periods=200, freq="15min", tz="UTC")
+    first = _bars(grid[:150].delete([10, 11]))
+    previous = validate_bars(first, FIFTEEN_MINUTES)
+
+    # The next window drops old bars, revises the last one and adds new ones after a gap
+    window = _bars(grid[20:150].append(grid[152:170]))
+    window.iloc[129, window.columns.get_loc("volume")] = 0.0
+    incremental = validate_bars(window, FIFTEEN_MINUTES, previous=previous)
+    full = validate_bars(window, FIFTEEN_MINUTES)
+
+    assert incremental.checked_rows == 19
+    assert full.checked_rows == len(window)
+    for field in ("timestamps", "missing_before", "bad_price", "inverted", "zero_volume_move", "bar_range"):
+        assert np.array_equal(getattr(incremental, field), getattr(full, field)), field
+    # The revised bar was the last one checked before, so it is checked again
+    assert incremental.missing == 2 and incremental.zero_volume_move[129]
+
+    # An unrelated window is validated from scratch
+    assert validate_bars(_bars(grid[160:]), FIFTEEN_MINUTES, previous=previous).checked_rows == 40
+
+
+def test_incremental_validation_replaces_the_forming_bar():
+    grid = pd.date_range("2024-01-01", periods=160, freq="15min", tz="UTC")
+    # Live windows end in the forming snapshot bar, off the 15m grid
+    first = _bars(grid[:150].append(pd.DatetimeIndex([grid[149] + pd.Timedelta("7min")])))
+    previous = validate_bars(first, FIFTEEN_MINUTES)
+    assert previous.checked_rows == 151
+
+    # Next cycle: the forming bar became the completed bar at 15m, followed by a new forming bar
+    window = _bars(grid[1:151].append(pd.DatetimeIndex([grid[150] + pd.Timedelta("7min")])))
+    incremental = validate_bars(window, FIFTEEN_MINUTES, previous=previous)
+    full = validate_bars(window, FIFTEEN_MINUTES)
+
+    assert incremental.checked_rows == 2
+    for field in ("timestamps", "missing_before", "bad_price", "inverted", "zero_volume_move", "bar_range"):
+        assert np.array_equal(getattr(incremental, field), getattr(full, field)), field
+    assert incremental.missing == 0
+
+
+def test_price_sanity_and_spikes_in_one_pass():
+    index = pd.date_range("2024-01-01", periods=20, freq="1min", tz="UTC")
+    df = _bars(index, high=np.r_[np.full(19, 101.0), 130.0], volume=np.r_[0.0, np.full(19, 10.0)])
+    df.columns = [c.upper() for c in df.columns]
+
+    validation = validate_bars(df, None)
+
+    assert validation.spike_ratio == 15.5  # 31 against an average range of 2
+    assert validation.zero_volume_move.sum() == 1 and not validation.bad_price.any()
+    assert not has_anomalous_data(df)  # spikes are only logged
+
+    df.iloc[3, 0] = 0.0
+    assert has_anomalous_data(df)
+    assert list(df.columns) == ["OPEN", "HIGH", "LOW", "CLOSE", "VOLUME"]
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from smartcfd.bars import BAR_COLUMNS, Bars
+from smartcfd.benchmarks import FakeMarketDataAPI, synthetic_universe
+from smartcfd.data_loader import DataLoader
+from smartcfd.features import create_features
+
+MINUTE = 60_000_000_000
+
+
+def test_bars_are_one_read_only_block_shared_by_views():
+    timestamps = 1_700_000_000 * 10**9 + np.arange(60, dtype=np.int64) * MINUTE
+    bars = Bars.from_arrays(timestamps, {"open": np.arange(60.0), "close": np.arange(60.0) + 0.5}, dtype="float32")
+
+    frame = bars.frame()
+    assert list(frame.columns) == list(BAR_COLUMNS) and (frame.dtypes == np.float32).all()
+    assert np.array_equal(bars.timestamps, timestamps) and str(frame.index.tz) == "UTC"
+    assert np.isnan(bars.column("vwap")).all()
+    assert np.shares_memory(frame["close"].to_numpy(), bars.values)
+    with pytest.raises(ValueError):
+        frame.iloc[0, 0] = 1.0
+
+    tail = bars.tail(3)
+    assert np.shares_memory(tail.frame().to_numpy(), bars.values) and not tail.owns_block()
+    compact = tail.compact()
+    assert compact.owns_block() and not np.shares_memory(compact.values, bars.values)
+    assert compact.frame().equals(tail.frame()) and bars.compact() is bars
+    assert create_features(frame).index.equals(frame.index)  # reads the view without writing to it
+
+
+def test_forming_bar_is_merged_when_the_block_is_built():
+    timestamps = np.arange(3, dtype=np.int64) * MINUTE
+    columns = {"open": np.ones(3), "close": np.ones(3), "volume": np.ones(3)}
+
+    replaced = Bars.from_arrays(timestamps, columns, last=(2 * MINUTE, {"close": 5.0}))
+    appended = Bars.from_arrays(timestamps, columns, last=(3 * MINUTE, {"close": 5.0}))
+    stale = Bars.from_arrays(timestamps, columns, last=(MINUTE, {"close": 5.0}))
+
+    assert len(replaced) == 3 and replaced.column("close")[-1] == 5.0 and replaced.column("open")[-1] == 1.0
+    assert len(appended) == 4 and appended.column("close")[-1] == 5.0 and np.isnan(appended.column("open")[-1])
+    assert len(stale) == 3 and (stale.column("close") == 1.0).all()
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_market_data_frames_are_compact_views(dtype):
+    frames = synthetic_universe(300, 2, seed=0, end=pd.Timestamp.now(tz="UTC"))
+    loader = DataLoader("key", "secret", "https://paper-api.alpaca.markets", bar_dtype=dtype)
+    loader.api = FakeMarketDataAPI(frames)
+
+    data = loader.get_market_data(list(frames), "15m", 100)
+
+    for symbol, df in data.items():
+        assert len(df) == 100 and (df.dtypes == dtype).all()
+        block = df._mgr.blocks[0].values
+        assert df._mgr.nblocks == 1 and not block.flags.writeable
+        assert block.nbytes == 100 * len(BAR_COLUMNS) * np.dtype(dtype).itemsize
+        assert block.base is not None and len(block.base) > 100  # A view of the fetch's block, not a second copy
+        assert np.allclose(df["close"].iloc[:-1], frames[symbol]["close"].iloc[-99:], rtol=1e-6)
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from smartcfd.benchmarks import FakeMarketDataAPI, compare_results, run_benchmarks, synthetic_ohlcv, synthetic_universe
+from smartcfd.data_loader import DataLoader
+
+
+def test_synthetic_bars_are_seeded_and_consistent():
+    bars = synthetic_ohlcv(500, seed=3)
+    again = synthetic_ohlcv(500, seed=3, end=pd.Timestamp("2025-06-01 12:07", tz="UTC"))
+
+    np.testing.assert_array_equal(bars.to_numpy(), again.to_numpy())
+    assert again.index[-1] == pd.Timestamp("2025-06-01 12:00", tz="UTC")
+    assert bars.index.is_monotonic_increasing and (bars.index.to_series().diff().dropna() == pd.Timedelta("15min")).all()
+    assert (bars["high"] >= bars[["open", "close"]].max(axis=1)).all()
+    assert (bars["low"] <= bars[["open", "close"]].min(axis=1)).all()
+    assert not synthetic_ohlcv(500, seed=4)["close"].equals(bars["close"])
+
+
+def test_fake_market_data_feeds_the_data_loader():
+    frames = synthetic_universe(300, 3, seed=1, end=pd.Timestamp.now(tz="UTC"))
+    loader = DataLoader("key", "secret", "https://paper-api.alpaca.markets")
+    loader.api = FakeMarketDataAPI(frames)
+
+    data = loader.get_market_data(list(frames), "15m", 200)
+
+    assert sorted(data) == sorted(frames)
+    for symbol, df in data.items():
+        assert len(df) == 200
+        # The snapshot bar is appended after the last historical bar
+        assert df.index[-1] == frames[symbol].index[-1] + pd.Timedelta("15min")
+
+
+def test_run_records_json_serialisable_results():
+    results = run_benchmarks(cases=["indicators.rsi", "data.has_data_gaps"], sizes=[(200, 2), (10_000, 10)], repeat=2, min_time=0.001, max_rows=10_000)
+
+    rows = {(r["name"], r["bars"]): r for r in results["results"]}
+    assert rows[("indicators.rsi", 200)]["repeat"] == 2
+    assert rows[("indicators.rsi", 200)]["median_s"] > 0
+    assert "skipped" in rows[("data.has_data_gaps", 10_000)]
+    json.dumps(results)
+
+
+def test_compare_flags_regressions_beyond_the_threshold():
+    def run(*timings):
+        return {"results": [{"name": name, "bars": 1000, "symbols": 1, "median_s": s} for name, s in timings]}
+
+    baseline = run(("a", 1.0), ("b", 1.0), ("c", 1.0), ("gone", 1.0))
+    current = run(("a", 1.05), ("b", 1.25), ("c", 0.5), ("added", 1.0))
+
+    status = {row["name"]: row["status"] for row in compare_results(baseline, current, threshold=0.10)}
+    assert status == {"a": "ok", "b": "regression", "c": "improvement", "gone": "missing", "added": "new"}
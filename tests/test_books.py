@@ -0,0 +1,135 @@
+import sqlite3
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+from smartcfd import books
+from smartcfd.config import AppConfig, RegimeConfig, RiskConfig
+from smartcfd.db import init_schema
+from smartcfd.profiles import build_profile, load_profiles, normalize_symbol
+
+
+def test_profiles_load_the_repo_configs():
+    profiles = {p.name: p for p in load_profiles(["configs/crypto.yml", "configs/multi_asset.yml"], AppConfig(), RiskConfig())}
+
+    crypto = profiles["crypto_1h"]
+    assert crypto.symbols[:2] == ["BTC/USD", "ETH/USD"] and crypto.app_config.trade_interval == "1h"
+    assert crypto.app_config.trade_confidence_threshold == 0.60  # The explicit field wins over ml_threshold
+    assert crypto.risk_config.risk_per_trade_percent == 2.0
+    assert (crypto.limits.max_trades, crypto.limits.cooldown_minutes, crypto.limits.class_caps) == (10, 30.0, {"crypto": 2})
+
+    multi = profiles["multi_example"]
+    assert multi.symbols == ["BTC/USD", "SPY"]  # Forex and commodity symbols are not tradable on Alpaca
+    assert set(multi.limits.class_risk_percent) <= {"crypto", "equity", "forex", "commodity"}
+    assert normalize_symbol("EURUSD=X") is None and normalize_symbol("eth-usdt") == "ETH/USDT"
+
+
+class _Strategy:
+    """Scores every symbol as a buy at its last close / 100 confidence, counting calls."""
+
+    def __init__(self):
+        self.evaluated = []
+        self.data_loader = None
+
+    def evaluate(self, symbol, regime, historical_data):
+        self.evaluated.append(symbol)
+        return {"action": "trade", "side": "buy", "confidence": float(historical_data["close"].iloc[-1]) / 100}
+
+
+def test_book_runner_shares_data_and_signals_and_keeps_books_apart(monkeypatch, tmp_path):
+    monkeypatch.setenv("ORDER_EVENTS_CSV", str(tmp_path / "events.csv"))
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    init_schema(conn)
+    strategies = []
+    monkeypatch.setattr(books, "get_strategy_by_name", lambda *args: strategies.append(_Strategy()) or strategies[-1])
+    monkeypatch.setattr(books, "DataLoader", MagicMock())
+
+    base = AppConfig(trade_interval="1h", min_data_points=10)
+    wide = build_profile("wide", {"watch": ["BTC-USD", "ETH-USD", "SOL-USD"], "ml_threshold": 0.5, "max_trades": 2}, base, RiskConfig())
+    narrow = build_profile("narrow", {"watch": ["ETH-USD", "SOL-USD"], "ml_threshold": 0.7, "min_data_points": 30, "cooldown_min": 60}, base, RiskConfig())
+    runner = books.BookRunner([wide, narrow], RegimeConfig(), MagicMock(), conn, MagicMock())
+    assert len(runner.desks) == 1 and runner.trade_interval == "1h"
+
+    index = pd.date_range("2024-01-01", periods=40, freq="h", tz="UTC")
+    closes = {"BTC/USD": 90.0, "ETH/USD": 80.0, "SOL/USD": 60.0}
+    runner.data_loader.get_market_data.return_value = {
+        s: pd.DataFrame({"open": c, "high": c + 1, "low": c - 1, "close": np.full(len(index), c), "volume": 1.0}, index=index)
+        for s, c in closes.items()
+    }
+    for book in runner.books:
+        book.risk_manager.check_for_halt = MagicMock(return_value=False)
+        book.risk_manager.volatility_check = MagicMock(return_value=False)
+        book.risk_manager.calculate_order_qty = MagicMock(return_value=(1.0, 100.0))
+        book.broker.get_order_by_client_id.return_value = None
+
+    runner.run()
+
+    # One fetch and one score per symbol, over the longest window
+    runner.data_loader.get_market_data.assert_called_once_with(["BTC/USD", "ETH/USD", "SOL/USD"], "1h", 30)
+    assert len(strategies) == 1 and sorted(strategies[0].evaluated) == sorted(closes)
+    # wide: above 0.5 but capped at 2 trades; narrow: only ETH is above 0.7
+    wide_book, narrow_book = runner.books
+    assert [g.symbol for g in wide_book.trade_group_manager.get_all_trade_groups()] == ["BTC/USD", "ETH/USD"]
+    assert [g.symbol for g in narrow_book.trade_group_manager.get_all_trade_groups()] == ["ETH/USD"]
+    assert conn.execute("SELECT COUNT(*) FROM trade_groups").fetchone()[0] == 3
+
+    # Open trades count against wide's max_trades, and narrow's ETH entry is cooling down
+    runner.run()
+    assert conn.execute("SELECT COUNT(*) FROM trade_groups").fetchone()[0] == 3
+
+
+def test_book_cooldown_blocks_repeat_entries(monkeypatch, tmp_path):
+    monkeypatch.setenv("ORDER_EVENTS_CSV", str(tmp_path / "events.csv"))
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    init_schema(conn)
+    monkeypatch.setattr(books, "get_strategy_by_name", lambda *args: _Strategy())
+    monkeypatch.setattr(books, "DataLoader", MagicMock())
+    profile = build_profile("solo", {"watch": ["BTC-USD"], "cooldown_min": 30}, AppConfig(min_data_points=1), RiskConfig())
+    book = books.BookRunner([profile], RegimeConfig(), MagicMock(), conn, MagicMock()).books[0]
+
+    data = {"BTC/USD": pd.DataFrame({"close": [1.0]})}
+    action = {"action": "trade", "side": "buy", "symbol": "BTC/USD", "confidence": 0.9}
+    assert book.select_actions([action], data) == [action]
+    group = book.trade_group_manager.create_group("BTC/USD", "buy")
+    book.trade_group_manager.update_trade_group_status(group.gid, "CANCELLED")
+    assert book.select_actions([action], data) == []
+
+
+def test_books_on_one_symbol_size_exits_from_their_own_groups(monkeypatch, tmp_path):
+    monkeypatch.setenv("ORDER_EVENTS_CSV", str(tmp_path / "events.csv"))
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    init_schema(conn)
+    monkeypatch.setattr(books, "get_strategy_by_name", lambda *args: _Strategy())
+    monkeypatch.setattr(books, "DataLoader", MagicMock())
+
+    # Both repo configs watch BTC/USD on 1h; SPY (multi_asset) has no crypto bars to fetch
+    profiles = load_profiles(["configs/crypto.yml", "configs/multi_asset.yml"], AppConfig(), RiskConfig())
+    portfolio = MagicMock()
+    portfolio.get_position.return_value = SimpleNamespace(qty="3")  # Both books' BTC, netted
+    runner = books.BookRunner(profiles, RegimeConfig(), MagicMock(), conn, portfolio)
+    desk = runner.desks["1h"]
+    assert desk.symbols.count("BTC/USD") == 1 and "SPY" not in desk.symbols
+
+    orders = {}
+    for book, qty in zip(runner.books, ("2", "1")):
+        group = book.trade_group_manager.create_group("BTC/USD", "buy")
+        book.trade_group_manager.update_trade_group_exits(group.gid, f"{book.name}_tp", f"{book.name}_sl")
+        book.trade_group_manager.update_trade_group_status(group.gid, "ACTIVE")
+        orders[f"{book.name}_tp"] = SimpleNamespace(id=f"{book.name}_tp", status="new", qty=qty, filled_qty="0")
+        orders[f"{book.name}_sl"] = SimpleNamespace(id=f"{book.name}_sl", status="new", qty=qty, filled_qty="0")
+    crypto, multi = runner.books
+    orders["crypto_1h_tp"].status, orders["crypto_1h_tp"].filled_qty = "partially_filled", "0.5"
+    crypto.broker.get_order_by_client_id.side_effect = orders.get
+
+    runner.reconcile()
+
+    # Only crypto_1h's stop is resized, to what its own take-profit left (not the 3 held in the account)
+    crypto.broker.replace_order.assert_called_once()
+    args, kwargs = crypto.broker.replace_order.call_args
+    assert args == ("crypto_1h_sl",) and float(kwargs["qty"]) == 1.5
+    assert [g.status for g in multi.trade_group_manager.get_all_trade_groups()] == ["ACTIVE"]
@@ -1,8 +1,11 @@
 import io
 import json
 import logging
+import queue
+import threading
+import time
 from smartcfd.config import load_config, AppConfig
-from smartcfd.logging_setup import setup_logging, JsonFormatter
+from smartcfd.logging_setup import setup_logging, shutdown_logging, parse_sample_rates, EventSampler, JsonFormatter, NonBlockingQueueHandler
 
 def test_load_config_defaults(monkeypatch):
     for k in [
@@ -58,3 +61,75 @@ def test_logging_json_format():
     assert data["level"] == "INFO"
     assert data["logger"] == "json-test"
     assert data["a"] == 1
+
+
+def _record(msg, level=logging.INFO):
+    return logging.LogRecord("t", level, __file__, 1, msg, (), None)
+
+def test_event_sampler_rate_limits_and_samples_per_event():
+    now = [0.0]
+    sampler = EventSampler(rate_limit_per_second=2, sample_rates=parse_sample_rates("hold=0.25"), clock=lambda: now[0])
+
+    assert [sampler.filter(_record("cycle")) for _ in range(4)] == [True, True, False, False]
+    assert sampler.filter(_record("other")) is True  # Limits are per event
+    assert sampler.filter(_record("cycle", logging.WARNING)) is True  # Warnings always pass
+    now[0] = 1.0
+    record = _record("cycle")
+    assert sampler.filter(record) is True and record.suppressed == 2
+
+    kept = [sampler.filter(_record("hold")) for _ in range(8)]
+    assert kept == [True, False, False, False, True, False, False, False]
+
+def test_event_sampler_keeps_a_bounded_number_of_windows(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(EventSampler, "max_events", 8)
+    sampler = EventSampler(rate_limit_per_second=1, clock=lambda: now[0])
+    for i in range(100):
+        now[0] = i * 0.5
+        assert sampler.filter(_record(f"gap at {i}"))  # An f-string message is an event each
+    assert len(sampler._windows) <= 8
+
+    record = _record("event %s")
+    record.args = (1,)
+    assert sampler.filter(record) and not sampler.filter(_record("event %s"))  # Same template, same event
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("queue-test")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    started = time.perf_counter()
+    for i in range(5):
+        logger.info("event %s", i, extra={"extra": {"i": i}})
+    assert time.perf_counter() - started < 0.5
+    assert handler.dropped == 3
+    assert [handler.queue.get_nowait().getMessage() for _ in range(2)] == ["event 0", "event 1"]
+    logger.info("after")
+    assert handler.queue.get_nowait().queue_dropped == 3
+
+def test_setup_logging_writes_json_from_a_background_thread(capsys, monkeypatch):
+    writers = []
+    original = JsonFormatter.format
+    monkeypatch.setattr(JsonFormatter, "format", lambda self, record: writers.append(threading.current_thread()) or original(self, record))
+    root = logging.getLogger()
+    level = root.level
+    try:
+        setup_logging("INFO", rate_limit_per_second=1)
+        log = logging.getLogger("setup-test")
+        log.info("first", extra={"symbol": "BTC/USD"})
+        log.info("first")
+        log.debug("hidden")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.error("failed", exc_info=True)
+    finally:
+        shutdown_logging()
+        root.setLevel(level)
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["msg"] for line in lines] == ["first", "failed"]
+    assert lines[0]["symbol"] == "BTC/USD" and "ValueError: boom" in lines[1]["exc_info"]
+    assert writers and threading.main_thread() not in writers
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from smartcfd.dataset_store import BarDatasetStore, load_bars, months_in_range
+
+
+def make_bars(start, end, freq="1h"):
+    index = pd.date_range(start=start, end=end, freq=freq, tz="UTC", inclusive="left")
+    close = np.linspace(100, 200, len(index))
+    return pd.DataFrame({
+        "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 10.0,
+    }, index=index)
+
+
+class FakeLoader:
+    def __init__(self, bars):
+        self.bars = bars
+        self.calls = []
+
+    def fetch_historical_range(self, symbol, start_date, end_date, interval):
+        self.calls.append((symbol, start_date, end_date, interval))
+        start, end = pd.Timestamp(start_date, tz="UTC"), pd.Timestamp(end_date, tz="UTC")
+        return self.bars[(self.bars.index >= start) & (self.bars.index <= end)].copy()
+
+
+def test_months_in_range():
+    months = months_in_range("2024-01-15", "2024-03-01")
+    assert [str(m) for m in months] == ["2024-01", "2024-02"]
+
+
+def test_write_partitions_by_month_and_read_prunes(tmp_path):
+    store = BarDatasetStore(str(tmp_path))
+    bars = make_bars("2024-01-01", "2024-04-01")
+    assert store.write("BTC/USD", "1h", bars) == 3
+    assert (tmp_path / "BTC_USD" / "1h" / "2024-02.parquet").exists()
+
+    df = store.read("BTC/USD", "1h", "2024-02-10", "2024-03-05")
+    assert df.index.min() == pd.Timestamp("2024-02-10", tz="UTC")
+    assert df.index.max() < pd.Timestamp("2024-03-05", tz="UTC")
+    pd.testing.assert_series_equal(df["close"], bars.loc[df.index, "close"], check_freq=False)
+
+
+def test_write_merges_with_existing_rows(tmp_path):
+    store = BarDatasetStore(str(tmp_path))
+    bars = make_bars("2024-01-01", "2024-02-01")
+    store.write("ETH/USD", "1h", bars.iloc[:100])
+    store.write("ETH/USD", "1h", bars.iloc[50:])
+    df = store.read("ETH/USD", "1h", "2024-01-01", "2024-02-01")
+    assert len(df) == len(bars)
+    assert df.index.is_unique
+
+
+def test_load_bars_downloads_only_missing_months(tmp_path):
+    store = BarDatasetStore(str(tmp_path))
+    loader = FakeLoader(make_bars("2023-01-01", "2023-04-01"))
+
+    df = load_bars("BTC/USD", "2023-01-01", "2023-04-01", "1h", store=store, data_loader=loader)
+    assert len(loader.calls) == 3
+    assert len(df) == len(loader.bars)
+
+    # Second run is served entirely from the archive
+    again = load_bars("BTC/USD", "2023-01-01", "2023-04-01", "1h", store=store, data_loader=loader)
+    assert len(loader.calls) == 3
+    pd.testing.assert_frame_equal(df, again)
+
+
+def test_partition_written_mid_month_is_incomplete(tmp_path):
+    store = BarDatasetStore(str(tmp_path))
+    store.write("BTC/USD", "1h", make_bars("2023-01-01", "2023-02-01"))
+    month = pd.Period("2023-01", freq="M")
+    assert store.is_complete("BTC/USD", "1h", month)
+
+    path = store.partition_path("BTC/USD", "1h", month)
+    mid_month = pd.Timestamp("2023-01-20", tz="UTC").timestamp()
+    os.utime(path, (mid_month, mid_month))
+    assert not store.is_complete("BTC/USD", "1h", month)
+    assert store.missing_months("BTC/USD", "1h", "2023-01-01", "2023-02-01") == [month]
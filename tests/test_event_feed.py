@@ -0,0 +1,65 @@
+from smartcfd.db import connect, init_schema, record_order_event
+from smartcfd.event_feed import OrderEventFeed, connect_readonly
+
+
+def _record(conn, n, event_type, gid, symbol):
+    for _ in range(n):
+        record_order_event(conn, event_type, group_gid=gid, symbol=symbol)
+
+
+def test_feed_reads_only_new_events_and_keeps_running_totals(tmp_path, monkeypatch):
+    monkeypatch.setenv("ORDER_EVENTS_CSV", str(tmp_path / "events.csv"))
+    path = str(tmp_path / "trades.db")
+    writer = connect(path)
+    init_schema(writer)
+    _record(writer, 3, "submitted", "g1", "BTC/USD")
+    _record(writer, 2, "filled", "g1", "BTC/USD")
+
+    feed = OrderEventFeed(connect_readonly(path), window=4)
+    assert feed.refresh() == 5
+    assert (feed.total, feed.groups, feed.symbols) == (5, 1, 1)
+    assert dict(feed.by_type) == {"submitted": 3, "filled": 2}
+    assert len(feed.frame) == 4 and list(feed.recent(2)["id"]) == [5, 4]
+    assert feed.refresh() == 0
+
+    # Only the new ids are read; g1 and BTC/USD are not counted again
+    _record(writer, 1, "filled", "g1", "BTC/USD")
+    _record(writer, 2, "submitted", "g2", "ETH/USD")
+    assert feed.refresh() == 3
+    assert (feed.total, feed.groups, feed.symbols) == (8, 2, 2)
+    assert feed.counts_by_type().set_index("event_type")["count"].to_dict() == {"submitted": 5, "filled": 3}
+    assert list(feed.frame["id"]) == [5, 6, 7, 8]
+    assert str(feed.frame["ts"].dt.tz) == "UTC"
+
+    assert list(feed.group_events("g1")["event_type"]) == ["submitted"] * 3 + ["filled"] * 3
+    writer.close()
+
+
+def test_feed_reads_a_database_without_the_indexes(tmp_path, monkeypatch):
+    monkeypatch.setenv("ORDER_EVENTS_CSV", str(tmp_path / "events.csv"))
+    path = str(tmp_path / "trades.db")
+    writer = connect(path)
+    init_schema(writer)
+    for column in ("event_type", "group_gid", "symbol"):
+        writer.execute(f"DROP INDEX idx_order_events_{column}")  # As written before the indexes existed
+    _record(writer, 2, "submitted", "g1", "BTC/USD")
+
+    feed = OrderEventFeed(connect_readonly(path))
+    assert feed.refresh() == 2
+    assert (feed.total, feed.groups, feed.symbols) == (2, 1, 1)
+    writer.close()
+
+
+def test_order_event_queries_use_indexes(tmp_path):
+    conn = connect(str(tmp_path / "trades.db"))
+    init_schema(conn)
+    plans = {
+        "by_type": "SELECT event_type, COUNT(*) FROM order_events WHERE id > 1 AND id <= 9 GROUP BY event_type",
+        "group": "SELECT * FROM order_events WHERE group_gid = 'g' ORDER BY id",
+        "seen": "SELECT 1 FROM order_events WHERE symbol = 'BTC/USD' AND id <= 5",
+    }
+    details = {name: " ".join(r["detail"] for r in conn.execute("EXPLAIN QUERY PLAN " + sql)) for name, sql in plans.items()}
+    assert "INTEGER PRIMARY KEY" in details["by_type"]
+    assert "idx_order_events_group_gid" in details["group"]
+    assert "idx_order_events_symbol" in details["seen"]
+    conn.close()
@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+from alpaca_trade_api.rest import APIError
+
+from smartcfd.alpaca_client import AlpacaBroker
+from smartcfd.data_loader import DataLoader
+from smartcfd.fake_alpaca import FakeAlpaca, FakeAlpacaConfig, FakeAlpacaServer
+from smartcfd.metrics import RATE_LIMIT_REMAINING
+from smartcfd.types import OrderRequest
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv("APCA_RETRY_MAX", "0")
+    with FakeAlpacaServer(FakeAlpacaConfig(rate_limit=0)) as server:
+        monkeypatch.setenv("APCA_API_DATA_URL", server.url)
+        yield server
+
+
+def test_broker_orders_and_positions_round_trip(server):
+    broker = AlpacaBroker("key-1", "secret", base_url=server.url)
+
+    order = broker.submit_order(OrderRequest(symbol="BTC/USD", qty="0.5", side="buy", type="market", time_in_force="gtc", client_order_id="c-1"))
+    assert order.status == "filled"
+    assert broker.get_order_by_client_id("c-1").id == order.id
+    assert broker.get_order_by_client_id("missing") is None
+
+    [position] = broker.list_positions()
+    assert position.symbol == "BTC/USD" and float(position.qty) == 0.5
+    account = broker.get_account_info()
+    assert float(account.cash) == pytest.approx(100_000 - 0.5 * float(order.filled_avg_price))
+
+    # A take-profit far above the market stays open until cancelled
+    tp = broker.submit_take_profit_order("BTC/USD", "0.5", "sell", str(10 * float(order.filled_avg_price)), "c-1_tp")
+    assert [o.id for o in broker.get_orders()] == [tp.id]
+    broker.cancel_order(tp.id)
+    assert broker.get_orders() == []
+    # Accounts are per API key
+    assert AlpacaBroker("key-2", "secret", base_url=server.url).list_positions() == []
+
+
+def test_data_loader_reads_bars_and_snapshots(server):
+    loader = DataLoader("key-1", "secret", server.url)
+
+    data = loader.get_market_data(["BTC/USD", "ETH/USD"], "15m", 100)
+
+    for symbol in ("BTC/USD", "ETH/USD"):
+        df = data[symbol]
+        assert len(df) == 100
+        assert isinstance(df.index, pd.DatetimeIndex) and str(df.index.tz) == "UTC"
+        # Closed 15m bars, then the forming bar from the snapshot
+        assert (df.index[:-1].to_series().diff().dropna() == pd.Timedelta("15min")).all()
+        assert df.index[-1] > df.index[-2]
+        assert {"open", "high", "low", "close", "volume"} <= set(df.columns)
+    assert not data["BTC/USD"]["close"].equals(data["ETH/USD"]["close"])
+
+
+def test_rate_limit_and_error_injection(monkeypatch):
+    monkeypatch.setenv("APCA_RETRY_MAX", "0")
+    with FakeAlpacaServer(FakeAlpacaConfig(rate_limit=2)) as server:
+        broker = AlpacaBroker("key-1", "secret", base_url=server.url)
+        broker.get_account_info()
+        broker.list_positions()
+        assert RATE_LIMIT_REMAINING.labels(server.url.split("//")[1]).value == 0
+        with pytest.raises(APIError) as error:
+            broker.list_positions()
+        assert error.value.status_code == 429
+        assert server.api.stats["rate_limited"] == 1
+
+    api = FakeAlpaca(FakeAlpacaConfig(error_rate=1.0, error_codes=(503,)))
+    assert api.injected_error() == 503
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBClassifier
+
+from smartcfd.fast_predictor import FastPredictor, build_fast_predictor
+from smartcfd.hyperparameter_search import BASE_PARAMS
+
+FEATURES = [f"feature_{i}" for i in range(6)]
+
+
+def make_data(n_rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_rows, len(FEATURES))), columns=FEATURES)
+    X.iloc[::17, 2] = np.nan
+    y = np.select([X["feature_0"] > 0.4, X["feature_0"] < -0.4], [1, 2], default=0)
+    return X, y
+
+
+@pytest.mark.parametrize("early_stopping", [False, True])
+def test_fast_path_matches_sklearn_wrapper_exactly(early_stopping):
+    X, y = make_data()
+    if early_stopping:
+        model = XGBClassifier(**BASE_PARAMS, n_estimators=200, early_stopping_rounds=5)
+        model.fit(X[:400], y[:400], eval_set=[(X[400:], y[400:])], verbose=False)
+    else:
+        model = XGBClassifier(**BASE_PARAMS, n_estimators=30).fit(X, y)
+
+    predictor = build_fast_predictor(model, FEATURES)
+    assert predictor is not None
+
+    expected_proba = model.predict_proba(X)
+    expected_label = model.predict(X)
+    for i in range(len(X)):
+        label, confidence, _ = predictor.predict_latest(X.iloc[: i + 1])
+        assert label == expected_label[i]
+        assert confidence == expected_proba[i].max()
+        np.testing.assert_array_equal(predictor.predict_proba_row(X.iloc[i].to_numpy()), expected_proba[i])
+
+
+def test_latest_values_reorders_columns_and_reports_missing():
+    X, y = make_data(200)
+    model = XGBClassifier(**BASE_PARAMS, n_estimators=5).fit(X, y)
+    predictor = FastPredictor(model, FEATURES)
+
+    shuffled = X[FEATURES[::-1]].assign(extra=1.0)
+    np.testing.assert_array_equal(predictor.latest_values(shuffled), X.iloc[-1].to_numpy())
+
+    with pytest.raises(KeyError):
+        predictor.latest_values(X.drop(columns=["feature_3"]))
+
+
+def test_non_xgboost_models_use_reference_path():
+    assert build_fast_predictor(object(), FEATURES) is None
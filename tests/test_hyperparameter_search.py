@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from smartcfd.hyperparameter_search import successive_halving_search
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(0)
+    n = 3000
+    X = pd.DataFrame({f"feature_{i}": rng.normal(size=n) for i in range(5)})
+    score = X["feature_0"] + 0.5 * X["feature_1"]
+    y = pd.Series(np.select([score > 0.7, score < -0.7], [1, 2], default=0))
+    return X, y
+
+
+def test_successive_halving_promotes_fewer_candidates(dataset):
+    X, y = dataset
+    param_dist = {
+        'n_estimators': [100, 500],
+        'learning_rate': [0.05, 0.1, 0.3],
+        'max_depth': [2, 3, 4],
+    }
+    result = successive_halving_search(
+        X, y, param_distributions=param_dist, n_candidates=9, eta=3,
+        min_samples=250, max_estimators=200, early_stopping_rounds=10, n_jobs=1,
+    )
+    trace = result.trace_frame()
+
+    # 9 -> 3 -> 1 candidates on growing budgets
+    assert list(trace.groupby("rung")["candidate"].count()) == [9, 3, 1]
+    assert trace.groupby("rung")["n_samples"].first().is_monotonic_increasing
+    assert trace["n_samples"].max() == int(len(X) * 0.8)
+    assert "n_estimators" not in result.best_params
+    assert 1 <= result.best_n_estimators <= 200
+    assert np.isfinite(result.best_score)
+    assert result.best_score == trace[trace["rung"] == 2]["score"].iloc[0]
+
+
+def test_successive_halving_uses_sample_weights(dataset):
+    X, y = dataset
+    weights = np.ones(len(y))
+    result = successive_halving_search(
+        X, y, sample_weight=weights, param_distributions={'max_depth': [2, 3]},
+        n_candidates=2, eta=2, min_samples=500, max_estimators=50, n_jobs=1,
+    )
+    assert result.best_params["max_depth"] in (2, 3)
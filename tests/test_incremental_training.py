@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+
+from smartcfd.dataset_store import BarDatasetStore
+from smartcfd.hyperparameter_search import BASE_PARAMS
+from smartcfd.training_data import build_training_matrix
+from smartcfd.incremental_training import (
+    continue_training, full_search_due, load_training_metadata, save_training_metadata, training_metadata_path,
+    STATUS_DEGRADED, STATUS_NO_NEW_DATA, STATUS_UPDATED,
+)
+
+
+def make_dataset(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_rows, 4)), columns=[f"feature_{i}" for i in range(4)])
+    y = pd.Series(np.select([X["feature_0"] > 0.5, X["feature_0"] < -0.5], [1, 2], default=0))
+    return X, y
+
+
+def base_model(X, y):
+    return XGBClassifier(**BASE_PARAMS, max_depth=3, n_estimators=20).fit(X, y)
+
+
+def test_metadata_round_trip(tmp_path):
+    path = training_metadata_path(str(tmp_path / "model.joblib"))
+    assert path.name == "training_metadata.json"
+    assert load_training_metadata(path) is None
+
+    save_training_metadata(path, {"trained_through": "2024-01-01T00:00:00+00:00", "best_params": {"max_depth": 3}})
+    assert load_training_metadata(path)["best_params"] == {"max_depth": 3}
+
+
+def test_full_search_due():
+    now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    assert full_search_due(None, 28, now=now)
+    assert not full_search_due({"last_full_search": (now - timedelta(days=7)).isoformat()}, 28, now=now)
+    assert full_search_due({"last_full_search": (now - timedelta(days=30)).isoformat()}, 28, now=now)
+
+
+def test_continue_training_adds_trees_without_touching_the_original():
+    X, y = make_dataset(1500)
+    model = base_model(X.iloc[:1000], y.iloc[:1000])
+    before = model.predict_proba(X.iloc[1000:])
+
+    result = continue_training(model, X.iloc[1000:], y.iloc[1000:], params={"max_depth": 3}, max_new_trees=50, early_stopping_rounds=5)
+
+    assert result.status == STATUS_UPDATED
+    assert result.new_trees > 0
+    assert result.model.get_booster().num_boosted_rounds() == 20 + result.new_trees
+    assert result.trained_through == X.index[1399]  # The last 100 rows were only validated on
+    np.testing.assert_array_equal(model.predict_proba(X.iloc[1000:]), before)
+
+
+def test_continue_training_rejects_degraded_update_and_short_windows():
+    X, y = make_dataset(1500)
+    model = base_model(X.iloc[:1000], y.iloc[:1000])
+
+    degraded = continue_training(model, X.iloc[1000:], y.iloc[1000:], params={}, baseline_logloss=1e-6)
+    assert degraded.status == STATUS_DEGRADED
+    assert degraded.model is None
+
+    short = continue_training(model, X.iloc[1000:1010], y.iloc[1000:1010], params={}, min_rows=50)
+    assert short.status == STATUS_NO_NEW_DATA
+
+
+def test_trained_through_is_the_last_bar_fitted_on(tmp_path, monkeypatch):
+    from smartcfd import model_trainer
+
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2024-01-01", periods=1500, freq="15min", tz="UTC")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, len(index))))
+    bars = pd.DataFrame({"open": close, "high": close * 1.001, "low": close * 0.999, "close": close, "volume": 10.0}, index=index)
+    BarDatasetStore(str(tmp_path / "bars")).write("BTC/USD", "15m", bars)
+
+    fitted = set()
+    fit = XGBClassifier.fit
+
+    def recording_fit(self, X, y, **kwargs):
+        fitted.update(X.index)
+        return fit(self, X, y, **kwargs)
+
+    monkeypatch.setattr(XGBClassifier, "fit", recording_fit)
+    model_path = model_trainer.train_and_evaluate_model(
+        symbol="BTC/USD", start_date="2024-01-01", end_date="2024-01-17", timeframe_str="15m",
+        model_output_path=str(tmp_path / "models" / "model.joblib"), dataset_root=str(tmp_path / "bars"),
+        offline=True, reports_dir=str(tmp_path / "reports"), n_jobs=1,
+    )
+
+    trained_through = pd.Timestamp(load_training_metadata(training_metadata_path(model_path))["trained_through"])
+    rows = build_training_matrix(bars).frame().index
+    assert rows[-1] > trained_through  # The test period
+    assert set(rows[rows <= trained_through]) <= fitted
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, patch, PropertyMock
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import joblib
 import time
@@ -41,7 +42,7 @@ def test_inference_strategy_model_loading(mock_joblib_load, tmp_path):
     mock_joblib_load.assert_called_once_with(str(model_path))
     assert strategy.model is not None
 
-@patch("smartcfd.strategy.joblib.load")
+@patch("smartcfd.model_registry.joblib.load")
 @patch("smartcfd.strategy.create_features")
 @patch("smartcfd.strategy.DataLoader")
 @patch("smartcfd.strategy.Path.exists")
@@ -98,3 +99,150 @@ def test_inference_strategy_evaluate(
     assert action["action"] == "buy"
     assert action["symbol"] == "BTC/USD"
     assert action["decision"] == "buy"
+
+
+class FixedLabelModel:
+    """Pickleable model that always predicts one label with full confidence."""
+    def __init__(self, label):
+        self.label = label
+
+    def predict(self, X):
+        return np.full(len(X), self.label)
+
+    def predict_proba(self, X):
+        proba = np.zeros((len(X), 3))
+        proba[:, self.label] = 1.0
+        return proba
+
+
+def test_inference_strategy_routes_symbols_to_their_models(tmp_path, monkeypatch):
+    """Symbols with a model under MODELS_DIR/<SYMBOL> use it; the rest fall back to the shared model."""
+    from smartcfd.config import AppConfig
+    from smartcfd.training_orchestrator import symbol_model_path
+
+    feature_names = ["feature_rsi", "feature_return_5m"]
+    joblib.dump(FixedLabelModel(0), tmp_path / "model.joblib")
+    joblib.dump(feature_names, tmp_path / "feature_names.joblib")
+    btc_path = symbol_model_path("BTC/USD", str(tmp_path))
+    btc_path.parent.mkdir(parents=True)
+    joblib.dump(FixedLabelModel(1), btc_path)
+    joblib.dump(feature_names, btc_path.with_name("feature_names.joblib"))
+
+    monkeypatch.setenv("MODEL_PATH", str(tmp_path / "model.joblib"))
+    monkeypatch.setenv("FEATURE_NAMES_PATH", str(tmp_path / "feature_names.joblib"))
+    monkeypatch.setenv("MODELS_DIR", str(tmp_path))
+    broker = MagicMock(api_key="key", secret_key="secret", base_url="https://paper-api.alpaca.markets")
+    strategy = InferenceStrategy(AppConfig(watch_list="BTC/USD,ETH/USD", min_data_points=100), broker)
+
+    index = pd.date_range("2024-01-01", periods=150, freq="15min", tz="UTC")
+    close = pd.Series(range(150), index=index, dtype=float) + 100
+    bars = pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 10.0})
+
+    assert strategy.evaluate("BTC/USD", "trending_up", bars)["side"] == "buy"
+    assert strategy.evaluate("ETH/USD", "trending_up", bars) is None
+
+
+def test_inference_strategy_hot_swaps_and_rolls_back_registry_models(tmp_path, monkeypatch):
+    """A newly activated registry version is picked up by refresh_models without a restart."""
+    from smartcfd.config import AppConfig
+    from smartcfd.model_registry import ModelRegistry
+
+    feature_names = ["feature_rsi", "feature_return_5m"]
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    for label in (0, 1):
+        work = tmp_path / f"work{label}"
+        work.mkdir()
+        joblib.dump(FixedLabelModel(label), work / "model.joblib")
+        joblib.dump(feature_names, work / "feature_names.joblib")
+    registry.publish(str(tmp_path / "work0" / "model.joblib"))
+
+    monkeypatch.setenv("MODEL_PATH", str(tmp_path / "missing.joblib"))
+    monkeypatch.setenv("MODELS_DIR", str(tmp_path))
+    monkeypatch.setenv("MODEL_REGISTRY_DIR", str(tmp_path / "registry"))
+    broker = MagicMock(api_key="key", secret_key="secret", base_url="https://paper-api.alpaca.markets")
+    strategy = InferenceStrategy(AppConfig(watch_list="BTC/USD", min_data_points=100), broker)
+
+    index = pd.date_range("2024-01-01", periods=150, freq="15min", tz="UTC")
+    close = pd.Series(range(150), index=index, dtype=float) + 100
+    bars = pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 10.0})
+
+    assert strategy.evaluate("BTC/USD", "trending_up", bars) is None
+    assert strategy.refresh_models() == []
+
+    registry.publish(str(tmp_path / "work1" / "model.joblib"))
+    assert strategy.refresh_models() == ["default"]
+    assert strategy.evaluate("BTC/USD", "trending_up", bars)["side"] == "buy"
+
+    registry.rollback()
+    assert strategy.refresh_models() == ["default"]
+    assert strategy.evaluate("BTC/USD", "trending_up", bars) is None
+
+
+class CountingModel(FixedLabelModel):
+    """FixedLabelModel that counts how many rows it has scored."""
+    def __init__(self, label):
+        super().__init__(label)
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return super().predict(X)
+
+
+@pytest.mark.parametrize("policy, expected_calls", [("closed", 2), ("always", 4)])
+def test_inference_strategy_rescores_only_when_a_bar_closes(tmp_path, monkeypatch, policy, expected_calls):
+    """With the 'closed' policy, repeated cycles on the same closed bars reuse the cached signal."""
+    from smartcfd.config import AppConfig
+
+    joblib.dump(CountingModel(1), tmp_path / "model.joblib")
+    joblib.dump(["feature_rsi", "feature_return_5m"], tmp_path / "feature_names.joblib")
+    monkeypatch.setenv("MODEL_PATH", str(tmp_path / "model.joblib"))
+    monkeypatch.setenv("FEATURE_NAMES_PATH", str(tmp_path / "feature_names.joblib"))
+    monkeypatch.setenv("MODELS_DIR", str(tmp_path))
+    monkeypatch.setenv("MODEL_REGISTRY_DIR", str(tmp_path / "registry"))
+    broker = MagicMock(api_key="key", secret_key="secret", base_url="https://paper-api.alpaca.markets")
+    strategy = InferenceStrategy(AppConfig(watch_list="BTC/USD", min_data_points=100, intrabar_policy=policy), broker)
+
+    index = pd.date_range("2024-01-01", periods=151, freq="15min", tz="UTC")
+    close = pd.Series(range(151), index=index, dtype=float) + 100
+    bars = pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 10.0})
+
+    for _ in range(3):
+        signal = strategy.evaluate("BTC/USD", "trending_up", bars.iloc[:150])
+        assert signal["side"] == "buy"
+    signal["side"] = "sell"  # callers get a copy of the cached signal
+    assert strategy.evaluate("BTC/USD", "trending_up", bars.iloc[1:])["side"] == "buy"
+    assert strategy.model.calls == expected_calls
+
+
+def test_inference_strategy_builds_one_predictor_per_version_across_threads(tmp_path, monkeypatch):
+    """Pipelined cycles score symbols on several threads; a model version gets one fast predictor."""
+    import threading
+    from smartcfd import strategy as strategy_module
+    from smartcfd.config import AppConfig
+    from smartcfd.model_registry import DEFAULT_MODEL_NAME
+
+    joblib.dump(CountingModel(1), tmp_path / "model.joblib")
+    joblib.dump(["feature_rsi", "feature_return_5m"], tmp_path / "feature_names.joblib")
+    monkeypatch.setenv("MODEL_PATH", str(tmp_path / "model.joblib"))
+    monkeypatch.setenv("FEATURE_NAMES_PATH", str(tmp_path / "feature_names.joblib"))
+    monkeypatch.setenv("MODELS_DIR", str(tmp_path))
+    monkeypatch.setenv("MODEL_REGISTRY_DIR", str(tmp_path / "registry"))
+    builds = []
+
+    def build(model, feature_names):
+        builds.append(model)
+        time.sleep(0.05)
+        return MagicMock()
+
+    monkeypatch.setattr(strategy_module, "build_fast_predictor", build)
+    strategy = InferenceStrategy(AppConfig(watch_list="BTC/USD"), MagicMock(api_key="key", secret_key="secret", base_url="https://paper-api.alpaca.markets"))
+    loaded = strategy._models[DEFAULT_MODEL_NAME]
+
+    predictors = []
+    threads = [threading.Thread(target=lambda: predictors.append(strategy._predictor_for(loaded))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(builds) == 1 and len({id(p) for p in predictors}) == 1
@@ -0,0 +1,73 @@
+import sqlite3
+from types import SimpleNamespace
+
+from smartcfd.db import init_schema, record_heartbeat
+from smartcfd.metrics import (
+    BROKER_ERRORS,
+    BROKER_SECONDS,
+    DB_SECONDS,
+    DB_WRITE_QUEUE,
+    RATE_LIMIT_LIMIT,
+    RATE_LIMIT_REMAINING,
+    REGISTRY,
+    Registry,
+    observe_rate_limit,
+    span_metrics,
+)
+from smartcfd.tracing import configure_tracing, tracer
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    orders = registry.counter("t_orders_total", "Orders.", ("status",))
+    depth = registry.gauge("t_depth", "Depth.")
+    latency = registry.histogram("t_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+
+    orders.labels("submitted").inc()
+    orders.labels(status="submitted").inc()
+    depth.set(3)
+    for value in (0.05, 0.5, 5.0):
+        latency.labels("fetch").observe(value)
+
+    text = registry.render()
+    assert "# TYPE t_orders_total counter" in text
+    assert 't_orders_total{status="submitted"} 2' in text
+    assert "t_depth 3" in text
+    # Buckets are cumulative and end with +Inf
+    assert 't_seconds_bucket{stage="fetch",le="0.1"} 1' in text
+    assert 't_seconds_bucket{stage="fetch",le="1"} 2' in text
+    assert 't_seconds_bucket{stage="fetch",le="+Inf"} 3' in text
+    assert 't_seconds_sum{stage="fetch"} 5.55' in text
+    assert 't_seconds_count{stage="fetch"} 3' in text
+
+
+def test_spans_are_routed_to_their_metric_family():
+    assert span_metrics("broker.submit_order") == (BROKER_SECONDS.labels("submit_order"), BROKER_ERRORS.labels("submit_order"))
+    assert span_metrics("db.record_run")[0] is DB_SECONDS.labels("record_run")
+    seconds, _ = span_metrics("trader.get_market_data")
+    assert seconds is not BROKER_SECONDS.labels("trader.get_market_data")
+    assert 'stage="trader.get_market_data"' in REGISTRY.render()
+
+
+def test_rate_limit_hook_reads_response_headers():
+    response = SimpleNamespace(
+        headers={"X-RateLimit-Remaining": "187", "X-RateLimit-Limit": "200"},
+        request=SimpleNamespace(url="https://paper-api.alpaca.markets/v2/account"),
+    )
+    assert observe_rate_limit(response) is response
+    assert RATE_LIMIT_REMAINING.labels("paper-api.alpaca.markets").value == 187
+    assert RATE_LIMIT_LIMIT.labels("paper-api.alpaca.markets").value == 200
+
+
+def test_db_writes_are_timed_and_leave_the_queue_gauge_at_zero():
+    configure_tracing(True)
+    try:
+        conn = sqlite3.connect(":memory:")
+        init_schema(conn)
+        before = DB_SECONDS.labels("record_heartbeat").count
+        record_heartbeat(conn, True, latency_ms=12.5)
+        assert DB_SECONDS.labels("record_heartbeat").count == before + 1
+        assert DB_WRITE_QUEUE.labels().value == 0
+    finally:
+        configure_tracing(False)
+        tracer.reset()
@@ -0,0 +1,58 @@
+import joblib
+import pytest
+
+from smartcfd.model_registry import ModelRegistry, file_version, load_current_model
+
+
+def write_model(directory, payload):
+    directory.mkdir(parents=True, exist_ok=True)
+    joblib.dump({"weights": payload}, directory / "model.joblib")
+    joblib.dump(["feature_a", "feature_b"], directory / "feature_names.joblib")
+    return directory / "model.joblib"
+
+
+def test_publish_is_content_addressed_and_idempotent(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    model_path = write_model(tmp_path / "work", [1, 2, 3])
+
+    version = registry.publish(str(model_path))
+    assert registry.publish(str(model_path)) == version
+    assert registry.versions() == [version]
+    assert registry.current_version() == version
+    assert registry.load().model == {"weights": [1, 2, 3]}
+
+
+def test_activate_and_rollback_switch_the_pointer(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "registry"), "BTC_USD")
+    v1 = registry.publish(str(write_model(tmp_path / "a", [1])))
+    v2 = registry.publish(str(write_model(tmp_path / "b", [2])))
+    assert v1 != v2
+    assert registry.manifest()["previous"] == v1
+
+    assert registry.rollback() == v1
+    assert registry.current_version() == v1
+    assert registry.load().model == {"weights": [1]}
+    assert [h["version"] for h in registry.manifest()["history"]] == [v1, v2, v1]
+
+    with pytest.raises(ValueError):
+        registry.activate("does-not-exist")
+
+
+def test_prune_keeps_current_and_previous(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    versions = [registry.publish(str(write_model(tmp_path / str(i), [i]))) for i in range(5)]
+    removed = registry.prune(keep=1)
+    assert set(registry.versions()) == {versions[2], versions[3], versions[4]}
+    assert set(removed) == set(versions[:2])
+
+
+def test_load_current_model_falls_back_to_plain_file(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    model_path = write_model(tmp_path, [7])
+    loaded = load_current_model(registry, model_path)
+    assert loaded.version == file_version(model_path)
+    assert loaded.feature_names == ["feature_a", "feature_b"]
+
+    version = registry.publish(str(model_path))
+    assert load_current_model(registry, model_path).version == version
+    assert load_current_model(ModelRegistry(str(tmp_path / "registry"), "ETH_USD"), tmp_path / "missing.joblib") is None
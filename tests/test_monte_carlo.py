@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from smartcfd.monte_carlo import equity_from_trade_history, returns_from_equity, run_monte_carlo
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(7)
+    return rng.normal(0.0005, 0.01, 500)
+
+
+def test_block_bootstrap_confidence_intervals(returns):
+    result = run_monte_carlo(returns, n_paths=2000, method="block", block_size=10, chunk_size=300, seed=1)
+
+    assert result.sharpe.shape == (2000,)
+    for name in ("sharpe", "max_drawdown", "terminal_equity"):
+        ci = result.confidence_intervals[name]
+        assert ci["lower"] <= ci["upper"]
+    assert (result.max_drawdown <= 0).all()
+    assert (result.terminal_equity > 0).all()
+
+
+def test_shuffle_preserves_terminal_equity(returns):
+    result = run_monte_carlo(returns, n_paths=500, method="shuffle", seed=3)
+    expected = np.prod(1 + returns)
+    np.testing.assert_allclose(result.terminal_equity, expected, rtol=1e-9)
+
+
+def test_seeded_runs_are_reproducible(returns):
+    a = run_monte_carlo(returns, n_paths=1000, method="block", chunk_size=250, seed=5)
+    b = run_monte_carlo(returns, n_paths=1000, method="block", chunk_size=250, seed=5)
+    np.testing.assert_array_equal(a.sharpe, b.sharpe)
+
+
+def test_invalid_method(returns):
+    with pytest.raises(ValueError):
+        run_monte_carlo(returns, method="unknown")
+
+
+def test_equity_from_trade_history():
+    trades = pd.DataFrame({
+        "timestamp": ["2025-01-01 00:00:00+00:00", "2025-01-01 01:00:00+00:00"],
+        "symbol": ["BTC/USD", "BTC/USD"],
+        "qty": [1.0, 1.0],
+        "side": ["buy", "sell"],
+        "price": [100.0, 110.0],
+    })
+    equity = equity_from_trade_history(trades, 1000.0)
+    assert list(equity) == [1000.0, 1000.0, 1010.0]
+    np.testing.assert_allclose(returns_from_equity(equity), [0.0, 0.01])
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from smartcfd.backtest_portfolio import BacktestPortfolio
+from smartcfd.config import RiskConfig
+from smartcfd.multi_asset_backtest import align_bars, run_multi_asset_backtest
+from smartcfd.risk import BacktestRiskManager
+
+FEATURES = ['feature_return_1m', 'feature_rsi', 'feature_hour_of_day']
+
+
+class AlwaysBuyModel:
+    """Predicts 'buy' with full confidence and records batch sizes."""
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_proba(self, X):
+        self.batch_sizes.append(len(X))
+        proba = np.zeros((len(X), 3))
+        proba[:, 1] = 1.0
+        return proba
+
+
+def make_bars(start, periods, base_price, freq="1h", seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start=start, periods=periods, freq=freq, tz="UTC")
+    close = base_price + np.cumsum(rng.normal(0, 1, periods))
+    return pd.DataFrame({
+        'open': close,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': 1000.0,
+    }, index=index)
+
+
+def test_align_bars_uses_union_index():
+    data = {
+        "BTC/USD": make_bars("2024-01-01", 100, 100.0),
+        "ETH/USD": make_bars("2024-01-01 10:00", 100, 50.0, seed=1),
+    }
+    aligned = align_bars(data, FEATURES)
+
+    assert len(aligned.index) == 110
+    assert aligned.close.shape == (2, 110)
+    assert aligned.features.shape == (2, 110, len(FEATURES))
+    assert aligned.features.dtype == np.float32
+    # ETH has no bars for the first 10 hours
+    assert not aligned.has_bar[1, :10].any()
+    assert aligned.has_bar[0, :100].all()
+    assert not aligned.has_bar[0, 100:].any()
+
+
+def test_multi_asset_backtest_respects_total_exposure():
+    data = {s: make_bars("2024-01-01", 120, 100.0, seed=i) for i, s in enumerate(["A", "B", "C", "D"])}
+    aligned = align_bars(data, FEATURES)
+    risk_cfg = RiskConfig(max_total_exposure_percent=30.0, max_exposure_per_asset_percent=25.0, risk_per_trade_percent=10.0)
+    model = AlwaysBuyModel()
+
+    result = run_multi_asset_backtest(aligned, model, risk_cfg, initial_capital=10000.0, confidence_threshold=0.5)
+
+    # Symbols are scored together in one batch per timestamp
+    assert max(model.batch_sizes) == 4
+    assert len(result.equity_curve) == len(aligned.index)
+
+    assert not result.trades.empty
+
+    # Replay the fills: after every buy, exposure at that bar's prices stays within the 30% cap
+    positions = {}
+    for trade in result.trades.itertuples():
+        sign = 1 if trade.action == "buy" else -1
+        positions[trade.symbol] = positions.get(trade.symbol, 0.0) + sign * trade.quantity
+        t = aligned.index.get_loc(trade.timestamp)
+        exposure = sum(qty * aligned.close[aligned.symbols.index(s), t] for s, qty in positions.items())
+        assert exposure <= result.equity_curve.iloc[t] * 0.30 + 1e-6
+
+
+def test_backtest_risk_manager_caps():
+    risk_cfg = RiskConfig(max_total_exposure_percent=50.0, max_exposure_per_asset_percent=25.0, risk_per_trade_percent=100.0)
+    rm = BacktestRiskManager(risk_cfg)
+    portfolio = BacktestPortfolio(initial_capital=1000.0)
+
+    # Limited by per-asset cap: 25% of 1000 at price 10 -> 25 units
+    assert rm.calculate_order_qty("A", 10.0, portfolio) == pytest.approx(25.0)
+
+    portfolio.execute_order("A", 25.0, "buy", 10.0)
+    assert rm.calculate_order_qty("A", 10.0, portfolio) == 0.0
+
+    portfolio.execute_order("B", 25.0, "buy", 10.0)
+    prices = {"A": 10.0, "B": 10.0}
+    # Total exposure is now 500 / 1000 = 50%, so no new symbol may be bought
+    assert rm.calculate_order_qty("C", 10.0, portfolio, prices) == 0.0
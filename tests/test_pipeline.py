@@ -0,0 +1,60 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from smartcfd.config import AppConfig, RegimeConfig, RiskConfig
+from smartcfd.pipeline import Stage, StagedPipeline
+from smartcfd.trader import Trader
+
+
+def test_staged_pipeline_overlaps_stages_and_drops_failed_items():
+    def fetch(i):
+        time.sleep(0.1)
+        if i == 3:
+            raise IOError("download failed")
+        return i
+
+    results = []
+    pipeline = StagedPipeline([Stage("fetch", fetch, workers=4), Stage("double", lambda i: i * 2, workers=2)], queue_size=2)
+    stats = pipeline.run(range(8), results.append)
+
+    assert sorted(results) == [0, 2, 4, 8, 10, 12, 14]
+    assert stats["counts"] == {"fetch": 7, "double": 7}
+    assert stats["seconds"] < 0.5  # 8 downloads of 0.1s on 4 workers
+
+
+def test_staged_pipeline_keeps_draining_when_the_consumer_fails():
+    def consume(item):
+        raise RuntimeError("order rejected")
+
+    stats = StagedPipeline([Stage("noop", lambda i: i)], queue_size=1).run(range(5), consume)
+    assert stats["consumed"] == 5
+    assert threading.active_count() < 10
+
+
+def test_pipelined_cycle_executes_each_symbol_and_stops_after_a_volatility_halt():
+    app_cfg = AppConfig(watch_list="BTC/USD,ETH/USD,SOL/USD", cycle_mode="pipelined", pipeline_fetch_workers=1)
+    strategy = MagicMock()
+    bars = pd.DataFrame({"close": [1.0, 2.0]})
+    strategy.get_historical_data.side_effect = lambda symbols: {symbols[0]: bars}
+    strategy.evaluate.side_effect = lambda symbol, regime, historical_data: {"action": "trade", "side": "buy", "confidence": 0.9}
+    risk_manager = MagicMock()
+    risk_manager.check_for_halt.return_value = False
+    risk_manager.volatility_check.side_effect = lambda data, symbol: symbol == "ETH/USD"
+
+    with patch.object(Trader, "_initialize_strategy", return_value=strategy):
+        trader = Trader(app_cfg, RiskConfig(), RegimeConfig(), MagicMock(), MagicMock(), MagicMock(), risk_manager)
+    trader.regime_detector = MagicMock()
+    calls = []
+    trader.execute_actions = MagicMock(side_effect=lambda actions, data: calls.append(("execute", actions[0]["symbol"])))
+    trader.reconcile_trade_groups = MagicMock(side_effect=lambda data, symbols=None: calls.append(("reconcile", *sorted(symbols))))
+    trader.trade_group_manager = MagicMock()
+    trader.trade_group_manager.get_all_trade_groups.return_value = [MagicMock(symbol="BTC/USD"), MagicMock(symbol="XRP/USD")]
+    trader.evaluate_new_trades()
+
+    # Each symbol's groups are reconciled before its orders, even after the halt; then those of unwatched symbols
+    assert calls == [("reconcile", "BTC/USD"), ("execute", "BTC/USD"), ("reconcile", "ETH/USD"), ("reconcile", "SOL/USD"), ("reconcile", "XRP/USD")]
+    assert risk_manager.is_halted is True
+    assert list(trader._last_historical_data) == ["BTC/USD", "ETH/USD", "SOL/USD"]
@@ -0,0 +1,43 @@
+import pandas as pd
+from datetime import timedelta
+
+from smartcfd.prediction_cache import PredictionCache, bars_hash, closed_bar_count, prediction_key
+
+
+def _bars(periods=5, end=None):
+    index = pd.date_range(end=end or "2024-01-01 01:00", periods=periods, freq="15min", tz="UTC")
+    close = pd.Series(range(periods), index=index, dtype=float) + 100
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 10.0})
+
+
+def test_prediction_cache_evicts_least_recently_used():
+    cache = PredictionCache(max_entries=2)
+    now = pd.Timestamp.now(tz="UTC")
+    cache.put("a", {"side": "buy"}, now)
+    cache.put("b", None, now)
+    assert cache.get("a").signal == {"side": "buy"}
+    cache.put("c", None, now)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats() == {"entries": 2, "hits": 3, "misses": 1}
+
+
+def test_closed_bar_count_excludes_the_in_progress_bar():
+    bars = _bars()
+    last_open = bars.index[-1]
+    assert closed_bar_count(bars.index, timedelta(minutes=15), last_open + pd.Timedelta(minutes=7)) == 4
+    assert closed_bar_count(bars.index, timedelta(minutes=15), last_open + pd.Timedelta(minutes=15)) == 5
+    assert closed_bar_count(bars.index.tz_localize(None), timedelta(minutes=15), last_open + pd.Timedelta(minutes=7)) == 4
+
+
+def test_prediction_key_changes_with_closed_bar_contents():
+    bars = _bars()
+    key = prediction_key("BTC/USD", "v1", bars)
+    assert key == prediction_key("BTC/USD", "v1", bars.copy())
+    assert key != prediction_key("BTC/USD", "v2", bars)
+
+    revised = bars.copy()
+    revised.iloc[2, revised.columns.get_loc("close")] += 0.5
+    assert bars_hash(revised) != bars_hash(bars)
+    assert prediction_key("BTC/USD", "v1", revised)[:3] == key[:3]
@@ -104,3 +104,25 @@ def test_retrain_main_no_existing_model(mock_train_and_evaluate):
     
     # Assert that training was still called
     mock_train_and_evaluate.assert_called_once()
+
+
+def test_manual_training_publishes_the_model(tmp_path, monkeypatch):
+    """A model trained by scripts/train_model.py becomes the registry's current version, which the trader loads."""
+    import joblib
+    from scripts import train_model
+    from smartcfd.model_registry import ModelRegistry
+
+    def fake_train(**kwargs):
+        model_path = tmp_path / "model.joblib"
+        joblib.dump({"model": 1}, model_path)
+        joblib.dump(["feature"], tmp_path / "feature_names.joblib")
+        return str(model_path)
+
+    monkeypatch.setattr(train_model, "train_and_evaluate_model", fake_train)
+    monkeypatch.setattr(train_model, "load_config_from_file", lambda: (MagicMock(trade_interval="1h"), None, None, None))
+    monkeypatch.setattr(train_model, "DEFAULT_REGISTRY_DIR", str(tmp_path / "registry"))
+    monkeypatch.setattr(sys, "argv", ["train_model.py"])
+
+    train_model.main()
+
+    assert ModelRegistry(str(tmp_path / "registry")).load().feature_names == ["feature"]
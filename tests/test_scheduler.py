@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+import pytest
+
+from smartcfd.scheduler import FULL, LIGHT, BarCloseScheduler, build_scheduler
+
+BAR = 15 * 60
+T0 = 1_700_000_200.0  # 100s into a 15m bar
+
+
+def _run(scheduler, cycle, duration=0.5):
+    scheduler.complete(cycle)
+    return cycle.at + duration
+
+
+def test_full_cycles_align_to_bar_close_plus_settle():
+    scheduler = BarCloseScheduler(timedelta(minutes=15), settle_seconds=5)
+    first = scheduler.next_cycle(T0)
+    assert first.kind == FULL and first.at == T0
+    now = _run(scheduler, first, duration=3.7)
+
+    times = []
+    for _ in range(3):
+        cycle = scheduler.next_cycle(now)
+        assert cycle.kind == FULL
+        times.append(cycle.at)
+        now = _run(scheduler, cycle, duration=2.3)  # cycle durations do not shift the grid
+    assert all(t % BAR == 5 for t in times)
+    assert [b - a for a, b in zip(times, times[1:])] == [BAR, BAR]
+
+
+def test_light_cycles_run_between_bar_closes():
+    scheduler = BarCloseScheduler(timedelta(minutes=15), settle_seconds=5, light_interval_seconds=300)
+    now = _run(scheduler, scheduler.next_cycle(T0))
+    kinds = []
+    for _ in range(6):
+        cycle = scheduler.next_cycle(now)
+        kinds.append((cycle.kind, (cycle.at - 5) % BAR))
+        now = _run(scheduler, cycle)
+    assert kinds == [(LIGHT, 300), (LIGHT, 600), (FULL, 0), (LIGHT, 300), (LIGHT, 600), (FULL, 0)]
+
+
+def test_missed_bar_close_runs_immediately():
+    scheduler = BarCloseScheduler(timedelta(minutes=15), settle_seconds=5, light_interval_seconds=60)
+    _run(scheduler, scheduler.next_cycle(T0))
+    late = scheduler.last_close(T0) + BAR + 40  # a cycle overran past the next close
+    cycle = scheduler.next_cycle(late)
+    assert cycle.kind == FULL and cycle.at == scheduler.last_close(late)
+
+
+def test_unknown_schedule_mode_is_rejected():
+    with pytest.raises(ValueError):
+        build_scheduler("cron", timedelta(minutes=15), 5, 60)
@@ -0,0 +1,48 @@
+import sqlite3
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from smartcfd.config import AppConfig, RegimeConfig, RiskConfig
+from smartcfd.db import init_schema
+from smartcfd.sharded_trader import ShardedTrader, ShardResult, partition_symbols
+
+
+def test_partition_symbols_round_robin():
+    symbols = ["BTC/USD", "ETH/USD", "SOL/USD", "LTC/USD", "DOGE/USD"]
+    assert partition_symbols(symbols, 2) == [["BTC/USD", "SOL/USD", "DOGE/USD"], ["ETH/USD", "LTC/USD"]]
+    assert partition_symbols(symbols[:1], 4) == [["BTC/USD"]]
+
+
+def test_sharded_trader_executes_shard_actions_in_watch_list_order():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    init_schema(conn)
+    risk_manager = MagicMock()
+    risk_manager.check_for_halt.return_value = False
+    trader = ShardedTrader(
+        app_config=AppConfig(watch_list="BTC/USD, ETH/USD, SOL/USD"),
+        risk_config=RiskConfig(),
+        regime_config=RegimeConfig(),
+        broker=MagicMock(),
+        db_conn=conn,
+        portfolio_manager=MagicMock(),
+        risk_manager=risk_manager,
+        n_shards=2,
+    )
+    assert trader.strategy is None
+    assert trader.shards == [["BTC/USD", "SOL/USD"], ["ETH/USD"]]
+
+    bars = pd.DataFrame({"close": [1.0, 2.0]})
+    trader._collect = MagicMock(return_value=[
+        ShardResult(["ETH/USD"], {"ETH/USD": bars}, {"ETH/USD": "trending_up"}, [{"action": "trade", "side": "buy", "symbol": "ETH/USD"}]),
+        ShardResult(["BTC/USD", "SOL/USD"], {"BTC/USD": bars, "SOL/USD": bars}, {"BTC/USD": "trending_up"},
+                    [{"action": "trade", "side": "sell", "symbol": "SOL/USD"}, {"action": "trade", "side": "buy", "symbol": "BTC/USD"}]),
+    ])
+    trader.execute_actions = MagicMock()
+    trader.evaluate_new_trades()
+    trader.close()
+
+    actions, historical_data = trader.execute_actions.call_args.args
+    assert [a["symbol"] for a in actions] == ["BTC/USD", "ETH/USD", "SOL/USD"]
+    assert set(historical_data) == {"BTC/USD", "ETH/USD", "SOL/USD"}
@@ -0,0 +1,29 @@
+import pytest
+
+from smartcfd.alpaca_client import AlpacaBroker
+from smartcfd.fake_alpaca import FakeAlpacaConfig, FakeAlpacaServer
+from smartcfd.startup import BUDGETS, StartupBudget, check_startup, measure_import
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=lambda budget: budget.module)
+def test_entry_points_import_without_heavy_dependencies(budget):
+    # The repo root has no config.ini, so this also checks nothing reads it at import
+    seconds, loaded = measure_import(budget.module)
+    assert seconds > 0
+    assert not set(budget.forbidden) & set(loaded)
+
+
+def test_startup_rows_flag_budget_and_import_violations():
+    [row] = check_startup([StartupBudget("smartcfd.trader", 1e-6, ("pandas",))], repeat=1)
+    assert row["status"] == "heavy_import" and row["heavy"] == ["pandas"]
+    [row] = check_startup([StartupBudget("smartcfd.config", 1e-6)], repeat=1)
+    assert row["status"] == "over_budget"
+
+
+def test_broker_makes_no_request_until_used(monkeypatch):
+    monkeypatch.setenv("APCA_RETRY_MAX", "0")
+    with FakeAlpacaServer(FakeAlpacaConfig(rate_limit=0)) as server:
+        broker = AlpacaBroker("key-1", "secret", base_url=server.url)
+        assert not server.api.stats
+        broker.get_account_info()
+        assert server.api.stats == {"GET /v2/account": 1}
@@ -0,0 +1,71 @@
+import sqlite3
+import time
+
+import pytest
+
+from smartcfd.db import get_recent_cycle_traces, init_schema, record_cycle_trace
+from smartcfd.tracing import Histogram, configure_tracing, span, traced, tracer
+
+
+@pytest.fixture
+def tracing_on():
+    configure_tracing(True)
+    tracer.reset()
+    yield tracer
+    configure_tracing(False)
+    tracer.reset()
+
+
+@traced("test.work")
+def _work(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_spans_feed_histograms_and_the_open_cycle(tracing_on):
+    with tracer.cycle("full") as trace:
+        with span("test.fetch"):
+            time.sleep(0.01)
+        _work(0.002)
+        _work(0.002)
+    with span("test.fetch"):
+        pass
+
+    assert trace.stages()["test.work"]["count"] == 2
+    assert trace.stages()["test.fetch"]["total_ms"] >= 10
+    snapshot = tracer.snapshot()
+    assert snapshot["stages"]["test.fetch"]["count"] == 2
+    assert snapshot["stages"]["cycle.full"]["count"] == 1
+    assert snapshot["last_cycle"]["kind"] == "full"
+
+
+def test_disabled_tracing_records_nothing():
+    configure_tracing(False)
+    tracer.reset()
+    with tracer.cycle("full") as trace:
+        with span("test.fetch"):
+            pass
+        assert _work(0) == 0
+    assert trace is None
+    assert tracer.snapshot()["stages"] == {}
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = Histogram()
+    for _ in range(90):
+        histogram.observe(0.003)
+    for _ in range(10):
+        histogram.observe(0.2)
+    assert histogram.quantile(0.5) == 0.005
+    assert histogram.quantile(0.99) == 0.2
+    assert histogram.snapshot()["count"] == 100
+
+
+def test_cycle_traces_are_persisted():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    init_schema(conn)
+    record_cycle_trace(conn, "full", 812.5, {"trader.get_market_data": {"count": 1, "total_ms": 640.0, "max_ms": 640.0}})
+    rows = get_recent_cycle_traces(conn)
+    assert rows[0]["kind"] == "full"
+    assert rows[0]["stages"]["trader.get_market_data"]["total_ms"] == 640.0
@@ -0,0 +1,63 @@
+import pytest
+from alpaca_trade_api.rest import APIError
+
+from smartcfd import traffic
+from smartcfd.alpaca_client import AlpacaBroker
+from smartcfd.data_loader import DataLoader
+from smartcfd.fake_alpaca import FakeAlpacaConfig, FakeAlpacaServer
+from smartcfd.types import OrderRequest
+
+
+def _session(url):
+    broker = AlpacaBroker("key-1", "secret", base_url=url)
+    order = broker.submit_order(OrderRequest(symbol="BTC/USD", qty="0.5", side="buy", type="market", time_in_force="gtc", client_order_id="c-1"))
+    data = DataLoader("key-1", "secret", url).get_market_data(["BTC/USD", "ETH/USD"], "15m", 50)
+    with pytest.raises(APIError) as error:
+        broker.api.get_order("no-such-order")
+    return order, data, error.value
+
+
+@pytest.mark.parametrize("name", ["traffic.jsonl", "traffic.jsonl.gz"])
+def test_replay_serves_the_recording_without_the_network(tmp_path, monkeypatch, name):
+    monkeypatch.setenv("APCA_RETRY_MAX", "0")
+    path = str(tmp_path / name)
+    with FakeAlpacaServer(FakeAlpacaConfig(rate_limit=0)) as server:
+        monkeypatch.setenv("APCA_API_DATA_URL", server.url)
+        recorder = traffic.TrafficRecorder(path, meta={"app_config": {"watch_list": "BTC/USD,ETH/USD"}})
+        with traffic.installed(recorder):
+            recorder.mark("cycle", kind="full")
+            order, data, error = _session(server.url)
+        recorder.close()
+        url = server.url
+
+    [summary] = traffic.describe(path)
+    assert summary["cycles"] == 1 and summary["errors"] == 1
+    assert summary["endpoints"]["POST /v2/orders"] == 1
+
+    # The server is gone: every response now comes from the recording
+    replay = traffic.TrafficReplay(path)
+    assert replay.cycles == ["full"] and replay.meta["app_config"]["watch_list"] == "BTC/USD,ETH/USD"
+    with traffic.installed(replay):
+        replayed_order, replayed_data, replayed_error = _session(url)
+    assert replayed_order.id == order.id and replayed_order.filled_avg_price == order.filled_avg_price
+    for symbol, df in data.items():
+        assert replayed_data[symbol].equals(df)
+    assert replayed_error.status_code == error.status_code == 404
+    assert replay.remaining == 0 and replay.stats["substituted"] == 0
+
+
+def test_replay_substitutes_or_fails_on_unrecorded_requests(tmp_path):
+    path = str(tmp_path / "traffic.jsonl")
+    recorder = traffic.TrafficRecorder(path)
+    recorder.request({"api": "trading", "method": "GET", "path": "/v2/orders:by_client_order_id", "params": {"client_order_id": "g1_entry"}}, lambda: {"id": "o-1"})
+    recorder.close()
+    request = {"api": "trading", "method": "GET", "path": "/v2/orders:by_client_order_id", "params": {"client_order_id": "g2_entry"}}
+
+    with pytest.raises(traffic.ReplayMismatch):
+        traffic.TrafficReplay(path, strict=True).request(request, None)
+
+    replay = traffic.TrafficReplay(path)
+    assert replay.request(request, None) == {"id": "o-1"}
+    with pytest.raises(traffic.ReplayExhausted):
+        replay.request(request, None)
+    assert replay.stats == {"substituted": 1, "exhausted": 1}
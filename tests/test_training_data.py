@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from smartcfd.features import create_features
+from smartcfd.training_data import build_training_matrix, create_target, numeric_feature_columns
+
+
+def make_bars(n_rows, seed=3):
+    index = pd.date_range("2024-01-01", periods=n_rows, freq="1min", tz="UTC")
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n_rows)))
+    return pd.DataFrame({
+        "open": close, "high": close * 1.001, "low": close * 0.999, "close": close,
+        "volume": rng.uniform(1, 10, n_rows),
+    }, index=index)
+
+
+def test_matrix_is_float32_contiguous_and_matches_pandas_features():
+    bars = make_bars(3000)
+    data = build_training_matrix(bars)
+
+    features = create_features(bars)
+    names = numeric_feature_columns(features)
+    expected = features[names].assign(target=create_target(bars)).iloc[:-5].dropna()
+
+    assert data.X.dtype == np.float32 and data.X.flags["C_CONTIGUOUS"]
+    assert data.feature_names == names
+    assert data.index.equals(expected.index)
+    np.testing.assert_array_equal(data.y, expected["target"].to_numpy())
+    np.testing.assert_allclose(data.X, expected[names].to_numpy(dtype=np.float32), rtol=1e-6)
+
+
+def test_chunked_build_matches_single_chunk():
+    bars = make_bars(5000)
+    whole = build_training_matrix(bars)
+    chunked = build_training_matrix(bars, chunk_rows=1000, warmup_rows=500)
+
+    assert chunked.index.equals(whole.index)
+    np.testing.assert_array_equal(chunked.y, whole.y)
+    np.testing.assert_allclose(chunked.X, whole.X, rtol=1e-5, atol=1e-6)
+
+
+def test_frame_and_after_are_views():
+    bars = make_bars(2000)
+    data = build_training_matrix(bars, feature_names=["feature_rsi", "feature_return_5m"])
+    assert data.feature_names == ["feature_rsi", "feature_return_5m"]
+    assert np.shares_memory(data.frame().to_numpy(), data.X)
+
+    cutoff = data.index[1000]
+    tail = data.after(cutoff)
+    assert tail.index[0] > cutoff and len(tail) == len(data) - 1001
+    assert np.shares_memory(tail.X, data.X)
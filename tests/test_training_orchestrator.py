@@ -0,0 +1,19 @@
+from pathlib import Path
+
+from smartcfd.training_orchestrator import plan_cpu_budget, symbol_model_path
+
+
+def test_plan_cpu_budget_never_oversubscribes():
+    assert plan_cpu_budget(4, cpu_budget=16) == (4, 4)
+    assert plan_cpu_budget(3, cpu_budget=16) == (3, 5)
+    assert plan_cpu_budget(20, cpu_budget=8) == (8, 1)
+    assert plan_cpu_budget(4, cpu_budget=16, max_workers=2) == (2, 8)
+    assert plan_cpu_budget(1, cpu_budget=1) == (1, 1)
+    for n_jobs in range(1, 12):
+        workers, threads = plan_cpu_budget(n_jobs, cpu_budget=6)
+        assert workers * threads <= 6
+
+
+def test_symbol_model_path():
+    assert symbol_model_path("BTC/USD", "models") == Path("models/BTC_USD/model.joblib")
+    assert symbol_model_path("brk-b", "models") == Path("models/BRK_B/model.joblib")